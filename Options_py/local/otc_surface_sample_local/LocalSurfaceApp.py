@@ -59,8 +59,6 @@ class LocalOptions():
             opc_today = pd.merge(op_usdcop_strategies,op_usdcop_tenors,'cross')
             opc_today['Date'] = self.s_val_date
             opc_today  = opc_today.reindex(columns=['Date','Tenor', 'Strategy'])
-            for i in ['MID', 'BID', 'ASK', 'price_type']:
-                opc_today[i] = np.nan
             closing_hour = dt.datetime.strptime(self.closing_hour, "%H:%M:%S")
             start_hour = closing_hour - dt.timedelta(minutes= self.quotes_window)
             broker_info = self.trades_quotes
@@ -78,78 +76,57 @@ class LocalOptions():
             broker_info['hora-inicio-operacion'] = pd.to_datetime(broker_info['hora-inicio-operacion'], format = '%H:%M:%S')
             self.logger.info('Informacion aplicable para la muestra de opciones local USDCOP: \n ' +
                              broker_info.to_string())
+            fin = broker_info['hora-fin-operacion']
+            is_trade = broker_info['orden'] == 'TRADE'
             #1er Criterio: Trades a tiempo
+            on_time = (fin >= start_hour) & (fin <= closing_hour) & is_trade
+            # Trades fuera de tiempo
+            out_time = ~on_time & ((fin < start_hour) | (fin > closing_hour) & is_trade)
+            # Quotes activos
+            active_quotes = (fin - broker_info['hora-inicio-operacion'] >= dt.timedelta(minutes = self.quotes_window)) & (fin >= closing_hour)
+            # Funcionales de los tres criterios en una sola agrupacion
+            sample_info = pd.concat([broker_info.loc[on_time].assign(criterio = 1),
+                                     broker_info.loc[out_time].assign(criterio = 2),
+                                     broker_info.loc[active_quotes].assign(criterio = 3)], ignore_index = True)
+            summary = SamplingOptions().summary_opt_groups(sample_info, ['criterio', 'estrategia', 'tenor', 'orden']).reset_index()
+            trades_on_time = summary.loc[summary.criterio == 1]
+            trades_out_time = summary.loc[summary.criterio == 2]
+            quotes = summary.loc[summary.criterio == 3]
             self.logger.info('1er Criterio de la muestra: trades on time')
-            brokers_matchs_on_time = broker_info.loc[(broker_info['hora-fin-operacion'] >= start_hour )\
-                                                             & (broker_info['hora-fin-operacion'] <= closing_hour) \
-                                                                 & (broker_info['orden']  == 'TRADE')]
-            if brokers_matchs_on_time.empty:
+            if trades_on_time.empty:
                 self.logger.info('No hay informacion aplciable para el 1er criterio de la muestra')
-                best_data_on_time  = pd.DataFrame()
             else:
-                best_data_on_time = brokers_matchs_on_time.groupby(['estrategia', 'tenor', 'orden']
-                                                                    ).apply(SamplingOptions().summary_opt)
-                self.logger.info('Tenor/Estrategia criterio 1: '+ str(best_data_on_time.index.tolist()))
-            # Trades fuera de tiempo
+                self.logger.info('Tenor/Estrategia criterio 1: '+ str(list(trades_on_time[['estrategia', 'tenor', 'orden']].itertuples(index = False, name = None))))
             self.logger.info('2ndo criterio de la muestra: trades off time')
-            brokers_match_out_time = (broker_info.drop(brokers_matchs_on_time.index.to_list(), 
-                                                               axis=0)).loc[(broker_info['hora-fin-operacion']<start_hour) \
-                                                                            | (broker_info['hora-fin-operacion']>closing_hour) \
-                                                                            & (broker_info['orden'] == 'TRADE')]
-            if brokers_match_out_time.empty:
+            if trades_out_time.empty:
                 self.logger.info('No hay trades aplicables al segundo criterio')
-                best_data_out_time  = pd.DataFrame()
             else:
-                best_data_out_time = brokers_match_out_time.groupby(['estrategia', 'tenor', 'orden']
-                                                                     ).apply(SamplingOptions().summary_opt)
-                self.logger.info('Tenor/Estrategia criterio 2: ' + str(best_data_out_time.index.tolist()))
-            # Quotes activos
+                self.logger.info('Tenor/Estrategia criterio 2: ' + str(list(trades_out_time[['estrategia', 'tenor', 'orden']].itertuples(index = False, name = None))))
             self.logger.info('3er criterio de la muestra: active quotes')
-            best_data = broker_info.loc[(broker_info['hora-fin-operacion'] - \
-                                         broker_info['hora-inicio-operacion'] >= dt.timedelta(minutes = self.quotes_window)) & (broker_info['hora-fin-operacion'] >= closing_hour)]
-            if best_data.empty:
+            if quotes.empty:
                 self.logger.info('No hubo puntas considerables para el tercer criterio de la muestra')
-                best_data_ba =pd.DataFrame()
             else:
-                best_data = best_data.groupby(['estrategia', 'tenor', 'orden']).apply(SamplingOptions().summary_opt)
-                self.logger.info('Posible combinacion Tenor /Estrategia aplicable al tercer criterio: '+ str(best_data.reset_index('orden').index.tolist()))
-                non_best_quotes = list(set(best_data.index.to_list()) & set(best_data_on_time.index.to_list() + best_data_out_time.index.to_list()))
-                best_data.drop(non_best_quotes, axis=0, inplace = True)
-                best_ask_and_bid = []
-                for index, row in (best_data.reset_index(level= ('orden')).groupby(
-                        level = ['estrategia', 'tenor'], observed = True)):
-                    if any(row["orden"].str.contains('ASK')) & any(row["orden"].str.contains('BID')):
-                        best_ask_and_bid.append(index)        
-                best_data_ba = (best_data.reset_index(level= ('orden')).loc[best_ask_and_bid]).set_index('orden', append = True)
-                self.logger.info('Tenor/Estrategia criterio 3: ' + str(best_data_ba.reset_index('orden').index.unique().tolist()))
-            # Criterios Jerarquicos 
-            # 1) Trades horario representativo
-            if not best_data_on_time.empty:
-                opc_trades_on_time = SamplingOptions().match_warrant_today(best_data_on_time, opc_today, 'TRADE')
-                opc_today.loc[opc_trades_on_time.index.to_list(), ['MID', 'price_type']] = \
-                    np.array([opc_trades_on_time.weighted,'trade_on_time_1'], dtype = 'object')
-            # 2) Trades fuera del horario representativo
-            if not best_data_out_time.empty:
-                opc_trades_out_time = SamplingOptions().match_warrant_today(best_data_out_time, opc_today, 'TRADE')
-                opc_today.loc[opc_trades_out_time.index.to_list(), ['MID', 'price_type']] = \
-                    opc_trades_out_time.weighted,'trade_out_time_2'
-            opc_today.BID.where(opc_today.MID.isna(), opc_today.MID, inplace = True)
-            opc_today.ASK.where(opc_today.MID.isna(), opc_today.MID, inplace = True)
-
-            # 3) Quotes horario representativo
-            if not best_data_ba.empty:
-                # Bid
-                bid_on_time = best_data_ba.xs('BID', level = 'orden', drop_level = False)
-                opc_bid_on_time =  SamplingOptions().match_warrant_today(bid_on_time, opc_today, 'BID')
-                opc_today.loc[opc_bid_on_time.index.to_list(), ['BID']] = opc_bid_on_time['max']
-                
-                # Ask
-                ask_on_time =  best_data_ba.xs('ASK', level = 'orden', drop_level = False)
-                opc_ask_on_time =  SamplingOptions().match_warrant_today(ask_on_time, opc_today, 'ASK')
-                opc_today.loc[opc_ask_on_time.index.to_list(), ['ASK']] = opc_ask_on_time['min']
-                #Mid- Average
-                opc_today.loc[opc_ask_on_time.index.to_list() , ['MID','price_type']] = \
-                    opc_today.loc[opc_ask_on_time.index.to_list(),['BID', 'ASK']].mean(axis = 1), 'quotes_on_time_3'
+                self.logger.info('Posible combinacion Tenor /Estrategia aplicable al tercer criterio: '+ str(list(quotes[['estrategia', 'tenor']].itertuples(index = False, name = None))))
+            # Se descartan los quotes cuya estrategia-tenor-orden ya tiene trades (1er o 2ndo criterio)
+            trades_keys = pd.MultiIndex.from_frame(summary.loc[summary.criterio != 3, ['estrategia', 'tenor', 'orden']])
+            best_quotes = quotes.loc[~pd.MultiIndex.from_frame(quotes[['estrategia', 'tenor', 'orden']]).isin(trades_keys)]
+            # Criterios Jerarquicos sobre la grilla estrategia-tenor
+            grid = pd.MultiIndex.from_frame(opc_today[['Strategy', 'Tenor']])
+            on_time_found, on_time_mid = SamplingOptions().match_warrant_grid(trades_on_time, grid, 'TRADE', 'weighted')
+            out_time_found, out_time_mid = SamplingOptions().match_warrant_grid(trades_out_time, grid, 'TRADE', 'weighted')
+            bid_found, best_bid = SamplingOptions().match_warrant_grid(best_quotes, grid, 'BID', 'max')
+            ask_found, best_ask = SamplingOptions().match_warrant_grid(best_quotes, grid, 'ASK', 'min')
+            quotes_found = bid_found & ask_found
+            self.logger.info('Tenor/Estrategia criterio 3: ' + str(grid[quotes_found].tolist()))
+            quotes_mid = pd.DataFrame({'BID': best_bid, 'ASK': best_ask}).mean(axis = 1).values
+            # Cada criterio sobreescribe a los anteriores: 3) quotes, 2) trades fuera de horario y 1) trades en horario
+            trades_mid = np.select([out_time_found, on_time_found], [out_time_mid, on_time_mid], default = np.nan)
+            opc_today['MID'] = np.where(quotes_found, quotes_mid, trades_mid)
+            opc_today['BID'] = np.where(quotes_found, best_bid, trades_mid)
+            opc_today['ASK'] = np.where(quotes_found, best_ask, trades_mid)
+            opc_today['price_type'] = np.select([quotes_found, out_time_found, on_time_found],
+                                                [np.array(x, dtype = 'object') for x in ['quotes_on_time_3', 'trade_out_time_2', 'trade_on_time_1']],
+                                                default = np.nan)
             # 4) Informacion del dia anterior
             self.logger.info('4to criterio de la muestra: hist_price')
             prev_info_ind = opc_today.loc[opc_today.MID.isna() & opc_today.BID.isna()
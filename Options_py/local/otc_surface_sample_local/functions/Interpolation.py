@@ -59,7 +59,7 @@ class Interpol():
             y_points (numpy.ndarray): Vector de 1 dimension con los valores interpolados de Y
         """
         try:
-            f_interpolate = interpolate.interp1d(self.x_nodes, self.y_nodes, kind = 'linear', fill_value= 'extrapolate')
+            f_interpolate = interpolate.interp1d(self.x_nodes, self.y_nodes, kind = 'linear', axis = 0, fill_value= 'extrapolate')
             y_out = f_interpolate(self.x_points)
         except Exception as e:
             error_line = str(sys.exc_info()[-1].tb_lineno)
@@ -77,7 +77,7 @@ class Interpol():
             y_points (numpy.ndarray): Vector de 1 dimension con los valores interpolados de Y
         """
         try:
-            f_interpolate = interpolate.interp1d(self.x_nodes, self.y_nodes, kind = 'cubic', fill_value= 'extrapolate')
+            f_interpolate = interpolate.interp1d(self.x_nodes, self.y_nodes, kind = 'cubic', axis = 0, fill_value= 'extrapolate')
             y_out = f_interpolate(self.x_points)
         except Exception as e:
             error_line = str(sys.exc_info()[-1].tb_lineno)
@@ -33,6 +33,60 @@ class SamplingOptions():
             logger.error(e)
             raise Exception(500)        
         return res
+    def summary_opt_groups(self, data, keys):
+        """Funcionales de summary_opt para todos los grupos de una sola vez, equivalente a
+        data.groupby(keys).apply(summary_opt). Las sumas de precio*monto y de monto se acumulan
+        en el orden de las filas de cada grupo (como sum()), y no con la suma compensada de
+        groupby().sum(), para conservar exactamente la volatilidad ponderada
+
+        Args:
+            data (pd.DataFrame): DataFrame de trades y/o quotes con las columnas precio y monto
+            keys (list): Columnas por las cuales agrupar
+        Return:
+            res (pd.DataFrame): DataFrame indexado por keys con las columnas weighted, max y min
+        """
+        try:
+            data = data.dropna(subset = keys)
+            grouped = data.groupby(keys)
+            res = grouped['precio'].agg(['max', 'min'])
+            codes = grouped.ngroup().values
+            positions = grouped.cumcount().values
+            values = np.column_stack([(data['precio'] * data['monto']).values, data['monto'].values])
+            sums = np.zeros((len(res), 2))
+            # En la iteracion k se suma la fila k de cada grupo: cada grupo aparece a lo sumo una vez
+            order = np.argsort(positions, kind = 'stable')
+            for rows in np.split(order, np.flatnonzero(np.diff(positions[order])) + 1):
+                sums[codes[rows]] += values[rows]
+            res.insert(0, 'weighted', sums[:, 0] / sums[:, 1])
+        except Exception as e:
+            error_line = str(sys.exc_info()[-1].tb_lineno)
+            logger.error('Se genero un error calculando estadisticas de la muestra de opciones. Fallo linea: ' + error_line)
+            logger.error(e)
+            raise Exception(500)
+        return res
+    def match_warrant_grid(self, data, grid, warrant, column):
+        """Valores de una columna de los resultados agrupados para cada combinacion estrategia-tenor
+        de la muestra, filtrando por tipo de orden
+
+        Args:
+            data (pd.DataFrame): Resultados de summary_opt_groups con las columnas estrategia, tenor y orden
+            grid (pd.MultiIndex): Combinaciones (Strategy, Tenor) de la muestra de superficie de volatilidad
+            warrant (str): Tipo de orden por la cual filtrar
+            column (str): Columna de los resultados a tomar
+        Return:
+            found (np.ndarray): Booleano por combinacion, True si hay resultados para el tipo de orden
+            values (np.ndarray): Valores de la columna por combinacion (NaN si no hay resultados)
+        """
+        try:
+            data_warrant = data.loc[data.orden == warrant].set_index(['estrategia', 'tenor'])[column]
+            found = grid.isin(data_warrant.index)
+            values = data_warrant.reindex(grid).values
+        except Exception as e:
+            error_line = str(sys.exc_info()[-1].tb_lineno)
+            logger.error('Se genero un error con el match de ordenes. Fallo linea: '+error_line)
+            logger.error(e)
+            raise Exception(500)
+        return found, values
     def match_warrant_today(self, data, opc_today, warrant):
         """Seleccion de filas conformes con los criterios de datos y tipo de orden
         para insertar en la posicion especifica de la supercicie de volatilidad
@@ -140,8 +194,8 @@ class DayCount():
     
     def add_on_to_deltas(self, opc_d, on_day, days, dec = 6, tenor = 'ON' ):
         """Realizar la extrapolacion del tenorON para una supercifie de volatilidad en deltas
-        Interpola de manera linear los valores para el dia ON por cada delta e inserta esta informacion en la superficie en deltas
-        Esta informacion la inserta como una nueva fila en el dataframe de la supeficie de volatilidad en deltas
+        Interpola de manera linear los valores para el dia ON de todos los deltas (bid y ask) en una sola interpolacion
+        e inserta esta informacion como una nueva fila en el dataframe de la supeficie de volatilidad en deltas
         Args:
             opc_d (pd.DataFrame): Superficie de Volatilidad en Deltas sin el nodo ON
             on_day (int): Dia ON
@@ -151,7 +205,7 @@ class DayCount():
         err_mss = 'Se genero un error agregando el nodo ON a la superficie USDCOP de deltas. Fallo linea: '
         try:
             opc_d['dias'] = days
-            on_values = [(Interpol(opc_d.dias.values, opc_d[opc_d.columns[x]].values, on_day).method('linear_interpol')).item() for x in range(1, opc_d.shape[1]-1)]
+            on_values = Interpol(opc_d.dias.values, opc_d[opc_d.columns[1:-1]].values, on_day).method('linear_interpol').tolist()
             on_values.insert(0, tenor)
             on_values.insert(len(on_values)+1, on_day)
             opc_d.loc[len(opc_d.index)] = on_values
@@ -185,8 +239,66 @@ class DayCount():
         return opc_d
 
 class SurfaceTransformation():
-    """Clase que contiene las transformaciones de la superficie de volartildiad
+    """Clase que contiene las transformaciones de la superficie de volartildiad.
+    Las conversiones entre estrategias y deltas son mapas lineales que se aplican a la vez a todos los tenores
+    y a ambas puntas (bid y ask), como un producto matricial sobre arreglos (tenor x punta x 5)
     """
+    STRATEGIES = ['ATM', '25RR', '10RR', '25BF', '10BF']
+    DELTAS = ['90D', '75D', '50D', '25D', '10D']
+    DELTA_COLUMNS = ["90D_Bid", "90D_Ask", "75D_Bid", "75D_Ask", "50D_Bid", "50D_Ask", "25D_Bid", "25D_Ask", "10D_Bid", "10D_Ask"]
+    # Deltas (filas, en el orden de DELTAS) en terminos de las estrategias (columnas, en el orden de STRATEGIES)
+    STRATEGIES_TO_DELTAS = np.array([[1, 0, -0.5, 0, 1],
+                                     [1, -0.5, 0, 1, 0],
+                                     [1, 0, 0, 0, 0],
+                                     [1, 0.5, 0, 1, 0],
+                                     [1, 0, 0.5, 0, 1]])
+    # Estrategias (filas) en terminos de los deltas (columnas): inversa de STRATEGIES_TO_DELTAS
+    DELTAS_TO_STRATEGIES = np.array([[0, 0, 1, 0, 0],
+                                     [0, -1, 0, 1, 0],
+                                     [-1, 0, 0, 0, 1],
+                                     [0, 0.5, -1, 0.5, 0],
+                                     [0.5, 0, -1, 0, 0.5]])
+    # Orden de suma de los terminos de cada producto (ATM, BF, RR y 90D/10D, 75D/25D, 50D): el mismo de las
+    # formulas de conversion, para que el producto matricial de exactamente los mismos valores
+    STRATEGIES_SUM_ORDER = [0, 3, 4, 1, 2]
+    DELTAS_SUM_ORDER = [0, 4, 1, 3, 2]
+
+    def strategies_to_deltas(self, strategies):
+        """Mapa lineal de estrategias a deltas
+
+        Args:
+            strategies (np.ndarray): Arreglo (..., 5) de volatilidades en estrategias, en el orden de STRATEGIES
+        Return:
+            (np.ndarray): Arreglo (..., 5) de volatilidades en deltas, en el orden de DELTAS
+        """
+        return 1 / 100 * np.matmul(strategies[..., self.STRATEGIES_SUM_ORDER],
+                                   self.STRATEGIES_TO_DELTAS[:, self.STRATEGIES_SUM_ORDER].T)
+
+    def deltas_to_strategies(self, deltas):
+        """Mapa lineal de deltas a estrategias
+
+        Args:
+            deltas (np.ndarray): Arreglo (..., 5) de volatilidades en deltas, en el orden de DELTAS
+        Return:
+            (np.ndarray): Arreglo (..., 5) de volatilidades en estrategias, en el orden de STRATEGIES
+        """
+        return 100 * np.matmul(deltas[..., self.DELTAS_SUM_ORDER],
+                               self.DELTAS_TO_STRATEGIES[:, self.DELTAS_SUM_ORDER].T)
+
+    def strategies_matrix(self, opc_today, tenors = None):
+        """Arreglo (tenor x punta x estrategia) de una superficie en estrategias
+
+        Args:
+            opc_today (pd.DataFrame): Superficie de volatilidad en estrategias
+            tenors (list): Tenores a tomar. Si no se entrega, se toman las filas de cada estrategia en el orden en que aparecen
+        Return:
+            (np.ndarray): Arreglo (tenor x 2 x 5) con las puntas BID y ASK de cada estrategia
+        """
+        strategies = [opc_today.loc[opc_today.Strategy == strategy] for strategy in self.STRATEGIES]
+        if tenors is not None:
+            strategies = [x.set_index('Tenor').reindex(tenors) for x in strategies]
+        return np.stack([x[['BID', 'ASK']].values for x in strategies], axis = -1)
+
     def surface_to_deltas(self, opc_today, tenors, dec=5):
         """Convertir la superficie de opciones desde estrategias a deltas 
         (teniendo en consideracion que las estrategias estandar son At The Money (ATM) - Risk Reversal (RR) y Butterfly (BF))
@@ -201,27 +313,9 @@ class SurfaceTransformation():
         """
         err_mss = 'Se genero un error convirtiendo la superficie de estrategias a deltas. Fallo linea: ' 
         try:
-            call_90d = 1 / 100 * (opc_today.loc[opc_today.Strategy == "ATM", ["BID", "ASK"]].values + \
-                                  opc_today.loc[opc_today.Strategy == "10BF", ["BID", "ASK"]].values - \
-                                      (0.5 * opc_today.loc[opc_today.Strategy == "10RR", ["BID", "ASK"]].values))
-            
-            call_75d = 1 / 100 * (opc_today.loc[opc_today.Strategy == "ATM", ["BID", "ASK"]].values +\
-                           opc_today.loc[opc_today.Strategy == "25BF", ["BID", "ASK"]].values - \
-                           (0.5 * opc_today.loc[opc_today.Strategy == "25RR", ["BID", "ASK"]].values))
-                
-            call_50d = 1 / 100 * (opc_today.loc[opc_today.Strategy == "ATM", ["BID", "ASK"]].values)
-            
-            call_25d = 1 / 100 * (opc_today.loc[opc_today.Strategy == "ATM", ["BID", "ASK"]].values + \
-                           opc_today.loc[opc_today.Strategy == "25BF", ["BID", "ASK"]].values + \
-                           (0.5 * opc_today.loc[opc_today.Strategy == "25RR", ["BID", "ASK"]].values))
-            
-            call_10d =  1 / 100 * (opc_today.loc[opc_today.Strategy == "ATM", ["BID", "ASK"]].values + \
-                           opc_today.loc[opc_today.Strategy == "10BF", ["BID", "ASK"]].values + \
-                           (0.5 * opc_today.loc[opc_today.Strategy == "10RR", ["BID", "ASK"]].values))
-            
-            opc_d = pd.DataFrame(np.hstack([tenors.values, call_90d,call_75d, call_50d, call_25d,  call_10d]),
-                                        columns = ["tenor","90D_Bid", "90D_Ask", "75D_Bid",	"75D_Ask",	"50D_Bid",	
-                                                   "50D_Ask",	"25D_Bid",	"25D_Ask",	"10D_Bid",	"10D_Ask"])
+            deltas = self.strategies_to_deltas(self.strategies_matrix(opc_today))
+            opc_d = pd.DataFrame(np.hstack([tenors.values, deltas.transpose(0, 2, 1).reshape(len(deltas), -1)]),
+                                 columns = ["tenor"] + self.DELTA_COLUMNS)
         except ValueError as e:
             error_line = str(sys.exc_info()[-1].tb_lineno)
             logger.error(err_mss + error_line)
@@ -260,40 +354,16 @@ class SurfaceTransformation():
         """
         err_mss = 'Se genero un error convirtiendo la superficie de deltas a estrategias. Fallo linea: '
         try:
-            atm =  100 *(opc_d.loc[opc_d.tenor.isin(tenors) ,['50D_Bid','50D_Ask']].values).flatten()
-            rr_25 = 100 * (opc_d.loc[opc_d.tenor.isin(tenors), ['25D_Bid','25D_Ask']].values - \
-                           opc_d.loc[opc_d.tenor.isin(tenors), ['75D_Bid','75D_Ask']].values).flatten()
-            rr_10 = 100 * (opc_d.loc[opc_d.tenor.isin(tenors), ['10D_Bid','10D_Ask']].values - \
-                           opc_d.loc[opc_d.tenor.isin(tenors), ['90D_Bid','90D_Ask']].values).flatten()
-            bf_25 = 100 * (0.5 *(opc_d.loc[opc_d.tenor.isin(tenors), ['75D_Bid','75D_Ask']].values + \
-                                 opc_d.loc[opc_d.tenor.isin(tenors), ['25D_Bid','25D_Ask']].values) - \
-                           opc_d.loc[opc_d.tenor.isin(tenors), ['50D_Bid','50D_Ask']].values).flatten()
-            bf_10 = 100 * (0.5*(opc_d.loc[opc_d.tenor.isin(tenors), ['90D_Bid','90D_Ask']].values + \
-                                opc_d.loc[opc_d.tenor.isin(tenors), ['10D_Bid','10D_Ask']].values) - \
-                           opc_d.loc[opc_d.tenor.isin(tenors), ['50D_Bid','50D_Ask']].values).flatten()
+            deltas = opc_d.loc[opc_d.tenor.isin(tenors), self.DELTA_COLUMNS].values.astype(float)
+            strategies = self.deltas_to_strategies(deltas.reshape(len(deltas), 5, 2).transpose(0, 2, 1))
             if add_on:
-
-                opc_today = pd.concat([
-                    pd.DataFrame([{'Date':val_date_string, 'Tenor': tenors[0],
-                                   'Strategy': 'ATM', 'MID': np.nan, 
-                                   'BID' : atm[0], 'ASK': atm[1], 'price_type': np.nan}]),
-                                    opc_today.loc[opc_today.Strategy == 'ATM'],
-                                    pd.DataFrame([{'Date':val_date_string, 'Tenor': tenors[0],
-                                     'Strategy': '25RR', 'MID': np.nan, 
-                                     'BID' : rr_25[0], 'ASK': rr_25[1], 'price_type': np.nan}]),
-                                    opc_today.loc[opc_today.Strategy == '25RR'],
-                                    pd.DataFrame([{'Date':val_date_string, 'Tenor': tenors[0],
-                                     'Strategy': '10RR', 'MID': np.nan, 
-                                     'BID' : rr_10[0], 'ASK': rr_10[1], 'price_type': np.nan}]),
-                                    opc_today.loc[opc_today.Strategy == '10RR'],
-                                    pd.DataFrame([{'Date':val_date_string, 'Tenor': tenors[0],
-                                     'Strategy': '25BF', 'MID': np.nan, 
-                                     'BID' : bf_25[0], 'ASK': bf_25[1], 'price_type': np.nan}]),
-                                    opc_today.loc[opc_today.Strategy == '25BF'],
-                                    pd.DataFrame([{'Date':val_date_string, 'Tenor': tenors[0],
-                                     'Strategy': '10BF', 'MID': np.nan, 
-                                     'BID' : bf_10[0], 'ASK': bf_10[1], 'price_type': np.nan}]),
-                                    opc_today.loc[opc_today.Strategy == '10BF']], ignore_index=True)
+                surface = []
+                for strategy, bid, ask in zip(self.STRATEGIES, *strategies[0]):
+                    surface.append(pd.DataFrame([{'Date':val_date_string, 'Tenor': tenors[0],
+                                                  'Strategy': strategy, 'MID': np.nan,
+                                                  'BID' : bid, 'ASK': ask, 'price_type': np.nan}]))
+                    surface.append(opc_today.loc[opc_today.Strategy == strategy])
+                opc_today = pd.concat(surface, ignore_index=True)
                 opc_today.loc[opc_today.MID.isna(), ['MID','price_type']] = \
                     np.array([opc_today.loc[opc_today.MID.isna(),['BID', 'ASK']].mean(axis = 1), 
                               'hist_price'], dtype = 'object')
@@ -325,35 +395,39 @@ class SurfaceTransformation():
     def surface_jumps(self, opc_today_d, opc_today_jumps , opc_yest, jump_tenors, spread_jumps, tenor_jump = '2Y'):
         """Realiza el salto en deltas de la superficie USDCOP como la agregacion del spread.
         Cuando se encuentran negociaciones en los nodos de largo plazo, se actualzian los spreads con esta nueva informacion.
+        Todos los tenores del salto se calculan a la vez y se elige entre la superficie del dia y el salto con spread
+        mediante la mascara de tenores con negociaciones.
         """
         err_mss = 'Fallo la actualizacion de los saltos sobre la supercicie de volatilidad para el LP. Fallo linea: '
         try:
-            d_opc_values = opc_today_d.loc[opc_today_d.tenor==tenor_jump]
-            j_tenors = pd.DataFrame({'Tenor':jump_tenors})
-            for tenor in jump_tenors:
-                spread_jump = spread_jumps.loc[spread_jumps.tenor == tenor]
-                today_surface_tenor = opc_today_jumps.loc[(opc_today_jumps.Tenor == tenor)]
-                if any(today_surface_tenor.price_type != 'hist_price_4'):
+            d_opc_values = opc_today_d.loc[opc_today_d.tenor==tenor_jump, self.DELTA_COLUMNS].values.astype(float)
+            jump_d = d_opc_values.reshape(-1, 5, 2).transpose(0, 2, 1)
+            updated = np.isin(jump_tenors, opc_today_jumps.loc[opc_today_jumps.price_type != 'hist_price_4', 'Tenor'])
+            for tenor, tenor_updated in zip(jump_tenors, updated):
+                if tenor_updated:
                     logger.info('Se actualiza el spread desde el tenor ' + tenor_jump + ' para el de ' + tenor)
-                    tenor_value = j_tenors.loc[j_tenors.Tenor == tenor]
-                    delta_tenor = self.surface_to_deltas(today_surface_tenor, tenor_value)
-                    new_spread_jump = (delta_tenor.drop(columns = 'tenor').values - d_opc_values.drop(columns = 'tenor').values).flatten()
-                    logger.info('Actualizacion Salto')
-                    spread_jumps_mid = np.array([0.5* (new_spread_jump[0]+new_spread_jump[1]),
-                                                     0.5* (new_spread_jump[2]+new_spread_jump[3]),
-                                                     0.5* (new_spread_jump[4]+new_spread_jump[5]),
-                                                     0.5* (new_spread_jump[6]+new_spread_jump[7]),
-                                                     0.5* (new_spread_jump[8]+new_spread_jump[9])])
-                    spread_jumps.loc[spread_jumps.tenor == tenor, spread_jumps.columns != 'tenor'] = spread_jumps_mid
                 else:
                     logger.info('No hubo actualizacion de saltos para ' + tenor)
-                    delta_tenor = pd.DataFrame([[tenor] + (d_opc_values[['90D_Bid', '90D_Ask']].values + spread_jump['d90_str'].values).flatten().tolist() + \
-                                                   (d_opc_values[['75D_Bid', '75D_Ask']].values + spread_jump['d75_str'].values).flatten().tolist() + \
-                                                   (d_opc_values[['50D_Bid', '50D_Ask']].values + spread_jump['d50_str'].values).flatten().tolist() + \
-                                                   (d_opc_values[['25D_Bid', '25D_Ask']].values + spread_jump['d25_str'].values).flatten().tolist() + \
-                                                   (d_opc_values[['10D_Bid', '10D_Ask']].values + spread_jump['d10_str'].values).flatten().tolist()],
-                                              columns = opc_today_d.columns)
-                opc_today_d = pd.concat([opc_today_d, delta_tenor], ignore_index = True)
+            missing_spreads = [tenor for tenor, tenor_updated in zip(jump_tenors, updated)
+                               if not tenor_updated and tenor not in spread_jumps.tenor.values]
+            if missing_spreads:
+                raise ValueError('No hay spread de salto para los tenores: ' + str(missing_spreads))
+            # Tenores con negociaciones: superficie del dia en deltas y nuevo spread (mid) frente al tenor del salto
+            today_d = self.strategies_to_deltas(self.strategies_matrix(opc_today_jumps, jump_tenors))
+            new_spreads = today_d - jump_d
+            new_spreads_mid = 0.5 * (new_spreads[:, 0] + new_spreads[:, 1])
+            # Tenores sin negociaciones: tenor del salto mas el spread vigente en ambas puntas
+            spreads = spread_jumps.set_index('tenor').reindex(jump_tenors)[['d90_str', 'd75_str', 'd50_str', 'd25_str', 'd10_str']].values
+            jumps_d = np.where(updated[:, None, None], today_d, jump_d + spreads[:, None, :])
+            logger.info('Actualizacion Saltos')
+            updated_spreads = pd.DataFrame(new_spreads_mid[updated], index = np.array(jump_tenors)[updated])
+            updated_rows = spread_jumps.tenor.isin(updated_spreads.index)
+            spread_jumps.loc[updated_rows, spread_jumps.columns != 'tenor'] = \
+                updated_spreads.loc[spread_jumps.loc[updated_rows, 'tenor']].values
+            jumps_d = pd.DataFrame(np.hstack([np.array(jump_tenors, dtype = 'object').reshape(-1, 1),
+                                              jumps_d.transpose(0, 2, 1).reshape(len(jump_tenors), -1)]),
+                                   columns = opc_today_d.columns)
+            opc_today_d = pd.concat([opc_today_d, jumps_d], ignore_index = True)
         except ValueError as e:
             error_line = str(sys.exc_info()[-1].tb_lineno)
             logger.error(err_mss + error_line)
@@ -0,0 +1,173 @@
+"""
+Pruebas de SurfaceTransformation: los mapas lineales entre estrategias y deltas
+son inversos y surface_jumps (todos los tenores del salto a la vez) produce
+exactamente lo mismo que la implementacion anterior por tenor, que se conserva
+en LegacySurfaceTransformation como referencia.
+
+Ejecutar el modulo directamente compara los tiempos de las dos versiones:
+    python tests/test_surface_transformation.py
+"""
+
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+pytest.importorskip("scipy")
+
+from functions.Sample import SurfaceTransformation
+
+TENORS = ["1M", "2M", "3M", "6M", "9M", "1Y", "2Y"]
+JUMP_TENORS = ["3Y", "5Y"]
+STRATEGY_LEVELS = {"ATM": 10.0, "25RR": 1.2, "10RR": 2.3, "25BF": 0.3, "10BF": 0.9}
+SPREAD_COLUMNS = ["d90_str", "d75_str", "d50_str", "d25_str", "d10_str"]
+
+
+class LegacySurfaceTransformation(SurfaceTransformation):
+    """Implementacion anterior (una formula por delta y un salto por tenor) usada como referencia"""
+
+    def surface_to_deltas(self, opc_today, tenors, dec=5):
+        def strategy_values(strategy):
+            return opc_today.loc[opc_today.Strategy == strategy, ["BID", "ASK"]].values
+
+        atm = strategy_values("ATM")
+        call_90d = 1 / 100 * (atm + strategy_values("10BF") - (0.5 * strategy_values("10RR")))
+        call_75d = 1 / 100 * (atm + strategy_values("25BF") - (0.5 * strategy_values("25RR")))
+        call_50d = 1 / 100 * (atm)
+        call_25d = 1 / 100 * (atm + strategy_values("25BF") + (0.5 * strategy_values("25RR")))
+        call_10d = 1 / 100 * (atm + strategy_values("10BF") + (0.5 * strategy_values("10RR")))
+        return pd.DataFrame(np.hstack([tenors.values, call_90d, call_75d, call_50d, call_25d, call_10d]),
+                            columns=["tenor"] + self.DELTA_COLUMNS)
+
+    def surface_jumps(self, opc_today_d, opc_today_jumps, opc_yest, jump_tenors, spread_jumps, tenor_jump='2Y'):
+        d_opc_values = opc_today_d.loc[opc_today_d.tenor == tenor_jump]
+        j_tenors = pd.DataFrame({'Tenor': jump_tenors})
+        for tenor in jump_tenors:
+            spread_jump = spread_jumps.loc[spread_jumps.tenor == tenor]
+            today_surface_tenor = opc_today_jumps.loc[(opc_today_jumps.Tenor == tenor)]
+            if any(today_surface_tenor.price_type != 'hist_price_4'):
+                tenor_value = j_tenors.loc[j_tenors.Tenor == tenor]
+                delta_tenor = self.surface_to_deltas(today_surface_tenor, tenor_value)
+                new_spread_jump = (delta_tenor.drop(columns='tenor').values
+                                   - d_opc_values.drop(columns='tenor').values).flatten()
+                spread_jumps_mid = np.array([0.5 * (new_spread_jump[i] + new_spread_jump[i + 1])
+                                             for i in range(0, 10, 2)])
+                spread_jumps.loc[spread_jumps.tenor == tenor, spread_jumps.columns != 'tenor'] = spread_jumps_mid
+            else:
+                delta_tenor = pd.DataFrame(
+                    [[tenor] + sum([(d_opc_values[[f'{delta}_Bid', f'{delta}_Ask']].values
+                                     + spread_jump[column].values).flatten().tolist()
+                                    for delta, column in zip(self.DELTAS, SPREAD_COLUMNS)], [])],
+                    columns=opc_today_d.columns)
+            opc_today_d = pd.concat([opc_today_d, delta_tenor], ignore_index=True)
+        return opc_today_d, spread_jumps
+
+
+def strategy_surface(tenors, rng, price_type='hist_price_4'):
+    """Superficie en estrategias con el formato de LocalOptions (filas por estrategia y tenor)"""
+    rows = []
+    for strategy, level in STRATEGY_LEVELS.items():
+        mids = level + np.cumsum(rng.normal(0, 0.2, len(tenors)))
+        spreads = rng.uniform(0.2, 0.8, len(tenors))
+        for tenor, mid, spread in zip(tenors, mids, spreads):
+            rows.append({'Date': '2026-10-16', 'Tenor': tenor, 'Strategy': strategy, 'MID': mid,
+                         'BID': mid - 0.5 * spread, 'ASK': mid + 0.5 * spread, 'price_type': price_type})
+    return pd.DataFrame(rows)
+
+
+def build_jump_inputs(seed, traded_tenors):
+    rng = np.random.default_rng(seed)
+    opc_today = strategy_surface(TENORS, rng)
+    opc_today_jumps = strategy_surface(JUMP_TENORS, rng)
+    opc_today_jumps.loc[opc_today_jumps.Tenor.isin(traded_tenors), 'price_type'] = 'trade'
+    opc_today_d = SurfaceTransformation().surface_to_deltas(opc_today, pd.DataFrame({'Tenor': TENORS}))
+    spread_jumps = pd.DataFrame(rng.normal(0.002, 0.001, (len(JUMP_TENORS), 5)), columns=SPREAD_COLUMNS)
+    spread_jumps.insert(0, 'tenor', JUMP_TENORS)
+    return opc_today, opc_today_jumps, opc_today_d, spread_jumps
+
+
+def run_jumps(transformation, opc_today_jumps, opc_today_d, spread_jumps):
+    return transformation.surface_jumps(opc_today_d.copy(), opc_today_jumps.copy(), None,
+                                        JUMP_TENORS, spread_jumps.copy())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_strategies_deltas_round_trip(seed):
+    transformation = SurfaceTransformation()
+    rng = np.random.default_rng(seed)
+    strategies = rng.normal(5, 3, (12, 2, 5))
+    deltas = rng.normal(0.1, 0.03, (12, 2, 5))
+
+    np.testing.assert_allclose(
+        transformation.deltas_to_strategies(transformation.strategies_to_deltas(strategies)),
+        strategies, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(
+        transformation.strategies_to_deltas(transformation.deltas_to_strategies(deltas)),
+        deltas, rtol=0, atol=1e-12)
+
+
+def test_conversion_matrices_are_inverse():
+    transformation = SurfaceTransformation()
+
+    np.testing.assert_array_equal(
+        transformation.DELTAS_TO_STRATEGIES @ transformation.STRATEGIES_TO_DELTAS, np.eye(5))
+
+
+def test_surface_to_deltas_matches_legacy():
+    opc_today, _, _, _ = build_jump_inputs(3, [])
+    tenors = pd.DataFrame({'Tenor': TENORS})
+
+    pd.testing.assert_frame_equal(SurfaceTransformation().surface_to_deltas(opc_today, tenors),
+                                  LegacySurfaceTransformation().surface_to_deltas(opc_today, tenors))
+
+
+@pytest.mark.parametrize("traded_tenors", [[], ["3Y"], ["5Y"], ["3Y", "5Y"]])
+@pytest.mark.parametrize("seed", range(3))
+def test_surface_jumps_matches_legacy(seed, traded_tenors):
+    _, opc_today_jumps, opc_today_d, spread_jumps = build_jump_inputs(seed, traded_tenors)
+
+    expected_d, expected_spreads = run_jumps(LegacySurfaceTransformation(), opc_today_jumps,
+                                             opc_today_d, spread_jumps)
+    result_d, result_spreads = run_jumps(SurfaceTransformation(), opc_today_jumps, opc_today_d, spread_jumps)
+
+    pd.testing.assert_frame_equal(result_d, expected_d)
+    pd.testing.assert_frame_equal(result_spreads, expected_spreads)
+
+
+def test_surface_jumps_without_spread_raises(caplog):
+    _, opc_today_jumps, opc_today_d, spread_jumps = build_jump_inputs(0, ["3Y"])
+    spread_jumps = spread_jumps.loc[spread_jumps.tenor != '5Y']
+
+    with pytest.raises(ValueError, match='204'):
+        run_jumps(SurfaceTransformation(), opc_today_jumps, opc_today_d, spread_jumps)
+    assert "No hay spread de salto para los tenores: ['5Y']" in caplog.text
+    # Antes el mismo caso tambien fallaba con ValueError, al sumar un spread vacio
+    with pytest.raises(ValueError):
+        run_jumps(LegacySurfaceTransformation(), opc_today_jumps, opc_today_d, spread_jumps)
+
+
+def benchmark(repeat=50):
+    """Compara los tiempos de la implementacion anterior y la vectorial"""
+    logging.getLogger().setLevel(logging.ERROR)
+    opc_today, opc_today_jumps, opc_today_d, spread_jumps = build_jump_inputs(0, ["3Y"])
+    tenors = pd.DataFrame({'Tenor': TENORS})
+    for transformation in [LegacySurfaceTransformation(), SurfaceTransformation()]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            transformation.surface_to_deltas(opc_today, tenors)
+        to_deltas = (time.perf_counter() - start) / repeat
+        start = time.perf_counter()
+        for _ in range(repeat):
+            run_jumps(transformation, opc_today_jumps, opc_today_d, spread_jumps)
+        jumps = (time.perf_counter() - start) / repeat
+        print(f"{type(transformation).__name__:<28} surface_to_deltas {to_deltas * 1000:6.2f} ms"
+              f"  surface_jumps {jumps * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,279 @@
+"""
+=============================================================
+
+Nombre: precia_api.py
+Tipo: Modulo
+
+Autor:
+    - Tecnología - Precia
+
+Ultima modificación: 16/10/2026
+
+Reune las funcionalidades para cargar informacion masiva en
+los endpoints de insercion de la API de OptimusK
+(/src/otc/...): construccion columnar del payload, division en
+bloques acotados por tamanio, sesion HTTP con conexiones
+persistentes y reintentos por bloque con llave de idempotencia.
+Los bloques se envian en orden; la compresion gzip y el envio
+paralelo son opcionales y solo deben activarse para endpoints
+que los soporten
+
+=============================================================
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from precia_utils.precia_exceptions import PlataformError
+from precia_utils.precia_logger import create_log_msg
+
+logger = logging.getLogger()
+
+DEFAULT_MAX_CHUNK_BYTES = 1_000_000
+DEFAULT_MAX_CHUNK_RECORDS = 5000
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_ATTEMPTS = 3
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _json_default(value):
+    """Serializa los escalares de numpy que json no soporta"""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def dataframe_to_records(data_df: pd.DataFrame, columns=None) -> list:
+    """
+    Construye los registros del payload de forma columnar (sin iterrows)
+
+    Args:
+        data_df (pd.DataFrame): Informacion a enviar
+        columns (list | dict, optional): Columnas del payload, en su orden. Si
+        es un diccionario, sus valores son los nombres en el payload. Defaults
+        to None (todas las columnas).
+
+    Returns:
+        list: Lista de diccionarios, uno por fila
+    """
+    if columns is not None:
+        data_df = data_df[list(columns)]
+        if isinstance(columns, dict):
+            data_df = data_df.rename(columns=columns)
+    return data_df.to_dict("records")
+
+
+class ApiIngestClient:
+    """
+    Cliente de insercion masiva para la API de OptimusK. Divide los registros
+    en bloques de hasta max_chunk_bytes (serializados) y max_chunk_records, y
+    los envia uno a uno, en orden, sobre una sesion con conexiones
+    persistentes: si un bloque falla, los siguientes no se envian. Cada
+    bloque lleva una llave de idempotencia derivada de su contenido, de modo
+    que los reintentos del mismo bloque son reconocibles por el servicio.
+
+    No hay confirmacion de que los endpoints acepten cuerpos con
+    Content-Encoding: gzip ni de que solo agreguen registros (sin depender
+    del orden de llegada), por lo que compress y append_only estan apagados
+    por defecto
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_chunk_bytes: int = DEFAULT_MAX_CHUNK_BYTES,
+        max_chunk_records: int = DEFAULT_MAX_CHUNK_RECORDS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        timeout: float = 10,
+        compress: bool = False,
+        append_only: bool = False,
+        backoff: float = 0.5,
+        session: requests.Session = None,
+        sleep=time.sleep,
+    ):
+        """
+        Args:
+            base_url (str): URL base de la API
+            max_chunk_bytes (int, optional): Tamanio maximo (sin comprimir) de
+            cada bloque. Defaults to DEFAULT_MAX_CHUNK_BYTES.
+            max_chunk_records (int, optional): Registros maximos por bloque.
+            Defaults to DEFAULT_MAX_CHUNK_RECORDS.
+            max_workers (int, optional): Bloques enviados en paralelo cuando
+            append_only es True. Defaults to DEFAULT_MAX_WORKERS.
+            max_attempts (int, optional): Intentos por bloque. Defaults to
+            DEFAULT_MAX_ATTEMPTS.
+            timeout (float, optional): Timeout (s) de cada solicitud. Defaults to 10.
+            compress (bool, optional): True para enviar los bloques con gzip
+            (Content-Encoding: gzip). Solo para endpoints que lo acepten.
+            Defaults to False.
+            append_only (bool, optional): True si el endpoint solo agrega los
+            registros recibidos y el orden de los bloques no importa; en ese
+            caso se envian hasta max_workers bloques en paralelo. Defaults to
+            False (bloques en orden).
+            backoff (float, optional): Espera base (s) entre reintentos, se
+            duplica en cada intento. Defaults to 0.5.
+            session (requests.Session, optional): Sesion HTTP. Defaults to None
+            (crea una sesion con un pool de max_workers conexiones).
+            sleep (callable, optional): Funcion de espera. Defaults to time.sleep.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_chunk_records = max_chunk_records
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.compress = compress
+        self.append_only = append_only
+        self.backoff = backoff
+        self.sleep = sleep
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """Cierra las conexiones de la sesion"""
+        self.session.close()
+
+    def build_chunks(self, records: list) -> list:
+        """
+        Serializa cada registro una sola vez y agrupa los registros en bloques
+        acotados por tamanio y numero de registros
+
+        Args:
+            records (list): Registros a enviar
+
+        Returns:
+            list: Payloads JSON ({"data": [...]}) de cada bloque, en bytes
+        """
+        chunks = []
+        parts = []
+        parts_size = 0
+        for record in records:
+            part = json.dumps(record, default=_json_default).encode("utf-8")
+            if parts and (
+                parts_size + len(part) > self.max_chunk_bytes
+                or len(parts) >= self.max_chunk_records
+            ):
+                chunks.append(b'{"data": [' + b", ".join(parts) + b"]}")
+                parts = []
+                parts_size = 0
+            parts.append(part)
+            parts_size += len(part) + 2
+        if parts:
+            chunks.append(b'{"data": [' + b", ".join(parts) + b"]}")
+        return chunks
+
+    def _post_chunk(self, url: str, chunk: bytes, chunk_number: int) -> requests.Response:
+        """Envia un bloque y lo reintenta ante errores de red o respuestas transitorias"""
+        headers = {
+            "Content-Type": "application/json",
+            "Idempotency-Key": hashlib.sha256(url.encode("utf-8") + chunk).hexdigest(),
+        }
+        body = chunk
+        if self.compress:
+            headers["Content-Encoding"] = "gzip"
+            body = gzip.compress(chunk)
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                response = self.session.post(url, data=body, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as request_exc:
+                if attempt == self.max_attempts:
+                    raise PlataformError(
+                        f"El bloque {chunk_number} no pudo enviarse a {url}"
+                    ) from request_exc
+                logger.warning(
+                    "Fallo el envio del bloque %s (intento %s): %s", chunk_number, attempt, request_exc
+                )
+            else:
+                if response.ok:
+                    logger.info(
+                        "Bloque %s enviado. code: %s, body: %s",
+                        chunk_number,
+                        response.status_code,
+                        response.text,
+                    )
+                    return response
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt == self.max_attempts:
+                    raise PlataformError(
+                        f"La API rechazo el bloque {chunk_number}. code: "
+                        f"{response.status_code}, body: {response.text}"
+                    )
+                logger.warning(
+                    "La API respondio %s al bloque %s (intento %s)",
+                    response.status_code,
+                    chunk_number,
+                    attempt,
+                )
+            self.sleep(self.backoff * 2 ** (attempt - 1))
+
+    def post_records(self, endpoint: str, records: list) -> int:
+        """
+        Envia los registros al endpoint en bloques, en orden (o en paralelo si
+        append_only es True)
+
+        Args:
+            endpoint (str): Ruta del endpoint (ej. /src/otc/swap/local)
+            records (list): Registros a enviar
+
+        Raises:
+            PlataformError: Cuando algun bloque no pudo enviarse
+
+        Returns:
+            int: Numero de bloques enviados
+        """
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        try:
+            chunks = self.build_chunks(records)
+            logger.info(
+                "Enviando %s registros a %s en %s bloques ...", len(records), url, len(chunks)
+            )
+            if self.append_only:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    futures = [
+                        executor.submit(self._post_chunk, url, chunk, chunk_number)
+                        for chunk_number, chunk in enumerate(chunks, start=1)
+                    ]
+                    for future in futures:
+                        future.result()
+            else:
+                for chunk_number, chunk in enumerate(chunks, start=1):
+                    self._post_chunk(url, chunk, chunk_number)
+            logger.info("Registros enviados exitosamente a %s", url)
+            return len(chunks)
+        except (Exception,) as post_exc:
+            raise_msg = f"No fue posible enviar la informacion a {url}"
+            logger.error(create_log_msg(raise_msg))
+            raise PlataformError(raise_msg) from post_exc
+
+    def post_dataframe(self, endpoint: str, data_df: pd.DataFrame, columns=None) -> int:
+        """
+        Envia el dataframe al endpoint en bloques (ver post_records)
+
+        Args:
+            endpoint (str): Ruta del endpoint (ej. /src/otc/swap/local)
+            data_df (pd.DataFrame): Informacion a enviar
+            columns (list | dict, optional): Columnas del payload (ver
+            dataframe_to_records). Defaults to None (todas las columnas).
+
+        Returns:
+            int: Numero de bloques enviados
+        """
+        return self.post_records(endpoint, dataframe_to_records(data_df, columns))
@@ -0,0 +1,190 @@
+"""
+=============================================================
+
+Nombre: precia_aws.py
+Tipo: Modulo
+
+Autor:
+    - Ruben Antonio Parra Medrano
+Tecnología - Precia
+
+Ultima modificación: 21/09/2022
+
+Reune las funcionalidades para usar la libreria boto3 que
+es el sdk de AWS para python
+
+=============================================================
+"""
+
+import base64
+import json
+import logging
+import sys
+import time
+
+import boto3
+from awsglue.utils import getResolvedOptions
+
+
+from precia_utils.precia_exceptions import PlataformError
+from precia_utils.precia_logger import create_log_msg
+
+logger = logging.getLogger()
+
+# Tiempo (s) que un secreto o parametro se conserva en el cache del proceso
+DEFAULT_CACHE_TTL = 300
+# Maximo de parametros por llamado a ssm.get_parameters
+SSM_BATCH_SIZE = 10
+
+# Cache en memoria de secretos y parametros: llave -> (expiracion, valor). Al
+# vivir a nivel de modulo, en una Lambda se conserva entre invocaciones en caliente
+_cache = {}
+_clients = {}
+
+
+def _get_client(service_name: str):
+    """Retorna el cliente boto3 del servicio, creado una sola vez por proceso"""
+    if service_name not in _clients:
+        _clients[service_name] = boto3.client(service_name)
+    return _clients[service_name]
+
+
+def _cache_get(key: tuple):
+    """Retorna el valor de la llave si esta en el cache y no ha expirado, None en otro caso"""
+    entry = _cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _cache_put(key: tuple, value, ttl: float) -> None:
+    """Guarda el valor de la llave en el cache durante ttl segundos"""
+    if ttl > 0:
+        _cache[key] = (time.monotonic() + ttl, value)
+
+
+def clear_cache() -> None:
+    """Elimina todos los secretos y parametros guardados en el cache"""
+    _cache.clear()
+
+
+def get_secret(secret_name: str, ttl: float = DEFAULT_CACHE_TTL) -> dict:
+    """
+    Obtiene secretos almacenados en el servicio Secrets Manager de AWS. El
+    secreto se conserva en memoria durante ttl segundos, de modo que los
+    llamados repetidos no vuelven a consultar Secrets Manager.
+
+    Args:
+        secret_name (str): Nombre del secreto en el servicio AWS.
+        ttl (float, optional): Segundos que el secreto se conserva en el
+        cache, 0 para no usar el cache. Defaults to DEFAULT_CACHE_TTL.
+
+    Raises:
+        PlataformError: Cuando ocurre algun error al obtener el secreto.
+
+    Returns:
+        dict: Secreto con la informacion desplegada en Secrets Manager AWS.
+    """
+    try:
+        cache_key = ("secret", secret_name)
+        secret_str = _cache_get(cache_key)
+        if secret_str is None:
+            logger.info('Intentando obtener secreto: "%s" ...', secret_name)
+            cliente_secrets_manager = _get_client("secretsmanager")
+            secret_data = cliente_secrets_manager.get_secret_value(SecretId=secret_name)
+            if "SecretString" in secret_data:
+                secret_str = secret_data["SecretString"]
+            else:
+                secret_str = base64.b64decode(secret_data["SecretBinary"])
+            _cache_put(cache_key, secret_str, ttl)
+            logger.info("Se obtuvo el secreto.")
+        return json.loads(secret_str)
+    except (Exception,) as sec_exc:
+        error_msg = f'Fallo al obtener el secreto "{secret_name}"'
+        logger.error(create_log_msg(error_msg))
+        raise PlataformError(error_msg) from sec_exc
+
+
+def get_parameters_from_ssm(parameter_names: list, ttl: float = DEFAULT_CACHE_TTL) -> dict:
+    """
+    Obtiene varios parametros de AWS Systems Manager (SSM) Parameter Store. Los
+    parametros que no estan en el cache se consultan con ssm.get_parameters en
+    lotes de SSM_BATCH_SIZE y se conservan en memoria durante ttl segundos.
+
+    Args:
+        parameter_names (list): Nombres de los parametros
+        ttl (float, optional): Segundos que los parametros se conservan en el
+        cache, 0 para no usar el cache. Defaults to DEFAULT_CACHE_TTL.
+
+    Raises:
+        PlataformError: Cuando algun parametro no existe o falla la consulta
+
+    Returns:
+        dict: Valor de cada parametro
+    """
+    try:
+        parameters = {}
+        missing_names = []
+        for parameter_name in parameter_names:
+            value = _cache_get(("parameter", parameter_name))
+            if value is None:
+                missing_names.append(parameter_name)
+            else:
+                parameters[parameter_name] = value
+        ssm_client = _get_client("ssm") if missing_names else None
+        for start in range(0, len(missing_names), SSM_BATCH_SIZE):
+            batch_names = missing_names[start : start + SSM_BATCH_SIZE]
+            logger.info("Intentando leer los parametros: %s", batch_names)
+            response = ssm_client.get_parameters(Names=batch_names, WithDecryption=True)
+            if response["InvalidParameters"]:
+                raise ValueError(f"No existen los parametros: {response['InvalidParameters']}")
+            for parameter in response["Parameters"]:
+                parameters[parameter["Name"]] = parameter["Value"]
+                _cache_put(("parameter", parameter["Name"]), parameter["Value"], ttl)
+        return parameters
+    except (Exception,) as ssm_exc:
+        error_msg = f"Fallo al obtener los parametros {parameter_names}"
+        logger.error(create_log_msg(error_msg))
+        raise PlataformError(error_msg) from ssm_exc
+
+
+def get_parameter_from_ssm(parameter_name: str, ttl: float = DEFAULT_CACHE_TTL) -> str:
+    """
+    Obtiene un parametro de AWS Systems Manager (SSM) Parameter Store usando el
+    cache de get_parameters_from_ssm
+
+    Args:
+        parameter_name (str): Nombre del parametro
+        ttl (float, optional): Segundos que el parametro se conserva en el
+        cache, 0 para no usar el cache. Defaults to DEFAULT_CACHE_TTL.
+
+    Raises:
+        PlataformError: Cuando el parametro no existe o falla la consulta
+
+    Returns:
+        str: Valor del parametro
+    """
+    return get_parameters_from_ssm([parameter_name], ttl)[parameter_name]
+
+
+def get_params(parameter_list: list) -> dict:
+    """
+    Obtiene los parametros configurados en 'Job parameters' en el Glue Job
+
+    Args:
+        parameter_list (list): Lista de parametros a recuperar
+
+    Returns:
+        dict: diccionario de los parametros solicitados
+    """
+    try:
+        logger.info("Obteniendo parametros ...")
+        params = getResolvedOptions(sys.argv, parameter_list)
+        logger.info("Todos los parametros fueron encontrados")
+        return params
+    except (Exception,) as sec_exc:
+        error_msg = (
+            f"No se encontraron todos los parametros solicitados: {parameter_list}"
+        )
+        logger.error(create_log_msg(error_msg))
+        raise PlataformError(error_msg) from sec_exc
@@ -0,0 +1,163 @@
+"""
+=============================================================
+
+Nombre: precia_cache.py
+Tipo: Modulo
+
+Autor:
+    - Tecnología - Precia
+
+Ultima modificación: 16/10/2026
+
+Cache de curvas direccionada por contenido y respaldado en S3.
+Cada entrada se identifica con el hash de los insumos de
+mercado, las convenciones y la versión de la metodología con
+que se construyó, de modo que una entrada solo se reutiliza
+cuando la curva se reconstruiría exactamente igual. Al vivir
+en S3 las entradas se comparten entre ejecuciones de los Glue
+Jobs. Sin bucket el cache queda deshabilitado
+
+=============================================================
+"""
+
+import hashlib
+import io
+import logging
+import zipfile
+
+import boto3
+import numpy as np
+import pandas as pd
+
+from precia_utils.precia_logger import create_log_msg
+
+logger = logging.getLogger()
+
+S3_MISSING_CODES = {"NoSuchKey", "404"}
+
+
+class CurveCache:
+    """
+    Guarda y recupera las curvas construidas a partir del hash de sus insumos.
+    Cada entrada es un .zip en s3://<bucket>/<prefix>/<llave>.zip con un
+    parquet por dataframe, que conserva el indice, los tipos de las columnas y
+    los valores nulos. Un error de S3 o de lectura nunca interrumpe el proceso:
+    la curva se vuelve a construir
+    """
+
+    def __init__(self, bucket: str, prefix: str, methodology_version: str, s3_client=None):
+        """
+        Args:
+            bucket (str): Bucket de S3 del cache. Si es None o vacío el cache
+            queda deshabilitado: get no encuentra entradas y put no guarda
+            prefix (str): Prefijo de las entradas del proceso dentro del bucket
+            methodology_version (str): Versión de la metodología, hace parte de
+            todas las llaves
+            s3_client (optional): Cliente de S3. Defaults to None (se crea
+            boto3.client("s3") en el primer uso).
+        """
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.methodology_version = methodology_version
+        self._s3_client = s3_client
+        if not self.enabled:
+            logger.info("Cache de curvas deshabilitado: no se configuro el bucket")
+
+    def __getstate__(self) -> dict:
+        # El cliente de boto3 no se serializa: cada proceso del pool crea el suyo
+        state = self.__dict__.copy()
+        state["_s3_client"] = None
+        return state
+
+    @property
+    def enabled(self) -> bool:
+        """Indica si el cache tiene bucket configurado"""
+        return bool(self.bucket)
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            self._s3_client = boto3.client("s3")
+        return self._s3_client
+
+    def object_key(self, key: str) -> str:
+        """Retorna la ruta del objeto de S3 de la entrada"""
+        return f"{self.prefix}/{key}.zip"
+
+    def key(self, *parts) -> str:
+        """
+        Calcula la llave de una curva a partir de sus insumos
+
+        Args:
+            parts: Insumos de la curva (dataframes, arreglos, fechas,
+            convenciones, etc.)
+
+        Returns:
+            str: Hash sha256 de los insumos y la versión de la metodología
+        """
+        digest = hashlib.sha256(self.methodology_version.encode())
+        for part in parts:
+            if isinstance(part, pd.DataFrame):
+                header = repr([(str(column), str(dtype)) for column, dtype in part.dtypes.items()])
+                content = pd.util.hash_pandas_object(part, index=False).values.tobytes()
+            elif isinstance(part, np.ndarray):
+                header = repr((str(part.dtype), part.shape))
+                content = np.ascontiguousarray(part).tobytes()
+            else:
+                header = type(part).__name__
+                content = repr(part).encode()
+            digest.update(header.encode() + len(content).to_bytes(8, "little") + content)
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """
+        Recupera las curvas guardadas con la llave
+
+        Args:
+            key (str): Llave de las curvas
+
+        Returns:
+            dict: Dataframes guardados por nombre, None si el cache está
+            deshabilitado, la llave no está en el cache o no se pudo leer
+        """
+        if not self.enabled:
+            return None
+        object_key = self.object_key(key)
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=object_key)
+            frames = {}
+            with zipfile.ZipFile(io.BytesIO(response["Body"].read())) as entry:
+                for member in entry.namelist():
+                    name = member[: -len(".parquet")]
+                    frames[name] = pd.read_parquet(io.BytesIO(entry.read(member)))
+        except (Exception,) as get_exc:
+            error_code = getattr(get_exc, "response", {}).get("Error", {}).get("Code")
+            if error_code not in S3_MISSING_CODES:
+                logger.warning(create_log_msg(f"No fue posible leer la entrada {object_key} del cache"))
+            return None
+        logger.info("Se recuperaron del cache las curvas %s", sorted(frames))
+        return frames
+
+    def put(self, key: str, frames: dict) -> None:
+        """
+        Guarda las curvas con la llave en un solo objeto de S3, de modo que una
+        lectura nunca encuentra una entrada incompleta. Un error al escribir el
+        cache no interrumpe el proceso
+
+        Args:
+            key (str): Llave de las curvas
+            frames (dict): Dataframes a guardar por nombre
+        """
+        if not self.enabled:
+            return
+        object_key = self.object_key(key)
+        try:
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w") as entry:
+                for name, frame in frames.items():
+                    # index=None guarda el RangeIndex como metadato y los demas
+                    # indices como columnas, de modo que read_parquet los restaura
+                    entry.writestr(f"{name}.parquet", frame.to_parquet(index=None))
+            self.s3_client.put_object(Bucket=self.bucket, Key=object_key, Body=buffer.getvalue())
+        except (Exception,):
+            logger.warning(create_log_msg(f"No fue posible guardar la entrada {object_key} en el cache"))
@@ -0,0 +1,327 @@
+"""
+=============================================================
+
+Nombre: precia_db.py
+Tipo: Modulo
+
+Autor:
+    - Ruben Antonio Parra Medrano
+Tecnología - Precia
+
+Ultima modificación: 21/09/2022
+
+Reune las funcionalidades para conectarse a una base de datos
+usando SQLalchemy
+
+=============================================================
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import sqlalchemy as sa
+
+from precia_utils.precia_exceptions import PlataformError
+from precia_utils.precia_logger import create_log_msg
+
+logger = logging.getLogger()
+
+# Registro de engines del proceso. Al vivir a nivel de modulo, en una Lambda
+# se conserva entre invocaciones en caliente y los pools se reutilizan
+_ENGINES = {}
+# Numero de consultas y tiempo acumulado (s) por engine
+_QUERY_STATS = {}
+
+
+def _register_query_timing(engine: sa.engine.Engine) -> None:
+    """
+    Registra en el engine los eventos que miden el tiempo de cada consulta y
+    lo acumulan en _QUERY_STATS
+    """
+    engine_name = repr(engine.url)
+    _QUERY_STATS[engine_name] = {"queries": 0, "seconds": 0.0}
+
+    @sa.event.listens_for(engine, "before_cursor_execute")
+    def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @sa.event.listens_for(engine, "after_cursor_execute")
+    def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        stats = _QUERY_STATS[engine_name]
+        stats["queries"] += 1
+        stats["seconds"] += elapsed
+        logger.debug("Consulta ejecutada en %.4f s: %s", elapsed, statement[:120])
+
+
+def get_engine(
+    db_url: str, timeout: int = 2, pool_size: int = 5, pool_recycle: int = 3600
+) -> sa.engine.Engine:
+    """
+    Retorna el engine de SQLAlchemy asociado al URL (servidor, usuario y
+    esquema). El engine se crea una sola vez por proceso con un pool de
+    conexiones y pre-ping, de modo que las clases y funciones que se conectan
+    varias veces a la misma base de datos reutilizan las conexiones abiertas.
+
+    Args:
+        db_url (str): URL de conexion a la base de datos
+        timeout (int, optional): Tiempo maximo de espera de conexion a la
+        base de datos. Defaults to 2.
+        pool_size (int, optional): Conexiones que se mantienen abiertas en el
+        pool. Defaults to 5.
+        pool_recycle (int, optional): Segundos tras los cuales se renueva una
+        conexion del pool. Defaults to 3600.
+
+    Returns:
+        sa.engine.Engine: Engine compartido del URL
+    """
+    engine_key = (db_url, timeout)
+    engine = _ENGINES.get(engine_key)
+    if engine is None:
+        logger.info("Creando el engine de conexion...")
+        engine = sa.create_engine(
+            db_url,
+            connect_args={"connect_timeout": timeout},
+            pool_size=pool_size,
+            pool_pre_ping=True,
+            pool_recycle=pool_recycle,
+        )
+        _register_query_timing(engine)
+        _ENGINES[engine_key] = engine
+        logger.info("Engine de conexion creado con exito")
+    return engine
+
+
+def log_query_stats() -> dict:
+    """
+    Registra en el log el numero de consultas y el tiempo acumulado de cada
+    engine del proceso
+
+    Returns:
+        dict: Numero de consultas y segundos acumulados por engine
+    """
+    for engine_name, stats in _QUERY_STATS.items():
+        logger.info(
+            "%s: %s consultas en %.3f s",
+            engine_name, stats["queries"], stats["seconds"],
+        )
+    return _QUERY_STATS
+
+
+def create_db_url(secret: dict) -> str:
+    """
+    Crea el URL de conexion de la base de datos usado por el metodo 'create_engine' de
+    SQLAlchemy a partir del secreto recuperado por Secret Manager AWS, para su
+    funcionamiento el secreto debe incluir 'schema' y en el 'engine' de conexion
+    mysql+mysqlconnector
+
+    Args:
+        secret (dict): Secreto recuperado por Secret Manager AWS
+
+    Raises:
+        PlataformError: El secreto no tiene todas las llaves esperadas
+
+    Returns:
+        str: URL de conexion para 'create_engine'
+    """
+    error_msg = "No se pudo crear el URL de coneccion de la base de datos"
+    raise_msg = "El secreto no tiene las llaves esperadas"
+    try:
+        logger.info("Creando URL de conexion a la base de datos ...")
+        username = secret["username"]
+        password = secret["password"]
+        host = secret["host"]
+        port = secret["port"]
+        schema = secret["schema"]
+        db_url = f"mysql+pymysql://{username}:{password}@{host}:{port}/{schema}"
+        logger.info("URL creado correctamente")
+        return db_url
+    except KeyError as url_exc:
+        logger.error(create_log_msg(error_msg))
+        raise PlataformError(raise_msg) from url_exc
+
+
+def connect_db_by_secret(secret: dict, timeout: int = 2) -> sa.engine.Engine:
+    """
+    Se conecta a una base de datos usando un secreto almacenado en Secret
+    Manager AWS. En el secreto se debe especificar el engine+driver bajo
+    la llave 'engine', y el esquema bajo la llave 'schema'.
+
+    Args:
+        secret_name (str): Nombre del secreto de la base de datos en Secret
+        Manager AWS
+        secret_region (str): Region donde se ubica el secreto de la base de
+        datos en Secret Manager AWS
+        timeout (int, optional): Tiempo maximo de espera de conexion a la
+        base de datos. Defaults to 2.
+
+    Raises:
+        PlataformError: El secreto no tiene las llaves esperadas
+        PlataformError: El RDS nego la conexion
+
+    Returns:
+        sa.engine.Engine: Engine MySQL que hace de interfaz de conexion
+        con la base de datos.
+    """
+    error_msg = "No se pudo conectar a la base de datos"
+    raise_msg = "Fallo el intento de conexion a la base de datos"
+    try:
+        logger.info("Conectandose a la base de datos ...")
+        logger.info("Esquema destino: %s", secret["schema"])
+        db_url = create_db_url(secret)
+        sql_engine = get_engine(db_url, timeout=timeout)
+        db_connection = sql_engine.connect()
+        logger.info("Conexion exitosa.")
+        return db_connection
+    except sa.exc.SQLAlchemyError as sql_exc:
+        logger.error(create_log_msg(error_msg))
+        raise PlataformError(raise_msg) from sql_exc
+    except PlataformError:
+        logger.error(create_log_msg(error_msg))
+        raise
+    except (Exception,):
+        logger.error(create_log_msg(error_msg))
+        raise
+
+
+def _df_to_params(df: pd.DataFrame) -> list:
+    """
+    Convierte el dataframe en una lista de filas con tipos nativos de Python
+    (los NaN se convierten en None) lista para usarse como parametros SQL
+
+    Args:
+        df (pd.DataFrame): Informacion a convertir
+
+    Returns:
+        list: Filas del dataframe como tuplas
+    """
+    df_obj = df.astype(object).where(df.notna(), None)
+    return list(df_obj.itertuples(index=False, name=None))
+
+
+@contextmanager
+def _transaction(connection):
+    """
+    Abre una transaccion sobre un Engine o una Connection de SQLAlchemy y
+    entrega la conexion sobre la que se deben ejecutar las sentencias. Si la
+    Connection ya tiene una transaccion abierta (begin() del llamador o el
+    autobegin de SQLAlchemy 2.x) las sentencias se ejecutan en un savepoint
+    dentro de ella, que confirma quien la abrio
+    """
+    if isinstance(connection, sa.engine.Engine):
+        with connection.begin() as engine_connection:
+            yield engine_connection
+    elif connection.in_transaction():
+        with connection.begin_nested():
+            yield connection
+    else:
+        with connection.begin():
+            yield connection
+
+
+def _multi_row_insert(connection, table: str, columns: list, rows: list,
+                      update_columns: list, batch_size: int) -> None:
+    """
+    Inserta las filas en lotes de batch_size filas, cada lote en una sola
+    sentencia parametrizada INSERT ... VALUES (...), (...). Si update_columns
+    no es vacio se agrega ON DUPLICATE KEY UPDATE para esas columnas
+    """
+    column_names = ", ".join(columns)
+    update_clause = ""
+    if update_columns:
+        update_clause = " ON DUPLICATE KEY UPDATE " + ", ".join(
+            f"{column} = VALUES({column})" for column in update_columns
+        )
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start : start + batch_size]
+        values_clause = ", ".join(
+            "(" + ", ".join(f":p{row_n}_{col_n}" for col_n in range(len(columns))) + ")"
+            for row_n in range(len(batch))
+        )
+        params = {
+            f"p{row_n}_{col_n}": value
+            for row_n, row in enumerate(batch)
+            for col_n, value in enumerate(row)
+        }
+        statement = sa.text(
+            f"INSERT INTO {table} ({column_names}) VALUES {values_clause}{update_clause}"
+        )
+        connection.execute(statement, params)
+
+
+def bulk_upsert_df(
+    connection,
+    df: pd.DataFrame,
+    table: str,
+    update_columns: list,
+    batch_size: int = 1000,
+    use_staging: bool = False,
+) -> int:
+    """
+    Inserta o actualiza (INSERT ... ON DUPLICATE KEY UPDATE) el dataframe en la
+    tabla usando sentencias parametrizadas de varias filas. Todo el dataframe
+    se carga en una sola transaccion.
+
+    Con use_staging=True las filas se cargan primero en una tabla temporal con
+    la misma estructura de la tabla destino y luego se aplican con un unico
+    INSERT ... SELECT ... ON DUPLICATE KEY UPDATE.
+
+    Args:
+        connection (sa.engine.Engine | sa.engine.Connection): Engine o conexion
+        a la base de datos destino. Si la conexion tiene una transaccion
+        abierta la carga se hace en un savepoint y el llamador debe confirmar
+        su transaccion
+        df (pd.DataFrame): Informacion a cargar, las columnas deben tener los
+        nombres de las columnas de la tabla
+        table (str): Tabla destino
+        update_columns (list): Columnas que se actualizan cuando la llave ya
+        existe en la tabla
+        batch_size (int, optional): Numero maximo de filas por sentencia.
+        Defaults to 1000.
+        use_staging (bool, optional): Carga en tabla temporal y aplica un solo
+        merge. Defaults to False.
+
+    Raises:
+        PlataformError: Fallo la carga de la informacion
+
+    Returns:
+        int: Numero de filas cargadas
+    """
+    error_msg = f"No se pudo cargar la informacion en la tabla {table}"
+    raise_msg = "Fallo la carga masiva de la informacion en base de datos"
+    try:
+        if df.empty:
+            logger.info("No hay filas para cargar en %s", table)
+            return 0
+        start_time = time.perf_counter()
+        columns = list(df.columns)
+        rows = _df_to_params(df)
+        with _transaction(connection) as trans_connection:
+            if use_staging:
+                staging_table = f"stg_{table}"
+                trans_connection.execute(sa.text(f"DROP TEMPORARY TABLE IF EXISTS {staging_table}"))
+                trans_connection.execute(sa.text(f"CREATE TEMPORARY TABLE {staging_table} LIKE {table}"))
+                _multi_row_insert(trans_connection, staging_table, columns, rows, [], batch_size)
+                column_names = ", ".join(columns)
+                update_clause = ", ".join(
+                    f"{column} = VALUES({column})" for column in update_columns
+                )
+                trans_connection.execute(sa.text(
+                    f"INSERT INTO {table} ({column_names}) "
+                    f"SELECT {column_names} FROM {staging_table} "
+                    f"ON DUPLICATE KEY UPDATE {update_clause}"
+                ))
+                trans_connection.execute(sa.text(f"DROP TEMPORARY TABLE {staging_table}"))
+            else:
+                _multi_row_insert(trans_connection, table, columns, rows, update_columns, batch_size)
+        elapsed = time.perf_counter() - start_time
+        logger.info(
+            "Se cargaron %s filas en %s en %.3f s (%s sentencias)",
+            len(rows), table, elapsed, -(-len(rows) // batch_size),
+        )
+        return len(rows)
+    except (Exception,) as upsert_exc:
+        logger.error(create_log_msg(error_msg))
+        raise PlataformError(raise_msg) from upsert_exc
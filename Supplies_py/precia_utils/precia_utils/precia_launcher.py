@@ -0,0 +1,303 @@
+"""
+=============================================================
+
+Nombre: precia_launcher.py
+Tipo: Modulo
+
+Autor:
+    - Tecnología - Precia
+
+Ultima modificación: 16/10/2026
+
+Reune las funcionalidades para lanzar procesos dependientes
+(Glue Jobs, Lambdas) a medida que se completan sus dependencias:
+cola local de lanzamientos, unificacion de lanzamientos repetidos,
+presupuesto de ejecuciones concurrentes y ritmo de lanzamientos
+controlado por un token bucket. Incluye un sustituto local de
+Glue para probar los lanzamientos sin AWS
+
+=============================================================
+"""
+
+import logging
+import time
+from collections import deque
+
+from precia_utils.precia_exceptions import PlataformError
+from precia_utils.precia_logger import create_log_msg
+
+logger = logging.getLogger()
+
+GLUE_TERMINAL_STATES = {"SUCCEEDED", "FAILED", "STOPPED", "TIMEOUT", "ERROR"}
+GLUE_THROTTLING_CODES = {
+    "ConcurrentRunsExceededException",
+    "ThrottlingException",
+    "ResourceNumberLimitExceededException",
+}
+
+
+class TokenBucket:
+    """
+    Limita el ritmo de lanzamientos: se permiten hasta 'capacity' lanzamientos
+    seguidos y luego 'rate' lanzamientos por segundo
+    """
+
+    def __init__(self, rate: float, capacity: int = 1, clock=time.monotonic, sleep=time.sleep):
+        """
+        Args:
+            rate (float): Lanzamientos por segundo
+            capacity (int, optional): Lanzamientos seguidos permitidos. Defaults to 1.
+            clock (callable, optional): Reloj en segundos. Defaults to time.monotonic.
+            sleep (callable, optional): Funcion de espera. Defaults to time.sleep.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.last_refill = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self) -> None:
+        """Espera lo justo hasta que haya un token disponible y lo consume"""
+        self._refill()
+        if self.tokens < 1:
+            self.sleep((1 - self.tokens) / self.rate)
+            self._refill()
+        self.tokens -= 1
+
+
+class DependencyLauncher:
+    """
+    Lanza procesos dependientes a medida que se completan sus dependencias.
+    Cada proceso se encola una sola vez aunque varias dependencias lo
+    habiliten, y los lanzamientos respetan el presupuesto de ejecuciones
+    concurrentes y el ritmo del token bucket
+    """
+
+    def __init__(
+        self,
+        launch,
+        dependencies: dict = None,
+        require_all: bool = True,
+        is_running=None,
+        is_retryable=None,
+        max_concurrent: int = None,
+        launch_rate: float = 1.0,
+        burst: int = 1,
+        max_attempts: int = 5,
+        retry_backoff: float = 0.0,
+        poll_interval: float = 5.0,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        """
+        Args:
+            launch (callable): Lanza el proceso recibido y retorna el identificador
+            de la ejecucion
+            dependencies (dict, optional): Procesos de los que depende cada
+            proceso. Defaults to None.
+            require_all (bool, optional): True si el proceso requiere todas sus
+            dependencias, False si basta con una. Defaults to True.
+            is_running (callable, optional): Indica si la ejecucion recibida sigue
+            en curso, necesario para max_concurrent. Defaults to None.
+            is_retryable (callable, optional): Indica si la excepcion de un
+            lanzamiento permite reintentarlo. Defaults to None (no reintenta).
+            max_concurrent (int, optional): Maximo de ejecuciones en curso.
+            Defaults to None (sin limite).
+            launch_rate (float, optional): Lanzamientos por segundo. Defaults to 1.0.
+            burst (int, optional): Lanzamientos seguidos permitidos. Defaults to 1.
+            max_attempts (int, optional): Intentos por proceso. Defaults to 5.
+            retry_backoff (float, optional): Segundos de espera adicional por
+            intento rechazado: tras el intento n se espera n * retry_backoff
+            antes del siguiente token. Defaults to 0.0.
+            poll_interval (float, optional): Segundos entre consultas del estado de
+            las ejecuciones en curso. Defaults to 5.0.
+            clock (callable, optional): Reloj en segundos. Defaults to time.monotonic.
+            sleep (callable, optional): Funcion de espera. Defaults to time.sleep.
+        """
+        self.launch = launch
+        self.dependencies = dependencies or {}
+        self.require_all = require_all
+        self.is_running = is_running
+        self.is_retryable = is_retryable or (lambda exc: False)
+        self.max_concurrent = max_concurrent
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self.sleep = sleep
+        self.bucket = TokenBucket(launch_rate, burst, clock=clock, sleep=sleep)
+        self.completed = set()
+        self.queue = deque()
+        self.launched = {}
+        self.running = {}
+
+    def is_ready(self, process) -> bool:
+        """Indica si las dependencias del proceso ya se completaron"""
+        check = all if self.require_all else any
+        return check(upstream in self.completed for upstream in self.dependencies[process])
+
+    def submit(self, process) -> bool:
+        """
+        Encola el proceso si no esta encolado ni fue lanzado
+
+        Returns:
+            bool: True si el proceso se encolo, False si se unifico con uno previo
+        """
+        if process in self.queue or process in self.launched:
+            logger.info("El proceso %s ya esta encolado o fue lanzado", process)
+            return False
+        self.queue.append(process)
+        return True
+
+    def mark_completed(self, upstreams) -> list:
+        """
+        Registra los procesos completados y encola los procesos dependientes
+        cuyas dependencias quedaron completas
+
+        Returns:
+            list: Procesos encolados pendientes de lanzamiento
+        """
+        self.completed.update(upstreams)
+        for process in self.dependencies:
+            if self.is_ready(process):
+                self.submit(process)
+        return list(self.queue)
+
+    def _refresh_running(self) -> None:
+        for process, run_id in list(self.running.items()):
+            if self.is_running is None or not self.is_running(run_id):
+                del self.running[process]
+
+    def _wait_for_slot(self) -> None:
+        if self.max_concurrent is None:
+            return
+        self._refresh_running()
+        while len(self.running) >= self.max_concurrent:
+            self.sleep(self.poll_interval)
+            self._refresh_running()
+
+    def run(self) -> dict:
+        """
+        Lanza todos los procesos encolados. Un lanzamiento rechazado por un
+        error reintentable vuelve a intentarse tras la espera de retry_backoff
+        y al siguiente token disponible
+
+        Raises:
+            PlataformError: Cuando un lanzamiento falla sin reintento posible o
+            agota sus intentos
+
+        Returns:
+            dict: Identificador de ejecucion de cada proceso lanzado
+        """
+        attempts = {}
+        while self.queue:
+            process = self.queue[0]
+            self._wait_for_slot()
+            self.bucket.acquire()
+            attempts[process] = attempts.get(process, 0) + 1
+            try:
+                run_id = self.launch(process)
+            except (Exception,) as launch_exc:
+                if self.is_retryable(launch_exc) and attempts[process] < self.max_attempts:
+                    logger.warning(
+                        "Lanzamiento rechazado para %s (intento %s): %s",
+                        process, attempts[process], launch_exc,
+                    )
+                    if self.retry_backoff:
+                        self.sleep(self.retry_backoff * attempts[process])
+                    continue
+                raise_msg = f"Fallo el lanzamiento del proceso dependiente {process}"
+                logger.error(create_log_msg(raise_msg))
+                raise PlataformError(raise_msg) from launch_exc
+            self.queue.popleft()
+            self.launched[process] = run_id
+            self.running[process] = run_id
+            logger.info("Se lanzo el proceso %s con el id %s", process, run_id)
+        return dict(self.launched)
+
+
+def glue_job_launcher(glue_client, job_name: str, arguments_builder) -> tuple:
+    """
+    Crea las funciones de lanzamiento y de estado de un Glue Job para
+    DependencyLauncher
+
+    Args:
+        glue_client: Cliente de Glue (boto3.client("glue") o LocalGlueClient)
+        job_name (str): Nombre del Glue Job
+        arguments_builder (callable): Retorna los argumentos del Glue Job para
+        el proceso recibido
+
+    Returns:
+        tuple: (launch, is_running)
+    """
+
+    def launch(process) -> str:
+        response = glue_client.start_job_run(JobName=job_name, Arguments=arguments_builder(process))
+        return response["JobRunId"]
+
+    def is_running(run_id: str) -> bool:
+        response = glue_client.get_job_run(JobName=job_name, RunId=run_id)
+        return response["JobRun"]["JobRunState"] not in GLUE_TERMINAL_STATES
+
+    return launch, is_running
+
+
+def is_glue_throttling(exc: Exception) -> bool:
+    """Indica si la excepcion es un rechazo de Glue por limite de concurrencia o de tasa"""
+    error_code = getattr(exc, "response", {}).get("Error", {}).get("Code")
+    return error_code in GLUE_THROTTLING_CODES
+
+
+class LocalGlueClient:
+    """
+    Sustituto local en proceso de boto3.client("glue") con start_job_run y
+    get_job_run. Cada ejecucion dura run_duration segundos del reloj y se
+    rechazan los lanzamientos que superan max_concurrent_runs por job
+    """
+
+    class ConcurrentRunsExceededException(Exception):
+        """Rechazo por limite de ejecuciones concurrentes, con el formato de botocore"""
+
+        def __init__(self, message: str):
+            super().__init__(message)
+            self.response = {"Error": {"Code": "ConcurrentRunsExceededException", "Message": message}}
+
+    def __init__(self, max_concurrent_runs: int = 1, run_duration: float = 0.0, clock=time.monotonic):
+        self.max_concurrent_runs = max_concurrent_runs
+        self.run_duration = run_duration
+        self.clock = clock
+        self.runs = {}
+
+    def _state(self, run: dict) -> str:
+        if self.clock() - run["StartedOn"] < self.run_duration:
+            return "RUNNING"
+        return "SUCCEEDED"
+
+    def start_job_run(self, JobName: str, Arguments: dict = None) -> dict:
+        running_runs = [
+            run for run in self.runs.values()
+            if run["JobName"] == JobName and self._state(run) == "RUNNING"
+        ]
+        if len(running_runs) >= self.max_concurrent_runs:
+            raise LocalGlueClient.ConcurrentRunsExceededException(
+                f"Concurrent runs exceeded for {JobName}"
+            )
+        run_id = f"jr_{len(self.runs) + 1:06d}"
+        self.runs[run_id] = {"JobName": JobName, "Arguments": Arguments or {}, "StartedOn": self.clock()}
+        return {"JobRunId": run_id}
+
+    def get_job_run(self, JobName: str, RunId: str) -> dict:
+        run = self.runs[RunId]
+        return {
+            "JobRun": {
+                "Id": RunId,
+                "JobName": JobName,
+                "Arguments": run["Arguments"],
+                "JobRunState": self._state(run),
+            }
+        }
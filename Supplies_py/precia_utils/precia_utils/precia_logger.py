@@ -0,0 +1,63 @@
+"""
+=============================================================
+
+Nombre: precia_logger.py
+Tipo: Modulo
+
+Autor:
+    - Ruben Antonio Parra Medrano
+Tecnología - Precia
+
+Ultima modificación: 21/09/2022
+
+Reune las funcionalidades para el generar logs con formato en
+Precia, los formatos son los presentados en las variables
+ERROR_MSG_LOG_FORMAT y PRECIA_LOG_FORMAT
+
+=============================================================
+"""
+
+import logging
+import sys
+
+
+ERROR_MSG_LOG_FORMAT = "{}. Fallo en linea: {}. Excepcion({}): {}."
+PRECIA_LOG_FORMAT = (
+    "%(asctime)s [%(levelname)s] [%(filename)s](%(funcName)s): %(message)s"
+)
+
+
+def setup_logging(log_level):
+    """
+    formatea todos los logs que invocan la libreria logging
+    """
+    logger = logging.getLogger()
+    for handler in logger.handlers:
+        logger.removeHandler(handler)
+    precia_handler = logging.StreamHandler(sys.stdout)
+    precia_handler.setFormatter(logging.Formatter(PRECIA_LOG_FORMAT))
+    logger.addHandler(precia_handler)
+    logger.setLevel(log_level)
+    return logger
+
+
+def create_log_msg(log_msg: str) -> str:
+    """
+    Aplica el formato de la variable ERROR_MSG_LOG_FORMAT al mensaje log_msg.
+    Valida antes de crear el mensaje si existe una excepcion, y de ser el caso
+    asocia el mensaje log_msg a los atributos de la excepcion.
+
+    Args:
+        log_msg (str): Mensaje de error personalizado que se integrara al log
+
+    Returns:
+        str: Mensaje para el log, si hay una excepcion responde con el
+        formato ERROR_MSG_LOG_FORMAT
+    """
+    exception_type, exception_value, exception_traceback = sys.exc_info()
+    if not exception_type:
+        return f"{log_msg}."
+    error_line = exception_traceback.tb_lineno
+    return ERROR_MSG_LOG_FORMAT.format(
+        log_msg, error_line, exception_type.__name__, exception_value
+    )
@@ -0,0 +1,3 @@
+from setuptools import setup
+
+setup(name="precia_utils", version="0.2", packages=["precia_utils"])
@@ -0,0 +1,112 @@
+"""
+Pruebas de ApiIngestClient con una sesion HTTP en memoria: por defecto los
+bloques se envian sin comprimir y en orden, y un bloque rechazado detiene el
+envio de los siguientes; gzip y el envio paralelo solo se usan cuando se piden
+(compress y append_only), y las respuestas transitorias se reintentan
+"""
+
+import gzip
+import json
+import threading
+
+import pytest
+
+from precia_utils.precia_api import ApiIngestClient
+from precia_utils.precia_exceptions import PlataformError
+
+BASE_URL = "https://api.precia.test"
+ENDPOINT = "/src/otc/swap/local"
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.text = json.dumps({"status": status_code})
+
+
+class MemorySession:
+    """Sustituto de requests.Session que registra cada POST y responde segun statuses"""
+
+    def __init__(self, statuses=None):
+        self.posts = []
+        self.statuses = list(statuses or [])
+        self.lock = threading.Lock()
+
+    def post(self, url, data, headers, timeout):
+        with self.lock:
+            self.posts.append({"url": url, "data": data, "headers": dict(headers)})
+            status_code = self.statuses.pop(0) if self.statuses else 200
+        return FakeResponse(status_code)
+
+    def close(self):
+        pass
+
+
+def records(count: int) -> list:
+    return [{"id_precia": f"IBR{number}", "mid": float(number)} for number in range(count)]
+
+
+def posted_ids(post: dict) -> list:
+    body = post["data"]
+    if post["headers"].get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return [record["id_precia"] for record in json.loads(body)["data"]]
+
+
+def test_chunks_are_sent_in_order_without_compression():
+    session = MemorySession()
+    client = ApiIngestClient(BASE_URL, max_chunk_records=2, session=session)
+
+    assert client.post_records(ENDPOINT, records(5)) == 3
+
+    assert [post["url"] for post in session.posts] == [BASE_URL + ENDPOINT] * 3
+    assert all("Content-Encoding" not in post["headers"] for post in session.posts)
+    assert [posted_ids(post) for post in session.posts] == [
+        ["IBR0", "IBR1"], ["IBR2", "IBR3"], ["IBR4"]
+    ]
+
+
+def test_rejected_chunk_stops_the_following_ones():
+    session = MemorySession(statuses=[200, 400])
+    client = ApiIngestClient(BASE_URL, max_chunk_records=2, session=session)
+
+    with pytest.raises(PlataformError):
+        client.post_records(ENDPOINT, records(6))
+
+    assert [posted_ids(post) for post in session.posts] == [["IBR0", "IBR1"], ["IBR2", "IBR3"]]
+
+
+def test_transient_responses_are_retried_with_the_same_idempotency_key():
+    session = MemorySession(statuses=[503, 200])
+    sleeps = []
+    client = ApiIngestClient(BASE_URL, session=session, backoff=0.5, sleep=sleeps.append)
+
+    client.post_records(ENDPOINT, records(3))
+
+    assert len(session.posts) == 2
+    assert session.posts[0]["headers"]["Idempotency-Key"] == session.posts[1]["headers"]["Idempotency-Key"]
+    assert sleeps == [0.5]
+
+
+def test_compress_sends_gzip_bodies():
+    session = MemorySession()
+    client = ApiIngestClient(BASE_URL, max_chunk_records=2, compress=True, session=session)
+
+    client.post_records(ENDPOINT, records(3))
+
+    assert all(post["headers"]["Content-Encoding"] == "gzip" for post in session.posts)
+    assert [posted_ids(post) for post in session.posts] == [["IBR0", "IBR1"], ["IBR2"]]
+
+
+def test_append_only_sends_every_chunk_in_parallel():
+    session = MemorySession()
+    client = ApiIngestClient(
+        BASE_URL, max_chunk_records=1, max_workers=3, append_only=True, session=session
+    )
+
+    assert client.post_records(ENDPOINT, records(7)) == 7
+
+    assert sorted(sum((posted_ids(post) for post in session.posts), [])) == sorted(
+        record["id_precia"] for record in records(7)
+    )
@@ -0,0 +1,144 @@
+"""
+Pruebas de CurveCache con un cliente de S3 en memoria: las curvas guardadas se
+recuperan exactamente iguales (valores, tipos, nulos e indice), una entrada
+inexistente o ilegible no interrumpe el proceso y sin bucket el cache queda
+deshabilitado sin tocar S3
+"""
+
+import datetime as dt
+import logging
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from precia_utils.precia_cache import CurveCache
+
+BUCKET = "s3-dev-otc-curve-cache"
+PREFIX = "otc_curve_cache/test"
+
+
+class MemoryS3Client:
+    """Sustituto en memoria de boto3.client("s3") con get_object y put_object"""
+
+    class NoSuchKey(Exception):
+        def __init__(self, key: str):
+            super().__init__(f"The specified key does not exist: {key}")
+            self.response = {"Error": {"Code": "NoSuchKey"}}
+
+    class Body:
+        def __init__(self, content: bytes):
+            self.content = content
+
+        def read(self) -> bytes:
+            return self.content
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes) -> dict:
+        self.objects[(Bucket, Key)] = Body
+        return {}
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        if (Bucket, Key) not in self.objects:
+            raise MemoryS3Client.NoSuchKey(Key)
+        return {"Body": MemoryS3Client.Body(self.objects[(Bucket, Key)])}
+
+
+class UnreachableS3Client:
+    """Cliente de S3 que falla en cualquier llamado"""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"No se esperaba un llamado a S3: {name}")
+
+
+def curve_frames() -> dict:
+    nodes = pd.DataFrame(
+        {
+            "days": np.array([1, 30, 90, 365], dtype="int64"),
+            "rate": [0.051, 0.0523, np.nan, 0.0561],
+            "tenor": ["ON", "1M", None, "1Y"],
+            "traded": [True, False, True, False],
+            "maturity": pd.to_datetime(["2026-10-17", "2026-11-16", "2027-01-15", "2027-10-16"]),
+            "valuation_date": [dt.date(2026, 10, 16)] * 4,
+        }
+    )
+    daily = pd.DataFrame(
+        {"rate": np.linspace(0.05, 0.06, 5)}, index=pd.RangeIndex(1, 6, name="days")
+    )
+    shifted = pd.DataFrame({"id_precia": ["SwapCC_USDCOP"] * 3, "mid": [1.0, 2.0, 3.0]})
+    shifted.index = pd.RangeIndex(10, 16, 2)
+    hazards = pd.DataFrame({"days": [365, 730], "rate": [0.01, 0.012]}).set_index("days")
+    return {"nodes": nodes, "daily": daily, "shifted": shifted, "hazards": hazards}
+
+
+def test_round_trip_is_exact():
+    cache = CurveCache(BUCKET, PREFIX, "test-1", s3_client=MemoryS3Client())
+    frames = curve_frames()
+    key = cache.key("USDCOP", "2026-10-16", frames["nodes"])
+
+    cache.put(key, frames)
+    cached = cache.get(key)
+
+    assert sorted(cached) == sorted(frames)
+    for name, frame in frames.items():
+        pd.testing.assert_frame_equal(cached[name], frame, check_exact=True)
+        pd.testing.assert_index_equal(cached[name].index, frame.index, exact=True)
+    assert cached["nodes"].at[2, "tenor"] is None
+
+
+def test_missing_entry_returns_none_without_warning(caplog):
+    cache = CurveCache(BUCKET, PREFIX, "test-1", s3_client=MemoryS3Client())
+
+    with caplog.at_level(logging.WARNING):
+        assert cache.get(cache.key("USDCOP")) is None
+
+    assert caplog.records == []
+
+
+def test_unreadable_entry_returns_none_with_warning(caplog):
+    s3_client = MemoryS3Client()
+    cache = CurveCache(BUCKET, PREFIX, "test-1", s3_client=s3_client)
+    key = cache.key("USDCOP")
+    s3_client.put_object(Bucket=BUCKET, Key=cache.object_key(key), Body=b"no es un zip")
+
+    with caplog.at_level(logging.WARNING):
+        assert cache.get(key) is None
+
+    assert "No fue posible leer la entrada" in caplog.text
+
+
+def test_key_depends_on_inputs_and_methodology_version():
+    frames = curve_frames()
+    cache = CurveCache(BUCKET, PREFIX, "test-1", s3_client=MemoryS3Client())
+    other_version = CurveCache(BUCKET, PREFIX, "test-2", s3_client=MemoryS3Client())
+    changed = frames["nodes"].copy()
+    changed.loc[0, "rate"] = 0.052
+
+    key = cache.key("USDCOP", frames["nodes"])
+    assert key == cache.key("USDCOP", frames["nodes"].copy())
+    assert key != cache.key("USDCOP", changed)
+    assert key != cache.key("USDCLP", frames["nodes"])
+    assert key != other_version.key("USDCOP", frames["nodes"])
+
+
+@pytest.mark.parametrize("bucket", [None, ""])
+def test_cache_without_bucket_is_disabled(bucket):
+    cache = CurveCache(bucket, PREFIX, "test-1", s3_client=UnreachableS3Client())
+    key = cache.key("USDCOP")
+
+    cache.put(key, curve_frames())
+
+    assert not cache.enabled
+    assert cache.get(key) is None
+
+
+def test_cache_is_picklable_without_its_client():
+    cache = CurveCache(BUCKET, PREFIX, "test-1", s3_client=MemoryS3Client())
+
+    restored = pickle.loads(pickle.dumps(cache))
+
+    assert restored.bucket == BUCKET
+    assert restored._s3_client is None
@@ -0,0 +1,98 @@
+"""
+Pruebas de bulk_upsert_df sobre una BD SQLite: carga por lotes en una sola
+transaccion con un Engine, con una Connection sin transaccion y con una
+Connection que ya tiene una transaccion abierta (begin() del llamador o el
+autobegin de SQLAlchemy 2.x), en la que la carga va en un savepoint.
+
+SQLite no tiene ON DUPLICATE KEY UPDATE, por lo que se carga sin columnas a
+actualizar (INSERT multi-fila)
+"""
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from precia_utils.precia_db import bulk_upsert_df
+from precia_utils.precia_exceptions import PlataformError
+
+TABLE = "pub_otc_fwd_inter"
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'publish.db'}")
+
+    # pysqlite no abre la transaccion hasta la primera escritura, lo que rompe
+    # los savepoints: se delega el BEGIN a SQLAlchemy (receta de su documentacion)
+    @sa.event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @sa.event.listens_for(engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    with engine.begin() as connection:
+        connection.execute(
+            sa.text(f"CREATE TABLE {TABLE} (id_precia TEXT PRIMARY KEY, mid_fwd FLOAT)")
+        )
+    yield engine
+    engine.dispose()
+
+
+def fwd_df(ids):
+    return pd.DataFrame({"id_precia": ids, "mid_fwd": [float(n) for n in range(len(ids))]})
+
+
+def published_ids(engine) -> list:
+    with engine.connect() as connection:
+        rows = connection.execute(sa.text(f"SELECT id_precia FROM {TABLE} ORDER BY id_precia"))
+        return [row[0] for row in rows]
+
+
+def test_engine_loads_all_batches(engine):
+    loaded = bulk_upsert_df(engine, fwd_df(["A", "B", "C", "D", "E"]), TABLE, [], batch_size=2)
+
+    assert loaded == 5
+    assert published_ids(engine) == ["A", "B", "C", "D", "E"]
+
+
+def test_engine_rolls_back_every_batch_on_failure(engine):
+    with pytest.raises(PlataformError):
+        bulk_upsert_df(engine, fwd_df(["A", "B", "C", "C"]), TABLE, [], batch_size=2)
+
+    assert published_ids(engine) == []
+
+
+def test_connection_without_transaction_commits(engine):
+    with engine.connect() as connection:
+        bulk_upsert_df(connection, fwd_df(["A", "B"]), TABLE, [], batch_size=1)
+
+    assert published_ids(engine) == ["A", "B"]
+
+
+def test_connection_with_open_transaction_uses_a_savepoint(engine):
+    with engine.connect() as connection:
+        # Con SQLAlchemy 2.x la consulta abre la transaccion (autobegin); con
+        # 1.4 se abre explicitamente
+        connection.execute(sa.text(f"SELECT COUNT(*) FROM {TABLE}"))
+        if not connection.in_transaction():
+            connection.begin()
+        bulk_upsert_df(connection, fwd_df(["A", "B"]), TABLE, [], batch_size=1)
+        assert connection.in_transaction()
+        connection.get_transaction().commit()
+
+    assert published_ids(engine) == ["A", "B"]
+
+
+def test_failed_load_keeps_the_callers_transaction(engine):
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        connection.execute(sa.text(f"INSERT INTO {TABLE} VALUES ('A', 1.0)"))
+        with pytest.raises(PlataformError):
+            bulk_upsert_df(connection, fwd_df(["B", "A"]), TABLE, [], batch_size=1)
+        # Solo se deshace el savepoint de la carga: la fila del llamador sigue
+        assert transaction.is_active
+        transaction.commit()
+
+    assert published_ids(engine) == ["A"]
@@ -0,0 +1,169 @@
+"""
+Pruebas de DependencyLauncher contra LocalGlueClient: lanzamientos unificados
+por dependencias, reintento con espera creciente de los rechazos por
+concurrencia, presupuesto de ejecuciones en curso y fallos sin reintento.
+
+El reloj es simulado: cada espera del launcher avanza el reloj del cliente
+local, de modo que las pruebas no duermen
+"""
+
+import pytest
+
+from precia_utils.precia_exceptions import PlataformError
+from precia_utils.precia_launcher import (
+    DependencyLauncher,
+    LocalGlueClient,
+    glue_job_launcher,
+    is_glue_throttling,
+)
+
+JOB_NAME = "glue-job-dev-process-otc-opt-inter"
+DEPENDENCIES = {
+    "USDBRL": ["USDBRL"],
+    "USDMXN": ["USDMXN"],
+    "USDPEN": ["USDBRL", "USDPEN"],
+}
+
+
+class FakeClock:
+    """Reloj simulado: sleep avanza el tiempo y registra cada espera"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class CountingGlueClient(LocalGlueClient):
+    """LocalGlueClient que cuenta las consultas de estado (glue:GetJobRun)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.get_job_run_calls = 0
+
+    def get_job_run(self, JobName: str, RunId: str) -> dict:
+        self.get_job_run_calls += 1
+        return super().get_job_run(JobName, RunId)
+
+
+def build_launcher(glue_client, clock, **kwargs):
+    launch, is_running = glue_job_launcher(
+        glue_client, JOB_NAME, lambda currency: {"--CURRENCY": currency}
+    )
+    options = {
+        "launch": launch,
+        "dependencies": DEPENDENCIES,
+        "require_all": False,
+        "is_retryable": is_glue_throttling,
+        "launch_rate": 1.0,
+        "burst": 10,
+        "clock": clock,
+        "sleep": clock.sleep,
+    }
+    options.update(kwargs)
+    if options.get("max_concurrent") is not None:
+        options["is_running"] = is_running
+    return DependencyLauncher(**options)
+
+
+def launched_currencies(glue_client) -> list:
+    return [run["Arguments"]["--CURRENCY"] for run in glue_client.runs.values()]
+
+
+def test_each_process_is_launched_once_without_polling():
+    clock = FakeClock()
+    glue_client = CountingGlueClient(max_concurrent_runs=10, run_duration=60, clock=clock)
+    launcher = build_launcher(glue_client, clock)
+
+    queued = launcher.mark_completed({"USDBRL", "USDPEN"})
+    launched = launcher.run()
+
+    assert queued == ["USDBRL", "USDPEN"]
+    assert sorted(launched) == ["USDBRL", "USDPEN"]
+    assert launched_currencies(glue_client) == ["USDBRL", "USDPEN"]
+    assert glue_client.get_job_run_calls == 0
+    assert clock.sleeps == []
+    # Una dependencia posterior no vuelve a lanzar lo ya lanzado
+    assert launcher.mark_completed({"USDPEN"}) == []
+
+
+def test_throttled_launch_is_retried_with_growing_backoff():
+    clock = FakeClock()
+    glue_client = LocalGlueClient(max_concurrent_runs=1, run_duration=5, clock=clock)
+    launcher = build_launcher(glue_client, clock, retry_backoff=2.0)
+
+    launcher.mark_completed({"USDMXN", "USDPEN"})
+    launched = launcher.run()
+
+    assert sorted(launched) == ["USDMXN", "USDPEN"]
+    # USDPEN se rechaza hasta que termina USDMXN (5 s): esperas de 2 y 4 s
+    assert clock.sleeps == [2.0, 4.0]
+
+
+def test_exhausted_attempts_raise():
+    clock = FakeClock()
+    glue_client = LocalGlueClient(max_concurrent_runs=1, run_duration=1000, clock=clock)
+    launcher = build_launcher(glue_client, clock, max_attempts=5, retry_backoff=2.0)
+
+    launcher.mark_completed({"USDMXN", "USDPEN"})
+    with pytest.raises(PlataformError):
+        launcher.run()
+
+    assert launched_currencies(glue_client) == ["USDMXN"]
+    assert clock.sleeps == [2.0, 4.0, 6.0, 8.0]
+
+
+def test_non_retryable_error_raises_without_retry():
+    clock = FakeClock()
+    calls = []
+
+    def launch(process):
+        calls.append(process)
+        raise ValueError("Argumentos invalidos")
+
+    launcher = DependencyLauncher(
+        launch=launch,
+        dependencies=DEPENDENCIES,
+        require_all=False,
+        is_retryable=is_glue_throttling,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    launcher.mark_completed({"USDMXN"})
+    with pytest.raises(PlataformError):
+        launcher.run()
+
+    assert calls == ["USDMXN"]
+
+
+def test_max_concurrent_waits_for_a_free_slot():
+    clock = FakeClock()
+    glue_client = LocalGlueClient(max_concurrent_runs=1, run_duration=12, clock=clock)
+    launcher = build_launcher(glue_client, clock, max_concurrent=1, poll_interval=5.0)
+
+    launcher.mark_completed({"USDMXN", "USDPEN"})
+    launcher.run()
+
+    # Se consulta el estado cada 5 s hasta que termina USDMXN, sin rechazos de Glue
+    assert clock.sleeps == [5.0, 5.0, 5.0]
+    assert launched_currencies(glue_client) == ["USDMXN", "USDPEN"]
+
+
+def test_require_all_waits_for_every_dependency():
+    clock = FakeClock()
+    glue_client = LocalGlueClient(max_concurrent_runs=10, clock=clock)
+    launcher = build_launcher(glue_client, clock, require_all=True)
+
+    assert launcher.mark_completed({"USDBRL"}) == ["USDBRL"]
+    launcher.run()
+    assert launcher.mark_completed({"USDPEN"}) == ["USDPEN"]
+    launcher.run()
+
+    assert launched_currencies(glue_client) == ["USDBRL", "USDPEN"]
@@ -20,6 +20,9 @@ final, o la declaracion de la fecha incial y un intervalo.
 #
 # Variables de entorno:
 # PAGINATION_MAX_LIMIT: '1000'
+# MAX_CONCURRENT_REQUESTS: '8' (opcional, fechas consultadas en paralelo)
+# HISTORY_CACHE_TTL: '300' (opcional, segundos que se conservan los datos de una fecha)
+# HISTORY_CACHE_MAX_ENTRIES: '256' (opcional, URLs que se conservan en el cache)
 #
 # Requerimientos:
 # capa-pandas-requests
@@ -27,23 +30,41 @@ final, o la declaracion de la fecha incial y un intervalo.
 # =============================================================
 #
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dateutil import relativedelta as rd
 import json
 import logging
 import os
 import sys
+import threading
+import time
 
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger()  # Log, ver en CloaudWatch
 logger.setLevel(logging.INFO)
 error_message = ''  # Mensaje de error para el cliente
 failed_init = False  # Evita timeouts causados por errores en el codigo de inicializacion
+REQUEST_TIMEOUT = 30  # Segundos por solicitud al API
+# Datos ya consultados por URL de fecha: {url: (instante de la consulta, datos)}, en orden de consulta.
+# Se conserva entre invocaciones en caliente del Lambda; las entradas vencidas se eliminan al leer y el
+# tamanio se limita a history_cache_max_entries
+history_cache = {}
+history_cache_lock = threading.Lock()  # Las fechas se consultan desde varios hilos
 
 try:
     logger.info('[INIT] Inicializando Lambda ...')
     max_total_results = int(os.environ['PAGINATION_MAX_LIMIT'])
+    max_concurrent_requests = int(os.environ.get('MAX_CONCURRENT_REQUESTS', '8'))
+    history_cache_ttl = int(os.environ.get('HISTORY_CACHE_TTL', '300'))
+    history_cache_max_entries = int(os.environ.get('HISTORY_CACHE_MAX_ENTRIES', '256'))
+    # Sesion con conexiones persistentes, una por consulta concurrente
+    http_session = requests.Session()
+    http_adapter = HTTPAdapter(pool_maxsize=max_concurrent_requests)
+    http_session.mount('http://', http_adapter)
+    http_session.mount('https://', http_adapter)
     logger.info('[INIT] Inicialización exitosa.')
 except Exception as e:
     error_message = str(e)
@@ -59,15 +80,17 @@ def lambda_handler(event, context):
     """
     if failed_init:  # Evita timeouts causados por errores en el codigo de inicializacion
         logger.critical('[lambda_handler] Lambda interrumpida. No se completo la inicializacion.')
-        global error_message
         return create_error_response(500, error_message, context)
 
     logger.info('[lambda_handler] event: ' + str(json.dumps(event)))
     
     try:
         logger.info("[lambda_handler] Iniciando ejecucion del lambda ...")
-        base_historical_url, historical_date_list, time_period_str, query_date, end_point = process_event(event)
-        historical_data_dict = get_historical_data(base_historical_url, historical_date_list)
+        base_historical_url, historical_date_list, time_period_str, query_date, end_point, range_url = process_event(event)
+        if range_url:
+            historical_data_dict = get_date_data(range_url)
+        else:
+            historical_data_dict = get_historical_data(base_historical_url, historical_date_list)
         body_to_return_dict = create_body(historical_data_dict, time_period_str, query_date, end_point)
         logger.info("[lambda_handler] Ejecucion del lambda finalizada exitosamente ...")
         return {
@@ -108,7 +131,7 @@ def process_event(event_lambda):
         else:
             try:
                 historical_initial_date = datetime.strptime(initial_date_str, '%Y-%m-%d')
-            except Exception as e:
+            except Exception:
                 raise ValueError('"initial_date" no tiene el formato esperado AAAA-MM-DD.')
         historical_final_date = False
         final_date = False
@@ -117,7 +140,7 @@ def process_event(event_lambda):
         if 'final_date' in ulr_params_dict['historical_url_param'] and bool(ulr_params_dict['historical_url_param']['final_date']):
             try:
                 final_date = datetime.strptime(ulr_params_dict['historical_url_param']['final_date'], '%Y-%m-%d')
-            except Exception as e:
+            except Exception:
                 raise ValueError('"final_date" no tiene el formato esperado AAAA-MM-DD.')
         if 'add_time_period' in ulr_params_dict['historical_url_param'] and bool(ulr_params_dict['historical_url_param']['add_time_period']):
             historical_time_period = ulr_params_dict['historical_url_param']['add_time_period']
@@ -144,13 +167,20 @@ def process_event(event_lambda):
         ulr_params_list.remove('historical_url_param')
         for parameter in ulr_params_list:
             url += str(parameter) + '=' + str(ulr_params_dict[parameter]) + '&'
+        # Si el API admite rangos, el historico se consulta en una sola solicitud paginada
+        range_url = None
+        if bool(ulr_params_dict['historical_url_param'].get('range_url_params')):
+            range_url_params = ulr_params_dict['historical_url_param']['range_url_params']
+            range_url = url + str(range_url_params['initial']) + '=' + time_period_date_list[0]
+            range_url += '&' + str(range_url_params['final']) + '=' + time_period_date_list[-1]
+            logger.info('[process_event] URL del rango del historico: ' + range_url)
         url += str(historical_url_param_name) + '='
         historical_time_str = time_period_date_list[0] + '/' + time_period_date_list[-1]
         logger.info('[process_event] URL base historico: ' + url)
         logger.info('[process_event] Dias del historico: ' + str(time_period_days))
         logger.info('[process_event] Periodo del historico: ' + historical_time_str)
         logger.info('[process_event] Event procesado exitosamente')
-        return url, time_period_date_list, historical_time_str, historical_initial_date.strftime("%Y-%m-%d"), end_point
+        return url, time_period_date_list, historical_time_str, historical_initial_date.strftime("%Y-%m-%d"), end_point, range_url
     except KeyError as e:
         logger.error('[process_event] El event no tiene la estructura esperada. Fallo en linea: ' + get_error_line() + '. Falta: ' + str(e))
         raise UserError(error_msg)
@@ -167,81 +197,135 @@ def create_deltatime(historical_time_period):
     A partir del diccionario entregado por el event crea un deltatime correspondiente al peridodo que se quiere correr una
     fecha
     """
-        historical_time_str = ''
-        if 'years' in historical_time_period:
-            try:
-                years_period = int(historical_time_period['years'])
-                historical_time_str += ' ' + str(years_period) + ' anios'
-            except ValueError:
-                years_period = 0
-        else:
+    historical_time_str = ''
+    if 'years' in historical_time_period:
+        try:
+            years_period = int(historical_time_period['years'])
+            historical_time_str += ' ' + str(years_period) + ' anios'
+        except ValueError:
             years_period = 0
-        if 'months' in historical_time_period:
-            try:
-                months_period = int(historical_time_period['months'])
-                historical_time_str += ' ' + str(months_period) + ' meses'
-            except ValueError:
-                months_period = 0
-        else:
+    else:
+        years_period = 0
+    if 'months' in historical_time_period:
+        try:
+            months_period = int(historical_time_period['months'])
+            historical_time_str += ' ' + str(months_period) + ' meses'
+        except ValueError:
             months_period = 0
-        if 'weeks' in historical_time_period:
-            try:
-                weeks_period = int(historical_time_period['weeks'])
-                historical_time_str += ' ' + str(weeks_period) + ' semanas'
-            except ValueError:
-                weeks_period = 0
-        else:
+    else:
+        months_period = 0
+    if 'weeks' in historical_time_period:
+        try:
+            weeks_period = int(historical_time_period['weeks'])
+            historical_time_str += ' ' + str(weeks_period) + ' semanas'
+        except ValueError:
             weeks_period = 0
-        if 'days' in historical_time_period:
-            try:
-                days_period = int(historical_time_period['days'])
-                
-                historical_time_str += ' ' + str(days_period) + ' dias'
-            except ValueError:
-                days_period = 0
-        else:
+    else:
+        weeks_period = 0
+    if 'days' in historical_time_period:
+        try:
+            days_period = int(historical_time_period['days'])
+            
+            historical_time_str += ' ' + str(days_period) + ' dias'
+        except ValueError:
             days_period = 0
-        if historical_time_str == '':
-                raise ValueError("event[...]['historical_url_param']['*_time_period'] no incluye a ['years'], ['months'], ['weeks'] o ['days'] valido.")
-        logger.debug('[get_historical_data] historical_time_str: ' + historical_time_str)
-        time_period_timedelta = rd.relativedelta(days=days_period, weeks=weeks_period, months=months_period, years=years_period)
-        return time_period_timedelta
+    else:
+        days_period = 0
+    if historical_time_str == '':
+        raise ValueError("event[...]['historical_url_param']['*_time_period'] no incluye a ['years'], ['months'], ['weeks'] o ['days'] valido.")
+    logger.debug('[get_historical_data] historical_time_str: ' + historical_time_str)
+    time_period_timedelta = rd.relativedelta(days=days_period, weeks=weeks_period, months=months_period, years=years_period)
+    return time_period_timedelta
+
+
+def has_more_pages(has_more):
+    """
+    Interpreta la bandera 'has_more' de la paginacion del API, que puede llegar como booleano o como texto
+    """
+    if isinstance(has_more, bool):
+        return has_more
+    return str(has_more).strip().lower() == 'true'
+
+
+def read_history_cache(full_url):
+    """
+    Retorna una copia de los datos vigentes de la URL en history_cache, o None si no estan. Elimina del cache las
+    entradas vencidas
+    """
+    with history_cache_lock:
+        now = time.monotonic()
+        expired_urls = [url for url, (query_time, _) in history_cache.items() if now - query_time >= history_cache_ttl]
+        for url in expired_urls:
+            del history_cache[url]
+        cached_data = history_cache.get(full_url)
+    if cached_data is None:
+        return None
+    return list(cached_data[1])
+
+
+def write_history_cache(full_url, data):
+    """
+    Guarda los datos de la URL en history_cache. Si se supera history_cache_max_entries se eliminan las entradas
+    consultadas hace mas tiempo
+    """
+    with history_cache_lock:
+        history_cache.pop(full_url, None)
+        history_cache[full_url] = (time.monotonic(), list(data))
+        while len(history_cache) > history_cache_max_entries:
+            del history_cache[next(iter(history_cache))]
+
+
+def get_date_data(full_url):
+    """
+    Consulta todas las paginas del API para la URL dada (una fecha o un rango). Los datos de cada URL se conservan
+    history_cache_ttl segundos para reutilizarlos en invocaciones en caliente
+    """
+    cached_data = read_history_cache(full_url)
+    if cached_data is not None:
+        logger.info('[get_date_data] Datos tomados del cache. url: ' + full_url)
+        return cached_data
+    data = []
+    size = 0
+    page_url = full_url
+    api_response_has_more_data = True
+    while api_response_has_more_data:
+        api_response = http_session.get(page_url, timeout=REQUEST_TIMEOUT)
+        api_response_code = api_response.status_code
+        if api_response_code == 200:
+            api_response_data = api_response.json()
+            data += api_response_data['data']
+            api_response_has_more_data = has_more_pages(api_response_data['meta']['page']['has_more'])
+            log_msg = 'code: 200, data agregada. url: ' + page_url
+        elif api_response_code == 204:
+            log_msg = 'code: 204, no data. url: ' + page_url
+            api_response_has_more_data = False
+        else:
+            api_response_data = api_response.json()
+            api_response_msg = 'code: ' + str(api_response_code) + ', body: ' + str(api_response_data) + '. url: ' + page_url
+            logger.info('[get_date_data] Repuesta del API: ' + api_response_msg)
+            logger.error('[get_date_data] La respuesta del API contiene un codigo de error.')
+            raise Exception('El API no respondio satisfactoriamente a la solicitud.')
+        size += max_total_results
+        page_url = full_url + '&inicio=' + str(size)
+        logger.info('[get_date_data] api_response: ' + log_msg)
+    write_history_cache(full_url, data)
+    return data
 
 
 def get_historical_data(incomplete_url, list_of_dates):
     """
-    Consulta y retorna datos obtenidos al realisar GET requiest a la API al combinar el imcomplete_url con el list_of_dates
+    Consulta y retorna datos obtenidos al realisar GET requiest a la API al combinar el imcomplete_url con el list_of_dates.
+    Las fechas se consultan en paralelo (hasta max_concurrent_requests a la vez) y los datos se retornan en el orden
+    de list_of_dates
     """
     error_msg = 'Fallo al obtener los datos del historico'
     try: 
         logger.info('[get_historical_data] Iniciando la obtencion de los datos del historico ...')
         data = []
-        for historical_date in list_of_dates:
-            size = 0
-            full_url = incomplete_url + historical_date
-            api_response_has_more_data = True
-            while api_response_has_more_data:
-                api_response = requests.get(full_url)
-                api_response_code = api_response.status_code
-                if api_response_code == 200:
-                    api_response_data = api_response.json()
-                    data += api_response_data['data']
-                    api_response_has_more_data = api_response_data['meta']['page']['has_more']
-                    if not eval(api_response_has_more_data):
-                        api_response_has_more_data = False
-                    log_msg = 'code: 200, data agregada. url: ' + full_url 
-                elif api_response_code == 204:
-                    log_msg = 'code: 204, no data. url: ' + full_url 
-                    api_response_has_more_data = False
-                else:
-                    api_response_data = api_response.json()
-                    api_response_msg = 'code: ' + str(api_response_code) + ', body: ' + str(api_response_data) + '. url: ' + full_url
-                    logger.info('[get_historical_data] Repuesta del API: ' + api_response_msg)
-                    logger.error('[get_historical_data] La respuesta del API contiene un codigo de error.')
-                    raise Exception('El API no respondio satisfactoriamente a la solicitud.')
-                size += max_total_results
-                full_url += '&inicio=' + str(size)
-                logger.info('[get_historical_data] api_response: ' + log_msg)
+        with ThreadPoolExecutor(max_workers=max_concurrent_requests) as executor:
+            date_results = executor.map(get_date_data, [incomplete_url + historical_date for historical_date in list_of_dates])
+            for date_data in date_results:
+                data += date_data
         logger.info('[get_historical_data] Obtencion de los datos del historico exitosa')
         return data
     except Exception as e:
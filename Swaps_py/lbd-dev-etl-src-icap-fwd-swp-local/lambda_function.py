@@ -97,6 +97,9 @@ from precia_utils.precia_aws import (
 )
 
 from ETLutils import connect_to_db
+# Copia de precia_utils.precia_orderbook (Supplies_py/precia_utils) empaquetada con la
+# lambda: la capa de precia_utils de la lambda no incluye el modulo
+from precia_orderbook import drop_traded_actions, resolve_modify_actions
 
 pd.options.mode.chained_assignment = None
 failed_init = False
@@ -1085,47 +1088,8 @@ def delete_actions_from_trades(process_df: pd.DataFrame) -> pd.DataFrame:
         init_msg = "Eliminando las filas de accion INSERT para las "
         init_msg += "puntas que finalizaron con una accion TRADE..."
         logger.info(init_msg)
-        df_icap_filters_trade = pd.DataFrame(
-            process_df[process_df["Action_Type"] == "Trade"]
-        )
+        df_icap_filters_trade = drop_traded_actions(process_df)
         df_icap_filters_trade["order"] = df_icap_filters_trade["Action_Type"]
-        df_icap_filters_trade["Market_Entry_Time"].astype("string")
-
-        for i in range(df_icap_filters_trade.index.size):
-            # trade de la iteracion
-            trade_row = df_icap_filters_trade.iloc[
-                df_icap_filters_trade.index == df_icap_filters_trade.index[i]
-            ]
-            by_tenor_drop_equal = process_df[
-                (
-                    process_df["Issue_Description"]
-                    == trade_row.Issue_Description.values[0]
-                )
-                & (process_df["Price"] == trade_row["Price"].values[0])
-                & (process_df["Amount"] == trade_row["Amount"].values[0])
-                & (
-                    process_df["Market_Entry_Time"]
-                    == trade_row["Market_Entry_Time"].values[0]
-                )
-            ]
-            process_df.drop(
-                index=by_tenor_drop_equal.index.values.tolist(), inplace=True
-            )
-            by_tenor_drop_different = process_df[
-                (
-                    process_df["Issue_Description"]
-                    == trade_row.Issue_Description.values[0]
-                )
-                & (process_df["Price"] == trade_row["Price"].values[0])
-                & (process_df["Amount"] == trade_row["Amount"].values[0])
-                & (
-                    process_df["Market_Entry_Time"]
-                    == trade_row["Market_Leave_Time"].values[0]
-                )
-            ]
-            process_df.drop(
-                index=by_tenor_drop_different.index.values.tolist(), inplace=True
-            )
 
         df_icap_filters_trade = df_icap_filters_trade.sort_values(
             ["Market_Entry_Time", "Market_Leave_Time"]
@@ -1339,176 +1303,6 @@ def order_by_action_and_hour(process_df: pd.DataFrame) -> pd.DataFrame:
         raise PlataformError from ah_exc
 
 
-def replace_modify_actions(process_df: pd.DataFrame):
-    """
-    Reemplaza los MODIFY por INSERT + CANCEL. Si es subject MODIFY solo se
-    reemplaza por CANCEL. El nuevo INSERT toma como hora de insercion la hora
-    del MODIFY, y el nuevo CANCEL toma como hora de insercion la hora del INSERT
-    sobre el que se hace el MODIFY y como hora de retiro la hora del MODIFY
-
-    Args:
-        process_df (pd.DataFrame): Dataframe sobre el cual se realiza el
-        reemplazo de los MODIFY
-
-    Raises:
-        PlataformError: Cuando falla el reemplazo de los MODIFY
-
-    Returns:
-        pd.DataFrame: Dataframe con MODIFY sustituidos
-    """
-    try:
-        process_df_copy = process_df.copy()
-        modify_index_list = process_df_copy[
-            (process_df_copy["Action_Type"] == "Modify")
-        ].index.values.tolist()
-
-        # Dataframe para guardar nuevos insert con fila dummie
-        new_inserts_df = pd.DataFrame(
-            {
-                "Vendor": [0],
-                "Issue_Description": [0],
-                "Trade_Date": [0],
-                "Order_Type": [0],
-                "Action_Type": [0],
-                "Market_Entry_Time": [0],
-                "Market_Leave_Time": [0],
-                "Price": [0],
-                "Amount": [0],
-                "Currency": [0],
-                "Rejected": [0],
-                "Market": [0],
-                "date_issue": [0],
-                "derived_type": [0],
-                "Underlying": [0],
-                "Tenor": [0],
-                "order_Time": [0],
-                "order_time_temp": [0],
-                "order": [0],
-                "lettering_mistake": [0],
-                "length_error": [0],
-                "tenor_length_error": [0],
-            }
-        )
-
-        for modify_index in modify_index_list:
-
-            moldify_row = process_df_copy.loc[modify_index]
-            moldify_row_df = process_df_copy.loc[[modify_index]]
-
-            new_insert_row_df = moldify_row_df
-            new_insert_row_df.iloc[
-                [0], new_insert_row_df.columns.get_loc("Action_Type")
-            ] = "Insert"
-            modify_type = moldify_row["Order_Type"]
-
-            # Se agrega el nuevo INSERT si el modify si no es Subject
-            if "Subject" not in modify_type:
-                new_inserts_df = pd.concat([new_inserts_df, new_insert_row_df])
-
-            # dataframe desde la primera fila hasta el modify de la iteracion
-            actions_without_trades_partial_df = process_df_copy[0:modify_index]
-
-            # precio del modify de la iteracion
-            modify_price = moldify_row["Price"]
-
-            # curva y tenores del modify de la iteracion
-            modify_descripcion = moldify_row["Issue_Description"]
-
-            is_bid = "bid" in moldify_row["Order_Type"].lower()
-
-            # dataframe con inserts
-            inserts_df = actions_without_trades_partial_df[
-                (
-                    actions_without_trades_partial_df["Issue_Description"]
-                    == modify_descripcion
-                )
-                & (actions_without_trades_partial_df["Action_Type"] == "Insert")
-                & (actions_without_trades_partial_df["Price"] == modify_price)
-                & (
-                    actions_without_trades_partial_df["Order_Type"].str.contains(
-                        "bid", False
-                    )
-                    == is_bid
-                )
-            ]
-
-            # primer insert del dataframe anterior
-            one_insert_df = inserts_df.head(1)
-
-            if not one_insert_df.empty:
-
-                insert_init_hour = one_insert_df.loc[
-                    one_insert_df.index
-                    == one_insert_df["Market_Entry_Time"].index.max(),
-                    "Market_Entry_Time",
-                ].values[0]
-                modify_init_hour = moldify_row["Market_Entry_Time"]
-
-                # Reemplazando las horas del MODIFY
-                process_df_copy.loc[
-                    process_df_copy.index == modify_index,
-                    "Market_Entry_Time",
-                ] = insert_init_hour
-                process_df_copy.loc[
-                    process_df_copy.index == modify_index,
-                    "Market_Leave_Time",
-                ] = modify_init_hour
-
-                # se obtiene el order type, order time y order time temp del INSERT
-                insert_order_type = one_insert_df.loc[
-                    one_insert_df.index == one_insert_df["Order_Type"].index.max(),
-                    "Order_Type",
-                ].values[0]
-                insert_order_time = one_insert_df.loc[
-                    one_insert_df.index == one_insert_df["order_Time"].index.max(),
-                    "order_Time",
-                ].values[0]
-                insert_order_time_temp = one_insert_df.loc[
-                    one_insert_df.index == one_insert_df["order_time_temp"].index.max(),
-                    "order_time_temp",
-                ].values[0]
-
-                # Se sustituye el MODIFY por un CANCEL
-                process_df_copy.loc[
-                    process_df_copy.index == modify_index,
-                    "Action_Type",
-                ] = "Cancel"
-
-                # Se sustituye el order type, order time y order time temp del
-                # CANCEL por los del INSERT
-                process_df_copy.loc[
-                    process_df_copy.index == modify_index,
-                    "Order_Type",
-                ] = insert_order_type
-                process_df_copy.loc[
-                    process_df_copy.index == modify_index,
-                    "order_Time",
-                ] = insert_order_time
-                process_df_copy.loc[
-                    process_df_copy.index == modify_index,
-                    "order_time_temp",
-                ] = insert_order_time_temp
-
-                # elimina el INSERT del que extrajo la hora para el MODIFY
-                process_df_copy.drop(
-                    index=one_insert_df["Market_Entry_Time"].index.max(),
-                    inplace=True,
-                )
-
-        # Eliminando el primer registro dummie
-        new_inserts_df = new_inserts_df.drop(new_inserts_df.index[0])
-
-        logger.info("MODIFYs convertidos en INSERTs: %s", new_inserts_df.shape[0])
-
-        # Agregando los nuevos registros inserts
-        process_df_copy = pd.concat([process_df_copy, new_inserts_df])
-
-        return process_df_copy
-    except (Exception,) as rma_exc:
-        logger.error(create_log_msg("Fallo el reemplazo de MODIFY por INSERT+CANCEL"))
-        raise PlataformError from rma_exc
-
-
 def count_modify_actions(process_df: pd.DataFrame) -> int:
     """Cuenta el numero de acciones MODIFY en el dataframe dado
 
@@ -1640,46 +1434,19 @@ def filter_orders(procces_df: pd.DataFrame) -> pd.DataFrame:
                 inplace=True,
             )
 
-            # Iteracion para reemplazar modify por insert + cancel incluso
-            # cuando hay modify de modify
-            iterations = 0
-            while True:
-
-                number_of_modify_before = count_modify_actions(
-                    actions_without_trades_df
-                )
-                iterations += 1
-                logger.info(
-                    "MODIFYs antes de sustiticion de MODIFYs numero %s: %s",
-                    iterations,
-                    number_of_modify_before,
-                )
-
-                before_modify_msg = "Acciones (sin TRADEs) antes de sustiticion de MODIFYs numero %s: %s"
-                logger.info(
-                    before_modify_msg, iterations, actions_without_trades_df.shape[0]
-                )
-
-                actions_without_trades_df = order_by_action_and_hour(
-                    actions_without_trades_df
-                )
-                actions_without_trades_df.reset_index(drop=True, inplace=True)
-
-                actions_without_trades_df = replace_modify_actions(
-                    actions_without_trades_df
-                )
-
-                number_of_modify_after = count_modify_actions(actions_without_trades_df)
-                logger.info(
-                    "MODIFYs despues de sustiticion de MODIFYs numero %s: %s",
-                    iterations,
-                    number_of_modify_after,
-                )
-
-                # Si son iguales significa que no hubo nuevos modify validos
-                # para reemplazar (modify de modify)
-                if number_of_modify_before == number_of_modify_after:
-                    break
+            # Reemplaza los modify por insert + cancel incluso cuando hay
+            # modify de modify
+            logger.info(
+                "MODIFYs antes de la sustitucion de MODIFYs: %s",
+                count_modify_actions(actions_without_trades_df),
+            )
+            actions_without_trades_df = resolve_modify_actions(
+                actions_without_trades_df
+            )
+            logger.info(
+                "MODIFYs despues de la sustitucion de MODIFYs: %s",
+                count_modify_actions(actions_without_trades_df),
+            )
 
             actions_df = pd.concat(
                 [
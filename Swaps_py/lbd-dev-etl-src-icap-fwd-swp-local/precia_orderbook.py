@@ -0,0 +1,189 @@
+"""
+=============================================================
+
+Nombre: precia_orderbook.py
+Tipo: Modulo
+
+Autor:
+    - Tecnología - Precia
+
+Ultima modificación: 16/10/2026
+
+Reune las funcionalidades para reconstruir el ciclo de vida de
+las puntas de los archivos de ordenes de los brokers (Tullett,
+ICAP): INSERT -> MODIFY -> CANCEL/TRADE. Las acciones se ordenan
+una sola vez y se emparejan por llave en diccionarios, en lugar
+de recorrer y filtrar el dataframe completo por cada accion
+
+=============================================================
+"""
+
+import logging
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import time
+
+import pandas as pd
+
+from precia_utils.precia_exceptions import PlataformError
+from precia_utils.precia_logger import create_log_msg
+
+logger = logging.getLogger()
+
+# Llave con la que un TRADE empareja las acciones de su punta (la hora se
+# compara contra la hora de entrada y la de salida del TRADE)
+TRADE_KEY_COLUMNS = ["Issue_Description", "Price", "Amount", "Market_Entry_Time"]
+# Columnas que el CANCEL generado por un MODIFY toma del INSERT emparejado
+INSERT_INHERITED_COLUMNS = ["Order_Type", "order_Time", "order_time_temp"]
+
+
+def _time_to_str(entry_time) -> str:
+    """Representacion en texto de la hora, igual a astype(str) de pandas"""
+    return "nan" if entry_time is None else str(entry_time)
+
+
+def resolve_modify_actions(actions_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reemplaza los MODIFY por INSERT + CANCEL, incluso cuando hay MODIFY de
+    MODIFY. Cada MODIFY que no es Subject genera un nuevo INSERT con su hora, y
+    el MODIFY se convierte en CANCEL del primer INSERT de la misma curva,
+    precio y lado (bid/offer): toma la hora de entrada, el tipo de orden,
+    order_Time y order_time_temp del INSERT y como hora de salida la hora del
+    MODIFY. El INSERT emparejado se elimina.
+
+    Cada ronda ordena las acciones de forma estable por hora de entrada y un
+    MODIFY solo puede emparejar un INSERT dentro de las primeras filas vigentes
+    hasta su posicion. Los INSERT generados en una ronda quedan disponibles en
+    la siguiente, y las rondas terminan cuando ninguna empareja un MODIFY.
+    Las filas se manipulan como referencias a las filas originales y el
+    dataframe resultante se construye una sola vez
+
+    Args:
+        actions_df (pd.DataFrame): Acciones (sin TRADE) del archivo del broker
+
+    Raises:
+        PlataformError: Cuando falla el reemplazo de los MODIFY
+
+    Returns:
+        pd.DataFrame: Dataframe con MODIFY sustituidos y Market_Entry_Time en
+        formato HH:MM:SS
+    """
+    try:
+        base_df = actions_df.reset_index(drop=True)
+        entry_times = [
+            None if pd.isna(entry_time) else entry_time
+            for entry_time in pd.to_datetime(base_df["Market_Entry_Time"]).dt.time
+        ]
+        is_bid = base_df["Order_Type"].str.contains("bid", case=False)
+        is_subject = base_df["Order_Type"].str.contains("Subject").tolist()
+        keys = list(zip(base_df["Issue_Description"], base_df["Price"], is_bid))
+
+        def sort_key(item):
+            row, _, donor = item
+            entry_time = entry_times[row if donor is None else donor]
+            return (entry_time is None, time.min if entry_time is None else entry_time)
+
+        # Cada accion es (fila original, tipo de accion, fila del INSERT del
+        # que hereda sus datos si es un CANCEL generado por un MODIFY)
+        items = [(row, action, None) for row, action in enumerate(base_df["Action_Type"])]
+        rounds = 0
+        while True:
+            rounds += 1
+            items.sort(key=sort_key)
+            inserts_by_key = {}
+            for position, (row, action, _) in enumerate(items):
+                if action == "Insert":
+                    inserts_by_key.setdefault(keys[row], deque()).append(position)
+
+            removed = []
+            new_inserts = []
+            for position, (row, action, _) in enumerate(items):
+                if action != "Modify":
+                    continue
+                # El MODIFY de la primera fila no genera INSERT: el flujo
+                # original lo descartaba junto con la fila dummie (etiqueta 0)
+                if not is_subject[row] and position > 0:
+                    new_inserts.append((row, "Insert", None))
+                candidates = inserts_by_key.get(keys[row])
+                if not candidates:
+                    continue
+                insert_position = candidates[0]
+                # Posicion del INSERT descontando los INSERT ya eliminados
+                if insert_position - bisect_left(removed, insert_position) >= position:
+                    continue
+                candidates.popleft()
+                insort(removed, insert_position)
+                items[position] = (row, "Cancel", items[insert_position][0])
+
+            removed_positions = set(removed)
+            items = [
+                item for position, item in enumerate(items) if position not in removed_positions
+            ] + new_inserts
+            logger.info(
+                "Ronda %s: MODIFYs convertidos en CANCEL: %s, INSERTs generados: %s",
+                rounds,
+                len(removed),
+                len(new_inserts),
+            )
+            if not removed:
+                break
+
+        rows = [row for row, _, _ in items]
+        result_df = base_df.iloc[rows].reset_index(drop=True)
+        result_df["Action_Type"] = [action for _, action, _ in items]
+        result_df["Market_Entry_Time"] = [
+            _time_to_str(entry_times[row if donor is None else donor])
+            for row, _, donor in items
+        ]
+        cancel_positions = [
+            position for position, (_, _, donor) in enumerate(items) if donor is not None
+        ]
+        if cancel_positions:
+            donors = [items[position][2] for position in cancel_positions]
+            for column in INSERT_INHERITED_COLUMNS:
+                values = result_df[column].to_numpy(dtype=object, copy=True)
+                values[cancel_positions] = base_df[column].to_numpy(dtype=object)[donors]
+                result_df[column] = values
+            leave_times = result_df["Market_Leave_Time"].to_numpy(dtype=object, copy=True)
+            leave_times[cancel_positions] = [
+                _time_to_str(entry_times[items[position][0]]) for position in cancel_positions
+            ]
+            result_df["Market_Leave_Time"] = leave_times
+        return result_df
+    except (Exception,) as rma_exc:
+        logger.error(create_log_msg("Fallo el reemplazo de MODIFY por INSERT+CANCEL"))
+        raise PlataformError("Fallo el reemplazo de MODIFY por INSERT+CANCEL") from rma_exc
+
+
+def drop_traded_actions(actions_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Elimina (sobre el mismo dataframe) todas las acciones que emparejan con un
+    TRADE: misma curva, precio y monto, y hora de entrada igual a la hora de
+    entrada o de salida del TRADE. Los TRADE tambien se eliminan
+
+    Args:
+        actions_df (pd.DataFrame): Dataframe a filtrar
+
+    Raises:
+        PlataformError: Cuando falla la eliminacion de acciones
+
+    Returns:
+        pd.DataFrame: Dataframe con solo los TRADE
+    """
+    try:
+        trades_df = pd.DataFrame(actions_df[actions_df["Action_Type"] == "Trade"])
+        leave_keys_df = trades_df[TRADE_KEY_COLUMNS[:-1] + ["Market_Leave_Time"]]
+        trade_keys_df = pd.concat(
+            [
+                trades_df[TRADE_KEY_COLUMNS],
+                leave_keys_df.set_axis(TRADE_KEY_COLUMNS, axis=1),
+            ]
+        ).dropna()
+        traded = pd.MultiIndex.from_frame(actions_df[TRADE_KEY_COLUMNS]).isin(
+            pd.MultiIndex.from_frame(trade_keys_df)
+        )
+        actions_df.drop(index=actions_df.index[traded], inplace=True)
+        return trades_df
+    except (Exception,) as dta_exc:
+        logger.error(create_log_msg("Fallo la eliminacion de acciones que emparejan con TRADE"))
+        raise PlataformError("Fallo la eliminacion de acciones que emparejan con TRADE") from dta_exc
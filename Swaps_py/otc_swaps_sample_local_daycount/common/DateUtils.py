@@ -110,6 +110,8 @@ class DateUtils():
         :param calendar: Calendario de dias habiles
         :return: Fecha habil anterior en formato datetime.date
         """
+        if isinstance(calendar, BusinessCalendar):
+            return calendar.previous(date)
         offset = -1
         flag = True
         while flag:
@@ -128,6 +130,8 @@ class DateUtils():
         :param calendar: Calendario de dias habiles
         :return: Siguiente fecha habil anterior en formato datetime.date
         """
+        if isinstance(calendar, BusinessCalendar):
+            return calendar.following(date)
         offset = 1
         flag = True
         while flag:
@@ -147,6 +151,8 @@ class DateUtils():
         :param calendar: Calendario dias habiles
         :return: Fecha correspondiente al agregar dias habiles en formato datetime.date
         """
+        if isinstance(calendar, BusinessCalendar):
+            return calendar.add_business_days(date, days)
         offset_date = date
         if (days > 0):
             for i in range(days):
@@ -180,6 +186,8 @@ class DateUtils():
         :param calendar: Calendario dias habiles
         :return: La fecha de pago en formato datetime.date
         """
+        if isinstance(calendar, BusinessCalendar):
+            return calendar.previous(date, inclusive=True)
         cal = np.array(calendar)
         previous_business_day_convention = max(cal[np.where(cal <= date)])        
         return previous_business_day_convention
@@ -192,6 +200,8 @@ class DateUtils():
         :param calendar: Calendario dias habiles
         :return: La fecha de pago en formato datetime.date
         """
+        if isinstance(calendar, BusinessCalendar):
+            return calendar.following(date, inclusive=True)
         cal = np.array(calendar)
         following_business_day_convention = min(cal[np.where(cal >= date)])
         return following_business_day_convention
@@ -204,9 +214,13 @@ class DateUtils():
         :param calendar: Calendario dias habiles
         :return: La fecha de pago en formato datetime.date
         """
-        cal = np.array(calendar)
-        following_business_day = min(cal[np.where(cal >= date)])
-        previous_business_day = max(cal[np.where(cal <= date)])
+        if isinstance(calendar, BusinessCalendar):
+            following_business_day = calendar.following(date, inclusive=True)
+            previous_business_day = calendar.previous(date, inclusive=True)
+        else:
+            cal = np.array(calendar)
+            following_business_day = min(cal[np.where(cal >= date)])
+            previous_business_day = max(cal[np.where(cal <= date)])
         if (date.month == previous_business_day.month):
             modified_previous_business_day_convention = previous_business_day
         else:
@@ -221,9 +235,13 @@ class DateUtils():
         :param calendar: Calendario dias habiles
         :return: La fecha de pago en formato datetime.date
         """
-        cal = np.array(calendar)
-        following_business_day = min(cal[np.where(cal >= date)])
-        previous_business_day = max(cal[np.where(cal <= date)])
+        if isinstance(calendar, BusinessCalendar):
+            following_business_day = calendar.following(date, inclusive=True)
+            previous_business_day = calendar.previous(date, inclusive=True)
+        else:
+            cal = np.array(calendar)
+            following_business_day = min(cal[np.where(cal >= date)])
+            previous_business_day = max(cal[np.where(cal <= date)])
         if (date.month == following_business_day.month):
             modified_following_business_day_convention = following_business_day
         else:
@@ -314,16 +332,27 @@ class DateUtils():
         else:
             return case(date, calendar)
 
+    def business_days(self, initial_date, final_date, calendar):
+        """
+        Calcular la lista de dias habiles entre dos fechas, ambas incluidas
+        :param initial_date: Fecha de inicio en formato datetime.date
+        :param final_date: Fecha de finalizacion en formato datetime.date
+        :param calendar: Calendario dias habiles
+        :return: Lista de dias habiles en formato datetime.date
+        """
+        business_days = BusinessCalendar.build(calendar).business_days(initial_date, final_date)
+        return business_days
+
     def days_business(self, initial_date, final_date, calendar):
         """
-        Calcular el numero de dias habiles entre dos fechas
+        Calcular el numero de dias habiles entre dos fechas, contando la fecha de inicio y no la de finalizacion
         Fecha: 2022-06-13
         :param initial_date: Fecha de inicio del calendario en formato datetime.date
         :param final_date: Fecha de finalizacion del calendario en formato datetime.date
         :param calendar: Calendario dias habiles
         :return: Numero de dias habiles entre las dos fechas
         """
-        days_business = len(self.business_days(initial_date, final_date, calendar))
+        days_business = BusinessCalendar.build(calendar).days_business(initial_date, final_date)
         return days_business
 
     def days_act(self, initial_date, final_date):
@@ -607,7 +636,7 @@ class DateUtils():
         if (case == 'error'):
             msg = ' day_count_convention invalido %s' % day_count_convention
             raise ValueError(msg)
-        elif (case == 'day_count_bus_252'):
+        elif (day_count_convention == 'bus_252'):
             return case(initial_date, final_date, calendar)
         else:
             return case(initial_date, final_date)
@@ -730,4 +759,191 @@ class DateUtils():
         start_date = self.starting_date(trade_date, calendar, starting_day_convention)
         tenor_raw_date = self.add_tenor(start_date, tenor)
         tenor_date = self.business_date(tenor_raw_date, calendar, business_day_convention)
-        return tenor_date
\ No newline at end of file
+        return tenor_date
+
+
+class BusinessCalendar():
+    """
+    Calendario de dias habiles construido una sola vez a partir de la lista de fechas. Guarda los dias
+    habiles como un arreglo ordenado de ordinales y un conjunto hash, de modo que la pertenencia se
+    resuelve en O(1) y las busquedas de dias habiles siguientes, anteriores y conteos en O(log n).
+    Se comporta como la lista de fechas original (in, iteracion, len, numpy.array) para poder pasarse
+    a cualquier metodo que hoy recibe el calendario como lista de datetime.date.
+    """
+    # -----Attributes-----
+    # Class attributes
+    _epoch_ordinal = dt.date(1970, 1, 1).toordinal()
+    #--------------------
+    def __init__(self, calendar, date_format=None):
+        """
+        Params:
+            calendar (list): Calendario de dias habiles en formato datetime.date, numpy.datetime64 o str
+            date_format (str): Formato de las fechas cuando el calendario viene como str (Opcional) None,
+                               en cuyo caso se esperan fechas ISO (YYYY-MM-DD).
+        """
+        if isinstance(calendar, BusinessCalendar):
+            ordinals = calendar.ordinals
+        else:
+            calendar = list(calendar)
+            if date_format is not None:
+                calendar = [dt.datetime.strptime(x, date_format).date() if isinstance(x, str) else x for x in calendar]
+            ordinals = np.unique(np.array(calendar, dtype='datetime64[D]').astype(np.int64)) + self._epoch_ordinal
+        if len(ordinals) == 0:
+            raise ValueError('El calendario de dias habiles no tiene fechas')
+        self.ordinals = ordinals
+        self.ordinals.flags.writeable = False
+        self._ordinals_set = set(ordinals.tolist())
+        self._dates = None
+        self._hash = hash(ordinals.tobytes())
+
+    @classmethod
+    def build(cls, calendar, date_format=None):
+        """
+        Entrega el calendario como BusinessCalendar sin reconstruirlo si ya lo es
+        Params:
+            Los mismos del constructor de la clase
+        Return:
+            business_calendar (BusinessCalendar): Calendario de dias habiles indexado
+        """
+        if isinstance(calendar, cls):
+            return calendar
+        return cls(calendar, date_format)
+
+    @property
+    def dates(self):
+        """
+        Arreglo de fechas habiles en formato datetime.date, generado solo si se solicita
+        """
+        if self._dates is None:
+            self._dates = np.array([dt.date.fromordinal(x) for x in self.ordinals.tolist()], dtype=object)
+            self._dates.flags.writeable = False
+        return self._dates
+
+    def __contains__(self, date):
+        return isinstance(date, dt.date) and date.toordinal() in self._ordinals_set
+
+    def __iter__(self):
+        return iter(self.dates)
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.dates.astype(dtype) if dtype is not None else self.dates.copy()
+
+    def __eq__(self, other):
+        return isinstance(other, BusinessCalendar) and np.array_equal(self.ordinals, other.ordinals)
+
+    def __hash__(self):
+        return self._hash
+
+    def _position(self, date, side):
+        """
+        Posicion de la fecha en el arreglo ordenado de dias habiles (numpy.searchsorted)
+        """
+        return int(np.searchsorted(self.ordinals, date.toordinal(), side=side))
+
+    def _date_at(self, position, date):
+        """
+        Fecha habil en la posicion dada, validando que no se salga del rango del calendario
+        """
+        if position < 0 or position >= len(self.ordinals):
+            msg = 'La fecha %s esta fuera del rango del calendario de dias habiles' % date
+            raise ValueError(msg)
+        return dt.date.fromordinal(int(self.ordinals[position]))
+
+    def is_business_day(self, date):
+        """
+        Indica si la fecha dada es dia habil
+        Params:
+            date (datetime.date): Fecha a revisar
+        Return:
+            is_business_day (Boolean): True si es dia habil
+        """
+        return date in self
+
+    def following(self, date, inclusive=False):
+        """
+        Calcula el siguiente dia habil
+        Params:
+            date (datetime.date): Fecha de referencia
+            inclusive (Boolean): Si la fecha es habil se entrega ella misma (Opcional) False
+        Return:
+            following (datetime.date): Siguiente dia habil
+        """
+        return self._date_at(self._position(date, 'left' if inclusive else 'right'), date)
+
+    def previous(self, date, inclusive=False):
+        """
+        Calcula el dia habil anterior
+        Params:
+            date (datetime.date): Fecha de referencia
+            inclusive (Boolean): Si la fecha es habil se entrega ella misma (Opcional) False
+        Return:
+            previous (datetime.date): Dia habil anterior
+        """
+        return self._date_at(self._position(date, 'right' if inclusive else 'left')-1, date)
+
+    def add_business_days(self, date, days):
+        """
+        Agrega un numero de dias habiles a la fecha de referencia
+        Params:
+            date (datetime.date): Fecha de referencia
+            days (int): Numero de dias habiles, negativo para retroceder
+        Return:
+            business_date (datetime.date): Fecha resultante
+        """
+        if days > 0:
+            return self._date_at(self._position(date, 'right')+days-1, date)
+        elif days < 0:
+            return self._date_at(self._position(date, 'left')+days, date)
+        if date not in self:
+            raise ValueError('No se pueden agregar cero dias habiles a una fecha no habil.')
+        return date
+
+    def business_days(self, initial_date, final_date):
+        """
+        Lista los dias habiles entre dos fechas, ambas incluidas
+        Params:
+            initial_date (datetime.date): Fecha inicial
+            final_date (datetime.date): Fecha final
+        Return:
+            business_days (list): Dias habiles en formato datetime.date
+        """
+        return list(self.dates[self._position(initial_date, 'left'):self._position(final_date, 'right')])
+
+    def days_business(self, initial_date, final_date):
+        """
+        Cuenta los dias habiles desde la fecha inicial (incluida) hasta la fecha final (excluida), que es
+        el conteo de la convencion bus/252
+        Params:
+            initial_date (datetime.date): Fecha inicial
+            final_date (datetime.date): Fecha final
+        Return:
+            days_business (int): Numero de dias habiles, negativo si la fecha final es anterior
+        """
+        return self._position(final_date, 'left') - self._position(initial_date, 'left')
+
+    def days_business_array(self, initial_dates, final_dates):
+        """
+        Cuenta los dias habiles entre arreglos de fechas con el mismo criterio de days_business
+        Params:
+            initial_dates (numpy.ndarray): Fechas iniciales en formato numpy.datetime64[D]
+            final_dates (numpy.ndarray): Fechas finales en formato numpy.datetime64[D]
+        Return:
+            days_business (numpy.ndarray): Numero de dias habiles de cada par de fechas
+        """
+        initial_ordinals = np.asarray(initial_dates, dtype='datetime64[D]').astype(np.int64) + self._epoch_ordinal
+        final_ordinals = np.asarray(final_dates, dtype='datetime64[D]').astype(np.int64) + self._epoch_ordinal
+        return np.searchsorted(self.ordinals, final_ordinals) - np.searchsorted(self.ordinals, initial_ordinals)
+
+    def day_count_bus_252(self, initial_date, final_date):
+        """
+        Calcula el recuento de dias entre dos fechas bajo la convencion bus/252
+        Params:
+            initial_date (datetime.date): Fecha inicial
+            final_date (datetime.date): Fecha final
+        Return:
+            day_count_bus_252 (float): Fraccion de año bus/252
+        """
+        return self.days_business(initial_date, final_date) / 252
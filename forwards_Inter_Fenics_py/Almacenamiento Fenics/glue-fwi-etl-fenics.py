@@ -19,7 +19,8 @@ FTP de Fenics por el glue de coleccion glue-*-fwi-collector-fenics).
 mid, cálculo de nodos overnight, cálculo de días, redondeo, etc.)
 - Valida la estructura de insumo (para esto se apoya en la lambda
 lbd-*-csv-validator)
-- Carga la informacion resultante de la ETL en BD publish
+- Carga la informacion resultante de la ETL en BD publish (carga masiva por
+lotes con precia_utils.precia_db.bulk_upsert_df)
 - Si ocurre una excepcion envia correo de error
 
 Parametros del Glue Job (Job parameters o Input arguments):
@@ -34,6 +35,8 @@ Parametros del Glue Job (Job parameters o Input arguments):
     "--S3_FWI_BUCKET"= <<Nombre del bucket de S3 donde esta el archivo de
     insumo (Viene de la lambda lbd-%env-trigger-etl-fenics)>>
     "PRECIA_API": <<URL de la API interna de Optimus K>>
+    "--extra-py-files"= <<Ruta en S3 de precia_utils-0.2-py3-none-any.whl
+    (se construye desde Supplies_py/precia_utils)>>
     %env: Ambiente: dev, qa o p
 
 ===============================================================================
@@ -49,7 +52,6 @@ from email.message import EmailMessage
 from io import StringIO
 from smtplib import SMTP
 from sys import argv, exc_info, stdout
-from base64 import b64decode
 
 
 # AWS
@@ -58,9 +60,17 @@ from boto3 import client as aws_client
 
 # DE TERCEROS
 import pandas as pd
-from sqlalchemy import create_engine
 from sqlalchemy.sql import text
 
+# PERSONALIZADAS
+from precia_utils import precia_aws
+from precia_utils.precia_launcher import (
+    DependencyLauncher,
+    glue_job_launcher,
+    is_glue_throttling,
+)
+from precia_utils.precia_db import bulk_upsert_df, get_engine, log_query_stats
+
 first_error_msg = None
 
 # LOGGER: INICIO --------------------------------------------------------------
@@ -298,6 +308,7 @@ class FwiFenicsETL:
     TRANSLATE_DICT_TABLE = "precia_utils_suppliers_api_dictionary"
     FWI_TABLE = "pub_otc_forwards_inter_points_nodes"
     SCALE_TABLE = "precia_utils_fwi_vendors_factors"
+    FWI_BATCH_SIZE = 1000
     DB_TIMEOUT = 2
     ON_EXCLUDE_LIST = ["USDPHP"]
 
@@ -320,9 +331,9 @@ class FwiFenicsETL:
     class ExtractManager:
         def __init__(self, s3_path: str, db_secret: dict) -> None:
             try:
-                self.utils_engine = create_engine(
+                self.utils_engine = get_engine(
                     db_secret["conn_string_sources"] + db_secret["schema_utils"],
-                    connect_args={"connect_timeout": FwiFenicsETL.DB_TIMEOUT},
+                    timeout=FwiFenicsETL.DB_TIMEOUT,
                 )
                 self.s3_path = s3_path
                 self.filename = path_basename(s3_path)
@@ -1143,9 +1154,9 @@ class FwiFenicsETL:
         ) -> None:
             try:
                 self.output_df = self.join_dfs(tuple_list=output_df_list)
-                self.publish_engine = create_engine(
+                self.publish_engine = get_engine(
                     db_secret["conn_string_publish"] + db_secret["schema_publish"],
-                    connect_args={"connect_timeout": FwiFenicsETL.DB_TIMEOUT},
+                    timeout=FwiFenicsETL.DB_TIMEOUT,
                 )
                 self.insert_df()
             except (Exception,) as gen_exc:
@@ -1176,29 +1187,32 @@ class FwiFenicsETL:
         def insert_df(self) -> None:
             try:
                 logger.info("Insertando df en BD publish...")
-
-                def insert_row(row: pd.Series) -> None:
-                    _, row_serie = row
-                    sql = text(
-                        f"""
-                        INSERT INTO {FwiFenicsETL.FWI_TABLE}
-                        (mid_fwd,bid_fwd,ask_fwd,days_fwd,id_precia,valuation_date,
-                        instrument_fwd,tenor_fwd) VALUES
-                        ({row_serie['mid_fwd']},{row_serie['bid_fwd']},{row_serie['ask_fwd']},
-                        {row_serie['days_fwd']}, '{row_serie['precia_id']}',
-                        '{row_serie['valuation_date']}',
-                        '{row_serie['instrument_fwd']}',
-                        '{row_serie['tenor_fwd']}') ON DUPLICATE KEY UPDATE
-                        mid_fwd = {row_serie['mid_fwd']},bid_fwd =
-                        {row_serie['bid_fwd']},ask_fwd =
-                        {row_serie['ask_fwd']}, instrument_fwd =
-                        '{row_serie['instrument_fwd']}', tenor_fwd =
-                        '{row_serie['tenor_fwd']}', days_fwd =
-                        '{row_serie['days_fwd']}';"""
-                    )
-                    self.publish_engine.execute(sql)
-
-                list(map(insert_row, self.output_df.iterrows()))
+                insert_df = self.output_df[
+                    [
+                        "mid_fwd",
+                        "bid_fwd",
+                        "ask_fwd",
+                        "days_fwd",
+                        "precia_id",
+                        "valuation_date",
+                        "instrument_fwd",
+                        "tenor_fwd",
+                    ]
+                ].rename(columns={"precia_id": "id_precia"})
+                bulk_upsert_df(
+                    connection=self.publish_engine,
+                    df=insert_df,
+                    table=FwiFenicsETL.FWI_TABLE,
+                    update_columns=[
+                        "mid_fwd",
+                        "bid_fwd",
+                        "ask_fwd",
+                        "instrument_fwd",
+                        "tenor_fwd",
+                        "days_fwd",
+                    ],
+                    batch_size=FwiFenicsETL.FWI_BATCH_SIZE,
+                )
                 logger.info("Insercion de df en BD publish exitosa")
             except (Exception,) as ins_exc:
                 global first_error_msg
@@ -1261,6 +1275,7 @@ class ParameterManager:
     def get_parameter_from_ssm():
         """
         Obtiene un parámetro de Amazon Systems Manager (SSM) Parameter Store.
+        El valor se conserva en el cache de precia_aws durante la ejecucion.
 
         Parámetros:
             parameter_name (str): El nombre del parámetro que se desea obtener.
@@ -1269,18 +1284,11 @@ class ParameterManager:
             str: El valor del parámetro almacenado en SSM Parameter Store.
 
         Excepciones:
-            ssm_client.exceptions.ParameterNotFound: Si el parámetro no existe en SSM Parameter Store.
-            Exception: Si ocurre un error inesperado al obtener el parámetro desde SSM Parameter Store.
+            Exception: Si el parámetro no existe u ocurre un error inesperado al obtenerlo desde SSM Parameter Store.
         """
-        ssm_client = aws_client("ssm")
         try:
-            response = ssm_client.get_parameter(
-                Name=ParameterManager.PARAMETER_STORE_NAME, WithDecryption=True
-            )
-            return response["Parameter"]["Value"]
-        except ssm_client.exceptions.ParameterNotFound:
-            logger.error(
-                f"El parámetro '{ParameterManager.PARAMETER_STORE_NAME}' no existe en Parameter Store."
+            return precia_aws.get_parameter_from_ssm(
+                ParameterManager.PARAMETER_STORE_NAME
             )
         except Exception as e:
             logger.error(
@@ -1487,6 +1495,14 @@ class GlueManager:
         "USDCHF": ["USDCHF"],
         "USDJPY": ["USDJPY"],
     }
+    # Ritmo de lanzamientos del glue de opciones. El job no espera a que terminen
+    # las ejecuciones lanzadas: el limite de concurrencia lo aplica Glue con el
+    # MaxConcurrentRuns del job de opciones, y sus rechazos se reintentan esperando
+    # 2, 4, 6 y 8 segundos (~20 s en total, como el reintento anterior)
+    OPI_LAUNCH_RATE = 0.5
+    OPI_LAUNCH_BURST = 2
+    OPI_MAX_ATTEMPTS = 5
+    OPI_RETRY_BACKOFF = 2.0
     PARAMS = [
         "DB_SECRET",
         "MAIL_SECRET",
@@ -1528,33 +1544,6 @@ class GlueManager:
 
 
 
-    @staticmethod
-    def start_job_run(glue_name: str, opi_curve: str, valuation_date: str) -> None:
-        try:
-            arguments = {
-                "--JOB_NAME": glue_name,
-                "--VALUATION_DATE": valuation_date,
-                "--CURRENCY": opi_curve,
-            }
-            glue_client = aws_client("glue")
-            response = glue_client.start_job_run(JobName=glue_name, Arguments=arguments)
-            job_run_id = response["JobRunId"]
-            logger.info(
-                "El Glue Job se lanzo bajo el id: %s. Para la curva: %s",
-                job_run_id,
-                opi_curve,
-            )
-        except (Exception,) as gen_exc:
-            global first_error_msg
-            raise_msg = (
-                f"Fallo el lanzamiento de la ejecucion del job de glue: {glue_name}"
-            )
-            error_msg = create_log_msg(raise_msg)
-            logger.error(error_msg)
-            if not first_error_msg:
-                first_error_msg = error_msg
-            raise PlataformError(raise_msg) from gen_exc
-
     @staticmethod
     def launch_opi_process(
         fwi_curves_set: set, valuation_date: str, glue_name: str
@@ -1563,44 +1552,32 @@ class GlueManager:
             logger.info(
                 "Lanzando procesamiento de curvas opt inter que dependen de fwd inter..."
             )
-            fwi_dependencies_set = {
-                curve
-                for sublist in GlueManager.OPI_DEPENDENCIES.values()
-                for curve in sublist
-            }
-            fwi_to_run_opt = fwi_curves_set & fwi_dependencies_set
-            opi_curves_to_run = [
-                key
-                for key, curves in GlueManager.OPI_DEPENDENCIES.items()
-                if any(curve in fwi_to_run_opt for curve in curves)
-            ]
+            launch, _ = glue_job_launcher(
+                glue_client=aws_client("glue"),
+                job_name=glue_name,
+                arguments_builder=lambda opi_curve: {
+                    "--JOB_NAME": glue_name,
+                    "--VALUATION_DATE": valuation_date,
+                    "--CURRENCY": opi_curve,
+                },
+            )
+            # Una curva de opciones se lanza con cualquiera de sus curvas fwd inter.
+            # Sin max_concurrent no se consulta el estado de las ejecuciones
+            # (glue:GetJobRun): se lanza y se retorna. Los rechazos de Glue por
+            # concurrencia se reintentan con espera creciente
+            launcher = DependencyLauncher(
+                launch=launch,
+                dependencies=GlueManager.OPI_DEPENDENCIES,
+                require_all=False,
+                is_retryable=is_glue_throttling,
+                launch_rate=GlueManager.OPI_LAUNCH_RATE,
+                burst=GlueManager.OPI_LAUNCH_BURST,
+                max_attempts=GlueManager.OPI_MAX_ATTEMPTS,
+                retry_backoff=GlueManager.OPI_RETRY_BACKOFF,
+            )
+            opi_curves_to_run = launcher.mark_completed(fwi_curves_set)
             logger.info("Curvas de opciones a lanzar: %s", opi_curves_to_run)
-            for curve in opi_curves_to_run:
-                for i in range(5):
-                    try:
-                        logger.info("Intento numero %s (%s)", i + 1, curve)
-                        GlueManager.start_job_run(
-                            glue_name=glue_name,
-                            valuation_date=valuation_date,
-                            opi_curve=curve,
-                        )
-                        break
-                    except (Exception,):
-                        error_msg = (
-                            "Ocurrio una excepcion en el lanzamiento del job de glue"
-                        )
-                        error_msg += (
-                            ". Es muy problable que sea por superacion de la tasa "
-                        )
-                        error_msg += (
-                            "maxima de lanzamientos o ejecuciones del job de glue"
-                        )
-                        logger.error(create_log_msg(error_msg))
-                        sleep(2 + 2 * i)  # Para evitar error de concurrencia en glue
-                        if i == 4:
-                            raise PlataformError(
-                                "Maximos reintentos de lanzamiento de glue opi alcanzados"
-                            )
+            launcher.run()
             logger.info(
                 "Lanzamiento de procesamiento de curvas opt inter que dependen de fwd inter exitoso"
             )
@@ -1695,15 +1672,7 @@ class SecretsManager:
             dict: Secreto con la informacion desplegada en Secrets Manager AWS.
         """
         try:
-            logger.info('Intentando obtener secreto: "%s" ...', secret_name)
-            cliente_secrets_manager = aws_client("secretsmanager")
-            secret_data = cliente_secrets_manager.get_secret_value(SecretId=secret_name)
-            if "SecretString" in secret_data:
-                secret_str = secret_data["SecretString"]
-            else:
-                secret_str = b64decode(secret_data["SecretBinary"])
-            logger.info("Se obtuvo el secreto.")
-            return json_loads(secret_str)
+            return precia_aws.get_secret(secret_name)
         except (Exception,) as sec_exc:
             error_msg = f'Fallo al obtener el secreto "{secret_name}"'
             logger.error(create_log_msg(error_msg))
@@ -1718,9 +1687,9 @@ class DbManager:
 
     def __init__(self, db_secret) -> None:
         try:
-            self.utils_engine = create_engine(
+            self.utils_engine = get_engine(
                 db_secret["conn_string_sources"] + db_secret["schema_utils"],
-                connect_args={"connect_timeout": FwiFenicsETL.DB_TIMEOUT},
+                timeout=FwiFenicsETL.DB_TIMEOUT,
             )
         except (Exception,) as gen_exc:
             global first_error_msg
@@ -2051,5 +2020,5 @@ class Main:
 
 
 if __name__ == "__main__":
-    Main().main() 
-
+    Main().main()
+    log_query_stats()
@@ -1,9 +1,11 @@
 """Módulo que se encarga de los Hazzard Internacionales y Probabilidades de Default Y Supervivencia
 para ser insertados en base de datos
-Este proceso tiene dependencias de las generación de curvas Swaps Inter y CDS"""
+Este proceso tiene dependencias de las generación de curvas Swaps Inter y CDS
+Requiere en --extra-py-files precia_utils-0.2-py3-none-any.whl (se construye desde Supplies_py/precia_utils)
+Parametro opcional --S3_CURVE_CACHE_BUCKET: bucket del cache de curvas en S3 (sin el parametro no se usa cache)"""
 
 # Nativas
-from base64 import b64decode
+from concurrent.futures import ProcessPoolExecutor
 from dateutil import relativedelta as rd
 import datetime as dt
 import json
@@ -23,12 +25,19 @@ from scipy import optimize
 
 # Personalizadas
 from DateUtils import DateUtils
+from precia_utils.precia_aws import get_parameter_from_ssm, get_secret
+from precia_utils.precia_cache import CurveCache
+from precia_utils.precia_db import get_engine, log_query_stats
 
 ERROR_MSG_LOG_FORMAT = "{} (linea: {}, {}): {}."
 PRECIA_LOG_FORMAT = (
     "%(asctime)s [%(levelname)s] [%(filename)s](%(funcName)s): %(message)s"
 )
 PARAMETER_STORE = "ps-otc-lambda-reports"
+# Cache en S3 de las curvas hazard, compartido entre ejecuciones. METHODOLOGY_VERSION hace parte de la
+# llave del cache y se debe actualizar con cada cambio de la metodología que modifique las curvas
+CURVE_CACHE_PREFIX = "otc_curve_cache/hazzard_inter"
+METHODOLOGY_VERSION = "hazzard-inter-3"
 
 #-------------------------------------------------------------------------------------------------------------------
 # CONFIGURACIÓN DEL SISTEMA DE LOGS
@@ -119,35 +128,10 @@ def get_params(parameter_list) -> dict:
         logger.error(create_log_msg(error_msg))
         raise Exception(error_msg) from sec_exc
         
-def get_secret(secret_name: str) -> dict:
-    """
-    Obtiene secretos almacenados en el servicio Secrets Manager de AWS.
-
-    Parameters:
-        secret_name (str): Nombre del secreto en el servicio AWS.
-        
-    Returns:
-        dict: Secreto con la informacion desplegada en Secrets Manager AWS.
-    """
-    try:
-        logger.info('Intentando obtener secreto: "%s" ...', secret_name)
-        cliente_secrets_manager = aws_client("secretsmanager")
-        secret_data = cliente_secrets_manager.get_secret_value(SecretId=secret_name)
-        if "SecretString" in secret_data:
-            secret_str = secret_data["SecretString"]
-        else:
-            secret_str = b64decode(secret_data["SecretBinary"])
-        logger.info("Se obtuvo el secreto.")
-        return json.loads(secret_str)
-    except (Exception,) as sec_exc:
-        error_msg = f'Fallo al obtener el secreto "{secret_name}"'
-        logger.error(create_log_msg(error_msg))
-        raise Exception(error_msg) from sec_exc
-    
-
 def get_parameter_store(parameter_name):
     """
-    Obtiene el valor del parameter store
+    Obtiene el valor del parameter store. El valor se conserva en el cache de precia_aws,
+    por lo que los reportes de estado sucesivos no vuelven a consultar SSM
     
     Parameters:
         parameter_name (str): Nombre del parámetro
@@ -155,13 +139,9 @@ def get_parameter_store(parameter_name):
     Returns:
         str: valor del parametro obtenido
     """
-    logger.info("Intentando leer el parametro: "+parameter_name)
-    ssm_client = aws_client('ssm')
-    response = ssm_client.get_parameter(
-        Name=parameter_name, WithDecryption=True)
-    logger.info("El parametro tiene el valor: " +
-                str(response['Parameter']['Value']))
-    return response['Parameter']['Value']
+    parameter_value = get_parameter_from_ssm(parameter_name)
+    logger.info("El parametro "+parameter_name+" tiene el valor: " + str(parameter_value))
+    return parameter_value
 
 #--------------------------------------------------------------------------------
 # EJECUTAR LAMBDA
@@ -208,7 +188,7 @@ def update_report_process(status, description, technical_description):
     valuation_date = valuation_date_param["VALUATION_DATE"]
     report_process = {
           "input_id": curve,
-          "output_id":[curve],
+          "output_id":curve.split(","),
           "process": "Derivados OTC",
           "product": "Hazzard_Inter",
           "stage": "Metodologia",
@@ -250,6 +230,156 @@ def hazard_cum(tao, hazard_rates_curve):
         logger.error(create_log_msg(''))
         raise PlataformError("")
     
+class CdsLegs():
+    """
+    Patas prima y protección de una curva de cds. El calendario de pagos, los factores de descuento y el tramo
+    de la curva hazard de cada pago se calculan una sola vez por fecha de valoración y curva de cds, de modo que
+    cada evaluación de las patas son solo operaciones vectoriales sobre los hazards constantes por tramo
+    """
+    def __init__(self, date_ini, cds_curve, cc_curve, rec=0.4, base=360):
+        """
+        Params:
+            date_ini (datetime.date): Fecha del calculo
+            cds_curve (Dataframe): Dataframe con la curva de cds
+                                       days:  Dias de la curva.
+                                       rate: Spread.
+            cc_curve (numpy.array): Curva de descuento de los flujos del cds
+            rec (float): Tasa de recuperación del cds
+            base (float): Base del cds
+        """
+        try:
+            #Se generan las fechas de pago de los cds
+            possible_first_cds_dates = [dt.date(date_ini.year,m,20) for m in [3,6,9,12]]+[dt.date(date_ini.year+1,3,20)]
+            first_cds_date = [d for d in possible_first_cds_dates if d > date_ini][0]
+            last_cds_date = date_ini+dt.timedelta(days=int(cds_curve["days"][len(cds_curve["days"])-1]))
+            year_diff = last_cds_date.year - first_cds_date.year
+            month_diff = last_cds_date.month - first_cds_date.month
+            cds_payments = int((year_diff * 12 + month_diff)/3)
+            pay_cds_dates = [first_cds_date + rd.relativedelta(months=3*i) for i in range(0,cds_payments+1)]
+            days_pay_cds = np.array([(pay_cds_date-date_ini).days for pay_cds_date in pay_cds_dates])
+            cds_days = np.asarray(cds_curve["days"])
+            self.tenor_pay = np.where(np.isin(days_pay_cds,cds_days))[0]
+            # Los pagos posteriores al último nodo de la curva no entran en las patas
+            days_pay_cds = days_pay_cds[:self.tenor_pay[-1]+1]
+            #Calculo del factor de descuento para los dias de pago
+            cc_day_freq = cc_curve[days_pay_cds-1]
+            df = 1/(1+cc_day_freq*days_pay_cds/base)
+            dt_freq = (days_pay_cds-np.append([0],days_pay_cds[:-1]))/base
+            t_pay_freq = days_pay_cds/base
+            self.dt_pay = t_pay_freq - np.append(0,t_pay_freq[:-1])
+            self.discount = dt_freq * df
+            # Nodo de la curva hazard de cada pago (interpolación 'next') y su matriz indicadora
+            self.segment = np.searchsorted(cds_days, days_pay_cds, side='left')
+            segment_matrix = self.segment[:,np.newaxis] == np.arange(len(cds_days))[np.newaxis,:]
+            # Derivada del hazard acumulado en cada pago respecto al hazard de cada nodo
+            self.dt_cum = np.cumsum(self.dt_pay[:,np.newaxis] * segment_matrix, axis=0)
+            self.segment_matrix = segment_matrix.astype(float)
+            self.spreads = np.asarray(cds_curve["rate"], dtype=float)
+            self.rec = rec
+        except(Exception,):
+            logger.error(create_log_msg('Se genero un error en la construccion del calendario de pagos del cds'))
+            raise PlataformError("Hubo un error en la construccion del calendario de pagos del cds")
+
+    def errors(self, hazards):
+        """
+        Calcula el error bootstrap de cada nodo de la curva de cds
+        Params:
+            hazards (numpy.array): Hazards asociados al cds, uno por nodo
+        Return:
+            (numpy.array): Diferencia entre la pata prima y la pata de protección en cada nodo
+        """
+        hazard_pay_freq = np.asarray(hazards)[self.segment]
+        survival = np.exp(-np.cumsum(self.dt_pay * hazard_pay_freq)) * self.discount
+        prem_leg = self.spreads * np.cumsum(survival)[self.tenor_pay]
+        def_leg = (1 - self.rec) * np.cumsum(hazard_pay_freq * survival)[self.tenor_pay]
+        return prem_leg-def_leg
+
+    def jacobian(self, hazards):
+        """
+        Calcula la matriz jacobiana exacta de los errores bootstrap respecto a los hazards. Es triangular
+        inferior: el error de cada nodo solo depende de los hazards de los nodos anteriores y del propio
+        Params:
+            hazards (numpy.array): Hazards asociados al cds, uno por nodo
+        Return:
+            (numpy.ndarray): Derivada del error de cada nodo (filas) respecto al hazard de cada nodo (columnas)
+        """
+        hazard_pay_freq = np.asarray(hazards)[self.segment]
+        survival = np.exp(-np.cumsum(self.dt_pay * hazard_pay_freq)) * self.discount
+        d_survival = -survival[:,np.newaxis] * self.dt_cum
+        d_prem_leg = self.spreads[:,np.newaxis] * np.cumsum(d_survival, axis=0)[self.tenor_pay]
+        d_def_leg = (1 - self.rec) * np.cumsum(survival[:,np.newaxis] * self.segment_matrix + hazard_pay_freq[:,np.newaxis] * d_survival, axis=0)[self.tenor_pay]
+        return d_prem_leg - d_def_leg
+
+    def objective(self, hazards):
+        """
+        Calcula la suma de errores cuadrados y su gradiente exacto
+        Params:
+            hazards (numpy.array): Hazards asociados al cds, uno por nodo
+        Return:
+            (float): Suma de errores cuadrados
+            (numpy.array): Gradiente de la suma de errores cuadrados
+        """
+        error = self.errors(hazards)
+        return np.dot(error,error), 2 * self.jacobian(hazards).T @ error
+
+    def bootstrap(self, h0, bounds=(1e-5,100), tol=1e-15, max_iter=100):
+        """
+        Despeja los hazards nodo por nodo: cada nodo se resuelve con Newton sobre su error bootstrap, dejando
+        fijos los hazards de los nodos anteriores, y con bisección cuando el paso de Newton sale del intervalo
+        que encierra la raíz. El error de un nodo no es monótono en su hazard (con hazards muy altos la
+        supervivencia del tramo se anula y el error vuelve a su valor sin el tramo), por lo que el intervalo
+        se busca desde el límite inferior, duplicando el hazard inicial hasta que el error cambia de signo
+        Params:
+            h0 (numpy.array): Hazards iniciales, uno por nodo
+            bounds (tuple): Límites de los hazards
+            tol (float): Tolerancia relativa del paso de Newton
+            max_iter (int): Número máximo de iteraciones por nodo
+        Return:
+            (numpy.array): Hazards que anulan el error de cada nodo, None si alguna raíz no está dentro de los límites
+        Raises:
+            PlataformError: Si algún nodo no converge en max_iter iteraciones
+        """
+        hazards = np.clip(np.asarray(h0, dtype=float), *bounds)
+        for node in range(len(hazards)):
+            lower = bounds[0]
+            hazards[node] = lower
+            error_lower = self.errors(hazards)[node]
+            upper = np.clip(h0[node], *bounds)
+            while True:
+                hazards[node] = upper
+                if np.sign(self.errors(hazards)[node]) != np.sign(error_lower):
+                    break
+                if upper >= bounds[1]:
+                    return None
+                lower = upper
+                upper = min(2*upper, bounds[1])
+            hazard = np.clip(h0[node], lower, upper)
+            for _ in range(max_iter):
+                hazards[node] = hazard
+                error = self.errors(hazards)[node]
+                if error == 0:
+                    break
+                if np.sign(error) == np.sign(error_lower):
+                    lower = hazard
+                else:
+                    upper = hazard
+                derivative = self.jacobian(hazards)[node,node]
+                step = hazard - error/derivative if derivative != 0 else np.nan
+                if not lower < step < upper:
+                    step = (lower+upper)/2
+                if abs(step-hazard) <= tol*abs(hazard):
+                    hazard = step
+                    break
+                hazard = step
+            else:
+                error_msg = f"El bootstrap de la curva hazard no convergio en el nodo {node} tras {max_iter} "
+                error_msg += f"iteraciones (error bootstrap: {error})"
+                logger.error(create_log_msg(error_msg))
+                raise PlataformError(error_msg)
+            hazards[node] = hazard
+        return hazards
+
+
 def cds_pr(hazards, date_ini, cds_curve, cc_curve, rec=0.4, base=360):
     """
     Calcula el error bootstrap para la curva de cds dados los hazards ingresados
@@ -270,27 +400,7 @@ def cds_pr(hazards, date_ini, cds_curve, cc_curve, rec=0.4, base=360):
 
     """
     try:
-        #Se generan las fechas de pago de los cds
-        possible_first_cds_dates = [dt.date(date_ini.year,m,20) for m in [3,6,9,12]]+[dt.date(date_ini.year+1,3,20)]
-        first_cds_date = [d for d in possible_first_cds_dates if d > date_ini][0]
-        last_cds_date = date_ini+dt.timedelta(days=int(cds_curve["days"][len(cds_curve["days"])-1]))
-        year_diff = last_cds_date.year - first_cds_date.year
-        month_diff = last_cds_date.month - first_cds_date.month
-        cds_payments = int((year_diff * 12 + month_diff)/3)
-        pay_cds_dates = [first_cds_date + rd.relativedelta(months=3*i) for i in range(0,cds_payments+1)]
-        days_pay_cds = np.array([(pay_cds_date-date_ini).days for pay_cds_date in pay_cds_dates])
-        #Calculo del factor de descuento para los dias de pago
-        cc_day_freq = cc_curve[days_pay_cds-1]
-        df = 1/(1+cc_day_freq*days_pay_cds/base)
-        #Se crea la curva hazard para los dias de pago
-        hazard_pay_freq = interpolate.interp1d(cds_curve["days"], hazards, kind = 'next', fill_value = "extrapolate")(days_pay_cds)
-        dt_freq = (days_pay_cds-np.append([0],days_pay_cds[:-1]))/base
-        t_pay_freq = days_pay_cds/base
-        haz = hazard_cum(t_pay_freq,hazard_pay_freq)
-        #Se calcula el valor presente de las patas del cds
-        prem_leg = cds_curve["rate"] * np.cumsum(np.exp(-haz) * dt_freq * df)[np.where(np.isin(days_pay_cds,cds_curve["days"]))]
-        def_leg = (1 - rec) * np.cumsum(hazard_pay_freq * np.exp(-haz) * dt_freq * df)[np.where(np.isin(days_pay_cds,cds_curve["days"]))]
-        error = prem_leg-def_leg
+        error = CdsLegs(date_ini, cds_curve, cc_curve, rec, base).errors(hazards)
         return np.dot(error,error)
     except(Exception,):
         logger.error(create_log_msg(_bootstrap_error_message))
@@ -299,7 +409,9 @@ def cds_pr(hazards, date_ini, cds_curve, cc_curve, rec=0.4, base=360):
 
 def hazard_objective(date_ini, cds_curve, cc_curve, rec = 0.4, base = 360):
     """
-    Construye la curva de hazard rates para una contraparte extranjera dados los cds
+    Construye la curva de hazard rates para una contraparte extranjera dados los cds. Los hazards se despejan
+    nodo por nodo; si alguna raíz queda por fuera de los límites se minimiza la suma de errores cuadrados con
+    el gradiente exacto
 
     Params
     ----------
@@ -319,14 +431,19 @@ def hazard_objective(date_ini, cds_curve, cc_curve, rec = 0.4, base = 360):
     """
     try:
         logger.info(cds_curve.rate)
-        h0=cds_curve["rate"]/(1-rec)
+        h0=cds_curve["rate"].values/(1-rec)
         bnds=[(1e-5,100)]*len(h0)
-        optimization = optimize.minimize(cds_pr,h0,bounds=bnds,args=(date_ini, cds_curve, cc_curve),tol=1e-16)
-        if not optimization.success:
-            logger.error(create_log_msg('Se genero un error en la optimizacion de la curva hazard'))
-            logger.error(create_log_msg(optimization.message))
-            raise PlataformError("Hubo un error en la optimizacion de la curva hazard")
-        hazards = optimization.x
+        # La valoración de las patas usa la recuperación por defecto; 'rec' solo define los hazards iniciales
+        cds_legs = CdsLegs(date_ini, cds_curve, cc_curve, base=base)
+        hazards = cds_legs.bootstrap(h0, bnds[0])
+        if hazards is None:
+            logger.info('Una raiz de la curva hazard esta fuera de los limites, se minimiza el error bootstrap')
+            optimization = optimize.minimize(cds_legs.objective,h0,jac=True,bounds=bnds,tol=1e-16)
+            if not optimization.success:
+                logger.error(create_log_msg('Se genero un error en la optimizacion de la curva hazard'))
+                logger.error(create_log_msg(optimization.message))
+                raise PlataformError("Hubo un error en la optimizacion de la curva hazard")
+            hazards = optimization.x
         return pd.DataFrame({"days":cds_curve["days"],"hazard":hazards})
     except(Exception,):
         logger.error(create_log_msg('Se genero un error en la generación de la curva hazzard'))
@@ -369,6 +486,110 @@ def sp_probability(haz_rate_info, days):
         logger.error(create_log_msg('Se genero un error en el calculo de las probabilidades de supervivencia y default'))
         raise PlataformError("Hubo un error en el calculo de las probabilidades de supervivencia y default")
 
+#---------------------------------------------------------------------------------
+# CONSTRUCCIÓN DE LAS CURVAS HAZARD
+
+# Curva de descuento de los flujos de los cds de cada contraparte
+DISCOUNT_CURVES = {
+    "SwapCC_USDOIS": ['CO', 'BA', 'CB', 'GS', 'JP', 'MS', 'WEF', 'BR', 'RBOC'],
+    "SwapCC_EUROIS": ['BCS', 'BBV', 'BNP', 'COM', 'DB', 'HBC', 'HS', 'INGB', 'SAN', 'SCB', 'SCP', 'UBS', 'NS'],
+    "SwapCC_JPYOIS": ['SUM', 'MTFC']
+}
+
+
+def curve_cache_from_params():
+    """
+    Crea el cache de curvas en el bucket del parametro opcional S3_CURVE_CACHE_BUCKET del glue.
+    Si el job no tiene el parametro el cache queda deshabilitado y las curvas siempre se construyen
+    """
+    bucket = None
+    if "--S3_CURVE_CACHE_BUCKET" in argv:
+        bucket = get_params(["S3_CURVE_CACHE_BUCKET"])["S3_CURVE_CACHE_BUCKET"]
+    return CurveCache(bucket, CURVE_CACHE_PREFIX, METHODOLOGY_VERSION)
+
+
+def discount_curve_name(cds: str):
+    """Retorna el nombre de la curva de descuento de la contraparte, None si la contraparte no tiene una"""
+    for curve, counterparties in DISCOUNT_CURVES.items():
+        if cds in counterparties:
+            return curve
+    return None
+
+
+def probability_days(valuation_date: str, df_calendar: pd.DataFrame):
+    """Calcula los días de la curva de probabilidades a partir del calendario de la reserva federal"""
+    date_format = '%Y-%m-%d'
+    date_ini = dt.datetime.strptime(valuation_date,date_format).date()
+    business_day_calendar=[dt.datetime.strptime(x,date_format).date() for x in  df_calendar["dates_calendar"].astype(str)]
+    tri_dates = DateUtils().tenor_sequence_dates(date_ini,"10Y", "3M", business_day_calendar, "spot_starting", "modified_following")
+    cds_days_prob = np.array([x.days for x in (tri_dates-date_ini)])
+    return np.append([1],(cds_days_prob-cds_days_prob[0])[1:])
+
+
+def build_hazard_curve(cds: str, valuation_date: str, df_cds: pd.DataFrame, df_swapcc_daily: pd.DataFrame, days_prob, curve_cache: CurveCache):
+    """
+    Construye la curva hazard y las probabilidades de default y supervivencia de una contraparte
+    Params:
+        cds (str): contraparte
+        valuation_date (str): fecha de valoración
+        df_cds (DataFrame): curva de cds de la contraparte (days, rate)
+        df_swapcc_daily (DataFrame): curva de descuento diaria (days, rate)
+        days_prob (numpy.ndarray): días de la curva de probabilidades
+        curve_cache (CurveCache): cache de las curvas hazard
+    Return:
+        hazards (DataFrame): curva hazard lista para pub_otc_hazzard_rates
+        df_probabilities (DataFrame): probabilidades listas para pub_otc_probabilities
+    """
+    date_ini = dt.datetime.strptime(valuation_date,"%Y-%m-%d").date()
+    # La curva hazard se reutiliza del cache cuando los insumos no cambiaron
+    cache_key = curve_cache.key(cds, valuation_date, df_cds, df_swapcc_daily)
+    cached_curves = curve_cache.get(cache_key)
+    if cached_curves is not None:
+        hazards = cached_curves["hazards"]
+    elif cds == 'CO':
+        hazards = hazard_objective(date_ini, df_cds, df_swapcc_daily.iloc[:,1].values, 0.5)
+    else:
+        hazards = hazard_objective(date_ini, df_cds, df_swapcc_daily.iloc[:,1].values)
+    if cached_curves is None:
+        curve_cache.put(cache_key, {"hazards": hazards})
+    probabilities = sp_probability(hazards, days_prob)
+    dp = probabilities[["days","dp"]]# dataframe probabilidades default
+    sp = probabilities[["days","sp"]]# dataframe probabilidades supervivencia
+
+    df_probabilities = pd.merge(dp, sp, on='days', how='inner')
+
+    # Columnas adicionales para inserción en base de datos
+    hazards.columns = ['days', 'rate']
+    df_probabilities.columns = ['days', 'pd_value', 'ps_value']
+    hazards["valuation_date"] = valuation_date
+    hazards["id_precia"] = cds
+    df_probabilities["id_precia"] = cds
+    df_probabilities["valuation_date"] = valuation_date
+    return hazards, df_probabilities
+
+
+# Insumos compartidos del proceso trabajador (fecha, días de probabilidades, curvas de descuento y cache)
+_shared_inputs = {}
+
+
+def _init_worker(shared_inputs: dict):
+    """Instala los insumos compartidos en el proceso trabajador una sola vez por proceso"""
+    global _shared_inputs
+    _shared_inputs = shared_inputs
+
+
+def _build_hazard_worker(cds: str, df_cds: pd.DataFrame):
+    """Construye la curva hazard de una contraparte en un proceso del pool"""
+    return build_hazard_curve(
+        cds,
+        _shared_inputs["valuation_date"],
+        df_cds,
+        _shared_inputs["discount_curves"][discount_curve_name(cds)],
+        _shared_inputs["days_prob"],
+        _shared_inputs["curve_cache"]
+    )
+
+
 #---------------------------------------------------------------------------------
 
 class DbHandler:
@@ -382,7 +603,7 @@ class DbHandler:
     def connect_db(self):
         """Genera la conexión a base de datos"""
         try:
-            self.connection = sa.create_engine(self.url_db).connect()
+            self.connection = get_engine(self.url_db).connect()
             logger.info("Se conecto correctamente a la base de datos")
         except Exception as e:
             logger.error(create_log_msg("Fallo la conexión a la base de datos"))
@@ -440,6 +661,34 @@ class DbHandler:
             logger.error(create_log_msg(error_message+":"+cds))
             update_report_process("Fallido", error_message, str(e))
             raise PlataformError(f"No fue posible extraer la información del CDS {cds}: "+ str(e))
+
+
+    def get_data_cds_set(self, cds_list: list):
+        """Trae en una sola consulta el valor de los CDS de varias contrapartes"""
+        query_cds = sa.sql.text("""
+            SELECT counterparty, days, mid_price as rate FROM prc_otc_cds
+            WHERE counterparty IN :cds_list
+            AND valuation_date = :valuation_date
+            AND status_info = :status_info
+        """).bindparams(sa.bindparam("cds_list", expanding=True))
+        query_params = {
+            "cds_list": cds_list,
+            "status_info": 1,
+            "valuation_date": self.valuation_date
+        }
+        error_message = "No fue posible extraer la información de los CDS"
+        try:
+            df_cds = pd.read_sql(query_cds, self.connection, params=query_params)
+            logger.debug(df_cds)
+            logger.info(f"Se obtuvo la información de los CDS: {sorted(df_cds['counterparty'].unique())}")
+            if df_cds.empty:
+                update_report_process("Fallido", error_message, "Empty Data")
+                raise ValueError(f"No hay datos de los CDS: {self.valuation_date}")
+            return df_cds
+        except Exception as e:
+            logger.error(create_log_msg(error_message+":"+",".join(cds_list)))
+            update_report_process("Fallido", error_message, str(e))
+            raise PlataformError("No fue posible extraer la información de los CDS: "+ str(e))
         
 
     def get_data_swapcc_inter_daily(self, curve: str):
@@ -488,6 +737,26 @@ class DbHandler:
             logger.error(create_log_msg(error_message))
             update_report_process("Fallido", error_message, str(e))
             raise PlataformError("No fue posible actualizar el estado de la informacion en base de datos: ", str(e))
+
+
+    def disable_previous_info_set(self, pub_table: str, valuation_date: str, id_precia_list: list):
+        """Actualiza el status de la información de varias contrapartes en una sola sentencia
+        pasando de 1 a 0
+        """
+        error_message = "Falló la actualización del estado de la información"
+        try:
+            update_query = sa.sql.text(
+                "UPDATE "+ pub_table
+                + " SET status_info= 0"
+                + " WHERE id_precia IN :id_precia_list"
+                + " AND valuation_date = :valuation_date"
+            ).bindparams(sa.bindparam("id_precia_list", expanding=True))
+            self.connection.execute(update_query, {"id_precia_list": id_precia_list, "valuation_date": valuation_date})
+            logger.info("Se ha actualizado el estado de la informacion correctamente")
+        except Exception as e:
+            logger.error(create_log_msg(error_message))
+            update_report_process("Fallido", error_message, str(e))
+            raise PlataformError("No fue posible actualizar el estado de la informacion en base de datos: ", str(e))
         
 
     def insert_data_db(self, df_insert: pd.DataFrame, pub_table: str):
@@ -512,13 +781,11 @@ class ETL():
         self.valuation_date = valuation_date_param["VALUATION_DATE"]
         cds_param = get_params(["HAZZARD"])
         self.cds = cds_param["HAZZARD"]
+        self.curve_cache = curve_cache_from_params()
 
     
     def extract_data(self):
         """Orquesta la extracción de la informacion de la clase DbHandler"""
-        usdois = ['CO', 'BA', 'CB', 'GS', 'JP', 'MS', 'WEF', 'BR', 'RBOC']
-        eurois = ['BCS', 'BBV', 'BNP', 'COM', 'DB', 'HBC', 'HS', 'INGB', 'SAN', 'SCB', 'SCP', 'UBS', 'NS']
-        jpyois = ['SUM', 'MTFC']
         logger.info("Comienza la extraccion de informacion de base de datos...")
         try:
             self.db_handler_utils = DbHandler(self.url_precia_utils, self.valuation_date)
@@ -545,12 +812,9 @@ class ETL():
         try:
             self.db_handler_pub = DbHandler(self.url_publish_otc, self.valuation_date)
             self.db_handler_pub.connect_db()
-            if self.cds in eurois:
-                self.df_swapcc_daily = self.db_handler_pub.get_data_swapcc_inter_daily("SwapCC_EUROIS")
-            elif self.cds in usdois:
-                self.df_swapcc_daily = self.db_handler_pub.get_data_swapcc_inter_daily("SwapCC_USDOIS")
-            elif self.cds in jpyois:
-                self.df_swapcc_daily = self.db_handler_pub.get_data_swapcc_inter_daily("SwapCC_JPYOIS")
+            discount_curve = discount_curve_name(self.cds)
+            if discount_curve is not None:
+                self.df_swapcc_daily = self.db_handler_pub.get_data_swapcc_inter_daily(discount_curve)
             self.db_handler_pub.disconnect_db()
         except PlataformError as e:
             logger.error(create_log_msg(e.error_message))
@@ -561,28 +825,8 @@ class ETL():
     def transform_data(self):
         """Orquesta la construcción de los Hazzard, Probabilidades de Default y Supervivencia"""
         try:
-            date_format = '%Y-%m-%d'
-            date_ini = dt.datetime.strptime(self.valuation_date,"%Y-%m-%d").date()
-            business_day_calendar=[dt.datetime.strptime(x,date_format).date() for x in  self.df_calendar["dates_calendar"].astype(str)]
-            tri_dates = DateUtils().tenor_sequence_dates(date_ini,"10Y", "3M", business_day_calendar, "spot_starting", "modified_following")
-            cds_days_prob = np.array([x.days for x in (tri_dates-date_ini)])
-            days_prob = np.append([1],(cds_days_prob-cds_days_prob[0])[1:])
-            if self.cds == 'CO':
-                self.hazards = hazard_objective(date_ini, self.df_cds, self.df_swapcc_daily.iloc[:,1].values, 0.5)
-            else:
-                self.hazards = hazard_objective(date_ini, self.df_cds, self.df_swapcc_daily.iloc[:,1].values)
-            self.dp = sp_probability(self.hazards, days_prob)[["days","dp"]]# dataframe probabilidades default
-            self.sp = sp_probability(self.hazards, days_prob)[["days","sp"]]# dataframe probabilidades supervivencia
-            
-            self.df_probabilities = pd.merge(self.dp, self.sp, on='days', how='inner')
-    
-            # Columnas adicionales para inserción en base de datos
-            self.hazards.columns = ['days', 'rate']
-            self.df_probabilities.columns = ['days', 'pd_value', 'ps_value']
-            self.hazards["valuation_date"] = self.valuation_date
-            self.hazards["id_precia"] = self.cds
-            self.df_probabilities["id_precia"] = self.cds
-            self.df_probabilities["valuation_date"] = self.valuation_date
+            days_prob = probability_days(self.valuation_date, self.df_calendar)
+            self.hazards, self.df_probabilities = build_hazard_curve(self.cds, self.valuation_date, self.df_cds, self.df_swapcc_daily, days_prob, self.curve_cache)
         except PlataformError as e:
             logger.error(create_log_msg(e.error_message))
             update_report_process("Fallido", e.error_message, str(e))
@@ -606,28 +850,160 @@ class ETL():
             
     def run_process_lambdas(self):
         """Orquesta la ejecucion de las lambdas de Hazzard Local y generación de archivos"""
-        lbd_file_param = get_params(["LAMBDA_FILE_GENERATOR"])
-        lbd_file = lbd_file_param["LAMBDA_FILE_GENERATOR"]
-        
-        lbd_hzd_local_param = get_params(["LAMBDA_HZD_LOCAL"])
-        lbd_hzd_local = lbd_hzd_local_param["LAMBDA_HZD_LOCAL"]
-        
-        payload = {
-            "VALUATION_DATE": self.valuation_date,
-            "HAZZARD": [self.cds]
+        run_process_lambdas(self.valuation_date, [self.cds])
+
+
+class HazardSetETL():
+    """Representa la construcción de las curvas hazard de varias contrapartes en un solo proceso. El calendario
+    y las curvas de descuento se consultan una sola vez, los cds de todas las contrapartes se traen en una sola
+    consulta, las curvas se construyen en un pool de procesos y se publican en una sola transacción
+    """
+    def __init__(self, url_publish_otc: str, url_process_otc: str, url_precia_utils: str, cds_list: list, max_workers: int = None) -> None:
+        self.url_publish_otc = url_publish_otc
+        self.url_process_otc = url_process_otc
+        self.url_precia_utils = url_precia_utils
+        self.cds_list = cds_list
+        self.max_workers = max_workers
+        valuation_date_param = get_params(["VALUATION_DATE"])
+        self.valuation_date = valuation_date_param["VALUATION_DATE"]
+        self.curve_cache = curve_cache_from_params()
+        self.failed = {}
+
+
+    def extract_data(self):
+        """Extrae el calendario, los cds de todas las contrapartes y cada curva de descuento una sola vez"""
+        logger.info("Comienza la extraccion de informacion de base de datos...")
+        try:
+            db_handler_utils = DbHandler(self.url_precia_utils, self.valuation_date)
+            db_handler_utils.connect_db()
+            self.df_calendar = db_handler_utils.get_data_calendars("federal_reserve_calendar")
+            db_handler_utils.disconnect_db()
+
+            db_handler_prc = DbHandler(self.url_process_otc, self.valuation_date)
+            db_handler_prc.connect_db()
+            df_cds_set = db_handler_prc.get_data_cds_set(self.cds_list)
+            db_handler_prc.disconnect_db()
+            self.df_cds = {
+                cds: df_cds[["days", "rate"]].reset_index(drop=True)
+                for cds, df_cds in df_cds_set.groupby("counterparty", sort=False)
+            }
+
+            discount_curves = {discount_curve_name(cds) for cds in self.df_cds} - {None}
+            db_handler_pub = DbHandler(self.url_publish_otc, self.valuation_date)
+            db_handler_pub.connect_db()
+            self.discount_curves = {curve: db_handler_pub.get_data_swapcc_inter_daily(curve) for curve in sorted(discount_curves)}
+            db_handler_pub.disconnect_db()
+        except PlataformError as e:
+            logger.error(create_log_msg(e.error_message))
+            update_report_process("Fallido", e.error_message, str(e))
+            raise PlataformError(e.error_message)
+        for cds in self.cds_list:
+            if cds not in self.df_cds:
+                self.failed[cds] = f"No hay datos del CDS: {self.valuation_date}"
+            elif discount_curve_name(cds) is None:
+                self.failed[cds] = "La contraparte no tiene curva de descuento asociada"
+
+
+    def transform_data(self):
+        """Construye en paralelo las curvas hazard y las probabilidades de todas las contrapartes"""
+        try:
+            days_prob = probability_days(self.valuation_date, self.df_calendar)
+        except(Exception,):
+            error_message = "Hubo un error en el calculo de los dias de las probabilidades"
+            logger.error(create_log_msg(error_message))
+            update_report_process("Fallido", error_message, "")
+            raise PlataformError(error_message)
+        shared_inputs = {
+            "valuation_date": self.valuation_date,
+            "days_prob": days_prob,
+            "discount_curves": self.discount_curves,
+            "curve_cache": self.curve_cache
         }
-        payload_hzd_local = {
-            "Records": [
-                {
-                  "Sns": {
-                    "Message": "{'VALUATION_DATE': '%s', 'FILES_ID': 'SC'}" % self.valuation_date  
-                  }
-                }
-              ]
+        self.results = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker, initargs=(shared_inputs,)) as executor:
+            futures = {
+                cds: executor.submit(_build_hazard_worker, cds, self.df_cds[cds])
+                for cds in self.cds_list if cds not in self.failed
+            }
+            for cds, future in futures.items():
+                try:
+                    self.results[cds] = future.result()
+                except(Exception,) as e:
+                    logger.error(create_log_msg(f"Fallo la construcción de la curva hazzard {cds}"))
+                    self.failed[cds] = getattr(e, "error_message", str(e))
+        logger.info(f"Se construyeron las curvas hazzard: {sorted(self.results)}")
+
+
+    def load_info(self):
+        """Publica las curvas hazard y las probabilidades de todas las contrapartes en una sola transacción"""
+        if not self.results:
+            return
+        cds_list = list(self.results)
+        df_hazards = pd.concat([hazards for hazards, _ in self.results.values()], ignore_index=True)
+        df_probabilities = pd.concat([probabilities for _, probabilities in self.results.values()], ignore_index=True)
+        db_loader_pub = DbHandler(self.url_publish_otc, self.valuation_date)
+        try:
+            db_loader_pub.connect_db()
+            transaction = db_loader_pub.connection.begin()
+            try:
+                db_loader_pub.disable_previous_info_set("pub_otc_hazzard_rates", self.valuation_date, cds_list)
+                db_loader_pub.insert_data_db(df_hazards, "pub_otc_hazzard_rates")
+                db_loader_pub.disable_previous_info_set("pub_otc_probabilities", self.valuation_date, cds_list)
+                db_loader_pub.insert_data_db(df_probabilities, "pub_otc_probabilities")
+                transaction.commit()
+            except(Exception,):
+                transaction.rollback()
+                raise
+        except PlataformError as e:
+            logger.error(create_log_msg(e.error_message))
+            update_report_process("Fallido", e.error_message, str(e))
+            raise PlataformError(e.error_message)
+        finally:
+            db_loader_pub.disconnect_db()
+        logger.info(f"Se publicaron en una sola transacción las curvas hazzard: {sorted(cds_list)}")
+
+
+    def run_process_lambdas(self):
+        """Lanza una sola vez las lambdas de Hazzard Local y generación de archivos para las curvas publicadas"""
+        if self.results:
+            run_process_lambdas(self.valuation_date, list(self.results))
+
+
+    def report_failures(self):
+        """Reporta las contrapartes cuya curva hazard no se pudo construir"""
+        if self.failed:
+            error_message = "No fue posible construir las curvas hazzard: " + ", ".join(f"{cds} ({error})" for cds, error in self.failed.items())
+            logger.error(create_log_msg(error_message))
+            update_report_process("Fallido", error_message, "")
+            raise PlataformError(error_message)
+
+
+def run_process_lambdas(valuation_date: str, cds_list: list):
+    """Lanza la lambda de generación de archivos para las curvas indicadas y la de Hazzard Local si se
+    generó la curva de Colombia
+    """
+    lbd_file_param = get_params(["LAMBDA_FILE_GENERATOR"])
+    lbd_file = lbd_file_param["LAMBDA_FILE_GENERATOR"]
+    
+    lbd_hzd_local_param = get_params(["LAMBDA_HZD_LOCAL"])
+    lbd_hzd_local = lbd_hzd_local_param["LAMBDA_HZD_LOCAL"]
+    
+    payload = {
+        "VALUATION_DATE": valuation_date,
+        "HAZZARD": cds_list
+    }
+    payload_hzd_local = {
+        "Records": [
+            {
+              "Sns": {
+                "Message": "{'VALUATION_DATE': '%s', 'FILES_ID': 'SC'}" % valuation_date  
+              }
             }
-        if self.cds == 'CO':
-            launch_lambda(lbd_hzd_local, payload_hzd_local)
-        launch_lambda(lbd_file, payload)
+          ]
+        }
+    if 'CO' in cds_list:
+        launch_lambda(lbd_hzd_local, payload_hzd_local)
+    launch_lambda(lbd_file, payload)
 
 
 
@@ -654,6 +1030,16 @@ def main():
     schema_publish_otc = key_secret_db["schema_aurora_publish"]
     url_db_publish_aurora = url_publish_otc+schema_publish_otc
 
+    cds_list = params_glue["HAZZARD"].split(",")
+    if len(cds_list) > 1:
+        hazard_set = HazardSetETL(url_db_publish_aurora, url_db_process_otc, url_db_precia_utils_otc, cds_list)
+        hazard_set.extract_data()
+        hazard_set.transform_data()
+        hazard_set.load_info()
+        hazard_set.run_process_lambdas()
+        hazard_set.report_failures()
+        update_report_process("Exitoso", "Proceso Finalizado", "")
+        return
     etl =  ETL(url_db_publish_aurora, url_db_process_otc, url_db_precia_utils_otc)
     etl.extract_data()
     etl.transform_data()
@@ -665,4 +1051,5 @@ def main():
 
 if __name__ == "__main__":
     logger = setup_logging(logging.INFO)
-    main() 
\ No newline at end of file
+    main()
+    log_query_stats()
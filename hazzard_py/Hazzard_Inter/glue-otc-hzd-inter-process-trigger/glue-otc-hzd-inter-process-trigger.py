@@ -241,21 +241,29 @@ def get_dependency_list(dependency_str: str):
     return [element.strip("' ") for element in dependency_str.split(',')]
 
 
-def check_and_launch(db_handler: DbHandler, is_dependencie_cds: bool, dependencies: list, curve_swap: str, lambda_name: str, message_reports: str, valuation_date: str):
-    """Verifica que las dependencias esten para los Hazzard y lanza la lambda del proceso"""
+def check_dependencies(db_handler: DbHandler, is_dependencie_cds: bool, dependencies: list, curve_swap: str, message_reports: str):
+    """Verifica que las dependencias esten para los Hazzard y retorna los cds listos para el proceso"""
+    ready_cds = []
     if is_dependencie_cds:
         for cds in dependencies:
             logger.info(f"CDS A VALIDAR:{cds}")
             reports = db_handler.check_dependencies_hzd(cds, curve_swap)
             if reports == 2:
-                payload_hzd_inter = {
-                    "VALUATION_DATE": valuation_date,
-                    "HAZZARD": cds
-                }
-                launch_lambda(lambda_name=lambda_name, payload=payload_hzd_inter)
-                logger.info(f"Se lanza el glue para el proceso de metodología de Hazzards Internacional: {curve_swap}")
+                ready_cds.append(cds)
             else:
                 logger.info(f"No se han reportado todas las dependencias para {cds}: {reports}" + message_reports)
+    return ready_cds
+
+
+def launch_hazzard_inter(ready_cds: list, lambda_name: str, valuation_date: str):
+    """Lanza una sola ejecucion del proceso de Hazzard Internacional para todos los cds listos"""
+    if ready_cds:
+        payload_hzd_inter = {
+            "VALUATION_DATE": valuation_date,
+            "HAZZARD": ",".join(ready_cds)
+        }
+        launch_lambda(lambda_name=lambda_name, payload=payload_hzd_inter)
+        logger.info(f"Se lanza el glue para el proceso de metodología de Hazzards Internacional: {ready_cds}")
 
 
 def main():
@@ -314,17 +322,17 @@ def main():
 
     message_reports = "\n o se ha lanzado el proceso cross anteriormente para esta curva"
 
-    check_and_launch(db_handler_sources, is_cds_usdois, dependencies_usdois, 'SwapCC_USDOIS',
-                      name_lambda_trigger_hzd, message_reports, valuation_date[0])
-
-    check_and_launch(db_handler_sources, is_cds_eurois, dependencies_eurois, 'SwapCC_EUROIS',
-                      name_lambda_trigger_hzd, message_reports, valuation_date[0])
-
-    check_and_launch(db_handler_sources, is_cds_jpyois, dependencies_jpyois, 'SwapCC_JPYOIS',
-                      name_lambda_trigger_hzd, message_reports, valuation_date[0])
+    ready_cds = check_dependencies(db_handler_sources, is_cds_usdois, dependencies_usdois, 'SwapCC_USDOIS',
+                                   message_reports)
+    ready_cds += check_dependencies(db_handler_sources, is_cds_eurois, dependencies_eurois, 'SwapCC_EUROIS',
+                                    message_reports)
+    ready_cds += check_dependencies(db_handler_sources, is_cds_jpyois, dependencies_jpyois, 'SwapCC_JPYOIS',
+                                    message_reports)
 
     db_handler_sources.disconnect_db()
 
+    launch_hazzard_inter(ready_cds, name_lambda_trigger_hzd, valuation_date[0])
+
     if not is_product:
         logger.info("El producto reportado no es dependencia para Hazzard Inter")
 
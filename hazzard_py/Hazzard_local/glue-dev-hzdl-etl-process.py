@@ -1317,6 +1317,76 @@ class hzdl_methodological:
             raise PlataformError("Hubo un error en el calculo de las probabilidades de supervivencia y default")
 
 
+    def sp_probabilities(self, hazards, days):
+        
+        """     
+        Calcula las probabilidades de supervivencia y default de varias contrapartes cuyas curvas hazard
+        tienen como nodos los días 'days' (ver sp_probability).
+        
+        Params
+        -------
+            hazards (numpy.ndarray): Hazards, una fila por contraparte y una columna por cada día de 'days'
+            days (numpy.ndarray): Días de los nodos de las curvas hazard y de las probabilidades
+
+        Returns
+        -------
+            (numpy.ndarray): Probabilidades de supervivencia, una fila por contraparte
+            (numpy.ndarray): Probabilidades de default, una fila por contraparte
+        """ 
+        try:
+            days_haz = np.arange(1,days[-1]+1)
+            # Interpolación 'next': cada día toma el hazard del primer nodo mayor o igual
+            hazard_rates_curve = hazards[:, np.searchsorted(days, days_haz, side='left')]
+            tao = days_haz/360
+            hazard_rates_cum = np.cumsum((tao - np.append(0,tao[:-1])) * hazard_rates_curve, axis=1)
+            sp = np.exp(-hazard_rates_cum[:, days-1])
+            dp = 1 - sp
+            return sp, dp
+        except(Exception,):
+            logger.error(create_log_msg('Se genero un error en el calculo de las probabilidades de supervivencia y default'))
+            raise PlataformError("Hubo un error en el calculo de las probabilidades de supervivencia y default")
+
+
+    def hazard_objective_bonds(self, days, cc_rf, cc_corps, rec = 0.4, base = 365):
+        """
+        Construye las curvas de hazard rates de varias contrapartes locales a la vez. El hazard de cada día se
+        despeja de la recursión sobre el hazard acumulado H_i = H_(i-1) + (t_i - t_(i-1)) * h_i, y cada día se
+        calcula para todas las contrapartes en una sola operación
+
+        Params
+        ----------
+        days (numpy.ndarray) : Días de vencimiento de los titulos corporativos.                                
+        cc_rf (numpy.ndarray) : Curva CEC_Pesos.
+        cc_corps (numpy.ndarray) : Curvas corporativas de referencia, una fila por contraparte.
+        rec (float): Tasa de recuperación del cds
+        base (float): Base del cds
+        
+        Returns
+        ------------
+        (numpy.ndarray): Hazards, una fila por contraparte y una columna por cada día de 'days'
+        """
+        try:
+            times=days/base
+            dt_times = times - np.append(0, times[:-1])
+            df_rf=1/(1+cc_rf[days-1])**(times)
+            df_corp=1/(1+cc_corps[:, days-1])**(times)
+            log_survival = np.log((df_corp-df_rf*rec)/(df_rf*(1-rec)))
+            hazards=np.ones(log_survival.shape)
+            hazards_cum = np.zeros(len(cc_corps))
+            for i in range(len(days)):
+                hazards[:, i]=-(log_survival[:, i]+hazards_cum)/dt_times[i]
+                hazards_cum = hazards_cum + dt_times[i]*hazards[:, i]
+            # Los hazards negativos toman el valor del nodo anterior al primer hazard negativo
+            negative = hazards<0
+            first_negative = np.argmax(negative, axis=1)
+            previous_hazard = hazards[np.arange(len(hazards)), first_negative-1]
+            hazards = np.where(negative, previous_hazard[:, np.newaxis], hazards)
+            return hazards
+        except(Exception,):
+            logger.error(create_log_msg('Se genero un error en la construccion de las curvas hazard'))
+            raise PlataformError("Hubo un error en la construccion de las curvas hazard")
+
+
     def hazard_objective_bond(self, days, cc_rf, cc_corp, rec = 0.4, base = 365):
         """
         Construye la curva de hazard rates para una contraparte local dadas las curvas CEC_Pesos y la curva corporativa de referencia
@@ -1335,20 +1405,8 @@ class hzdl_methodological:
                             days:  Dias de la curva.
                             hazard: Hazard asociado a la contraparte.
         """
-        try:
-            times=days/base
-            df_rf=1/(1+cc_rf[days-1])**(times)
-            df_corp=1/(1+cc_corp[days-1])**(times)
-            hazards=np.ones(len(days))
-            hazards[0]=-np.log((df_corp[0]-df_rf[0]*rec)/(df_rf[0]*(1-rec)))/times[0]
-            for i in range(1,len(days)):
-                hazards[i]=-(np.log((df_corp[i]-df_rf[i]*rec)/(df_rf[i]*(1-rec)))+self.hazard_cum(times[:i],hazards[:i])[-1])/(times[i]-times[i-1])
-            if len(np.where(hazards<0)[0])>0:
-                hazards[np.where(hazards<0)[0]]=hazards[min(np.where(hazards<0)[0])-1]
-            return pd.DataFrame({"days":days,"rate":hazards})
-        except(Exception,):
-            logger.error(create_log_msg(''))
-            raise PlataformError("")    
+        hazards = self.hazard_objective_bonds(days, cc_rf, np.asarray(cc_corp)[np.newaxis, :], rec, base)[0]
+        return pd.DataFrame({"days":days,"rate":hazards})
 
 
 def launch_lambda(lambda_name: str, payload: dict):
@@ -1483,51 +1541,33 @@ def run():
         actionsdb = actions_db(db_url_publish)
         data_hzd_co, hazards_co = actionsdb.get_hzd_co_data()
         logger.info('Se finaliza la recoleccion de la informacion necesaria.')
-        data_db_hazzard = []
-        data_db_probabilities = []
         logger.info(data_hzd_co)
         if data_hzd_co != 0:
             curve = list(hzdl_params_df["counterparty"].values)
             actionsdb.disable_previous_info(valuation_date, curve)
             hzdl_meth = hzdl_methodological()
-            spread_list = []
-            for item in curve:
-                logger.info('Se esta realizando la creación para la curva: '+str(item))
-                spread = hzdl_params_df.loc[hzdl_params_df["counterparty"]== item, "spread"].values[0]
-                spread_list.append(spread)
-                spread = float(spread)
-                baaa2 = pd.Series(baaa2)
-                baaa2 = baaa2.values
-                corp_curve=baaa2+spread
-                date_ini=dt.datetime.strptime(valuation_date,"%Y-%m-%d").date()
-                calendar_col_df = calendar_col_df.astype(str)
-                business_day_calendar=[dt.datetime.strptime(x,date_format).date() for x in  calendar_col_df]
-                last_date_pd = DateUtils.tenor_date(DateUtils,date_ini,"7Y", business_day_calendar, "spot_starting", "modified_following")
-                cds_last_day = (last_date_pd-date_ini).days
-                days_prob = np.arange(60,cds_last_day,60)
-                ### Aplicacion metodologia
-                cec = pd.Series(cec)
-                cec = cec.values
-                hazards=hzdl_meth.hazard_objective_bond(days_prob, cec/100, corp_curve/100)# la funcion retorna un dataframe de hazards
-                hazards["id_precia"] = item
-                hazards["valuation_date"] = valuation_date
-                sd_prob_cc=hzdl_meth.sp_probability(hazards, days_prob)
-                sd_prob_co=hzdl_meth.sp_probability(hazards_co, days_prob)
-                dp_corp=sd_prob_co["dp"]+sd_prob_co["sp"]*sd_prob_cc["dp"]
-                sp_corp=sd_prob_cc["sp"]*sd_prob_co["sp"]
-                dp_corp_out=pd.DataFrame({"days":days_prob,"pd_value":dp_corp, "id_precia":item, "valuation_date":valuation_date}) # dataframe probabilidades default
-                sp_corp_out=pd.DataFrame({"days":days_prob,"ps_value":sp_corp, "id_precia":item, "valuation_date":valuation_date}) # dataframe probabilidades supervivencia
-                data_to_db = pd.merge(dp_corp_out, sp_corp_out, on="days", how='inner', validate="one_to_one")
-                new_columns_name = {'id_precia_x':'id_precia', 'valuation_date_x':'valuation_date'}
-                data_to_db.rename(columns=new_columns_name, inplace=True)
-                data_to_db = data_to_db[['id_precia', 'days', 'pd_value', 'ps_value', 'valuation_date']]
-
-                data_hazzard = pd.DataFrame(hazards)
-                data_db_hazzard.append(data_hazzard)
-                data_probabilities = pd.DataFrame(data_to_db)
-                data_db_probabilities.append(data_probabilities)
-            data_hazzard = pd.concat(data_db_hazzard, ignore_index=True)
-            data_probabilities = pd.concat(data_db_probabilities, ignore_index=True)
+            logger.info('Se esta realizando la creación para las curvas: '+str(curve))
+            spreads = hzdl_params_df.drop_duplicates("counterparty").set_index("counterparty")["spread"].loc[curve].values.astype(float)
+            date_ini=dt.datetime.strptime(valuation_date,"%Y-%m-%d").date()
+            business_day_calendar=[dt.datetime.strptime(x,date_format).date() for x in  calendar_col_df.astype(str)]
+            last_date_pd = DateUtils.tenor_date(DateUtils,date_ini,"7Y", business_day_calendar, "spot_starting", "modified_following")
+            cds_last_day = (last_date_pd-date_ini).days
+            days_prob = np.arange(60,cds_last_day,60)
+            ### Aplicacion metodologia: una fila por contraparte sobre las curvas CEC y BAAA2
+            cec = pd.Series(cec).values
+            baaa2 = pd.Series(baaa2).values
+            corp_curves = (baaa2[np.newaxis, :]+spreads[:, np.newaxis])/100
+            hazards = hzdl_meth.hazard_objective_bonds(days_prob, cec/100, corp_curves)
+            sp_cc, dp_cc = hzdl_meth.sp_probabilities(hazards, days_prob)
+            sd_prob_co=hzdl_meth.sp_probability(hazards_co, days_prob)
+            sp_co = sd_prob_co["sp"].values
+            dp_co = sd_prob_co["dp"].values
+            dp_corp=dp_co+sp_co*dp_cc
+            sp_corp=sp_cc*sp_co
+            id_precia = np.repeat(curve, len(days_prob))
+            days_curves = np.tile(days_prob, len(curve))
+            data_hazzard = pd.DataFrame({"days":days_curves, "rate":hazards.ravel(), "id_precia":id_precia, "valuation_date":valuation_date})
+            data_probabilities = pd.DataFrame({"id_precia":id_precia, "days":days_curves, "pd_value":dp_corp.ravel(), "ps_value":sp_corp.ravel(), "valuation_date":valuation_date})
             actionsdb.insert_data("pub_otc_hazzard_rates", data_hazzard)
             logger.info('Se inserta la informacion de rates en base de datos para Hazzard rates')
             actionsdb.insert_data("pub_otc_probabilities", data_probabilities)
@@ -8,7 +8,7 @@ Autor:
     - Ruben Antonio Parra Medrano
 Tecnología - Precia
 
-Ultima modificación: 01/11/2023
+Ultima modificación: 16/10/2026
 
 Script que contiene el main que instancia diferentes
 clases que permiten el procesamiento de archivos insumo de
@@ -17,20 +17,28 @@ resultantes en las bases de datos en source y publish,
 los datos de publish son también publicados como archivos
 en un FTP conforme a los parámetros:
 
+Si el parametro CURRENCY trae varias monedas separadas por
+coma (ej. EURUSD,USDJPY) se procesan todas en una sola
+ejecucion (OptInterBatchApp)
+
+Requiere en --extra-py-files opt_inter_process-0.2-py3-none-any.whl
+(se construye desde opt_inter_process_V2)
 
 =============================================================
 """
 import boto3
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import json
 import pandas as pd
 import sqlalchemy as sa
 import sqlalchemy as sql
 import logging
+import time
 
 from opt_inter_process.VolatilitySurface import VolatilitySurface
 from opt_inter_utils.FileManager import FileManager
-from opt_inter_utils.ForwardNode import ForwardNode
+from opt_inter_utils.ForwardNode import ForwardNode, connect_to_db_pub
 #from opt_inter_utils.PublishInBD import PublishInBD
 from opt_inter_utils.ReportEmail import ReportEmail
 from opt_inter_utils.StatusReport import StatusReport
@@ -45,6 +53,7 @@ logger = setup_logging(logging.INFO)
 
 
 date_format = "%Y-%m-%d"
+OUTPUT_KEYS = ["OPBR", "OPCD", "OPBRD", "OPCDD"]
 class PublishInBD:
 
     """
@@ -54,6 +63,8 @@ class PublishInBD:
     """
 
     db_connection = None
+    # Filas por sentencia INSERT multi-fila
+    INSERT_CHUNK_SIZE = 1000
 
     def __init__(self, *dataframes) -> None:
         """
@@ -130,6 +141,7 @@ class PublishInBD:
             - Creacion de la conexion a la base de datos
             - Eliminacion de la informacion preexistente de la superficie en BD
             - Insercion de la informacion de la superficie en BD
+              (ambas en una sola transaccion para las 4 tablas)
             - Cierra la conexion a la BD
 
         """
@@ -146,7 +158,7 @@ class PublishInBD:
             logger.error(create_log_msg(error_msg))
             raise PlataformError(error_msg) from exc_exc
         finally:
-            if self.db_connection is None:
+            if self.db_connection is not None:
                 self.db_connection.close()
 
     def convert_to_dict(self, dataframes):
@@ -228,9 +240,11 @@ class PublishInBD:
     def publish_all(self):
         """
         Publica la informacion de todos los dataframes (con los que se creo el objeto)
-        en el esquema de base de datos de publicacion. Realiza:
-            - Eliminacion de informacion preexistente en BD para la superficie a publicar
-            - Inserta la informacion de la superficie en BD
+        en el esquema de base de datos de publicacion. Primero traduce y valida todos los
+        dataframes y luego reemplaza las superficies en una sola transaccion para todas
+        las tablas, de modo que nunca quedan publicadas a medias:
+            - Eliminacion de informacion preexistente en BD para las superficies a publicar
+            - Inserta la informacion de las superficies en BD (INSERT multi-fila por bloques)
         """
         try:
             for table in self.dataframes_dict:
@@ -241,8 +255,24 @@ class PublishInBD:
                     raise PlataformError(error_msg)
                 if "days" in df:
                     self.dataframes_dict[table].set_index("days", inplace=True)
-                self.delete_repeated(table)
-                self.insert(table)
+            start_time = time.perf_counter()
+            transaction = self.db_connection.begin()
+            try:
+                for table in self.dataframes_dict:
+                    self.delete_repeated(table)
+                    self.insert(table)
+                transaction.commit()
+            except (Exception,):
+                transaction.rollback()
+                raise
+            elapsed_time = time.perf_counter() - start_time
+            total_rows = sum(len(df) for df in self.dataframes_dict.values())
+            logger.info(
+                "Superficies reemplazadas en una sola transaccion: %s filas en %.3f s (%.0f filas/s)",
+                total_rows,
+                elapsed_time,
+                total_rows / elapsed_time if elapsed_time else float("inf"),
+            )
         except (Exception,) as pub_exc:
             error_msg = (
                 "Fallo la publicacion de los dataframes con la informacion de opt inter"
@@ -252,9 +282,10 @@ class PublishInBD:
 
     def delete_repeated(self, table):
         """
-        Elimina la informacion preexistente en BD para la superficie a publicar. Identifca el dataframe
+        Elimina la informacion preexistente en BD para las superficies a publicar. Identifca el dataframe
         a partir de la tabla (indexando el diccionario de dataframes del objeto). Identifica la
-        informacion a eliminar a partir de los campos 'currency' y 'valuation_date' del dataframe
+        informacion a eliminar a partir de los campos 'currency' (todas las monedas del dataframe)
+        y 'valuation_date' del dataframe
 
         Args:
             table (str): tabla de la BD en la que se va a eliminar informacion
@@ -263,7 +294,7 @@ class PublishInBD:
         try:
             logger.info("Construyendo delete query...")
             df = self.dataframes_dict[table].reset_index()
-            currency = df.at[0, "currency"]
+            currencies = df["currency"].unique().tolist()
             valuation_date_str = df.at[0, "valuation_date"]
             if not isinstance(valuation_date_str, str):
                 date_type = type(valuation_date_str)
@@ -271,16 +302,16 @@ class PublishInBD:
                     "Se esperaba valuation_date como tipo string, no como "
                     + str(date_type)
                 )
-            delete_info = f"currency: {currency} y valuation_date: {valuation_date_str}"
+            delete_info = f"currency: {currencies} y valuation_date: {valuation_date_str}"
             delete_info += f" en {table}"
             delete_query = sql.sql.text(
-                f"""DELETE FROM {table} WHERE currency = :CURRENCY 
+                f"""DELETE FROM {table} WHERE currency IN :CURRENCIES 
                 AND valuation_date = :VALUATION_DATE"""
-            )
+            ).bindparams(sql.bindparam("CURRENCIES", expanding=True))
             logger.debug("Delete query: %s", delete_query)
             query_params = {
                 "VALUATION_DATE": valuation_date_str,
-                "CURRENCY": currency,
+                "CURRENCIES": currencies,
             }
             logger.info("delete query construida")
             logger.info("Eliminando informacion para %s", delete_info)
@@ -300,12 +331,24 @@ class PublishInBD:
         """
         try:
             logger.info("Insertando dataframe en %s ...", table)
+            start_time = time.perf_counter()
             self.dataframes_dict[table].to_sql(
-                table, con=self.db_connection, if_exists="append"
+                table,
+                con=self.db_connection,
+                if_exists="append",
+                method="multi",
+                chunksize=self.INSERT_CHUNK_SIZE,
+            )
+            elapsed_time = time.perf_counter() - start_time
+            rows = len(self.dataframes_dict[table])
+            logger.info(
+                "Inserción de dataframe exitosa: %s filas en %.3f s (%.0f filas/s)",
+                rows,
+                elapsed_time,
+                rows / elapsed_time if elapsed_time else float("inf"),
             )
-            logger.info("Inserción de dataframe exitosa")
         except (Exception,) as ins_exc:
-            error_msg = "Fallo la insercion del dataframe en {table}"
+            error_msg = f"Fallo la insercion del dataframe en {table}"
             logger.error(create_log_msg(error_msg))
             raise PlataformError(error_msg) from ins_exc
 
@@ -415,6 +458,32 @@ class actions_db():
         logger.debug(select_query)
         db_connection.close()
         return fwd_params_df 
+
+    def get_data_opi_set(self, currencies: list) -> pd.DataFrame:
+        """Consulta en una sola query el insumo de Fenics de varias monedas
+
+        Args:
+            currencies (list): Monedas a consultar
+
+        Returns:
+            pd.DataFrame: Insumo de Fenics de todas las monedas
+        """
+        select_query = sa.sql.text(
+            "SELECT valuation_date, id_precia, currency, strategy, tenor, bid, ask, MID, maturity_date "
+            "FROM src_otc_options_inter "
+            "WHERE valuation_date = :valuation_date AND currency IN :currencies and status_info = 1"
+        ).bindparams(sa.bindparam("currencies", expanding=True))
+        db_connection = self.create_connection()
+        try:
+            opi_df = pd.read_sql(
+                select_query,
+                db_connection,
+                params={"valuation_date": valuation_date, "currencies": currencies},
+            )
+        finally:
+            db_connection.close()
+        logger.info("Registros del insumo de Fenics consultados: %s", len(opi_df))
+        return opi_df
         
 
 def launch_lambda(lambda_name: str, payload: dict):
@@ -466,7 +535,7 @@ def get_parameter_from_ssm(parameter_name):
         logger.error(f"Error al obtener el parámetro '{parameter_name}' desde r Parameter Store: {e}")
 
 
-def update_report_process(status, description, technical_description):
+def update_report_process(status, description, technical_description, instrument=None):
     """
     Estructura el reporte de estado del proceso y luego llama la funcion que invoca la lambda
     
@@ -474,6 +543,7 @@ def update_report_process(status, description, technical_description):
         status (str): Estado del proceso
         description (str): Descripcion del proceso
         technical_description (str): Descripcion técnica del proceso (llegado el caso haya fallado el proceso)
+        instrument (str, optional): Instrumento reportado. Por defecto es el parametro CURRENCY
         
     Returns:
         None
@@ -481,7 +551,7 @@ def update_report_process(status, description, technical_description):
     lambda_name = get_parameter_from_ssm(parameter_store_name)
     report_process = {
           "input_id": "Opciones Internacionales",
-          "output_id":[currency],
+          "output_id":[instrument or currency],
           "process": "Derivados OTC",
           "product": "opt_inter",
           "stage": "Metodologia",
@@ -500,14 +570,122 @@ def update_report_process(status, description, technical_description):
 
 
 
+def build_surface_data(instrument: str, input_data: pd.DataFrame, fwd_data: pd.DataFrame) -> dict:
+    """
+    Construye la superficie de volatilidad de una moneda y ordena sus 4 dataframes
+    en un diccionario para su publicacion. Se ejecuta tambien en los procesos del
+    pool del modo por lotes
+
+    Args:
+        instrument (str): Moneda (par) de la superficie
+        input_data (DataFrame): Insumo de Fenics de la moneda
+        fwd_data (DataFrame): Nodos forward internacional de la moneda
+
+    Returns:
+        dict: Datos a publicar
+    """
+    opt_inter_process = VolatilitySurface(input_data, fwd_data, valuation_date, instrument)
+    opt_inter_process.all_surface_df()
+    return {
+        "OPBR": opt_inter_process.int_surface_db,
+        "OPCD": opt_inter_process.int_surface_deltas,
+        "OPBRD": opt_inter_process.daily_int_surface,
+        "OPCDD": opt_inter_process.daily_int_surface_deltas,
+    }
+
+
+def get_fwd_nodes_set(config_secret: dict, currencies: list) -> dict:
+    """
+    Obtiene en una sola consulta a pub_otc los nodos de los forward internacional de
+    los que dependen las monedas (llave 'dependence/fwd_to_opt' del secreto de
+    configuracion) y arma los nodos de cada moneda igual que ForwardNode.get_maturity_date
+
+    Args:
+        config_secret (dict): Secreto de configuracion de optimus K
+        currencies (list): Monedas del lote
+
+    Returns:
+        dict: Nodos de cada moneda (dataframe vacio si no tiene dependencias), o
+        DependencyError si falta la informacion de alguno de sus forward
+    """
+    error_msg = "No fue posible obtener los nodos forward internacional de las monedas "
+    error_msg += f"{currencies} para {valuation_date}"
+    db_connection = None
+    try:
+        fwd_dependent_dict = json.loads(config_secret["dependence/fwd_to_opt"])
+        fwd_instruments = sorted(
+            {
+                fwd_instrument
+                for instrument in currencies
+                for fwd_instrument in fwd_dependent_dict.get(instrument, [])
+            }
+        )
+        params = get_params(["PUB_DB_FWD_INTER_TABLE", "TENORS"])
+        tenors = params["TENORS"].split(",")
+        fwd_nodes_df = pd.DataFrame(columns=["instrument_fwd", "tenor", "days"])
+        if fwd_instruments:
+            days_query = sa.sql.text(
+                "SELECT instrument_fwd, tenor_fwd AS tenor, days_fwd AS days FROM "
+                f"{params['PUB_DB_FWD_INTER_TABLE']} WHERE valuation_date = :valuation_date "
+                "AND instrument_fwd IN :instruments"
+            ).bindparams(sa.bindparam("instruments", expanding=True))
+            db_connection = connect_to_db_pub(config_secret)
+            fwd_nodes_df = pd.read_sql(
+                days_query,
+                db_connection,
+                params={"valuation_date": valuation_date, "instruments": fwd_instruments},
+            )
+        fwd_nodes = {}
+        columns = ["tenor", "days", "valuation_date", "maturity_date", "instrument"]
+        for instrument in currencies:
+            if instrument not in fwd_dependent_dict:
+                fwd_nodes[instrument] = pd.DataFrame()
+                continue
+            all_fwd_node_df = pd.DataFrame(index=tenors, columns=columns)
+            for fwd_instrument in fwd_dependent_dict[instrument]:
+                fwd_node_df = fwd_nodes_df.loc[
+                    fwd_nodes_df["instrument_fwd"] == fwd_instrument, ["tenor", "days"]
+                ].copy()
+                if fwd_node_df.empty:
+                    logger.warning(
+                        "Para FWD INTER %s no hay datos para %s", instrument, valuation_date
+                    )
+                    raise_msg = "Se requiere que el proceso de forward internacional para "
+                    raise_msg += f"{instrument} se ejecute primero para continuar este proceso"
+                    fwd_nodes[instrument] = DependencyError(raise_msg)
+                    break
+                fwd_node_df["valuation_date"] = pd.to_datetime(valuation_date, format=date_format)
+                fwd_node_df["instrument"] = fwd_instrument
+                fwd_node_df["maturity_date"] = fwd_node_df["valuation_date"] + pd.to_timedelta(
+                    fwd_node_df["days"], unit="D"
+                )
+                fwd_node_df["valuation_date"] = fwd_node_df["valuation_date"].dt.strftime(date_format)
+                fwd_node_df["maturity_date"] = fwd_node_df["maturity_date"].dt.strftime(date_format)
+                fwd_node_df.set_index("tenor", drop=False, inplace=True)
+                all_fwd_node_df.update(fwd_node_df)
+            else:
+                all_fwd_node_df.reset_index(inplace=True, drop=True)
+                all_fwd_node_df.dropna(inplace=True)
+                all_fwd_node_df["days"] = all_fwd_node_df["days"].astype("int")
+                fwd_nodes[instrument] = all_fwd_node_df
+        return fwd_nodes
+    except (Exception,) as fwd_exc:
+        logger.error(create_log_msg(error_msg))
+        raise PlataformError(error_msg) from fwd_exc
+    finally:
+        if db_connection is not None:
+            db_connection.close()
+
+
 class OptInterApp:
     """
     Clase que orquesta el procesamiento y publicacion de opciones internacionales
     """
 
-    def __init__(self) -> None:
+    def __init__(self, instrument: str = None) -> None:
         self.input_file_path = "DESCONOCIDO"
         self.job_name = "DESCONOCIDO"
+        self.currency = instrument or currency
 
     def get_config_process(self) -> dict:
         """
@@ -582,16 +760,35 @@ class OptInterApp:
             object: Dataframe pandas con la informacion solicitada
         """
         error_msg = "No fue posible obtener datos del forward internacional solicitado"
-        error_msg += f" {currency} para {valuation_date}"
+        error_msg += f" {self.currency} para {valuation_date}"
         try:
             logger.info(
                 "Obteniendos datos dependientes del proceso de forward internacional ..."
             )
-            fwd_inter = ForwardNode(currency, valuation_date, config_secret)
+            fwd_inter = ForwardNode(self.currency, valuation_date, config_secret)
             fwd_inter_data = fwd_inter.get_maturity_date()
+            return self.complete_fwd_inter_data(fwd_inter_data)
+        except (Exception,):
+            logger.error(create_log_msg(error_msg))
+            raise
+
+    def complete_fwd_inter_data(self, fwd_inter_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Completa los nodos forward internacional con el tenor 2Y (a partir del 1Y)
+        cuando este no fue consultado
+
+        Args:
+            fwd_inter_data (pd.DataFrame): Nodos forward internacional del instrumento
+
+        Returns:
+            pd.DataFrame: Nodos forward internacional completos
+        """
+        error_msg = "No fue posible completar los nodos del forward internacional"
+        error_msg += f" {self.currency} para {valuation_date}"
+        try:
             if fwd_inter_data.empty:
                 logger.info(
-                    "No hay dependencias asociadas al instrumento %s", currency
+                    "No hay dependencias asociadas al instrumento %s", self.currency
                 )
             else:
                 logger.info(
@@ -631,16 +828,7 @@ class OptInterApp:
         error_msg = "Fallo el proceso de negocio de opciones internacionales"
         try:
             logger.info("Iniciando logica de negocio de opciones internacionales ...")
-            opt_inter_process = VolatilitySurface(
-                input_data, fwd_data, valuation_date, currency
-            )
-            opt_inter_process.all_surface_df()
-            all_out_data = {
-                "OPBR": opt_inter_process.int_surface_db,
-                "OPCD": opt_inter_process.int_surface_deltas,
-                "OPBRD": opt_inter_process.daily_int_surface,
-                "OPCDD": opt_inter_process.daily_int_surface_deltas,
-            }
+            all_out_data = build_surface_data(self.currency, input_data, fwd_data)
             logger.info("Logica de negocio de opciones internacionales finalizada")
             return all_out_data
         except (Exception,):
@@ -658,30 +846,53 @@ class OptInterApp:
             PlataformError: Cuando el diccionario de los dataframe a publicar incompleto
         """
         error_msg = "Diccionario de los dataframe a publicar incompleto"
-        try:
-            opbr_df = processed_data["OPBR"]
-            opcd_df = processed_data["OPCD"]
-            opbrd_df = processed_data["OPBRD"]
-            opcdd_df = processed_data["OPCDD"]
-        except KeyError as key_exc:
+        if any(key not in processed_data for key in OUTPUT_KEYS):
             logger.error(create_log_msg(error_msg))
-            raise PlataformError(error_msg) from key_exc
+            raise PlataformError(error_msg)
+
+        self.publish_db(processed_data)
+        self.publish_ftp(processed_data)
+
+    def publish_db(self, processed_data: dict) -> None:
+        """
+        Publica en base de datos los datos entregados por la logica de negocio (de una o
+        varias monedas)
 
+        Args:
+            processed_data (dict): datos entregados por el proceso
+        """
         error_msg = "Fallo al publicar en la base de datos"
         try:
             logger.info("Publicando en base de datos ...")
-            publisher_to_db = PublishInBD(opcd_df, opcdd_df, opbr_df, opbrd_df)
+            publisher_to_db = PublishInBD(
+                processed_data["OPCD"],
+                processed_data["OPCDD"],
+                processed_data["OPBR"],
+                processed_data["OPBRD"],
+            )
             publisher_to_db.excute()
             logger.info("Finaliza publicacion en base de datos")
         except (Exception,):
             logger.error(create_log_msg(error_msg))
             raise
 
+    def publish_ftp(self, processed_data: dict) -> None:
+        """
+        Publica en el FTP los datos entregados por la logica de negocio
+
+        Args:
+            processed_data (dict): datos entregados por el proceso
+        """
         error_msg = "Fallo al publicar en el FTP"
         try:
             logger.info("Publicando en el FTP ...")
             publisher_to_ftp = FileManager(
-                currency, valuation_date, opcdd_df, opcd_df, opbrd_df, opbr_df
+                self.currency,
+                valuation_date,
+                processed_data["OPCDD"],
+                processed_data["OPCD"],
+                processed_data["OPBRD"],
+                processed_data["OPBR"],
             )
             publisher_to_ftp.run()
             logger.info("Finaliza publicacion en el FTP")
@@ -715,7 +926,7 @@ class OptInterApp:
         error_msg = "Fallo al actualizar el status"
         try:
             report = StatusReport()
-            report.update_status(status, currency, valuation_date)
+            report.update_status(status, self.currency, valuation_date)
         except (Exception,):
             logger.error(create_log_msg(error_msg))
             raise
@@ -728,7 +939,7 @@ class OptInterApp:
             error_msg (str): Mensaje de erro para el usuario
         """
         subject = "Optimus-K: Error al procesar Opciones Internacionales "
-        subject += f"{currency} {valuation_date}"
+        subject += f"{self.currency} {valuation_date}"
         body = f"""
 Cordial saludo.
 
@@ -790,28 +1001,183 @@ Enviado por el servicio de notificaciones de Precia PPV S.A. en AWS
             self.process_data()
             self.update_status("Exitoso")
             logger.info("Finaliza el Glue Job exitosamente")
-            update_report_process("Exitoso", "Proceso Finalizado", "")
+            update_report_process("Exitoso", "Proceso Finalizado", "", self.currency)
         except DependencyError:
             logger.critical(create_log_msg(error_msg))
-            update_report_process("Fallido", error_msg, str(DependencyError))
+            update_report_process("Fallido", error_msg, str(DependencyError), self.currency)
             raise
         except PlataformError as known_exc:
             logger.critical(create_log_msg(error_msg))
             msg_to_user = str(known_exc)
             self.report_error(msg_to_user)
-            msg_to_user = f"{currency}-{valuation_date}:{msg_to_user}"
-            update_report_process("Fallido", error_msg, str(known_exc))
+            msg_to_user = f"{self.currency}-{valuation_date}:{msg_to_user}"
+            update_report_process("Fallido", error_msg, str(known_exc), self.currency)
             raise PlataformError(msg_to_user) from known_exc
         except (Exception,) as unknown_exc:
             logger.critical(create_log_msg(error_msg))
             msg_to_user = "Error desconocido, revise el log asociado y considere solicitar soporte"
             self.report_error(msg_to_user)
-            msg_to_user = f"{currency}-{valuation_date}: {msg_to_user}"
-            update_report_process("Fallido", error_msg, str(unknown_exc))
+            msg_to_user = f"{self.currency}-{valuation_date}: {msg_to_user}"
+            update_report_process("Fallido", error_msg, str(unknown_exc), self.currency)
             raise PlataformError(msg_to_user) from unknown_exc
 
 
+class OptInterBatchApp:
+    """
+    Orquesta el procesamiento y publicacion de opciones internacionales de varias monedas
+    en una sola ejecucion. El insumo de Fenics y los nodos forward de todas las monedas se
+    consultan una sola vez, las superficies se construyen en un pool de procesos y las
+    tablas de publicacion se cargan en una sola transaccion. El estatus de cada moneda se
+    reporta por separado para orquestar la validacion conjunta
+    """
+
+    def __init__(self, currencies: list, max_workers: int = None) -> None:
+        self.currencies = currencies
+        self.max_workers = max_workers
+        self.apps = {instrument: OptInterApp(instrument) for instrument in currencies}
+        self.inputs = {}
+        self.results = {}
+        self.failed = {}
+
+    def load_data(self) -> None:
+        """
+        Consulta una sola vez el insumo de Fenics y los nodos forward de todas las monedas
+        """
+        error_msg = "Fallo la obtencion de los datos del lote de monedas"
+        try:
+            first_app = self.apps[self.currencies[0]]
+            config_secret = first_app.get_config_process()
+            for app in self.apps.values():
+                app.job_name = first_app.job_name
+            logger.info("Extrayendo el insumo de Fenics de las monedas %s ...", self.currencies)
+            input_data = actions_db(db_url_sources).get_data_opi_set(self.currencies)
+            input_data["maturity_date"] = None
+            input_by_currency = {
+                instrument: instrument_df.reset_index(drop=True)
+                for instrument, instrument_df in input_data.groupby("currency", sort=False)
+            }
+            fwd_nodes = get_fwd_nodes_set(config_secret, self.currencies)
+        except (Exception,):
+            logger.error(create_log_msg(error_msg))
+            raise
+        for instrument in self.currencies:
+            if isinstance(fwd_nodes[instrument], DependencyError):
+                self.failed[instrument] = fwd_nodes[instrument]
+            elif instrument not in input_by_currency:
+                self.failed[instrument] = PlataformError(
+                    f"No hay datos del insumo de Fenics para {instrument} en {valuation_date}"
+                )
+            else:
+                try:
+                    fwd_data = self.apps[instrument].complete_fwd_inter_data(fwd_nodes[instrument])
+                    self.inputs[instrument] = (input_by_currency[instrument], fwd_data)
+                except (Exception,) as fwd_exc:
+                    self.failed[instrument] = fwd_exc
+
+    def process(self) -> None:
+        """
+        Construye en paralelo las superficies de todas las monedas con insumos completos
+        """
+        logger.info("Construyendo las superficies de %s ...", list(self.inputs))
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                instrument: executor.submit(build_surface_data, instrument, *inputs)
+                for instrument, inputs in self.inputs.items()
+            }
+            for instrument, future in futures.items():
+                try:
+                    all_out_data = future.result()
+                except (Exception,) as surface_exc:
+                    logger.error(create_log_msg(f"Fallo la superficie de {instrument}"))
+                    self.failed[instrument] = surface_exc
+                    continue
+                if any(out_df.empty or out_df.isnull().values.any() for out_df in all_out_data.values()):
+                    self.failed[instrument] = PlataformError(
+                        f"La superficie de {instrument} esta vacia o tiene valores nulos"
+                    )
+                    continue
+                self.results[instrument] = all_out_data
+        logger.info("Se construyeron las superficies de: %s", sorted(self.results))
+
+    def publish(self) -> None:
+        """
+        Publica las superficies de todas las monedas en base de datos (una sola transaccion)
+        y luego los archivos de cada moneda en el FTP
+        """
+        if not self.results:
+            return
+        processed_data = {
+            key: pd.concat([all_out_data[key] for all_out_data in self.results.values()], ignore_index=True)
+            for key in OUTPUT_KEYS
+        }
+        try:
+            logger.info("Publicando en base de datos las superficies de %s ...", list(self.results))
+            self.apps[self.currencies[0]].publish_db(processed_data)
+        except (Exception,) as pub_exc:
+            for instrument in self.results:
+                self.failed[instrument] = pub_exc
+            self.results = {}
+            return
+        for instrument, all_out_data in list(self.results.items()):
+            try:
+                self.apps[instrument].publish_ftp(all_out_data)
+            except (Exception,) as ftp_exc:
+                self.failed[instrument] = ftp_exc
+                del self.results[instrument]
+
+    def report(self) -> None:
+        """
+        Reporta por separado el estatus de cada moneda del lote
+        """
+        error_msg = "Glue Job interrumpido"
+        for instrument in self.currencies:
+            app = self.apps[instrument]
+            if instrument not in self.failed:
+                try:
+                    app.update_status("Exitoso")
+                    update_report_process("Exitoso", "Proceso Finalizado", "", instrument)
+                    continue
+                except (Exception,) as status_exc:
+                    self.failed[instrument] = status_exc
+            failed_exc = self.failed[instrument]
+            logger.critical(create_log_msg(f"{error_msg} para {instrument}"))
+            try:
+                if not isinstance(failed_exc, DependencyError):
+                    if isinstance(failed_exc, PlataformError):
+                        msg_to_user = str(failed_exc)
+                    else:
+                        msg_to_user = "Error desconocido, revise el log asociado y considere solicitar soporte"
+                    app.report_error(msg_to_user)
+                update_report_process("Fallido", error_msg, str(failed_exc), instrument)
+            except (Exception,):
+                logger.error(create_log_msg(f"Fallo el reporte del error de {instrument}"))
+
+    def execute(self) -> None:
+        """
+        Orquesta todos los procesos del lote de monedas de opciones internacionales
+        """
+        logger.info("Inicia el Glue Job para las monedas %s ...", self.currencies)
+        try:
+            self.load_data()
+            self.process()
+            self.publish()
+        except (Exception,) as batch_exc:
+            for instrument in self.currencies:
+                self.failed.setdefault(instrument, batch_exc)
+        self.report()
+        if self.failed:
+            msg_to_user = "Fallo el procesamiento de: " + ", ".join(
+                f"{instrument}-{valuation_date} ({failed_exc})"
+                for instrument, failed_exc in self.failed.items()
+            )
+            raise PlataformError(msg_to_user)
+        logger.info("Finaliza el Glue Job exitosamente")
+
 
 if __name__ == "__main__":
-    app = OptInterApp()
+    currencies = currency.split(",")
+    if len(currencies) > 1:
+        app = OptInterBatchApp(currencies)
+    else:
+        app = OptInterApp()
     app.execute()
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import datetime as dt
 import logging
+from collections import Counter
 from opt_inter_process.functions.Rounding import rd
 from opt_inter_process.functions.Interpolation import Interpol as interpol
 from precia_utils.precia_aws import get_params
@@ -134,161 +135,8 @@ class VolatilitySurface:
                 logger.info(
                     "Extension de la Superficies de Volatilidad: %s", self.instrument
                 )
-                for tenor in tenors_to_create:
-                    logger.info("Calculando extension para: %s", tenor)
-                    strategy = tenor[0]
-                    tenor_new = tenor[1]
-                    if (
-                        int((len(opc_inter_tenors) - 1) * 0.5)
-                        >= (
-                            opc_inter_tenors.index[opc_inter_tenors.tenor == tenor_new]
-                            - 1
-                        )[0]
-                    ):
-                        logger.info("Extension del corto plazo")
-                        market_tenors_selection = [
-                            i for i in market_tenors if strategy in i
-                        ]
-                        nearby_tenors = [
-                            market_tenors_selection[0][1],
-                            market_tenors_selection[1][1],
-                        ]
-                        int_surface_strategy = self.int_surface.loc[
-                            (self.int_surface.strategy == strategy)
-                            & (self.int_surface.tenor.isin(nearby_tenors))
-                        ]
-                        if (
-                            tenor_new == "ON"
-                            and tenor_new not in self.fwd_info.tenor.values
-                        ):
-                            day = 1
-                        else:
-                            day = self.fwd_info.loc[
-                                self.fwd_info.tenor == tenor_new, "days"
-                            ].values[0]
-                        if (
-                            rd(int_surface_strategy.mid.values[0],self.dec)
-                            == rd(int_surface_strategy.mid.values[1],self.dec)
-                        ):
-                            int_surface_strategy.mid.values[1] *= 1 + self.addition
-                            opc_surface.loc[
-                                (opc_surface.strategy == strategy)
-                                & (
-                                    opc_surface.tenor
-                                    == int_surface_strategy.tenor.values[1]
-                                ),
-                                "mid",
-                            ] *= (
-                                1 + self.addition
-                            )
-                        vol_value = rd(
-                            int_surface_strategy.loc[
-                                int_surface_strategy.tenor == nearby_tenors[0], "mid"
-                            ].values
-                            - (
-                                int_surface_strategy.loc[
-                                    int_surface_strategy.tenor == nearby_tenors[0],
-                                    "days",
-                                ].values
-                                - day
-                            )
-                            * (
-                                (
-                                    int_surface_strategy.loc[
-                                        int_surface_strategy.tenor == nearby_tenors[1],
-                                        "mid",
-                                    ].values
-                                    - int_surface_strategy.loc[
-                                        int_surface_strategy.tenor == nearby_tenors[0],
-                                        "mid",
-                                    ].values
-                                )
-                                / (
-                                    int_surface_strategy.loc[
-                                        int_surface_strategy.tenor == nearby_tenors[1],
-                                        "days",
-                                    ].values
-                                    - int_surface_strategy.loc[
-                                        int_surface_strategy.tenor == nearby_tenors[0],
-                                        "days",
-                                    ].values
-                                )
-                            ),
-                            self.dec,
-                        )[0]
-                    else:
-                        logger.info("Extension del largo plazo")
-                        market_tenors_selection = [
-                            i for i in market_tenors if strategy in i
-                        ]
-                        nearby_tenors = [
-                            market_tenors_selection[-1][1],
-                            market_tenors_selection[-2][1],
-                        ]
-                        int_surface_strategy = self.int_surface.loc[
-                            (self.int_surface.strategy == strategy)
-                            & (self.int_surface.tenor.isin(nearby_tenors))
-                        ]
-                        day = self.fwd_info.loc[
-                            self.fwd_info.tenor == tenor_new, "days"
-                        ].values[0]
-                        if (
-                            rd(int_surface_strategy.mid.values[0],self.dec)
-                            == rd(int_surface_strategy.mid.values[1],self.dec)
-                        ):
-                            int_surface_strategy.mid.values[1] *= 1 + self.addition
-                            opc_surface.loc[
-                                (opc_surface.strategy == strategy)
-                                & (
-                                    opc_surface.tenor
-                                    == int_surface_strategy.tenor.values[1]
-                                ),
-                                "mid",
-                            ] *= (
-                                1 + self.addition
-                            )
-                        vol_value = rd(
-                            int_surface_strategy.loc[
-                                int_surface_strategy.tenor == nearby_tenors[0], "mid"
-                            ].values
-                            + 0.1
-                            * (
-                                day
-                                - int_surface_strategy.loc[
-                                    int_surface_strategy.tenor == nearby_tenors[0],
-                                    "days",
-                                ].values
-                            )
-                            * (
-                                (
-                                    int_surface_strategy.loc[
-                                        int_surface_strategy.tenor == nearby_tenors[0],
-                                        "mid",
-                                    ].values
-                                    - int_surface_strategy.loc[
-                                        int_surface_strategy.tenor == nearby_tenors[1],
-                                        "mid",
-                                    ].values
-                                )
-                                / (
-                                    int_surface_strategy.loc[
-                                        int_surface_strategy.tenor == nearby_tenors[0],
-                                        "days",
-                                    ].values
-                                    - int_surface_strategy.loc[
-                                        int_surface_strategy.tenor == nearby_tenors[1],
-                                        "days",
-                                    ].values
-                                )
-                            ),
-                            self.dec,
-                        )[0]
-                    opc_surface.loc[
-                        (opc_surface.tenor == tenor_new)
-                        & (opc_surface.strategy == strategy),
-                        ["mid", "days"],
-                    ] = np.array([vol_value, day])
-                
+                self.extend_missing_nodes(opc_surface, tenors_to_create)
+
             logger.info("Redondeo a %s decimales", str(self.dec))
             opc_surface["mid"] = rd(opc_surface["mid"], self.dec)
             logger.debug(opc_surface)
@@ -329,9 +177,94 @@ class VolatilitySurface:
         self.int_surface_db = opc_surface_copy
         logger.info("Finalizacion complemento de la superficie %s", self.instrument)
 
+    def extend_missing_nodes(self, opc_surface, tenors_to_create):
+        """Extrapolacion, en una sola operacion vectorial, de todos los nodos estrategia-tenor que no existen en el mercado.
+        Los tenores del corto plazo se extrapolan con los dos primeros tenores de mercado de la estrategia y los del largo plazo con los dos ultimos.
+        Si los dos nodos de mercado redondeados coinciden, el segundo nodo se incrementa en BASIC_POINTS para el calculo,
+        y en la superficie una vez por cada tenor extrapolado con ese par de nodos
+        Args:
+            opc_surface (pd.DataFrame): Superficie completa (estrategias x tenores) a la que se asignan los nodos extrapolados
+            tenors_to_create (list): Nodos (estrategia, tenor) a extrapolar
+        """
+        market_strategies = self.int_surface["strategy"].to_numpy(dtype=object)
+        market_tenors = self.int_surface["tenor"].to_numpy(dtype=object)
+        market_mids = self.int_surface["mid"].to_numpy(dtype=float)
+        market_days = self.int_surface["days"].to_numpy()
+        group_starts = np.flatnonzero(
+            np.r_[True, market_strategies[1:] != market_strategies[:-1]]
+        )
+        group_sizes = np.diff(np.r_[group_starts, len(market_strategies)])
+        strategy_group = dict(zip(market_strategies[group_starts], range(len(group_starts))))
+
+        new_strategies = [strategy for strategy, _ in tenors_to_create]
+        new_tenors = [tenor for _, tenor in tenors_to_create]
+        groups = np.array([strategy_group[strategy] for strategy in new_strategies])
+        if any(group_sizes[groups] < 2):
+            raise ValueError(
+                "Se requieren al menos dos tenores de mercado por estrategia para extrapolar"
+            )
+        positions = np.array([self.tenors.index(tenor) for tenor in new_tenors])
+        is_short = int((len(self.tenors) - 1) * 0.5) >= positions - 1
+        logger.info(
+            "Extension del corto plazo: %s. Extension del largo plazo: %s",
+            int(is_short.sum()),
+            int((~is_short).sum()),
+        )
+
+        fwd_days = self.fwd_info.drop_duplicates("tenor").set_index("tenor")["days"]
+        days = fwd_days.reindex(new_tenors).to_numpy(dtype=float)
+        if "ON" not in self.fwd_info.tenor.values:
+            days[is_short & (np.array(new_tenors, dtype=object) == "ON")] = 1
+        if any(np.isnan(days)):
+            raise ValueError(
+                "No hay dias en los puntos fwd para los tenores: "
+                + str(sorted({tenor for tenor, day in zip(new_tenors, days) if np.isnan(day)}))
+            )
+
+        # Corto plazo: nodo cercano = primer tenor, nodo lejano = segundo tenor
+        # Largo plazo: nodo cercano = ultimo tenor, nodo lejano = penultimo tenor
+        group_first = group_starts[groups]
+        group_last = group_first + group_sizes[groups] - 1
+        near = np.where(is_short, group_first, group_last)
+        far = np.where(is_short, group_first + 1, group_last - 1)
+        bumped = np.where(is_short, far, near)
+        equal_mids = rd(market_mids[near], self.dec) == rd(market_mids[far], self.dec)
+        bumped_mids = market_mids[bumped] * (1 + self.addition)
+        near_mids = np.where(equal_mids & ~is_short, bumped_mids, market_mids[near])
+        far_mids = np.where(equal_mids & is_short, bumped_mids, market_mids[far])
+        near_days = market_days[near]
+        far_days = market_days[far]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            short_vols = near_mids - (near_days - days) * (
+                (far_mids - near_mids) / (far_days - near_days)
+            )
+            long_vols = near_mids + 0.1 * (days - near_days) * (
+                (near_mids - far_mids) / (near_days - far_days)
+            )
+        vols = rd(np.where(is_short, short_vols, long_vols), self.dec)
+
+        bumps = Counter(
+            zip(
+                np.array(new_strategies, dtype=object)[equal_mids],
+                market_tenors[bumped[equal_mids]],
+            )
+        )
+        for (strategy, tenor), times in bumps.items():
+            bumped_rows = (opc_surface.strategy == strategy) & (opc_surface.tenor == tenor)
+            for _ in range(times):
+                opc_surface.loc[bumped_rows, "mid"] *= 1 + self.addition
+
+        surface_nodes = pd.MultiIndex.from_frame(opc_surface[["strategy", "tenor"]])
+        new_rows = surface_nodes.isin(tenors_to_create)
+        extended = pd.DataFrame(
+            {"mid": vols, "days": days},
+            index=pd.MultiIndex.from_tuples(tenors_to_create),
+        ).reindex(surface_nodes[new_rows])
+        opc_surface.loc[new_rows, ["mid", "days"]] = extended.to_numpy()
+
     def strategies_to_deltas(self):
         """Conversion de una superficie de volatilidad en terminso de estrategias a terminos de deltas.
-        Toma las distintas columnas de estrategias para crear un DataFrame unificado con los valores de las volatilidades en terminos de deltas.
+        Toma las columnas de estrategias de la grilla (dias x estrategia) para calcular a la vez, sobre todos los tenores, las volatilidades en terminos de deltas.
         Este calculo se puede convalidad con el area de I+D
         """
         error_msg = (
@@ -343,76 +276,25 @@ class VolatilitySurface:
                 "Inicio transformacion superficie %s en terminos de estrategias a deltas",
                 self.instrument,
             )
-            call_90d = (
-                self.int_surface.loc[self.int_surface.strategy == "ATM", ["mid"]].values
-                + self.int_surface.loc[
-                    self.int_surface.strategy == "10BF", ["mid"]
-                ].values
-                - (
-                    0.5
-                    * self.int_surface.loc[
-                        self.int_surface.strategy == "10RR", ["mid"]
-                    ].values
-                )
-            ).flatten()
-
-            call_75d = (
-                self.int_surface.loc[self.int_surface.strategy == "ATM", ["mid"]].values
-                + self.int_surface.loc[
-                    self.int_surface.strategy == "25BF", ["mid"]
-                ].values
-                - (
-                    0.5
-                    * self.int_surface.loc[
-                        self.int_surface.strategy == "25RR", ["mid"]
-                    ].values
-                )
-            ).flatten()
-
-            call_50d = (
-                self.int_surface.loc[self.int_surface.strategy == "ATM", ["mid"]].values
-            ).flatten()
-
-            call_25d = (
-                self.int_surface.loc[self.int_surface.strategy == "ATM", ["mid"]].values
-                + self.int_surface.loc[
-                    self.int_surface.strategy == "25BF", ["mid"]
-                ].values
-                + (
-                    0.5
-                    * self.int_surface.loc[
-                        self.int_surface.strategy == "25RR", ["mid"]
-                    ].values
-                )
-            ).flatten()
-
-            call_10d = (
-                self.int_surface.loc[self.int_surface.strategy == "ATM", ["mid"]].values
-                + self.int_surface.loc[
-                    self.int_surface.strategy == "10BF", ["mid"]
-                ].values
-                + (
-                    0.5
-                    * self.int_surface.loc[
-                        self.int_surface.strategy == "10RR", ["mid"]
-                    ].values
-                )
-            ).flatten()
-            opc_d = pd.DataFrame(
+            surface_grid = self.int_surface_db
+            atm = surface_grid["ATM"].to_numpy(dtype=float)
+            bf_10 = surface_grid["10BF"].to_numpy(dtype=float)
+            rr_10 = surface_grid["10RR"].to_numpy(dtype=float)
+            bf_25 = surface_grid["25BF"].to_numpy(dtype=float)
+            rr_25 = surface_grid["25RR"].to_numpy(dtype=float)
+            deltas_grid = np.column_stack(
                 [
-                    self.int_surface["days"].unique(),
-                    call_90d,
-                    call_75d,
-                    call_50d,
-                    call_25d,
-                    call_10d,
+                    atm + bf_10 - (0.5 * rr_10),
+                    atm + bf_25 - (0.5 * rr_25),
+                    atm,
+                    atm + bf_25 + (0.5 * rr_25),
+                    atm + bf_10 + (0.5 * rr_10),
                 ]
-            ).T
-            opc_d.columns = ["days", "X0.9", "X0.75", "X0.5", "X0.25", "X0.1"]
-            opc_d.days = opc_d.days.astype(int)
-            opc_d.loc[:, ~opc_d.columns.isin(["days"])] = rd(
-                opc_d.loc[:, ~opc_d.columns.isin(["days"])], self.dec
             )
+            opc_d = pd.DataFrame(
+                rd(deltas_grid, self.dec), columns=["X0.9", "X0.75", "X0.5", "X0.25", "X0.1"]
+            )
+            opc_d.insert(0, "days", surface_grid["days"].to_numpy(dtype=int))
             opc_d["instrument"] = self.instrument
             opc_d["valuation_date"] = self.val_date
         except PlataformError:
@@ -429,7 +311,7 @@ class VolatilitySurface:
 
     def interpol_nodes_curves(self):
         """Interpolacion de una curva diaria desde una curva de nodos
-        se interpolan los valores de dias y los precios/niveles mid de cada columna.
+        se interpolan los valores de dias y los precios/niveles mid de todas las columnas en una sola llamada sobre la grilla.
         Se crea un dataframe con la informacion interpolada, la secuencia de dias, la fecha de valoracion y el instrumento de la curva.
         """
         error_msg = (
@@ -464,17 +346,34 @@ class VolatilitySurface:
                         max(self.int_surface_deltas.days.values + 1),
                     )
                 ]
-                for i in values_to_interpolate:
-                    try:
-                        interpolated_values = rd(
-                            interpol(
-                                curves[curv].days.values, curves[curv][i].values, days
-                            ).method(self.method),
-                            self.dec,
-                        )
-                        interpolated_dict.update({i: interpolated_values})
-                    except:
-                        pass
+                try:
+                    interpolated_grid = rd(
+                        interpol(
+                            curves[curv].days.values,
+                            curves[curv][values_to_interpolate].values,
+                            days,
+                        ).method(self.method),
+                        self.dec,
+                    )
+                    interpolated_dict.update(
+                        zip(values_to_interpolate, interpolated_grid.T)
+                    )
+                except (Exception,):
+                    logger.warning(
+                        "No fue posible interpolar la grilla completa de %s, se interpola por columna",
+                        self.instrument,
+                    )
+                    for i in values_to_interpolate:
+                        try:
+                            interpolated_values = rd(
+                                interpol(
+                                    curves[curv].days.values, curves[curv][i].values, days
+                                ).method(self.method),
+                                self.dec,
+                            )
+                            interpolated_dict.update({i: interpolated_values})
+                        except (Exception,):
+                            pass
                 interpolated_dict.update({"valuation_date": self.val_date})
                 interpolated_dict.update({"instrument": self.instrument})
                 interpolated_dict.update({"days": days})
@@ -52,13 +52,13 @@ class Interpol():
         
         Args:
             x_nodes (list, numpy.ndarray): Vector/arreglo de puntos de 1 dimension del eje X
-            y_nodes (list, numpy.ndarray): Vector/arreglo de N dimensiones del eje Y
+            y_nodes (list, numpy.ndarray): Vector/arreglo de N dimensiones del eje Y (la primera dimension corresponde a x_nodes)
             x_points (list, numpy.ndarray): Vector/arreglo de 1 dimension con los valores del eje X a interpolar
         Return:
-            y_points (numpy.ndarray): Vector de 1 dimension con los valores interpolados de Y
+            y_points (numpy.ndarray): Arreglo con los valores interpolados de Y (una fila por cada valor de x_points)
         """
         try:
-            f_interpolate = interpolate.interp1d(self.x_nodes, self.y_nodes, kind = 'linear', fill_value= 'extrapolate')
+            f_interpolate = interpolate.interp1d(self.x_nodes, self.y_nodes, kind = 'linear', fill_value= 'extrapolate', axis = 0)
             y_out = f_interpolate(self.x_points)
         except Exception as e:
             error_line = str(sys.exc_info()[-1].tb_lineno)
@@ -70,13 +70,13 @@ class Interpol():
         """Interpolacion cubica por medio del scipy-intepolate-cubic.        
         Args:
             x_nodes (list, numpy.ndarray): Vector/arreglo de puntos de 1 dimension del eje X
-            y_nodes (list, numpy.ndarray): Vector/arreglo de N dimensiones del eje Y
+            y_nodes (list, numpy.ndarray): Vector/arreglo de N dimensiones del eje Y (la primera dimension corresponde a x_nodes)
             x_points (list, numpy.ndarray): Vector]/arreglo de 1 dimension con los valores del eje X a interpolar
         Return:
-            y_points (numpy.ndarray): Vector de 1 dimension con los valores interpolados de Y
+            y_points (numpy.ndarray): Arreglo con los valores interpolados de Y (una fila por cada valor de x_points)
         """
         try:
-            f_interpolate = interpolate.interp1d(self.x_nodes, self.y_nodes, kind = 'cubic', fill_value= 'extrapolate')
+            f_interpolate = interpolate.interp1d(self.x_nodes, self.y_nodes, kind = 'cubic', fill_value= 'extrapolate', axis = 0)
             y_out = f_interpolate(self.x_points)
         except Exception as e:
             error_line = str(sys.exc_info()[-1].tb_lineno)
@@ -1,3 +1,3 @@
 from setuptools import setup
 
-setup(name="opt_inter_process", version="0.1", packages=["opt_inter_process", "opt_inter_process.functions", "opt_inter_process.functions.Decorators"])
\ No newline at end of file
+setup(name="opt_inter_process", version="0.2", packages=["opt_inter_process", "opt_inter_process.functions", "opt_inter_process.functions.Decorators"])
\ No newline at end of file
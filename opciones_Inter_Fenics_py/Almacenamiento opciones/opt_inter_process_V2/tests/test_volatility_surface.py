@@ -0,0 +1,229 @@
+"""
+Pruebas de regresion de VolatilitySurface: la extension vectorial de nodos
+(extend_missing_nodes), la conversion de estrategias a deltas sobre la grilla y
+la interpolacion de la grilla completa (Interpol sobre el eje 0) deben producir
+exactamente lo mismo que la implementacion anterior por nodo y por columna.
+
+La implementacion anterior es el wheel opt_inter_process 0.1 tomado del
+historial de git (baseline/opt_inter_process-0.1-py3-none-any.whl) y se importa
+aparte, sin mezclarse con el paquete actual. precia_utils se toma del wheel de
+la carpeta del Glue Job; si precia_aws no se puede importar (sin boto3 ni
+awsglue) se reemplaza por un modulo sustituto, porque get_params se simula en
+todas las pruebas.
+
+Ejecutar el modulo directamente compara los tiempos de las dos versiones sobre
+una superficie sintetica de 30 tenores:
+    python tests/test_volatility_surface.py
+"""
+
+import importlib
+import logging
+import sys
+import time
+import types
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+BASELINE_WHEEL = Path(__file__).resolve().parent / "baseline" / "opt_inter_process-0.1-py3-none-any.whl"
+sys.path.insert(0, str(PACKAGE_DIR))
+sys.path.insert(0, str(PACKAGE_DIR.parent / "precia_utils-0.1-py3-none-any.whl"))
+pytest.importorskip("scipy")
+
+try:
+    importlib.import_module("precia_utils.precia_aws")
+except ImportError:
+    precia_aws = types.ModuleType("precia_utils.precia_aws")
+
+    def _unavailable(*args, **kwargs):
+        raise RuntimeError("precia_aws no esta disponible fuera de Glue")
+
+    precia_aws.get_params = _unavailable
+    precia_aws.get_secret = _unavailable
+    sys.modules["precia_utils.precia_aws"] = precia_aws
+
+
+def import_baseline_surface():
+    """Importa VolatilitySurface del wheel 0.1 sin reemplazar el paquete actual en sys.modules"""
+
+    def package_modules():
+        return [name for name in sys.modules if name.split(".")[0] == "opt_inter_process"]
+
+    current = {name: sys.modules.pop(name) for name in package_modules()}
+    sys.path.insert(0, str(BASELINE_WHEEL))
+    try:
+        return importlib.import_module("opt_inter_process.VolatilitySurface")
+    finally:
+        sys.path.remove(str(BASELINE_WHEEL))
+        for name in package_modules():
+            del sys.modules[name]
+        sys.modules.update(current)
+
+
+import opt_inter_process.VolatilitySurface as volatility_surface
+from opt_inter_process.VolatilitySurface import VolatilitySurface
+from opt_inter_process.functions.Interpolation import Interpol as interpol
+
+legacy_volatility_surface = import_baseline_surface()
+LegacyVolatilitySurface = legacy_volatility_surface.VolatilitySurface
+
+VALUATION_DATE = "2026-10-16"
+TENORS = (
+    ["ON", "1W", "2W", "3W"]
+    + [f"{months}M" for months in range(1, 12)]
+    + ["1Y", "15M", "18M", "21M", "2Y", "30M", "3Y", "4Y", "5Y", "6Y", "7Y", "8Y", "9Y", "10Y", "15Y"]
+)
+TENOR_OFFSETS = {"W": "weeks", "M": "months", "Y": "years"}
+TENOR_DAYS = [
+    1 if tenor == "ON"
+    else (
+        pd.Timestamp(VALUATION_DATE)
+        + pd.DateOffset(**{TENOR_OFFSETS[tenor[-1]]: int(tenor[:-1])})
+        - pd.Timestamp(VALUATION_DATE)
+    ).days
+    for tenor in TENORS
+]
+STRATEGIES = ["ATM", "10BF", "10RR", "25BF", "25RR"]
+# surface_completition (igual en 0.1 y 0.2) resta fechas date y usa .dt.days, lo que solo
+# funciona con pandas 1.x, la version del runtime de Glue 4.0
+requires_pandas_1 = pytest.mark.skipif(
+    int(pd.__version__.split(".")[0]) >= 2,
+    reason="VolatilitySurface requiere pandas 1.x (runtime de Glue 4.0)",
+)
+PARAMS = {
+    "TENORS": ",".join(TENORS),
+    "STRATEGIES": ",".join(STRATEGIES),
+    "ID_BODY": "[strategy]_[instrument]_[tenor]",
+    "DECIMAL_ROUND": "4",
+    "INTERPOLATION_METHOD": "linear_interpol",
+    "BASIC_POINTS": "0.0001",
+}
+
+
+def build_market_data(seed, missing_short=1, missing_long=1, equal_mids=False):
+    """Arma un insumo de Fenics y unos nodos forward sinteticos para USDCOP"""
+    rng = np.random.default_rng(seed)
+    market_tenors = TENORS[missing_short : len(TENORS) - missing_long]
+    rows = []
+    for strategy in STRATEGIES:
+        level = {"ATM": 12.0, "10BF": 1.5, "10RR": -2.0, "25BF": 0.5, "25RR": -0.8}[strategy]
+        mids = level + np.cumsum(rng.normal(0, 0.3, len(market_tenors)))
+        if equal_mids and strategy in ("ATM", "25RR"):
+            mids[1] = mids[0]
+            mids[-2] = mids[-1]
+        spreads = rng.uniform(0.1, 0.5, len(market_tenors))
+        for tenor, mid, spread in zip(market_tenors, mids, spreads):
+            rows.append(
+                {
+                    "valuation_date": VALUATION_DATE,
+                    "id_precia": f"{strategy}_USDCOP_{tenor}",
+                    "currency": "USDCOP",
+                    "strategy": strategy,
+                    "tenor": tenor,
+                    "bid": mid - spread,
+                    "ask": mid + spread,
+                    "MID": mid,
+                    "maturity_date": None,
+                }
+            )
+    input_data = pd.DataFrame(rows)
+    valuation = pd.Timestamp(VALUATION_DATE)
+    fwd_data = pd.DataFrame(
+        {
+            "tenor": TENORS,
+            "days": TENOR_DAYS,
+            "valuation_date": VALUATION_DATE,
+            "maturity_date": [
+                (valuation + pd.Timedelta(days=days)).strftime("%Y-%m-%d") for days in TENOR_DAYS
+            ],
+            "instrument": "USDCOP",
+        }
+    )
+    return input_data, fwd_data
+
+
+def run_surface(surface_class, input_data, fwd_data):
+    surface = surface_class(input_data.copy(), fwd_data.copy(), VALUATION_DATE, "USDCOP")
+    surface.all_surface_df()
+    return surface
+
+
+@pytest.fixture(autouse=True)
+def surface_params(monkeypatch):
+    for module in [volatility_surface, legacy_volatility_surface]:
+        monkeypatch.setattr(module, "get_params", lambda keys: dict(PARAMS))
+
+
+@requires_pandas_1
+@pytest.mark.parametrize("method", ["linear_interpol", "cubic_splines_interpol"])
+@pytest.mark.parametrize(
+    "missing_short, missing_long, equal_mids",
+    [(0, 0, False), (1, 1, False), (2, 1, False), (1, 2, True), (0, 3, True)],
+)
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_surface_matches_legacy(monkeypatch, seed, missing_short, missing_long, equal_mids, method):
+    monkeypatch.setitem(PARAMS, "INTERPOLATION_METHOD", method)
+    input_data, fwd_data = build_market_data(seed, missing_short, missing_long, equal_mids)
+
+    expected = run_surface(LegacyVolatilitySurface, input_data, fwd_data)
+    result = run_surface(VolatilitySurface, input_data, fwd_data)
+
+    for attribute in [
+        "int_surface",
+        "int_surface_db",
+        "int_surface_deltas",
+        "daily_int_surface",
+        "daily_int_surface_deltas",
+    ]:
+        pd.testing.assert_frame_equal(
+            getattr(result, attribute), getattr(expected, attribute), check_dtype=False
+        )
+
+
+@requires_pandas_1
+def test_extend_missing_nodes_bumps_equal_mids_once_per_tenor():
+    input_data, fwd_data = build_market_data(7, missing_short=2, missing_long=2, equal_mids=True)
+
+    expected = run_surface(LegacyVolatilitySurface, input_data, fwd_data).int_surface
+    result = run_surface(VolatilitySurface, input_data, fwd_data).int_surface
+
+    atm_1m = (result.strategy == "ATM") & (result.tenor == "1M")
+    assert result.loc[atm_1m, "mid"].values == pytest.approx(expected.loc[atm_1m, "mid"].values)
+    assert not result["mid"].isna().any()
+
+
+@pytest.mark.parametrize("method", ["linear_interpol", "cubic_splines_interpol"])
+def test_interpol_grid_matches_per_column(method):
+    rng = np.random.default_rng(11)
+    x_nodes = np.array(TENOR_DAYS)
+    y_nodes = rng.normal(10, 2, (len(x_nodes), 5))
+    x_points = list(range(1, TENOR_DAYS[-1] + 1))
+
+    grid = interpol(x_nodes, y_nodes, x_points).method(method)
+    columns = [interpol(x_nodes, y_nodes[:, i], x_points).method(method) for i in range(5)]
+
+    assert grid.shape == (len(x_points), 5)
+    np.testing.assert_array_equal(grid, np.column_stack(columns))
+
+
+def benchmark(repeat=5):
+    """Compara los tiempos de la implementacion anterior y la vectorial"""
+    logging.getLogger().setLevel(logging.ERROR)
+    volatility_surface.get_params = lambda keys: dict(PARAMS)
+    legacy_volatility_surface.get_params = lambda keys: dict(PARAMS)
+    for method in ["linear_interpol", "cubic_splines_interpol"]:
+        PARAMS["INTERPOLATION_METHOD"] = method
+        input_data, fwd_data = build_market_data(1, missing_short=2, missing_long=2, equal_mids=True)
+        for version, surface_class in [("0.1", LegacyVolatilitySurface), ("0.2", VolatilitySurface)]:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                run_surface(surface_class, input_data, fwd_data)
+            elapsed = (time.perf_counter() - start) / repeat
+            print(f"{method:<24} opt_inter_process {version} {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
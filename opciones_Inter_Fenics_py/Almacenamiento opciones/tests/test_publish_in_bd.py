@@ -0,0 +1,140 @@
+"""
+Pruebas de PublishInBD.publish_all del Glue Job de opciones internacionales sobre
+una BD SQLite en memoria: el reemplazo de las superficies (DELETE + INSERT
+multi-fila por bloques) se hace en una sola transaccion para todas las tablas,
+de modo que si falla una insercion se conservan las filas publicadas antes.
+
+El Glue Job lee los parametros de Glue y el secreto de BD al importarse, por lo
+que se reemplazan get_params y get_secret antes de cargarlo. Las librerias del
+job se toman de los wheels de la carpeta, como en --extra-py-files
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+JOB_DIR = Path(__file__).resolve().parents[1]
+JOB_PATH = JOB_DIR / "glue-job-process-otc-opt-inter.py"
+JOB_WHEELS = ["precia_utils-0.1", "opt_inter_utils-0.1", "opt_inter_process-0.2"]
+GLUE_PARAMS = {
+    "DB_SECRET": "secret-db",
+    "VALUATION_DATE": "2026-10-16",
+    "CURRENCY": "USDCOP",
+    "PARAMETER_STORE": "parameter-store",
+    "DELTAS_TRANSLATE_DICT": "{}",
+    "STRATEGY_TRANSLATE_DICT": "{}",
+}
+DB_SECRET = {"conn_string_sources": "sqlite://", "schema_sources": ""}
+DELTAS_TABLE = "pub_otc_opt_inter_deltas"
+DAILY_TABLE = "pub_otc_opt_inter_daily_deltas"
+
+
+@pytest.fixture(scope="module")
+def job_module():
+    for wheel in JOB_WHEELS:
+        sys.path.insert(0, str(JOB_DIR / f"{wheel}-py3-none-any.whl"))
+    pytest.importorskip("awsglue")
+    pytest.importorskip("boto3")
+    pytest.importorskip("paramiko")
+    precia_aws = pytest.importorskip("precia_utils.precia_aws")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            precia_aws, "get_params", lambda keys: {key: GLUE_PARAMS[key] for key in keys}
+        )
+        monkeypatch.setattr(precia_aws, "get_secret", lambda name: dict(DB_SECRET))
+        spec = importlib.util.spec_from_file_location("glue_job_process_otc_opt_inter", JOB_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def db_connection():
+    # Una sola conexion para que la BD en memoria sea la misma en todo el test
+    engine = sa.create_engine("sqlite://", poolclass=sa.pool.StaticPool)
+    published = pd.DataFrame(
+        {"days": [1, 30], "X05": [10.0, 11.0], "currency": "USDCOP", "valuation_date": "2026-10-16"}
+    )
+    # Los datos iniciales se confirman antes de entregar la conexion: publish_all
+    # abre su propia transaccion y no puede encontrar una ya iniciada (SQLAlchemy 2.x)
+    with engine.begin() as seed_connection:
+        for table in [DELTAS_TABLE, DAILY_TABLE]:
+            seed_connection.execute(
+                sa.text(
+                    f"CREATE TABLE {table} (days INTEGER, X05 FLOAT, currency TEXT, "
+                    "valuation_date TEXT, PRIMARY KEY (days, currency, valuation_date))"
+                )
+            )
+            published.to_sql(table, seed_connection, if_exists="append", index=False)
+    connection = engine.connect()
+    assert not connection.in_transaction()
+    yield connection
+    connection.close()
+    engine.dispose()
+
+
+def surface(days):
+    return pd.DataFrame(
+        {
+            "days": days,
+            "X05": [20.0 + day for day in days],
+            "currency": "USDCOP",
+            "valuation_date": "2026-10-16",
+        }
+    )
+
+
+def published_rows(connection, table):
+    return pd.read_sql(
+        sa.text(f"SELECT days, X05 FROM {table} ORDER BY days"), connection
+    ).values.tolist()
+
+
+def test_publish_all_replaces_surfaces(job_module, db_connection, monkeypatch):
+    monkeypatch.setattr(job_module.PublishInBD, "INSERT_CHUNK_SIZE", 2)
+    publisher = job_module.PublishInBD(
+        {DELTAS_TABLE: surface([1, 7, 14, 30]), DAILY_TABLE: surface(list(range(1, 31)))}
+    )
+    publisher.db_connection = db_connection
+
+    publisher.publish_all()
+
+    assert published_rows(db_connection, DELTAS_TABLE) == [
+        [1, 21.0], [7, 27.0], [14, 34.0], [30, 50.0]
+    ]
+    assert len(published_rows(db_connection, DAILY_TABLE)) == 30
+
+
+def test_publish_all_rolls_back_when_an_insert_fails(job_module, db_connection, monkeypatch):
+    monkeypatch.setattr(job_module.PublishInBD, "INSERT_CHUNK_SIZE", 2)
+    # La tabla diaria repite el dia 5 en el tercer bloque: falla la llave primaria
+    # cuando ya se insertaron la tabla de nodos y los primeros bloques de la diaria
+    publisher = job_module.PublishInBD(
+        {DELTAS_TABLE: surface([1, 7, 14, 30]), DAILY_TABLE: surface([1, 2, 3, 4, 5, 5, 6])}
+    )
+    publisher.db_connection = db_connection
+
+    with pytest.raises(job_module.PlataformError):
+        publisher.publish_all()
+
+    assert not db_connection.in_transaction()
+    assert published_rows(db_connection, DELTAS_TABLE) == [[1, 10.0], [30, 11.0]]
+    assert published_rows(db_connection, DAILY_TABLE) == [[1, 10.0], [30, 11.0]]
+
+
+def test_publish_all_rejects_null_values_before_touching_the_db(job_module, db_connection):
+    invalid_surface = surface([1, 7])
+    invalid_surface.loc[1, "X05"] = None
+    publisher = job_module.PublishInBD(
+        {DELTAS_TABLE: surface([1, 7, 14, 30]), DAILY_TABLE: invalid_surface}
+    )
+    publisher.db_connection = db_connection
+
+    with pytest.raises(job_module.PlataformError):
+        publisher.publish_all()
+
+    assert published_rows(db_connection, DELTAS_TABLE) == [[1, 10.0], [30, 11.0]]
@@ -1,3 +1,3 @@
 from setuptools import setup
 
-setup(name="swap_inter_ccs", version="0.1", packages=["swap_inter_ccs"])
\ No newline at end of file
+setup(name="swap_inter_ccs", version="0.2", packages=["swap_inter_ccs"])
\ No newline at end of file
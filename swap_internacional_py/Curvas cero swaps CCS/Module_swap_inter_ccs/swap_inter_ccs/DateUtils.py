@@ -119,6 +119,8 @@ class DateUtils():
         :param calendar: Calendario de dias habiles
         :return: Fecha habil anterior en formato datetime.date
         """
+        if isinstance(calendar, BusinessCalendar):
+            return calendar.previous(date)
         offset = -1
         flag = True
         while flag:
@@ -137,6 +139,8 @@ class DateUtils():
         :param calendar: Calendario de dias habiles
         :return: Siguiente fecha habil anterior en formato datetime.date
         """
+        if isinstance(calendar, BusinessCalendar):
+            return calendar.following(date)
         offset = 1
         flag = True
         while flag:
@@ -156,6 +160,8 @@ class DateUtils():
         :param calendar: Calendario dias habiles
         :return: Fecha correspondiente al agregar dias habiles en formato datetime.date
         """
+        if isinstance(calendar, BusinessCalendar):
+            return calendar.add_business_days(date, days)
         offset_date = date
         if (days > 0):
             for i in range(days):
@@ -189,6 +195,8 @@ class DateUtils():
         :param calendar: Calendario dias habiles
         :return: La fecha de pago en formato datetime.date
         """
+        if isinstance(calendar, BusinessCalendar):
+            return calendar.previous(date, inclusive=True)
         cal = np.array(calendar)
         previous_business_day_convention = max(cal[np.where(cal <= date)])        
         return previous_business_day_convention
@@ -201,6 +209,8 @@ class DateUtils():
         :param calendar: Calendario dias habiles
         :return: La fecha de pago en formato datetime.date
         """
+        if isinstance(calendar, BusinessCalendar):
+            return calendar.following(date, inclusive=True)
         cal = np.array(calendar)
         following_business_day_convention = min(cal[np.where(cal >= date)])
         return following_business_day_convention
@@ -213,9 +223,13 @@ class DateUtils():
         :param calendar: Calendario dias habiles
         :return: La fecha de pago en formato datetime.date
         """
-        cal = np.array(calendar)
-        following_business_day = min(cal[np.where(cal >= date)])
-        previous_business_day = max(cal[np.where(cal <= date)])
+        if isinstance(calendar, BusinessCalendar):
+            following_business_day = calendar.following(date, inclusive=True)
+            previous_business_day = calendar.previous(date, inclusive=True)
+        else:
+            cal = np.array(calendar)
+            following_business_day = min(cal[np.where(cal >= date)])
+            previous_business_day = max(cal[np.where(cal <= date)])
         if (date.month == previous_business_day.month):
             modified_previous_business_day_convention = previous_business_day
         else:
@@ -230,9 +244,13 @@ class DateUtils():
         :param calendar: Calendario dias habiles
         :return: La fecha de pago en formato datetime.date
         """
-        cal = np.array(calendar)
-        following_business_day = min(cal[np.where(cal >= date)])
-        previous_business_day = max(cal[np.where(cal <= date)])
+        if isinstance(calendar, BusinessCalendar):
+            following_business_day = calendar.following(date, inclusive=True)
+            previous_business_day = calendar.previous(date, inclusive=True)
+        else:
+            cal = np.array(calendar)
+            following_business_day = min(cal[np.where(cal >= date)])
+            previous_business_day = max(cal[np.where(cal <= date)])
         if (date.month == following_business_day.month):
             modified_following_business_day_convention = following_business_day
         else:
@@ -322,16 +340,27 @@ class DateUtils():
         else:
             return case(date, calendar)
 
+    def business_days(self, initial_date, final_date, calendar):
+        """
+        Calcular la lista de dias habiles entre dos fechas, ambas incluidas
+        :param initial_date: Fecha de inicio en formato datetime.date
+        :param final_date: Fecha de finalizacion en formato datetime.date
+        :param calendar: Calendario dias habiles
+        :return: Lista de dias habiles en formato datetime.date
+        """
+        business_days = BusinessCalendar.build(calendar).business_days(initial_date, final_date)
+        return business_days
+
     def days_business(self, initial_date, final_date, calendar):
         """
-        Calcular el numero de dias habiles entre dos fechas
+        Calcular el numero de dias habiles entre dos fechas, contando la fecha de inicio y no la de finalizacion
         Fecha: 2022-06-13
         :param initial_date: Fecha de inicio del calendario en formato datetime.date
         :param final_date: Fecha de finalizacion del calendario en formato datetime.date
         :param calendar: Calendario dias habiles
         :return: Numero de dias habiles entre las dos fechas
         """
-        days_business = len(self.business_days(initial_date, final_date, calendar))
+        days_business = BusinessCalendar.build(calendar).days_business(initial_date, final_date)
         return days_business
 
     def days_act(self, initial_date, final_date):
@@ -615,11 +644,176 @@ class DateUtils():
         if (case == 'error'):
             msg = ' day_count_convention invalido %s' % day_count_convention
             raise ValueError(msg)
-        elif (case == 'day_count_bus_252'):
+        elif (day_count_convention == 'bus_252'):
             return case(initial_date, final_date, calendar)
         else:
             return case(initial_date, final_date)
 
+    def to_datetime64(self, dates):
+        """
+        Convertir fechas o arreglos de fechas a numpy.datetime64 con resolucion diaria
+        :param dates: Fecha o arreglo de fechas en formato datetime.date, numpy.datetime64 o str ISO
+        :return: Arreglo de fechas en formato numpy.datetime64[D]
+        """
+        dates = np.asarray(dates)
+        if dates.dtype == object:
+            try:
+                ordinals = np.fromiter((x.toordinal() for x in dates.ravel()), np.int64, dates.size)
+            except AttributeError:
+                # Arreglo con str ISO (u otros tipos sin toordinal): numpy los interpreta
+                return dates.astype('datetime64[D]')
+            return (ordinals - BusinessCalendar._epoch_ordinal).astype('datetime64[D]').reshape(dates.shape)
+        return dates.astype('datetime64[D]')
+
+    def date_parts(self, dates):
+        """
+        Calcular el agno, mes y dia de un arreglo de fechas
+        :param dates: Arreglo de fechas en formato numpy.datetime64[D]
+        :return: Arreglos de agnos, meses y dias
+        """
+        years = dates.astype('datetime64[Y]')
+        months = dates.astype('datetime64[M]')
+        year = years.astype(np.int64) + 1970
+        month = (months - years).astype(np.int64) + 1
+        day = (dates - months).astype(np.int64) + 1
+        return year, month, day
+
+    def month_days_array(self, dates):
+        """
+        Calcular el numero de dias del mes de cada fecha de un arreglo
+        :param dates: Arreglo de fechas en formato numpy.datetime64[D]
+        :return: Arreglo con el numero de dias del mes
+        """
+        months = dates.astype('datetime64[M]')
+        return ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+
+    def leap_days_before_array(self, dates):
+        """
+        Calcular para cada fecha el numero de dias de agnos bisiestos y de 29 de febrero hasta la fecha (incluida)
+        :param dates: Arreglo de fechas en formato numpy.datetime64[D]
+        :return: Arreglos con los dias de agnos bisiestos y con los 29 de febrero acumulados
+        """
+        year = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+        day_of_year = (dates - dates.astype('datetime64[Y]')).astype(np.int64) + 1
+        previous_year = year - 1
+        leap_years_before = previous_year // 4 - previous_year // 100 + previous_year // 400
+        is_leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        leap_year_days = 366 * leap_years_before + np.where(is_leap, day_of_year, 0)
+        february_29 = leap_years_before + (is_leap & (day_of_year >= 60))
+        return leap_year_days, february_29
+
+    def days_act_array(self, initial_dates, final_dates):
+        """
+        Calcular el numero de dias entre dos arreglos de fechas
+        :param initial_dates: Arreglo de fechas de inicio en formato numpy.datetime64[D]
+        :param final_dates: Arreglo de fechas de finalizacion en formato numpy.datetime64[D]
+        :return: Arreglo con el numero de dias entre las fechas
+        """
+        return (final_dates - initial_dates).astype(np.int64)
+
+    def days_non_leap_array(self, initial_dates, final_dates):
+        """
+        Calcular el numero de dias entre dos arreglos de fechas bajo una convencion de agnos no bisiestos
+        :param initial_dates: Arreglo de fechas de inicio en formato numpy.datetime64[D]
+        :param final_dates: Arreglo de fechas de finalizacion en formato numpy.datetime64[D]
+        :return: Arreglo con el numero de dias sin contar los 29 de febrero
+        """
+        days_act = self.days_act_array(initial_dates, final_dates)
+        february_29 = self.leap_days_before_array(final_dates)[1] - self.leap_days_before_array(initial_dates)[1]
+        return days_act - np.where(days_act > 0, february_29, 0)
+
+    def days_30_u_array(self, initial_dates, final_dates):
+        """
+        Calcular el numero de dias entre dos arreglos de fechas bajo una convencion de 30 dias por mes de EE.UU.
+        :param initial_dates: Arreglo de fechas de inicio en formato numpy.datetime64[D]
+        :param final_dates: Arreglo de fechas de finalizacion en formato numpy.datetime64[D]
+        :return: Arreglo con el numero de dias bajo la convencion de 30 dias por mes de EE.UU.
+        """
+        y_1, m_1, d_1 = self.date_parts(initial_dates)
+        y_2, m_2, d_2 = self.date_parts(final_dates)
+        d_1 = np.minimum(d_1, 30)
+        d_2 = np.where(d_1 == 30, d_2, np.minimum(d_2, 30))
+        return 360 * (y_2 - y_1) + 30 * (m_2 - m_1) + (d_2 - d_1)
+
+    def days_30_e_array(self, initial_dates, final_dates):
+        """
+        Calcular el numero de dias entre dos arreglos de fechas bajo una convencion europea de 30 dias por mes.
+        :param initial_dates: Arreglo de fechas de inicio en formato numpy.datetime64[D]
+        :param final_dates: Arreglo de fechas de finalizacion en formato numpy.datetime64[D]
+        :return: Arreglo con el numero de dias bajo la convencion europea de 30 dias por mes.
+        """
+        y_1, m_1, d_1 = self.date_parts(initial_dates)
+        y_2, m_2, d_2 = self.date_parts(final_dates)
+        return 360 * (y_2 - y_1) + 30 * (m_2 - m_1) + (np.minimum(d_2, 30) - np.minimum(d_1, 30))
+
+    def days_30_co_array(self, initial_dates, final_dates):
+        """
+        Calcular el numero de dias entre dos arreglos de fechas bajo la convencion colombiana, de precia, de 30 dias
+        por mes. Replica rama a rama el calculo de days_30_co.
+        :param initial_dates: Arreglo de fechas de inicio en formato numpy.datetime64[D]
+        :param final_dates: Arreglo de fechas de finalizacion en formato numpy.datetime64[D]
+        :return: Arreglo con el numero de dias bajo la convencion colombiana de 30 dias por mes.
+        """
+        y_1, m_1, d_1 = self.date_parts(initial_dates)
+        y_2, m_2, d_2 = self.date_parts(final_dates)
+        dp_2 = self.month_days_array(final_dates)
+        d_2 = np.where((dp_2 < d_1) & (d_2 == dp_2), d_1, d_2)
+        dv = np.maximum((y_2 - y_1 - 1) * 360, 0)
+        short_month_days = np.where(d_1 == 31, d_2, 30 - d_1 + d_2)
+        ds_years = np.where(d_2 >= d_1, (12 - m_1 + m_2) * 30 + d_2 - d_1,
+                            (12 - m_1 + m_2 - 1) * 30 + short_month_days)
+        ds_same_year = np.where(d_2 >= d_1, (m_2 - m_1) * 30 + d_2 - d_1,
+                                np.maximum((m_2 - m_1 - 1) * 30, 0) + short_month_days)
+        ds = np.where(y_2 != y_1, ds_years, ds_same_year)
+        ds = ds - ((d_1 == 30) & (d_2 == 31))
+        return dv + ds
+
+    def day_count_act_365_array(self, initial_dates, final_dates):
+        """
+        Calcular el recuento de dias entre dos arreglos de fechas bajo una convencion Act/365, separando los dias de
+        agnos bisiestos (base 366) del resto (base 365) igual que day_count_act_365
+        :param initial_dates: Arreglo de fechas de inicio en formato numpy.datetime64[D]
+        :param final_dates: Arreglo de fechas de finalizacion en formato numpy.datetime64[D]
+        :return: Arreglo con el recuento de dias bajo la convencion Act/365
+        """
+        days_act = np.maximum(self.days_act_array(initial_dates, final_dates), 0)
+        leap_days = self.leap_days_before_array(final_dates)[0] - self.leap_days_before_array(initial_dates)[0]
+        leap_days = np.where(days_act > 0, leap_days, 0)
+        return leap_days / 366 + (days_act - leap_days) / 365
+
+    def day_count_array(self, initial_dates, final_dates, day_count_convention, calendar=None):
+        """
+        Calcular el recuento de dias entre arreglos de fechas dada su convencion. Entrega los mismos valores que
+        day_count aplicado fecha a fecha, de modo que un cronograma completo se calcula en una sola llamada.
+        :param initial_dates: Fechas de inicio (arreglo o fecha unica) en formato datetime.date o numpy.datetime64
+        :param final_dates: Fechas de finalizacion (arreglo o fecha unica) en formato datetime.date o numpy.datetime64
+        :param day_count_convention: Nombre de la convencion de la fecha de recuento de dias
+        :param calendar: Calendario dias habiles, default = None
+        :return: Arreglo con el recuento de dias entre las fechas correspondiente.
+        """
+        initial_dates, final_dates = np.broadcast_arrays(self.to_datetime64(initial_dates),
+                                                         self.to_datetime64(final_dates))
+        switcher = {
+            '30_360_u': (self.days_30_u_array, 360),
+            '30_360_e': (self.days_30_e_array, 360),
+            '30_360_co': (self.days_30_co_array, 360),
+            'act_360': (self.days_act_array, 360),
+            'act_365_f': (self.days_act_array, 365),
+            'nl_365': (self.days_non_leap_array, 365)
+        }
+        if (day_count_convention == '1'):
+            return np.ones(initial_dates.shape)
+        elif (day_count_convention == 'act_365'):
+            return self.day_count_act_365_array(initial_dates, final_dates)
+        elif (day_count_convention == 'bus_252'):
+            return BusinessCalendar.build(calendar).days_business_array(initial_dates, final_dates) / 252
+        case = switcher.get(day_count_convention, 'error')
+        if (case == 'error'):
+            msg = ' day_count_convention invalido %s' % day_count_convention
+            raise ValueError(msg)
+        days_function, basis = case
+        return days_function(initial_dates, final_dates) / basis
+
     def same_day_starting_day_convention(self, trade_date, calendar=None):
         """
         Calcular la fecha de inicio de un contrato bajo la convencion de iniciar el mismo dia (Same Day Starting convention)
@@ -783,6 +977,194 @@ class DateUtils():
             third_wednesday = self.add_business_days(third_wednesday, prior_day_adjust, calendar_business_days)
         return third_wednesday
 
+
+class BusinessCalendar():
+    """
+    Calendario de dias habiles construido una sola vez a partir de la lista de fechas. Guarda los dias
+    habiles como un arreglo ordenado de ordinales y un conjunto hash, de modo que la pertenencia se
+    resuelve en O(1) y las busquedas de dias habiles siguientes, anteriores y conteos en O(log n).
+    Se comporta como la lista de fechas original (in, iteracion, len, numpy.array) para poder pasarse
+    a cualquier metodo que hoy recibe el calendario como lista de datetime.date.
+    """
+    # -----Attributes-----
+    # Class attributes
+    _epoch_ordinal = dt.date(1970, 1, 1).toordinal()
+    #--------------------
+    def __init__(self, calendar, date_format=None):
+        """
+        Params:
+            calendar (list): Calendario de dias habiles en formato datetime.date, numpy.datetime64 o str
+            date_format (str): Formato de las fechas cuando el calendario viene como str (Opcional) None,
+                               en cuyo caso se esperan fechas ISO (YYYY-MM-DD).
+        """
+        if isinstance(calendar, BusinessCalendar):
+            ordinals = calendar.ordinals
+        else:
+            calendar = list(calendar)
+            if date_format is not None:
+                calendar = [dt.datetime.strptime(x, date_format).date() if isinstance(x, str) else x for x in calendar]
+            ordinals = np.unique(DateUtils().to_datetime64(calendar).astype(np.int64)) + self._epoch_ordinal
+        if len(ordinals) == 0:
+            raise ValueError('El calendario de dias habiles no tiene fechas')
+        self.ordinals = ordinals
+        self.ordinals.flags.writeable = False
+        self._ordinals_set = set(ordinals.tolist())
+        self._dates = None
+        self._hash = hash(ordinals.tobytes())
+
+    @classmethod
+    def build(cls, calendar, date_format=None):
+        """
+        Entrega el calendario como BusinessCalendar sin reconstruirlo si ya lo es
+        Params:
+            Los mismos del constructor de la clase
+        Return:
+            business_calendar (BusinessCalendar): Calendario de dias habiles indexado
+        """
+        if isinstance(calendar, cls):
+            return calendar
+        return cls(calendar, date_format)
+
+    @property
+    def dates(self):
+        """
+        Arreglo de fechas habiles en formato datetime.date, generado solo si se solicita
+        """
+        if self._dates is None:
+            self._dates = np.array([dt.date.fromordinal(x) for x in self.ordinals.tolist()], dtype=object)
+            self._dates.flags.writeable = False
+        return self._dates
+
+    def __contains__(self, date):
+        return isinstance(date, dt.date) and date.toordinal() in self._ordinals_set
+
+    def __iter__(self):
+        return iter(self.dates)
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.dates.astype(dtype) if dtype is not None else self.dates.copy()
+
+    def __eq__(self, other):
+        return isinstance(other, BusinessCalendar) and np.array_equal(self.ordinals, other.ordinals)
+
+    def __hash__(self):
+        return self._hash
+
+    def _position(self, date, side):
+        """
+        Posicion de la fecha en el arreglo ordenado de dias habiles (numpy.searchsorted)
+        """
+        return int(np.searchsorted(self.ordinals, date.toordinal(), side=side))
+
+    def _date_at(self, position, date):
+        """
+        Fecha habil en la posicion dada, validando que no se salga del rango del calendario
+        """
+        if position < 0 or position >= len(self.ordinals):
+            msg = 'La fecha %s esta fuera del rango del calendario de dias habiles' % date
+            raise ValueError(msg)
+        return dt.date.fromordinal(int(self.ordinals[position]))
+
+    def is_business_day(self, date):
+        """
+        Indica si la fecha dada es dia habil
+        Params:
+            date (datetime.date): Fecha a revisar
+        Return:
+            is_business_day (Boolean): True si es dia habil
+        """
+        return date in self
+
+    def following(self, date, inclusive=False):
+        """
+        Calcula el siguiente dia habil
+        Params:
+            date (datetime.date): Fecha de referencia
+            inclusive (Boolean): Si la fecha es habil se entrega ella misma (Opcional) False
+        Return:
+            following (datetime.date): Siguiente dia habil
+        """
+        return self._date_at(self._position(date, 'left' if inclusive else 'right'), date)
+
+    def previous(self, date, inclusive=False):
+        """
+        Calcula el dia habil anterior
+        Params:
+            date (datetime.date): Fecha de referencia
+            inclusive (Boolean): Si la fecha es habil se entrega ella misma (Opcional) False
+        Return:
+            previous (datetime.date): Dia habil anterior
+        """
+        return self._date_at(self._position(date, 'right' if inclusive else 'left')-1, date)
+
+    def add_business_days(self, date, days):
+        """
+        Agrega un numero de dias habiles a la fecha de referencia
+        Params:
+            date (datetime.date): Fecha de referencia
+            days (int): Numero de dias habiles, negativo para retroceder
+        Return:
+            business_date (datetime.date): Fecha resultante
+        """
+        if days > 0:
+            return self._date_at(self._position(date, 'right')+days-1, date)
+        elif days < 0:
+            return self._date_at(self._position(date, 'left')+days, date)
+        if date not in self:
+            raise ValueError('No se pueden agregar cero dias habiles a una fecha no habil.')
+        return date
+
+    def business_days(self, initial_date, final_date):
+        """
+        Lista los dias habiles entre dos fechas, ambas incluidas
+        Params:
+            initial_date (datetime.date): Fecha inicial
+            final_date (datetime.date): Fecha final
+        Return:
+            business_days (list): Dias habiles en formato datetime.date
+        """
+        return list(self.dates[self._position(initial_date, 'left'):self._position(final_date, 'right')])
+
+    def days_business(self, initial_date, final_date):
+        """
+        Cuenta los dias habiles desde la fecha inicial (incluida) hasta la fecha final (excluida), que es
+        el conteo de la convencion bus/252
+        Params:
+            initial_date (datetime.date): Fecha inicial
+            final_date (datetime.date): Fecha final
+        Return:
+            days_business (int): Numero de dias habiles, negativo si la fecha final es anterior
+        """
+        return self._position(final_date, 'left') - self._position(initial_date, 'left')
+
+    def days_business_array(self, initial_dates, final_dates):
+        """
+        Cuenta los dias habiles entre arreglos de fechas con el mismo criterio de days_business
+        Params:
+            initial_dates (numpy.ndarray): Fechas iniciales en formato numpy.datetime64[D]
+            final_dates (numpy.ndarray): Fechas finales en formato numpy.datetime64[D]
+        Return:
+            days_business (numpy.ndarray): Numero de dias habiles de cada par de fechas
+        """
+        initial_ordinals = np.asarray(initial_dates, dtype='datetime64[D]').astype(np.int64) + self._epoch_ordinal
+        final_ordinals = np.asarray(final_dates, dtype='datetime64[D]').astype(np.int64) + self._epoch_ordinal
+        return np.searchsorted(self.ordinals, final_ordinals) - np.searchsorted(self.ordinals, initial_ordinals)
+
+    def day_count_bus_252(self, initial_date, final_date):
+        """
+        Calcula el recuento de dias entre dos fechas bajo la convencion bus/252
+        Params:
+            initial_date (datetime.date): Fecha inicial
+            final_date (datetime.date): Fecha final
+        Return:
+            day_count_bus_252 (float): Fraccion de año bus/252
+        """
+        return self.days_business(initial_date, final_date) / 252
+
+
 class CalendarHandler():
     """Clase para el uso de los calendarios de dias habiles en distintas jurisdicciones y combinacion de jurisdicciones
     """
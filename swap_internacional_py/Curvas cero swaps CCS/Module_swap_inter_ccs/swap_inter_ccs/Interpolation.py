@@ -1,4 +1,5 @@
 import sys
+import copy
 from scipy import interpolate
 import numpy as np
 import logging
@@ -83,4 +84,140 @@ class Interpol():
             error_line = str(sys.exc_info()[-1].tb_lineno)
             logger.error('[Interpolacion] No se pudo realizar la interpolacion. Fallo en linea: ' + error_line + '. Motivo: '+ str(e))
             raise ValueError('[Interpolacion] No se pudo realizar la interpolacion')
-        return y_out 
\ No newline at end of file
+        return y_out
+
+
+class FittedInterpol():
+    """Interpolador ajustado una sola vez sobre los nodos X y evaluable sobre cualquier vector de puntos.
+    Lo que solo depende de los nodos X (orden, longitudes de los intervalos y factorizacion del sistema
+    tridiagonal de los splines cubicos) se calcula en el constructor; refit cambia unicamente los valores Y,
+    que es el caso del bootstrap donde los dias de los nodos no cambian entre iteraciones.
+    """
+    _bc_types = ('not-a-knot', 'natural')
+
+    def __init__(self, x_nodes, y_nodes, interpol_method, bc_type='not-a-knot'):
+        """
+        Args:
+            x_nodes (list, numpy.ndarray): Vector/arreglo de puntos de 1 dimension del eje X
+            y_nodes (list, numpy.ndarray): Vector/arreglo del eje Y, la ultima dimension corresponde a los nodos X
+            interpol_method (str): Metodo de interpolacion (linear_interpol, cubic_splines_interpol)
+            bc_type (str): Condicion de frontera de los splines cubicos: not-a-knot (la misma de
+                           interp1d kind='cubic') o natural. Default not-a-knot
+        """
+        if interpol_method not in ('linear_interpol', 'cubic_splines_interpol'):
+            logger.error('[Interpolacion] metodo de interpolacion invalido %s' % interpol_method)
+            raise ValueError('[Interpolacion] No se pudo realizar el metodo de interpolacion')
+        if bc_type not in self._bc_types:
+            logger.error('[Interpolacion] condicion de frontera invalida %s' % bc_type)
+            raise ValueError('[Interpolacion] No se pudo realizar el metodo de interpolacion')
+        x_nodes = np.asarray(x_nodes, dtype=float)
+        min_nodes = 2 if interpol_method == 'linear_interpol' else (4 if bc_type == 'not-a-knot' else 3)
+        if x_nodes.ndim != 1 or len(x_nodes) < min_nodes:
+            logger.error('[Interpolacion] Se requieren al menos %s nodos en un vector de 1 dimension' % min_nodes)
+            raise ValueError('[Interpolacion] No se pudo realizar la interpolacion')
+        self.order = np.argsort(x_nodes, kind='mergesort')
+        self.x_nodes = x_nodes[self.order]
+        self.h = np.diff(self.x_nodes)
+        if np.any(self.h <= 0):
+            logger.error('[Interpolacion] Los nodos X no pueden repetirse')
+            raise ValueError('[Interpolacion] No se pudo realizar la interpolacion')
+        self.interpol_method = interpol_method
+        self.bc_type = bc_type
+        if interpol_method == 'cubic_splines_interpol':
+            self._factorize()
+            self._coefficients_map = self._spline_coefficients(np.eye(len(self.x_nodes)))
+        self._set_y(y_nodes)
+
+    def _factorize(self):
+        """Factorizacion (algoritmo de Thomas) del sistema tridiagonal de las segundas derivadas de los nodos
+        interiores. Con not-a-knot las segundas derivadas de los extremos se despejan de la continuidad de la
+        tercera derivada en el segundo y penultimo nodo y se sustituyen en la primera y ultima ecuacion.
+        """
+        h = self.h
+        lower = h[:-1].copy()
+        diag = 2*(h[:-1] + h[1:])
+        upper = h[1:].copy()
+        if self.bc_type == 'not-a-knot':
+            diag[0] += h[0]*(h[0] + h[1])/h[1]
+            upper[0] -= h[0]**2/h[1]
+            diag[-1] += h[-1]*(h[-1] + h[-2])/h[-2]
+            lower[-1] -= h[-1]**2/h[-2]
+        denominator = np.empty_like(diag)
+        upper_prime = np.empty_like(diag)
+        denominator[0] = diag[0]
+        upper_prime[0] = upper[0]/diag[0]
+        for i in range(1, len(diag)):
+            denominator[i] = diag[i] - lower[i]*upper_prime[i-1]
+            upper_prime[i] = upper[i]/denominator[i]
+        self._lower = lower
+        self._denominator = denominator
+        self._upper_prime = upper_prime
+
+    def _spline_coefficients(self, y_nodes):
+        """Resuelve las segundas derivadas con la factorizacion precalculada y entrega los coeficientes del
+        polinomio en x - x_i de cada intervalo
+        Args:
+            y_nodes (numpy.ndarray): Valores del eje Y ordenados segun los nodos X
+        Return:
+            coefficients (numpy.ndarray): Coeficientes de grado 0 a 3 (..., 4, intervalos)
+        """
+        h = self.h
+        slopes = np.diff(y_nodes, axis=-1)/h
+        rhs = 6*np.diff(slopes, axis=-1)
+        interior = np.empty_like(rhs)
+        interior[..., 0] = rhs[..., 0]/self._denominator[0]
+        for i in range(1, rhs.shape[-1]):
+            interior[..., i] = (rhs[..., i] - self._lower[i]*interior[..., i-1])/self._denominator[i]
+        for i in range(rhs.shape[-1]-2, -1, -1):
+            interior[..., i] -= self._upper_prime[i]*interior[..., i+1]
+        if self.bc_type == 'not-a-knot':
+            first = ((h[0] + h[1])*interior[..., :1] - h[0]*interior[..., 1:2])/h[1]
+            last = ((h[-1] + h[-2])*interior[..., -1:] - h[-1]*interior[..., -2:-1])/h[-2]
+        else:
+            first = np.zeros_like(interior[..., :1])
+            last = first
+        second_derivatives = np.concatenate([first, interior, last], axis=-1)
+        m_lo = second_derivatives[..., :-1]
+        m_hi = second_derivatives[..., 1:]
+        return np.stack([y_nodes[..., :-1], slopes - h*(2*m_lo + m_hi)/6, m_lo/2, (m_hi - m_lo)/(6*h)], axis=-2)
+
+    def _set_y(self, y_nodes):
+        """Asigna los valores Y (en el orden de los nodos X) y calcula los coeficientes de cada intervalo.
+        Para splines cubicos los coeficientes son lineales en Y, por lo que se obtienen con el mapa precalculado.
+        """
+        y_nodes = np.asarray(y_nodes, dtype=float)
+        if y_nodes.shape[-1:] != self.x_nodes.shape:
+            logger.error('La longitud de dias_x y valores_y no coincide, por lo que no se puede generar la interpolacion')
+            raise TypeError()
+        self.y_nodes = y_nodes[..., self.order]
+        if self.interpol_method == 'linear_interpol':
+            self.coefficients = np.stack([self.y_nodes[..., :-1], np.diff(self.y_nodes, axis=-1)/self.h], axis=-2)
+        else:
+            self.coefficients = np.tensordot(self.y_nodes, self._coefficients_map, axes=(-1, 0))
+
+    def refit(self, y_nodes):
+        """Interpolador con los mismos nodos X y nuevos valores Y, reutilizando lo precalculado sobre X.
+        Args:
+            y_nodes (list, numpy.ndarray): Valores del eje Y en el orden original de los nodos X
+        Return:
+            interpolator (FittedInterpol): Interpolador ajustado a los nuevos valores
+        """
+        interpolator = copy.copy(self)
+        interpolator._set_y(y_nodes)
+        return interpolator
+
+    def __call__(self, x_points):
+        """Evalua el interpolador, extrapolando con el primer y ultimo intervalo como interp1d
+        con fill_value='extrapolate'.
+        Args:
+            x_points (int, float, list, numpy.ndarray): Valores del eje X a interpolar
+        Return:
+            y_points (numpy.ndarray): Valores interpolados de Y
+        """
+        x_points = np.asarray(x_points, dtype=float)
+        segment = np.clip(np.searchsorted(self.x_nodes, x_points), 1, len(self.x_nodes)-1) - 1
+        t = x_points - self.x_nodes[segment]
+        if self.interpol_method == 'linear_interpol':
+            return self.coefficients[..., 1, segment]*t + self.coefficients[..., 0, segment]
+        return (((self.coefficients[..., 3, segment]*t + self.coefficients[..., 2, segment])*t
+                 + self.coefficients[..., 1, segment])*t + self.coefficients[..., 0, segment])
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Planificador de la construcción de un conjunto de curvas a partir de su grafo de dependencias.
+Las curvas se agrupan en olas: cada ola contiene las curvas cuyas dependencias ya fueron
+construidas, se calcula en paralelo en un pool de procesos y sus resultados se persisten
+juntos antes de iniciar la siguiente ola.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from precia_utils.precia_logger import create_log_msg
+from precia_utils.precia_exceptions import PlataformError
+
+# Insumos compartidos del proceso trabajador (características, calendarios, etc.)
+_shared_inputs = {}
+
+
+def _init_worker(shared_inputs):
+    """
+    Instala los insumos compartidos en el proceso trabajador. Se ejecuta una sola vez por
+    proceso, de modo que los insumos no se serializan en cada tarea.
+    Params:
+        shared_inputs (dict): insumos compartidos por todas las curvas
+    """
+    global _shared_inputs
+    _shared_inputs = shared_inputs
+
+
+def _run_build(builder, curve, upstream_results):
+    """
+    Ejecuta la construcción de una curva en el proceso trabajador
+    Params:
+        builder (callable): función de construcción de la curva
+        curve (str): nombre de la curva
+        upstream_results (dict): resultados de las curvas de las que depende
+    Return:
+        resultado de la construcción de la curva
+    """
+    return builder(curve, _shared_inputs, upstream_results)
+
+
+class CurveScheduler():
+    """
+    Clase que organiza la construcción de curvas por olas de dependencias y las ejecuta en un
+    pool de procesos
+    """
+    def __init__(self, builders, dependencies, logger, max_workers=None):
+        """
+        Params:
+            builders (dict): función de construcción por curva. Cada función debe estar definida a
+                nivel de módulo y recibir (curve, shared_inputs, upstream_results)
+            dependencies (dict): lista de curvas de las que depende cada curva. Las dependencias
+                que no se construyen en el conjunto se consideran publicadas previamente
+            logger (logging.Logger): logger del proceso
+            max_workers (int): número máximo de procesos del pool
+        """
+        self.builders = builders
+        self.dependencies = {curve: [dependency for dependency in dependencies.get(curve, []) if dependency in builders] for curve in builders}
+        self.logger = logger
+        self.max_workers = max_workers
+
+    def waves(self):
+        """
+        Agrupa las curvas en olas según el grafo de dependencias
+        Return:
+            waves (list): listas de curvas, cada una con las dependencias cubiertas por las olas anteriores
+        """
+        try:
+            pending = {curve: set(dependencies) for curve, dependencies in self.dependencies.items()}
+            waves = []
+            while pending:
+                wave = sorted(curve for curve, dependencies in pending.items() if not dependencies)
+                if not wave:
+                    raise ValueError(f"Dependencias circulares entre las curvas: {sorted(pending)}")
+                waves.append(wave)
+                for curve in wave:
+                    del pending[curve]
+                for dependencies in pending.values():
+                    dependencies.difference_update(wave)
+            return waves
+        except(Exception,):
+            self.logger.error(create_log_msg("Fallo la construcción de las olas de dependencias"))
+            raise PlataformError("No fue posible construir las olas de dependencias de las curvas")
+
+    def run(self, shared_inputs, persist):
+        """
+        Construye las curvas ola por ola. Las curvas de una misma ola se construyen en paralelo y sus
+        resultados se entregan juntos a la función de persistencia. Si una curva falla, las curvas que
+        dependen de ella no se construyen.
+        Params:
+            shared_inputs (dict): insumos compartidos por todas las curvas
+            persist (callable): función que recibe el diccionario curva -> resultado de cada ola
+        Return:
+            results (dict): resultado de cada curva construida
+            failed (dict): mensaje de error de cada curva que no se construyó
+        """
+        waves = self.waves()
+        results = {}
+        failed = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker, initargs=(shared_inputs,)) as executor:
+            for number, wave in enumerate(waves, start=1):
+                futures = {}
+                for curve in wave:
+                    failed_dependencies = [dependency for dependency in self.dependencies[curve] if dependency in failed]
+                    if failed_dependencies:
+                        failed[curve] = f"Falló la construcción de sus dependencias: {failed_dependencies}"
+                        continue
+                    upstream_results = {dependency: results[dependency] for dependency in self.dependencies[curve]}
+                    futures[curve] = executor.submit(_run_build, self.builders[curve], curve, upstream_results)
+                wave_results = {}
+                for curve, future in futures.items():
+                    try:
+                        wave_results[curve] = future.result()
+                    except(Exception,) as e:
+                        self.logger.error(create_log_msg(f"Fallo la construcción de la curva {curve}"))
+                        failed[curve] = getattr(e, "error_message", str(e))
+                if wave_results:
+                    try:
+                        persist(wave_results)
+                    except(Exception,) as e:
+                        self.logger.error(create_log_msg(f"Fallo la persistencia de la ola {number}"))
+                        for curve in wave_results:
+                            failed[curve] = getattr(e, "error_message", str(e))
+                        continue
+                    results.update(wave_results)
+                self.logger.info(f"Finaliza la ola {number} de {len(waves)}: {sorted(wave_results)}")
+        return results, failed
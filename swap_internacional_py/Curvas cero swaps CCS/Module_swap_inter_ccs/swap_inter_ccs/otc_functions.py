@@ -6,10 +6,11 @@ Created on Mon Feb 27 12:03:32 2023
 """
 
 import datetime as dt
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-from swap_inter_ccs.Interpolation import Interpol
-from swap_inter_ccs.DateUtils import DateUtils
+from swap_inter_ccs.Interpolation import FittedInterpol
+from swap_inter_ccs.DateUtils import DateUtils, BusinessCalendar
 from scipy import optimize
 from dateutil import relativedelta as rd
 
@@ -21,11 +22,45 @@ class curve_function():
     """
     Clase que contiene las funciones relacionadas a la construcción de curvas interpoladas
     """
+    # -----Attributes-----
+    # Class attributes
+    _interpolators_cache_size = 64
+    #--------------------
     def __init__(self, curve_nodes_tenors, curve_nodes_df, curve_tenors, interpolation_method):
         self.curve_nodes_tenors = curve_nodes_tenors
         self.curve_nodes_df = curve_nodes_df
         self.curve_tenors = curve_tenors
         self.interpolation_method = interpolation_method
+
+    @staticmethod
+    @lru_cache(maxsize=_interpolators_cache_size)
+    def _fitted_interpolator(x_nodes_bytes, interpolation_method):
+        """
+        Interpolador ajustado a los días de los nodos, guardado en una cache acotada a los
+        ultimos _interpolators_cache_size juegos de nodos y metodos de interpolación
+        Params:
+            x_nodes_bytes (bytes): días de los nodos como bytes de un arreglo float64
+            interpolation_method (str): metodo de interpolación
+        Return:
+            interpolator (FittedInterpol): Interpolador con valores de los nodos en cero
+        """
+        x_nodes = np.frombuffer(x_nodes_bytes)
+        return FittedInterpol(x_nodes, np.zeros(len(x_nodes)), interpolation_method)
+
+    def interpolate(self, x_nodes, y_nodes):
+        """
+        Interpola los valores de los nodos sobre los días de la curva. El interpolador ajustado a los días de
+        los nodos se guarda por metodo de interpolación, de modo que en las iteraciones del bootstrap solo se
+        actualizan los valores de los nodos.
+        Params:
+            x_nodes (numpy.ndarray): días de los nodos para interpolar
+            y_nodes (numpy.ndarray): valores de los nodos para interpolar
+        Return:
+            y_points (numpy.ndarray): valores interpolados sobre curve_tenors
+        """
+        x_nodes = np.asarray(x_nodes, dtype=float)
+        interpolator = self._fitted_interpolator(x_nodes.tobytes(), self.interpolation_method).refit(y_nodes)
+        return interpolator(self.curve_tenors)
     
     def curve_from_nominal_rates(self):
         """
@@ -40,7 +75,7 @@ class curve_function():
         """
         
         curve_nodes_rates = (1/self.curve_nodes_df-1)*360/self.curve_nodes_tenors
-        rates_curve = Interpol(self.curve_nodes_tenors, curve_nodes_rates, self.curve_tenors).method(self.interpolation_method)
+        rates_curve = self.interpolate(self.curve_nodes_tenors, curve_nodes_rates)
         curve = 1/(1+rates_curve*self.curve_tenors/360)
         return(curve)
     
@@ -57,7 +92,7 @@ class curve_function():
         """
         x_nodes = np.append(np.array([0]),self.curve_nodes_tenors)
         y_nodes = np.append(np.array([1]),self.curve_nodes_df)
-        df_curve = Interpol(x_nodes,y_nodes, self.curve_tenors).method(self.interpolation_method)
+        df_curve = self.interpolate(x_nodes, y_nodes)
         curve = df_curve
         return(curve)
     def curve_from_log_discount_factors(self):
@@ -74,7 +109,7 @@ class curve_function():
         curve_nodes_logdf = np.log(self.curve_nodes_df)
         x_nodes = np.append(np.array([0]),self.curve_nodes_tenors)
         y_nodes = np.append(np.array([0]),curve_nodes_logdf)
-        log_df_curve = Interpol(x_nodes,y_nodes, self.curve_tenors).method(self.interpolation_method)
+        log_df_curve = self.interpolate(x_nodes, y_nodes)
         curve = np.exp(log_df_curve)
         return(curve)
     
@@ -100,6 +135,111 @@ class curve_function():
             return case()
 
 
+class CashflowSchedule():
+    """
+    Clase que genera en una sola pasada las fechas de pago, tiempos entre cupones y marcas de ultimo pago
+    de todos los swaps de una curva, almacenados en arreglos planos. Cada fecha de mercado se ajusta una
+    sola vez aunque aparezca en el calendario de varios tenores y el cronograma queda en cache por fecha
+    de valoracion, convenciones y tenores para reprocesos dentro del mismo proceso. La cache conserva
+    solo los ultimos _cache_size cronogramas.
+    """
+    # -----Attributes-----
+    # Class attributes
+    _cache_size = 32
+    #--------------------
+    def __init__(self, trade_date, tenors, frequency, bullet_tenors, calendar, starting_day_convention,
+                 business_day_convention, daycount_convention, nested_frequency=False):
+        """
+        Params:
+            trade_date (datetime.date): Fecha de valoración
+            tenors (numpy.ndarray): Tenores de los swaps en el orden de construcción de la curva
+            frequency (str): Frecuencia de pago de los swaps no bullet
+            bullet_tenors (list): Tenores que pagan un unico cupon al vencimiento
+            calendar (list, BusinessCalendar): Calendario de dias habiles en formato datetime.date
+            starting_day_convention (str): Nombre de la convencion del dia de inicio
+            business_day_convention (str): Nombre de la convencion de dias habiles
+            daycount_convention (str): Nombre de la convencion de conteo de dias
+            nested_frequency (Boolean): Las fechas de cada tenor son las primeras del cronograma de la frecuencia
+                                        de pago (Opcional) False.
+        """
+        date_utils = DateUtils()
+        frequency_specs = date_utils.tenor_specs(frequency)
+        effective_date = date_utils.starting_date(trade_date, calendar, starting_day_convention)
+        adjusted_dates = {}
+        flows_dates = []
+        flows_tenor_index = []
+        seen_dates = set()
+        for tenor_index, tenor in enumerate(tenors):
+            tenor_frequency = tenor if tenor in bullet_tenors else frequency
+            tenor_frequency_specs = frequency_specs if nested_frequency else date_utils.tenor_specs(tenor_frequency)
+            tenor_count = self.tenor_count(date_utils.tenor_specs(tenor), date_utils.tenor_specs(tenor_frequency))
+            coupon_tenors = [str(x*tenor_frequency_specs["length"])+tenor_frequency_specs["period"] for x in range(1, tenor_count+1)]
+            tenor_dates = [effective_date]
+            for coupon_tenor in coupon_tenors:
+                if coupon_tenor not in adjusted_dates:
+                    adjusted_dates[coupon_tenor] = date_utils.business_date(
+                        date_utils.add_tenor(effective_date, coupon_tenor), calendar, business_day_convention)
+                tenor_dates.append(adjusted_dates[coupon_tenor])
+            if tenor_index > 0:
+                tenor_dates = [x for x in tenor_dates if x not in seen_dates]
+            if not tenor_dates:
+                msg = 'El tenor %s no tiene flujos nuevos respecto a los tenores anteriores' % tenor
+                raise ValueError(msg)
+            seen_dates.update(tenor_dates)
+            flows_dates.extend(tenor_dates)
+            flows_tenor_index.extend([tenor_index]*len(tenor_dates))
+
+        self.trade_date = trade_date
+        self.tenor_index = np.array(flows_tenor_index)
+        self.tenors = np.array(tenors)[self.tenor_index]
+        self.dates = np.array(flows_dates)
+        self.days = np.array([x.days for x in self.dates-trade_date])
+        accrual_start = np.append(np.array([trade_date]), self.dates[:-1])
+        self.coupon_time = date_utils.day_count_array(accrual_start, self.dates, daycount_convention, calendar)
+        self.last_payment = np.append(self.tenor_index[1:] != self.tenor_index[:-1], True)
+        for flows_array in (self.tenor_index, self.tenors, self.dates, self.days, self.coupon_time, self.last_payment):
+            flows_array.flags.writeable = False
+
+    @staticmethod
+    def tenor_count(tenor_specs, frequency_specs):
+        """
+        Calcula el numero de cupones de un tenor dada la frecuencia de pago
+        Params:
+            tenor_specs (dict): Periodo y longitud del tenor
+            frequency_specs (dict): Periodo y longitud de la frecuencia de pago
+        Return:
+            tenor_count (int): Numero de cupones
+        """
+        if (tenor_specs["period"] == frequency_specs["period"]):
+            return int(tenor_specs["length"]/frequency_specs["length"])
+        elif (tenor_specs["period"] == "Y" and frequency_specs["period"] == "M"):
+            return int(tenor_specs["length"]*12/frequency_specs["length"])
+        msg = 'La frecuencia %s%s no es compatible con el tenor %s%s' % (
+            frequency_specs["length"], frequency_specs["period"], tenor_specs["length"], tenor_specs["period"])
+        raise ValueError(msg)
+
+    @classmethod
+    def build(cls, trade_date, tenors, frequency, bullet_tenors, calendar, starting_day_convention,
+              business_day_convention, daycount_convention, nested_frequency=False):
+        """
+        Entrega el cronograma de flujos desde la cache o lo genera si no existe para los parametros dados
+        Params:
+            Los mismos del constructor de la clase
+        Return:
+            schedule (CashflowSchedule): Cronograma de flujos de los swaps de la curva
+        """
+        return cls._cached_build(trade_date, tuple(tenors), frequency, tuple(bullet_tenors),
+                                 BusinessCalendar.build(calendar), starting_day_convention, business_day_convention,
+                                 daycount_convention, nested_frequency)
+
+    @classmethod
+    @lru_cache(maxsize=_cache_size)
+    def _cached_build(cls, trade_date, tenors, frequency, bullet_tenors, calendar, starting_day_convention,
+                      business_day_convention, daycount_convention, nested_frequency):
+        return cls(trade_date, tenors, frequency, bullet_tenors, calendar, starting_day_convention,
+                   business_day_convention, daycount_convention, nested_frequency)
+
+
 class forward_functions():
     """
     Clase que contiene las funciones relacionadas a futuros y forwards
@@ -206,6 +346,7 @@ class swap_functions():
         self.curves_characteristics=curves_characteristics
         self.interest_rates_characteristics = interest_rates_characteristics
         self.calendar = calendar
+        self.business_calendar = BusinessCalendar(calendar)
         self.logger = logger
     # -----Attributes-----
 
@@ -280,7 +421,7 @@ class swap_functions():
             swap_characteristics = self.swaps_characteristics.loc[np.where(self.swaps_characteristics["swap_curve"]==swap_curve)].reset_index(drop=True)
             swap_business_day_convention = swap_characteristics["business_day_convention"][0]
             swap_starting_type_convention = swap_characteristics["start_type"][0]        
-            swap_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            swap_business_day_calendar=self.business_calendar
             swap_daycount_convention = swap_characteristics["daycount_convention"][0]
             bullet_tenors = swap_characteristics["bullet_tenors"][0].split(',')
             frequency_payment = swap_characteristics["buyer_leg_frequency_payment"][0]
@@ -290,7 +431,7 @@ class swap_functions():
             on_business_day_convention = interest_rate_characteristics["business_day_convention"][0]
             on_tenor = interest_rate_characteristics["tenor"][0]
             on_starting_type_convention = interest_rate_characteristics["start_type"][0]
-            on_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            on_business_day_calendar=self.business_calendar
             on_daycount_convention = interest_rate_characteristics["daycount_convention"][0]
     
             #ON handling
@@ -312,30 +453,10 @@ class swap_functions():
             
             self.logger.info(create_log_msg(self._flows_log_message))
             #Cashflow handling
-            swap_table = pd.DataFrame()
-            swap_last_dates=np.array([])
-            last_payment_date=None
-    
-            for swap_tenor in swap_tenors:
-                #Looping though swap tenors
-                swap_rate = swap_rates[np.where(swap_tenors==swap_tenor)][0]
-                frequency = swap_tenor if swap_tenor in bullet_tenors else frequency_payment
-                swap_dates = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)
-                if not swap_table.empty:
-                    swap_dates=swap_dates[np.where(np.logical_not(pd.Series(swap_dates).isin(swap_last_dates)))]
-                swap_last_dates=np.append(swap_last_dates,swap_dates)
-                swap_days = [x.days for x in (swap_dates-trade_date)]
-                
-                if swap_table.empty:
-                    default_date=trade_date
-                else:
-                    default_date=last_payment_date
-                coupon_time = [DateUtils().day_count(default_date,swap_dates[0],swap_daycount_convention)]+[DateUtils().day_count(swap_dates[i-1],swap_dates[i],swap_daycount_convention) for i in range(1,len(swap_dates))]
-                last_payment_date=swap_dates[-1]
-                last_payment=np.append(np.repeat(False, len(coupon_time)-1),True)
-                
-                swap_table = pd.concat([swap_table, pd.DataFrame({"swap_tenor":swap_tenor, "swap_rate":swap_rate, "swap_days":pd.Series(swap_days), "coupon_time":pd.Series(coupon_time),"last_payment":last_payment})])
-            swap_table.reset_index(drop=True,inplace=True)
+            schedule = CashflowSchedule.build(trade_date, swap_tenors, frequency_payment, bullet_tenors, swap_business_day_calendar,
+                                              swap_starting_type_convention, swap_business_day_convention, swap_daycount_convention)
+            swap_table = pd.DataFrame({"swap_tenor":schedule.tenors, "swap_rate":swap_rates[schedule.tenor_index], "swap_days":schedule.days,
+                                       "coupon_time":schedule.coupon_time, "last_payment":schedule.last_payment})
             if discount_curve is not None:
                 swap_table["discount_curve"]=discount_curve[swap_table["swap_days"]-1].reset_index(drop=True)
             self.logger.info(create_log_msg(f'Inicia el proceso de optimizacion de la curva {swap_curve}'))
@@ -469,13 +590,12 @@ class swap_functions():
             swap_characteristics = self.swaps_characteristics.loc[np.where(self.swaps_characteristics["swap_curve"]==swap_curve)].reset_index(drop=True)
             swap_business_day_convention = swap_characteristics["business_day_convention"][0]
             swap_starting_type_convention = swap_characteristics["start_type"][0]           
-            swap_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            swap_business_day_calendar=self.business_calendar
             swap_daycount_convention = swap_characteristics["daycount_convention"][0]
             bullet_tenors = swap_characteristics["bullet_tenors"][0].split(',')
             on_the_run_tenors=swap_characteristics["on_the_run_tenors"][0].split(',')
             frequency_payment_buyer = swap_characteristics["buyer_leg_frequency_payment"][0]
             frequency_payment_seller = swap_characteristics["seller_leg_frequency_payment"][0]
-            eq_freq= frequency_payment_buyer==frequency_payment_seller
 
             #Swap handling
             swap_tenors = swaps_info.loc[np.isin(swaps_info["tenor"],on_the_run_tenors),"tenor"].values
@@ -489,46 +609,14 @@ class swap_functions():
              
             self.logger.info(create_log_msg(self._flows_log_message))
             #Cashflow handling
-            swap_table = pd.DataFrame()
-            swap_last_dates_buyer=np.array([])
-            swap_last_dates_seller=np.array([])
-            last_payment_date_buyer=None
-            last_payment_date_seller=None
-            
-            for swap_tenor in swap_tenors:
-                #Looping though swap tenors
-                swap_rate = swap_rates[np.where(swap_tenors==swap_tenor)][0]
-                frequency_buyer = swap_tenor if swap_tenor in bullet_tenors else frequency_payment_buyer
-                frequency_seller = swap_tenor if swap_tenor in bullet_tenors else frequency_payment_seller
-                if eq_freq:
-                    swap_dates_buyer= swap_dates_seller = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency_buyer, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)    
-                else:
-                    swap_dates_buyer = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency_buyer, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)
-                    swap_dates_seller = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency_seller, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)
-                if not swap_table.empty:
-                    swap_dates_buyer=swap_dates_buyer[np.where(np.logical_not(pd.Series(swap_dates_buyer).isin(swap_last_dates_buyer)))]
-                    swap_dates_seller=swap_dates_seller[np.where(np.logical_not(pd.Series(swap_dates_seller).isin(swap_last_dates_seller)))]
-                swap_last_dates_buyer=np.append(swap_last_dates_buyer,swap_dates_buyer)
-                swap_last_dates_seller=np.append(swap_last_dates_seller,swap_dates_seller)
-                
-            
-                swap_days_seller = [x.days for x in (swap_dates_seller-trade_date)]
-                
-                if swap_table.empty:
-                    default_date_buyer=trade_date
-                    default_date_seller=trade_date
-                else:
-                    default_date_buyer=last_payment_date_buyer
-                    default_date_seller=last_payment_date_seller
-                
-                coupon_time_buyer = [DateUtils().day_count(default_date_buyer,swap_dates_buyer[0],swap_daycount_convention)]+[DateUtils().day_count(swap_dates_buyer[i-1],swap_dates_buyer[i],swap_daycount_convention) for i in range(1,len(swap_dates_buyer))]
-                coupon_time_seller = [DateUtils().day_count(default_date_seller,swap_dates_seller[0],swap_daycount_convention)]+[DateUtils().day_count(swap_dates_seller[i-1],swap_dates_seller[i],swap_daycount_convention) for i in range(1,len(swap_dates_seller))]
-                last_payment_date_buyer=swap_dates_buyer[-1]
-                last_payment_date_seller=swap_dates_seller[-1]
-                last_payment=np.append(np.repeat(False, len(coupon_time_buyer)-1),True)
-                
-                swap_table = pd.concat([swap_table, pd.DataFrame({"swap_tenor":swap_tenor, "swap_rate":swap_rate, "swap_days":pd.Series(swap_days_seller), "coupon_time_buyer":pd.Series(coupon_time_buyer), "coupon_time_seller":pd.Series(coupon_time_seller),"last_payment":last_payment})])
-            swap_table.reset_index(drop=True,inplace=True)
+            schedule_buyer = CashflowSchedule.build(trade_date, swap_tenors, frequency_payment_buyer, bullet_tenors, swap_business_day_calendar,
+                                                    swap_starting_type_convention, swap_business_day_convention, swap_daycount_convention)
+            schedule_seller = CashflowSchedule.build(trade_date, swap_tenors, frequency_payment_seller, bullet_tenors, swap_business_day_calendar,
+                                                     swap_starting_type_convention, swap_business_day_convention, swap_daycount_convention)
+            if not np.array_equal(schedule_buyer.tenor_index, schedule_seller.tenor_index):
+                raise ValueError('Las patas del swap no tienen el mismo numero de flujos por tenor')
+            swap_table = pd.DataFrame({"swap_tenor":schedule_seller.tenors, "swap_rate":swap_rates[schedule_seller.tenor_index], "swap_days":schedule_seller.days,
+                                       "coupon_time_buyer":schedule_buyer.coupon_time, "coupon_time_seller":schedule_seller.coupon_time, "last_payment":schedule_buyer.last_payment})
             swap_table["foreing_discount_curve"] = 1/(1+discount_curve_for[swap_table["swap_days"].values-1]*swap_table["swap_days"].values/360)
             swap_table["foreing_projection_curve"] = 1/(1+projection_curve_for[swap_table["swap_days"].values-1]*swap_table["swap_days"].values/360)
             
@@ -633,13 +721,12 @@ class swap_functions():
             swap_characteristics = self.swaps_characteristics.loc[np.where(self.swaps_characteristics["swap_curve"]==swap_curve)].reset_index(drop=True)
             swap_business_day_convention = swap_characteristics["business_day_convention"][0]
             swap_starting_type_convention = swap_characteristics["start_type"][0]            
-            swap_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            swap_business_day_calendar=self.business_calendar
             swap_daycount_convention = swap_characteristics["daycount_convention"][0]
             bullet_tenors = swap_characteristics["bullet_tenors"][0].split(',')
             on_the_run_tenors=swap_characteristics["on_the_run_tenors"][0].split(',')
             frequency_payment_buyer = swap_characteristics["buyer_leg_frequency_payment"][0]
             frequency_payment_seller = swap_characteristics["seller_leg_frequency_payment"][0]
-            eq_freq= frequency_payment_buyer==frequency_payment_seller
             
             effective_date = DateUtils().starting_date(trade_date, swap_business_day_calendar,swap_starting_type_convention)
             
@@ -684,44 +771,15 @@ class swap_functions():
                 implied_rate_curve = ((1+discount_curve_for[fwd_days-1]*fwd_days/360)/(1+fwd_points.iloc[:swap_tenor_days[0]-1,1]/spot_pair_1*spot_pair_2)-1)*360/fwd_days
             self.logger.info(create_log_msg(self._flows_log_message))
             #Cashflow handling
-            swap_table = pd.DataFrame()
-            swap_last_dates_buyer=np.array([])
-            swap_last_dates_seller=np.array([])
-            last_payment_date_buyer=None
-            last_payment_date_seller=None
-            
-            for swap_tenor in swap_tenors:
-                #Looping though swap tenors
-                swap_basis = swaps_basis[np.where(swap_tenors==swap_tenor)][0]
-                frequency_buyer = swap_tenor if swap_tenor in bullet_tenors else frequency_payment_buyer
-                frequency_seller = swap_tenor if swap_tenor in bullet_tenors else frequency_payment_seller
-                if eq_freq:
-                    swap_dates_buyer= swap_dates_seller = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency_buyer, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)    
-                else:
-                    swap_dates_buyer = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency_buyer, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)
-                    swap_dates_seller = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency_seller, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)
-                if not swap_table.empty:
-                    swap_dates_buyer=swap_dates_buyer[np.where(np.logical_not(pd.Series(swap_dates_buyer).isin(swap_last_dates_buyer)))]
-                    swap_dates_seller=swap_dates_seller[np.where(np.logical_not(pd.Series(swap_dates_seller).isin(swap_last_dates_seller)))]
-                swap_last_dates_buyer=np.append(swap_last_dates_buyer,swap_dates_buyer)
-                swap_last_dates_seller=np.append(swap_last_dates_seller,swap_dates_seller)
-                
-                swap_days_buyer = [x.days for x in (swap_dates_buyer-trade_date)]
-                
-                
-                if swap_table.empty:
-                    default_date_buyer=trade_date
-                    default_date_seller=trade_date
-                else:
-                    default_date_buyer=last_payment_date_buyer
-                    default_date_seller=last_payment_date_seller
-                
-                coupon_time_buyer = [DateUtils().day_count(default_date_buyer,swap_dates_buyer[0],swap_daycount_convention)]+[DateUtils().day_count(swap_dates_buyer[i-1],swap_dates_buyer[i],swap_daycount_convention) for i in range(1,len(swap_dates_buyer))]
-                coupon_time_seller = [DateUtils().day_count(default_date_seller,swap_dates_seller[0],swap_daycount_convention)]+[DateUtils().day_count(swap_dates_seller[i-1],swap_dates_seller[i],swap_daycount_convention) for i in range(1,len(swap_dates_seller))]
-                last_payment_date_buyer=swap_dates_buyer[-1]
-                last_payment_date_seller=swap_dates_seller[-1]
-                last_payment=np.append(np.repeat(False, len(coupon_time_buyer)-1),True)
-                swap_table = pd.concat([swap_table, pd.DataFrame({"swap_tenor":swap_tenor, "swap_basis":swap_basis, "swap_days":pd.Series(swap_days_buyer), "coupon_time_buyer":pd.Series(coupon_time_buyer), "coupon_time_seller":pd.Series(coupon_time_seller),"last_payment":last_payment})])
+            schedule_buyer = CashflowSchedule.build(trade_date, swap_tenors, frequency_payment_buyer, bullet_tenors, swap_business_day_calendar,
+                                                    swap_starting_type_convention, swap_business_day_convention, swap_daycount_convention)
+            schedule_seller = CashflowSchedule.build(trade_date, swap_tenors, frequency_payment_seller, bullet_tenors, swap_business_day_calendar,
+                                                     swap_starting_type_convention, swap_business_day_convention, swap_daycount_convention)
+            if not np.array_equal(schedule_buyer.tenor_index, schedule_seller.tenor_index):
+                raise ValueError('Las patas del swap no tienen el mismo numero de flujos por tenor')
+            swap_table = pd.DataFrame({"swap_tenor":schedule_buyer.tenors, "swap_basis":swaps_basis[schedule_buyer.tenor_index], "swap_days":schedule_buyer.days,
+                                       "coupon_time_buyer":schedule_buyer.coupon_time, "coupon_time_seller":schedule_seller.coupon_time, "last_payment":schedule_buyer.last_payment})
+
      
             projection_curve_for_t2=projection_curve_for*on_value_seller_t2
             projection_curve_dom_t2=projection_curve_dom*on_value_buyer_t2
@@ -756,7 +814,7 @@ class swap_functions():
             swap_characteristics = self.swaps_characteristics.loc[np.where(self.swaps_characteristics["swap_curve"]==swap_curve)].reset_index(drop=True)
             swap_business_day_convention = swap_characteristics["business_day_convention"][0]
             swap_starting_type_convention = swap_characteristics["start_type"][0]            
-            swap_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            swap_business_day_calendar=self.business_calendar
             on_the_run_tenors=swap_characteristics["on_the_run_tenors"][0].split(',')
             used_swaps_info=swaps_info.loc[np.isin(swaps_info["tenor"],on_the_run_tenors)].reset_index(drop=True)
             swap_tenor_dates=[DateUtils().tenor_date(
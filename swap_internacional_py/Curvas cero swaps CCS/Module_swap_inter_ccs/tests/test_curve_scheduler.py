@@ -0,0 +1,113 @@
+"""
+Pruebas de CurveScheduler: las curvas se agrupan en olas según el grafo de
+dependencias (OIS antes que CCS y CCS antes que basis), cada curva recibe los
+resultados de sus dependencias, cada ola se persiste una sola vez y, cuando una
+curva falla, solo dejan de construirse las curvas que dependen de ella.
+
+Las funciones de construcción se definen a nivel de módulo para que el pool de
+procesos las pueda serializar. precia_utils se toma del wheel de la carpeta del
+Glue Job, como en --extra-py-files
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+MODULE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(MODULE_DIR))
+sys.path.insert(0, str(MODULE_DIR.parent / "precia_utils-0.2-py3-none-any.whl"))
+
+from precia_utils.precia_exceptions import PlataformError
+from swap_inter_ccs.curve_scheduler import CurveScheduler
+
+DEPENDENCIES = {
+    "SwapCC_USDOIS": [],
+    "SwapCC_EUROIS": [],
+    "USDPEN": ["SwapCC_USDOIS"],
+    "EURUSD": ["SwapCC_USDOIS", "SwapCC_EUROIS"],
+    "Basis_EURUSD": ["EURUSD"],
+}
+logger = logging.getLogger(__name__)
+
+
+def build_curve(curve, shared_inputs, upstream_results):
+    """Nivel de la curva: el de sus insumos más la suma de los de sus dependencias"""
+    if curve in shared_inputs.get("failing", []):
+        raise PlataformError(f"No fue posible construir la curva {curve}")
+    return shared_inputs["levels"][curve] + sum(upstream_results.values())
+
+
+def shared_inputs(failing=()):
+    levels = {curve: float(number) for number, curve in enumerate(DEPENDENCIES, start=1)}
+    return {"levels": levels, "failing": list(failing)}
+
+
+def test_waves_follow_the_dependency_graph():
+    # USDCLP depende de una curva que no se construye en el conjunto: se considera publicada
+    dependencies = dict(DEPENDENCIES, USDCLP=["SwapCC_USDOIS", "SwapCC_Camara"])
+    scheduler = CurveScheduler({curve: build_curve for curve in dependencies}, dependencies, logger)
+
+    assert scheduler.waves() == [
+        ["SwapCC_EUROIS", "SwapCC_USDOIS"],
+        ["EURUSD", "USDCLP", "USDPEN"],
+        ["Basis_EURUSD"],
+    ]
+
+
+def test_circular_dependencies_raise():
+    dependencies = {"EURUSD": ["Basis_EURUSD"], "Basis_EURUSD": ["EURUSD"]}
+    scheduler = CurveScheduler({curve: build_curve for curve in dependencies}, dependencies, logger)
+
+    with pytest.raises(PlataformError):
+        scheduler.waves()
+
+
+def test_run_builds_wave_by_wave_with_upstream_results():
+    scheduler = CurveScheduler({curve: build_curve for curve in DEPENDENCIES}, DEPENDENCIES, logger, max_workers=2)
+    persisted = []
+
+    results, failed = scheduler.run(shared_inputs(), lambda wave_results: persisted.append(dict(wave_results)))
+
+    assert failed == {}
+    assert results == {
+        "SwapCC_USDOIS": 1.0,
+        "SwapCC_EUROIS": 2.0,
+        "USDPEN": 3.0 + 1.0,
+        "EURUSD": 4.0 + 1.0 + 2.0,
+        "Basis_EURUSD": 5.0 + 7.0,
+    }
+    # Una persistencia por ola, en el orden del grafo
+    assert [sorted(wave_results) for wave_results in persisted] == [
+        ["SwapCC_EUROIS", "SwapCC_USDOIS"],
+        ["EURUSD", "USDPEN"],
+        ["Basis_EURUSD"],
+    ]
+
+
+def test_failed_curve_only_stops_its_dependents():
+    scheduler = CurveScheduler({curve: build_curve for curve in DEPENDENCIES}, DEPENDENCIES, logger, max_workers=2)
+    persisted = []
+
+    results, failed = scheduler.run(shared_inputs(failing=["SwapCC_EUROIS"]), lambda wave_results: persisted.append(sorted(wave_results)))
+
+    assert sorted(results) == ["SwapCC_USDOIS", "USDPEN"]
+    assert failed["SwapCC_EUROIS"] == "No fue posible construir la curva SwapCC_EUROIS"
+    assert "SwapCC_EUROIS" in failed["EURUSD"]
+    assert "EURUSD" in failed["Basis_EURUSD"]
+    assert persisted == [["SwapCC_USDOIS"], ["USDPEN"]]
+
+
+def test_failed_persistence_fails_the_wave_and_its_dependents():
+    scheduler = CurveScheduler({curve: build_curve for curve in DEPENDENCIES}, DEPENDENCIES, logger, max_workers=2)
+
+    def persist(wave_results):
+        if "EURUSD" in wave_results:
+            raise PlataformError("Fallo la publicación de la ola")
+
+    results, failed = scheduler.run(shared_inputs(), persist)
+
+    assert sorted(results) == ["SwapCC_EUROIS", "SwapCC_USDOIS"]
+    assert failed["EURUSD"] == failed["USDPEN"] == "Fallo la publicación de la ola"
+    assert "EURUSD" in failed["Basis_EURUSD"]
@@ -1,10 +1,14 @@
 """El siguiente script contiene clases que permiten la construcción
 de las curvas ccs: USDPEN, USDCLP, EURUSD a partir de la metodología
+Requiere en --extra-py-files swap_inter_ccs-0.2-py3-none-any.whl (Module_swap_inter_ccs) y
+precia_utils-0.2-py3-none-any.whl (se construye desde Supplies_py/precia_utils)
+Parametro opcional --S3_CURVE_CACHE_BUCKET: bucket del cache de curvas en S3 (sin el parametro no se usa cache)
 """
 import boto3
 import json
 import logging
 from datetime import datetime
+from sys import argv
 
 import pandas as pd
 import sqlalchemy as sa
@@ -13,12 +17,45 @@ from precia_utils.precia_logger import setup_logging, create_log_msg
 from precia_utils.precia_aws import get_params, get_secret
 from precia_utils.precia_exceptions import PlataformError
 from precia_utils import precia_sftp
+from precia_utils.precia_cache import CurveCache
 from swap_inter_ccs.otc_functions import swap_functions
+from swap_inter_ccs.curve_scheduler import CurveScheduler
 from common_library_email_report.ReportEmail import ReportEmail
 
 
 logger = setup_logging(logging.INFO)
 parameter_store_name = "/ps-otc-lambda-reports"
+# Cache en S3 de las curvas construidas, compartido entre ejecuciones. METHODOLOGY_VERSION hace parte
+# de la llave del cache y se debe actualizar con cada cambio de swap_inter_ccs que modifique las curvas
+CURVE_CACHE_PREFIX = "otc_curve_cache/cross"
+METHODOLOGY_VERSION = "swap_inter_ccs-0.2"
+# Curvas publicadas por otros procesos de las que depende cada curva cross. En un conjunto de
+# curvas las dependencias son la primera ola del grafo (se cargan en paralelo una sola vez) y las
+# curvas cross la segunda; si una dependencia no está disponible solo fallan las curvas que la usan
+CROSS_CURVE_DEPENDENCIES = {
+    "USDPEN": ["SwapCC_USDOIS"],
+    "USDCLP": ["SwapCC_USDOIS", "SwapCC_Camara"],
+    "EURUSD": ["SwapCC_USDOIS", "SwapCC_EUROIS"],
+    "USDJPY": ["SwapCC_USDOIS", "SwapCC_JPYOIS"],
+}
+# Atributo de ETL en el que se asigna cada curva de CROSS_CURVE_DEPENDENCIES
+DEPENDENCY_INPUTS = {
+    "SwapCC_USDOIS": "df_swap_inter_cc_usdois",
+    "SwapCC_Camara": "df_swapcc_camara_daliy",
+    "SwapCC_EUROIS": "df_swapcc_estr_daliy",
+    "SwapCC_JPYOIS": "df_swapcc_jpyois_daliy",
+}
+
+
+def curve_cache_from_params():
+    """
+    Crea el cache de curvas en el bucket del parametro opcional S3_CURVE_CACHE_BUCKET del glue.
+    Si el job no tiene el parametro el cache queda deshabilitado y las curvas siempre se construyen
+    """
+    bucket = None
+    if "--S3_CURVE_CACHE_BUCKET" in argv:
+        bucket = get_params(["S3_CURVE_CACHE_BUCKET"])["S3_CURVE_CACHE_BUCKET"]
+    return CurveCache(bucket, CURVE_CACHE_PREFIX, METHODOLOGY_VERSION)
 
 
 class ExtratorDataDb:
@@ -372,15 +409,27 @@ class Loader:
 
 class ETL:
     """Representa la orquestación de la ETL"""
-    def __init__(self, url_publish_otc: str, url_sirius: str, url_process_otc: str, url_precia_utils: str) -> None:
+    # Información extraída que necesita transform_data y curvas que genera
+    input_names = [
+        "df_swaps_characteristics", "df_curves_characteristics", "df_interest_rates_characteristics",
+        "df_calendar_dates", "df_fwd_inter_daily", "df_fwd_inter_nodes", "df_swap_inter_cc_usdois",
+        "df_swapcc_camara_daliy", "df_swapcc_estr_daliy", "df_swapcc_jpyois_daliy", "df_exchange_rate",
+        "df_swap_inter"
+    ]
+    output_names = ["swapcc_diaria", "swapcc_nodos", "curva_par"]
+
+    def __init__(self, url_publish_otc: str, url_sirius: str, url_process_otc: str, url_precia_utils: str, curve: str = None) -> None:
         self.url_sirius = url_sirius
         self.url_publish_otc = url_publish_otc
         self.url_process_otc = url_process_otc
         self.url_precia_utils = url_precia_utils
-        curve_param = get_params(["CURVE"])
-        self.curve = curve_param["CURVE"]
+        if curve is None:
+            curve_param = get_params(["CURVE"])
+            curve = curve_param["CURVE"]
+        self.curve = curve
         valuation_date_param = get_params(["VALUATION_DATE"])
         self.valuation_date = valuation_date_param["VALUATION_DATE"]
+        self.curve_cache = curve_cache_from_params()
         self.report_process = {
           "input_id": "SwapCC_"+self.curve,
           "output_id":"SwapCC_"+self.curve,
@@ -396,8 +445,14 @@ class ETL:
         }
 
 
-    def extract_data(self):
-        """Orquesta la extracción de la informacion de la clase ExtratorDataDb"""
+    def extract_data(self, shared_inputs: dict = None, extract_dependencies: bool = True):
+        """Orquesta la extracción de la informacion de la clase ExtratorDataDb. Cuando se construyen
+        varias curvas, shared_inputs guarda la informacion común (características de las tasas y
+        calendarios) para consultarla una sola vez y las curvas de CROSS_CURVE_DEPENDENCIES no se
+        extraen (extract_dependencies=False) porque las carga la primera ola de CurveSetETL
+        """
+        if shared_inputs is None:
+            shared_inputs = {}
         logger.info("Comienza la extraccion de informacion de base de datos...")
         self.calendar_curve_swap = {
             "USDPEN": ["peruvian_calendar", "federal_reserve_calendar"],
@@ -410,9 +465,14 @@ class ETL:
             self.db_handler_utils.connect_db()
             self.df_swaps_characteristics = self.db_handler_utils.get_data_swaps_characteristics("SwapCC_"+self.curve)
             self.df_curves_characteristics = self.db_handler_utils.get_data_curves_characteristics("SwapCC_"+self.curve)
-            self.df_interest_rates_characteristics = self.db_handler_utils.get_data_interest_rates_characteristics()
+            if "interest_rates_characteristics" not in shared_inputs:
+                shared_inputs["interest_rates_characteristics"] = self.db_handler_utils.get_data_interest_rates_characteristics()
+            self.df_interest_rates_characteristics = shared_inputs["interest_rates_characteristics"]
             if self.curve in self.calendar_curve_swap.keys():
-                self.df_calendar_dates = self.db_handler_utils.get_data_calendars(self.calendar_curve_swap[self.curve])
+                calendar_key = "calendar_" + "_".join(self.calendar_curve_swap[self.curve])
+                if calendar_key not in shared_inputs:
+                    shared_inputs[calendar_key] = self.db_handler_utils.get_data_calendars(self.calendar_curve_swap[self.curve])
+                self.df_calendar_dates = shared_inputs[calendar_key]
             self.db_handler_utils.disconnect_db()
         except PlataformError as e:
             logger.error(create_log_msg(e.error_message))
@@ -423,13 +483,9 @@ class ETL:
             self.db_handler_pub.connect_db()
             self.df_fwd_inter_daily = self.db_handler_pub.get_data_fwd_inter_daily(self.curve)
             self.df_fwd_inter_nodes = self.db_handler_pub.get_data_fwd_inter_nodes(self.curve)
-            self.df_swap_inter_cc_usdois = self.db_handler_pub.get_data_swap_inter_cc_daliy("SwapCC_USDOIS")
-            if self.curve == "USDCLP":
-                self.df_swapcc_camara_daliy = self.db_handler_pub.get_data_swap_inter_cc_daliy("SwapCC_Camara")
-            elif self.curve == "EURUSD":
-                self.df_swapcc_estr_daliy = self.db_handler_pub.get_data_swap_inter_cc_daliy("SwapCC_EUROIS")
-            elif self.curve == "USDJPY":
-                self.df_swapcc_jpyois_daliy = self.db_handler_pub.get_data_swap_inter_cc_daliy("SwapCC_JPYOIS")
+            if extract_dependencies:
+                for dependency in CROSS_CURVE_DEPENDENCIES[self.curve]:
+                    setattr(self, DEPENDENCY_INPUTS[dependency], self.db_handler_pub.get_data_swap_inter_cc_daliy(dependency))
             self.db_handler_pub.disconnect_db()
         except PlataformError as e:
             logger.error(create_log_msg(e.error_message))
@@ -465,12 +521,33 @@ class ETL:
             raise PlataformError(e.error_message)
 
 
+    def get_inputs(self):
+        """Retorna la información extraída por extract_data"""
+        return {name: getattr(self, name) for name in self.input_names if hasattr(self, name)}
+
+
+    def set_data(self, data: dict):
+        """Asigna la información extraída o las curvas generadas previamente"""
+        for name, value in data.items():
+            setattr(self, name, value)
+
+
+    def get_outputs(self):
+        """Retorna las curvas generadas por transform_data"""
+        return {name: getattr(self, name) for name in self.output_names}
+
+
     def transform_data(self):
         """Orquesta la construcción de las curvas ccs"""
         trade_date = datetime.strptime(self.valuation_date,'%Y-%m-%d').date()
         swap_class = swap_functions(self.df_swaps_characteristics, self.df_curves_characteristics, self.df_interest_rates_characteristics, self.df_calendar_dates["dates_calendar"].astype(str), logger)
-        
-        if self.curve == 'USDPEN':
+        # Las curvas se reutilizan del cache cuando los insumos no cambiaron
+        cache_key = self.curve_cache.key(self.curve, self.valuation_date, *[part for item in sorted(self.get_inputs().items()) for part in item])
+        cached_curves = self.curve_cache.get(cache_key)
+
+        if cached_curves is not None:
+            self.set_data(cached_curves)
+        elif self.curve == 'USDPEN':
             try:
                 self.swapcc_nodos, self.swapcc_diaria = swap_class.ccs_curve("SwapCC_USDPEN", trade_date, self.df_swap_inter, self.df_fwd_inter_daily, 
                                                                                         self.df_exchange_rate, self.df_swap_inter_cc_usdois["rate"].values,
@@ -523,6 +600,9 @@ class ETL:
                 update_report_process("Fallido", e.error_message, str(e))
                 raise PlataformError(e.error_message)
 
+        if cached_curves is None:
+            self.curve_cache.put(cache_key, self.get_outputs())
+
         # Columnas adicionales para inserción en base de datos
         self.swapcc_diaria["valuation_date"] = self.valuation_date
         self.swapcc_diaria["curve"] = "SwapCC_"+self.curve
@@ -539,14 +619,25 @@ class ETL:
 
     def load_info(self, data_connection_sftp, route_swap):
         """Orquesta la generación de archivos y la inserción a la base de datos de Swap Inter - CCS"""
-        report_cross = {
-            'product': ["Swap Inter Cross"],
-            'input_name':["SwapCC_"+self.curve],
-            'status_process':["successful"],
-            'valuation_date':[self.valuation_date]
-        }
-        
         logger.info(f"Comienza la generación de archivos y la inserción a bd para la curva: {self.curve}")
+        self.load_files(data_connection_sftp, route_swap)
+        # Inserción en base de datos
+        try:
+            self.db_loader_pub = ExtratorDataDb(self.url_publish_otc, self.valuation_date)
+            self.db_loader_pub.connect_db()
+            self.publish_info(self.db_loader_pub)
+            self.db_loader_pub.disconnect_db()
+        except PlataformError as e:
+            logger.error(create_log_msg(e.error_message))
+            self.send_error_email(e.error_message)
+            raise PlataformError(e.error_message)
+        logger.info("Finaliza la creación de los archivos y la inserción en la base de datos exitosamente")
+        self.report_dependencies()
+        update_report_process("Exitoso", "Proceso Finalizado", "")
+
+
+    def load_files(self, data_connection_sftp, route_swap):
+        """Genera los archivos de la curva en el SFTP de Swap Inter - CCS"""
         sufix_nodos_name = "_Nodos_fecha.txt".replace("fecha", self.valuation_date.replace("-", ""))
         sufix_diaria_name = "_Diaria_fecha.txt".replace("fecha", self.valuation_date.replace("-", ""))
         loader = Loader(data_connection_sftp, route_swap)
@@ -568,31 +659,33 @@ class ETL:
             raise PlataformError(e.error_message)
         finally:
             loader.disconnect_sftp()
-        # Inserción en base de datos
-        try:
-            self.db_loader_pub = ExtratorDataDb(self.url_publish_otc, self.valuation_date)
-            self.db_loader_pub.connect_db()
-            self.db_loader_pub.disable_previous_info("pub_otc_inter_swap_cross_daily", self.valuation_date, "SwapCC_"+self.curve)
-            self.db_loader_pub.insert_data_db(self.swapcc_diaria, "pub_otc_inter_swap_cross_daily")
-            self.db_loader_pub.disable_previous_info("pub_otc_inter_swap_cross_points_nodes", self.valuation_date, "SwapCC_"+self.curve)
-            self.db_loader_pub.insert_data_db(self.swapcc_nodos, "pub_otc_inter_swap_cross_points_nodes")
-            self.curva_par.rename(columns={'mid':'mid_price','bid':'bid_price','ask':'ask_price'}, inplace=True)
-            self.db_loader_pub.disable_previous_info("pub_otc_inter_swap_cross_curva_par", self.valuation_date, "Swap_"+self.curve)
-            self.db_loader_pub.insert_data_db(self.curva_par, "pub_otc_inter_swap_cross_curva_par")
-            self.db_loader_pub.disconnect_db()
-        except PlataformError as e:
-            logger.error(create_log_msg(e.error_message))
-            self.send_error_email(e.error_message)
-            raise PlataformError(e.error_message)
-        logger.info("Finaliza la creación de los archivos y la inserción en la base de datos exitosamente")
-        # Reporte del proceso de Cross
+
+
+    def publish_info(self, db_loader_pub: ExtratorDataDb):
+        """Reemplaza la información publicada de la curva usando la conexión de db_loader_pub"""
+        db_loader_pub.disable_previous_info("pub_otc_inter_swap_cross_daily", self.valuation_date, "SwapCC_"+self.curve)
+        db_loader_pub.insert_data_db(self.swapcc_diaria, "pub_otc_inter_swap_cross_daily")
+        db_loader_pub.disable_previous_info("pub_otc_inter_swap_cross_points_nodes", self.valuation_date, "SwapCC_"+self.curve)
+        db_loader_pub.insert_data_db(self.swapcc_nodos, "pub_otc_inter_swap_cross_points_nodes")
+        curva_par = self.curva_par.rename(columns={'mid':'mid_price','bid':'bid_price','ask':'ask_price'})
+        db_loader_pub.disable_previous_info("pub_otc_inter_swap_cross_curva_par", self.valuation_date, "Swap_"+self.curve)
+        db_loader_pub.insert_data_db(curva_par, "pub_otc_inter_swap_cross_curva_par")
+
+
+    def report_dependencies(self):
+        """Reporta la curva como exitosa en la tabla de dependencias de Cross"""
+        report_cross = {
+            'product': ["Swap Inter Cross"],
+            'input_name':["SwapCC_"+self.curve],
+            'status_process':["successful"],
+            'valuation_date':[self.valuation_date]
+        }
         df_report_cross = pd.DataFrame(report_cross)
         self.db_loader_utils = ExtratorDataDb(self.url_precia_utils, self.valuation_date)
         self.db_loader_utils.connect_db()
         self.db_loader_utils.disable_previous_info_process("precia_utils_swi_status_cross_dependencies", self.valuation_date, "Swap Inter Cross", "SwapCC_"+self.curve)
         self.db_loader_utils.insert_data_db(df_report_cross, "precia_utils_swi_status_cross_dependencies")
         self.db_loader_utils.disconnect_db()
-        update_report_process("Exitoso", "Proceso Finalizado", "")
 
     
     def send_error_email(self, error_msg: str):
@@ -638,6 +731,116 @@ Enviado por el servicio automático de notificaciones de Precia PPV S.A. en AWS
             raise PlataformError(e.error_message)
 
 
+def load_published_curve(curve: str, shared_inputs: dict, upstream_results: dict):
+    """Carga en un proceso del pool una curva publicada por otro proceso de la que dependen las
+    curvas cross (primera ola de CurveSetETL)
+    """
+    db_handler_pub = ExtratorDataDb(shared_inputs["urls"][0], shared_inputs["valuation_date"])
+    db_handler_pub.connect_db()
+    try:
+        return db_handler_pub.get_data_swap_inter_cc_daliy(curve)
+    finally:
+        db_handler_pub.disconnect_db()
+
+
+def build_cross_curve(curve: str, shared_inputs: dict, upstream_results: dict):
+    """Construye una curva cross en un proceso del pool a partir de la información extraída
+    por CurveSetETL y de las curvas de las que depende, cargadas en la ola anterior
+    """
+    etl = ETL(*shared_inputs["urls"], curve=curve)
+    etl.set_data(shared_inputs["curves"][curve])
+    etl.set_data({DEPENDENCY_INPUTS[dependency]: curve_data for dependency, curve_data in upstream_results.items()})
+    etl.transform_data()
+    return etl.get_outputs()
+
+
+class CurveSetETL:
+    """Representa la construcción de varias curvas cross en un solo proceso. La información común
+    se consulta una sola vez y las curvas se construyen por olas de dependencias: primero se cargan
+    en paralelo las curvas publicadas de las que dependen y luego se construyen en paralelo las
+    curvas cross, que se publican en una sola transacción. Una curva que falla no detiene las
+    demás: los fallos se reportan por curva al final
+    """
+    def __init__(self, url_publish_otc: str, url_sirius: str, url_process_otc: str, url_precia_utils: str, curves: list) -> None:
+        self.urls = (url_publish_otc, url_sirius, url_process_otc, url_precia_utils)
+        self.url_publish_otc = url_publish_otc
+        self.curves = curves
+        valuation_date_param = get_params(["VALUATION_DATE"])
+        self.valuation_date = valuation_date_param["VALUATION_DATE"]
+        self.dependencies = {curve: CROSS_CURVE_DEPENDENCIES[curve] for curve in curves}
+        self.failed = {}
+
+
+    def extract_data(self):
+        """Extrae la información de cada curva. Las características de las tasas y los calendarios
+        se consultan una sola vez; una curva cuyos insumos no se pudieron extraer se registra como
+        fallida y las demás continúan
+        """
+        self.shared_inputs = {}
+        self.curve_inputs = {}
+        for curve in self.curves:
+            try:
+                etl = ETL(*self.urls, curve=curve)
+                etl.extract_data(self.shared_inputs, extract_dependencies=False)
+                self.curve_inputs[curve] = etl.get_inputs()
+            except PlataformError as e:
+                logger.error(create_log_msg(f"Fallo la extracción de la información de la curva {curve}"))
+                self.failed[curve] = e.error_message
+
+
+    def build_curves(self, data_connection_sftp: dict, route_swap: str):
+        """Construye y publica las curvas por olas de dependencias"""
+        self.data_connection_sftp = data_connection_sftp
+        self.route_swap = route_swap
+        results = {}
+        if self.curve_inputs:
+            builders = {dependency: load_published_curve for curve in self.curve_inputs for dependency in self.dependencies[curve]}
+            builders.update({curve: build_cross_curve for curve in self.curve_inputs})
+            scheduler = CurveScheduler(builders, self.dependencies, logger)
+            shared_inputs = {"urls": self.urls, "valuation_date": self.valuation_date, "curves": self.curve_inputs}
+            results, failed = scheduler.run(shared_inputs, self.persist_wave)
+            self.failed.update(failed)
+        built_curves = sorted(curve for curve in results if curve in self.curves)
+        logger.info(f"Finaliza la construcción de las curvas: {built_curves}")
+        if self.failed:
+            for curve, error in self.failed.items():
+                logger.error(f"No fue posible construir la curva {curve}: {error}")
+            error_message = "No fue posible construir las curvas: " + ", ".join(f"{curve} ({error})" for curve, error in self.failed.items())
+            raise PlataformError(error_message)
+        update_report_process("Exitoso", "Proceso Finalizado", "")
+
+
+    def persist_wave(self, wave_results: dict):
+        """Genera los archivos de las curvas cross de la ola y las publica en una sola transacción.
+        Las curvas publicadas por otros procesos (primera ola) no se vuelven a publicar
+        """
+        etls = []
+        for curve, outputs in wave_results.items():
+            if curve not in self.curves:
+                continue
+            etl = ETL(*self.urls, curve=curve)
+            etl.set_data(outputs)
+            etl.load_files(self.data_connection_sftp, self.route_swap)
+            etls.append(etl)
+        if not etls:
+            return
+        db_loader_pub = ExtratorDataDb(self.url_publish_otc, self.valuation_date)
+        db_loader_pub.connect_db()
+        transaction = db_loader_pub.connection.begin()
+        try:
+            for etl in etls:
+                etl.publish_info(db_loader_pub)
+            transaction.commit()
+        except(Exception,):
+            transaction.rollback()
+            raise
+        finally:
+            db_loader_pub.disconnect_db()
+        logger.info(f"Se publicaron en una sola transacción las curvas: {sorted(etl.curve for etl in etls)}")
+        for etl in etls:
+            etl.report_dependencies()
+
+
 def launch_lambda(lambda_name: str, payload: dict):
     """Lanza una ejecucion de lambda indicada
 
@@ -760,6 +963,12 @@ def main():
     }
     route_swap = key_secret_sftp["route_swap"]
     
+    curves = params_glue["CURVE"].split(",")
+    if len(curves) > 1:
+        curve_set = CurveSetETL(url_db_publish_aurora, url_db_publish_sirius, url_db_process_otc, url_db_precia_utils_otc, curves)
+        curve_set.extract_data()
+        curve_set.build_curves(data_connection_sftp, route_swap)
+        return
     etl =  ETL(url_db_publish_aurora, url_db_publish_sirius, url_db_process_otc, url_db_precia_utils_otc)
     etl.extract_data()
     etl.transform_data()
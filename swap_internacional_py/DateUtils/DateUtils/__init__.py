@@ -1 +1 @@
-from .DateUtils import DateUtils
+from .DateUtils import DateUtils, BusinessCalendar
@@ -2,6 +2,6 @@ from setuptools import setup, find_packages
 
 setup(
     name='DateUtils',
-    version='0.1',
+    version='0.2',
     packages=["DateUtils"]
 )
@@ -0,0 +1,50 @@
+"""
+Pruebas de DateUtils.to_datetime64: fechas sueltas y arreglos de datetime.date,
+datetime.datetime, numpy.datetime64 y str ISO (tambien en arreglos de tipo
+object) se convierten a numpy.datetime64[D] conservando la forma del arreglo
+"""
+
+import datetime as dt
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from DateUtils.DateUtils import DateUtils
+
+EXPECTED = np.array(["2024-02-29", "2026-10-16"], dtype="datetime64[D]")
+
+
+@pytest.mark.parametrize(
+    "dates",
+    [
+        [dt.date(2024, 2, 29), dt.date(2026, 10, 16)],
+        [dt.datetime(2024, 2, 29, 23, 59), dt.datetime(2026, 10, 16, 8)],
+        [pd.Timestamp("2024-02-29"), pd.Timestamp("2026-10-16")],
+        np.array(["2024-02-29", "2026-10-16"]),
+        np.array(["2024-02-29", "2026-10-16"], dtype=object),
+        pd.Series(["2024-02-29", "2026-10-16"]).values,
+        np.array([dt.date(2024, 2, 29), "2026-10-16"], dtype=object),
+        EXPECTED,
+    ],
+)
+def test_arrays_are_converted_to_days(dates):
+    converted = DateUtils().to_datetime64(dates)
+
+    assert converted.dtype == np.dtype("datetime64[D]")
+    np.testing.assert_array_equal(converted, EXPECTED)
+
+
+@pytest.mark.parametrize("date", [dt.date(2026, 10, 16), "2026-10-16", np.datetime64("2026-10-16T12:00")])
+def test_single_date_is_converted(date):
+    assert DateUtils().to_datetime64(date) == np.datetime64("2026-10-16")
+
+
+def test_shape_is_kept():
+    dates = np.array([["2024-02-29"], ["2026-10-16"]], dtype=object)
+
+    assert DateUtils().to_datetime64(dates).shape == (2, 1)
@@ -1,5 +1,6 @@
 """Este módulo se encarga de gestionar los reportes de los procesos necesarios para Swap Inter Cross,
-verificar que esten completos para cada curva y lanzar el proceso para Cross"""
+verificar que esten completos para cada curva y lanzar el proceso para Cross
+Requiere en --extra-py-files precia_utils-0.2-py3-none-any.whl (se construye desde Supplies_py/precia_utils)"""
 
 from itertools import product
 import json
@@ -13,9 +14,23 @@ import sqlalchemy as sa
 from precia_utils.precia_logger import setup_logging, create_log_msg
 from precia_utils.precia_aws import get_params, get_secret
 from precia_utils.precia_exceptions import PlataformError
+from precia_utils.precia_launcher import DependencyLauncher
 
 logger = setup_logging(logging.INFO)
 
+# Curva cross, parámetro de la lambda que la lanza, procesos de los que depende y número de reportes esperados
+CROSS_DEPENDENCIES = [
+    ("USDCLP", "LAMBDA_TRIGGER_PROCESS", ['USDCLP', 'SwapCC_Camara', 'SwapCC_USDOIS', 'Swap_CLP'], 5),
+    ("USDPEN", "LAMBDA_TRIGGER_PROCESS", ['USDPEN', 'SwapCC_USDOIS', 'Swap_PEN'], 4),
+    ("EURUSD", "LAMBDA_TRIGGER_PROCESS", ['EURUSD', 'SwapCC_EUROIS', 'SwapCC_USDOIS', 'Swap_EURUS'], 5),
+    ("USDJPY", "LAMBDA_TRIGGER_PROCESS", ['USDJPY', 'Swap_USDJPY', 'SwapCC_JPYOIS', 'SwapCC_USDOIS'], 5),
+    ("USDMXN", "LAMBDA_TRIGGER_TIIESOFR", ['USDMXN', 'Swap_TIIESOFR', 'Swap_TIIE', 'SwapCC_USDOIS'], 5),
+    ("CLFCLP", "LAMBDA_TRIGGER_UFCAMARA", ['CLFCLP', 'Swap_UFCAMARA', 'SwapCC_Camara'], 3),
+    ("USDCLP", "LAMBDA_TRIGGER_CLPCOLATERAL", ['USDCLP', 'Swap_CLP', 'Swap_Camara', 'SwapCC_USDOIS'], 5),
+]
+# Ritmo de lanzamiento de las lambdas de cross (lanzamientos por segundo)
+CROSS_LAUNCH_RATE = 2.0
+
 
 class DbHandler:
     """Representa la extracción e inserción de información de las bases de datos"""
@@ -71,24 +86,25 @@ class DbHandler:
             raise PlataformError("No fue posible insertar la información en la base de datos: "+ str(e))
         
 
-    def check_dependencies_cross(self, process: str):
-        """Obtiene el numero de los procesos reportados en base de datos"""
+    def get_reported_processes(self, processes: list):
+        """Obtiene en una sola consulta el numero de reportes en base de datos de cada proceso"""
         query_dependencies = sa.sql.text(""
-            +"SELECT COUNT(input_name) as amount_processes FROM precia_utils_swi_status_cross_dependencies "
+            +"SELECT input_name, COUNT(input_name) as amount_processes FROM precia_utils_swi_status_cross_dependencies "
             +" WHERE product IN ('Rates parity', 'Forward Inter', 'Swap Inter')"
-            +" AND input_name IN ("+process+")"
+            +" AND input_name IN :processes"
             +" AND valuation_date = :valuation_date "
             +" AND last_status = :last_status "
-        "")
+            +" GROUP BY input_name"
+        "").bindparams(sa.bindparam("processes", expanding=True))
         query_params = {
+            "processes": processes,
             "last_status": 1,
             "valuation_date": self.valuation_date
         }
         try:
             reported_processes = pd.read_sql(query_dependencies, self.connection, params=query_params)
-            number_processes = reported_processes.at[0, 'amount_processes']
             logger.info("Se obtuvo la información de los procesos reportados para cross")
-            return number_processes
+            return dict(zip(reported_processes["input_name"], reported_processes["amount_processes"]))
         except Exception as e:
             logger.error(create_log_msg("Fallo la extracción de la informacion de la base de datos"))
             raise PlataformError ("No se pudo traer la info de base de datos: " + str(e))
@@ -148,40 +164,8 @@ def main():
     input_name = list(params_glue["INPUT_NAME"].split(","))
     valuation_dates_str = ",".join(["'{}'".format(element) for element in valuation_date])
     input_names = ",".join(["'{}'".format(element) for element in input_name])
-    dependencies_usdclp = "'USDCLP', 'SwapCC_Camara', 'SwapCC_USDOIS', 'Swap_CLP'"
-    dependencies_usdpen = "'USDPEN', 'SwapCC_USDOIS', 'Swap_PEN'"
-    dependencies_eurusd = "'EURUSD', 'SwapCC_EUROIS', 'SwapCC_USDOIS', 'Swap_EURUS'"
-    dependencies_usdjpy = "'USDJPY', 'Swap_USDJPY', 'SwapCC_JPYOIS', 'SwapCC_USDOIS'"
-    dependencies_usdmxn = "'USDMXN', 'Swap_TIIESOFR', 'Swap_TIIE', 'SwapCC_USDOIS'"
-    dependencies_clfclp = "'CLFCLP', 'Swap_UFCAMARA', 'SwapCC_Camara'"
-    dependencies_usdclp_colateral = "'USDCLP', 'Swap_CLP', 'Swap_Camara', 'SwapCC_USDOIS'"
-    
-    usdclp_list = [element.strip("' ") for element in dependencies_usdclp.split(',')]
-    usdpen_list = [element.strip("' ") for element in dependencies_usdpen.split(',')]
-    eurusd_list = [element.strip("' ") for element in dependencies_eurusd.split(',')]
-    usdjpy_list = [element.strip("' ") for element in dependencies_usdjpy.split(',')]
-    usdmxn_list = [element.strip("' ") for element in dependencies_usdmxn.split(',')]
-    clfclp_list = [element.strip("' ") for element in dependencies_clfclp.split(',')]
-    usdclp_colateral_list = [element.strip("' ") for element in dependencies_usdclp_colateral.split(',')]
     product_list = ["Swap Inter", "Forward Inter", "Rates parity"]
-    name_lambda_trigger_process = params_glue["LAMBDA_TRIGGER_PROCESS"]
-    name_lambda_trigger_tiiesofr = params_glue["LAMBDA_TRIGGER_TIIESOFR"]
-    name_lambda_trigger_ufcamara = params_glue["LAMBDA_TRIGGER_UFCAMARA"]
-    name_lambda_trigger_clpcolateral = params_glue["LAMBDA_TRIGGER_CLPCOLATERAL"]
-
-    payload_cross = {
-        "VALUATION_DATE":valuation_date[0],
-        "CURVE":""
-    }
-
     is_product = product_name in product_list
-    is_cross_clp = any(element in usdclp_list for element in input_name)
-    is_cross_pen = any(element in usdpen_list for element in input_name)
-    is_cross_eurusd = any(element in eurusd_list for element in input_name)
-    is_cross_usdjpy = any(element in usdjpy_list for element in input_name)
-    is_cross_usdmxn = any(element in usdmxn_list for element in input_name)
-    is_cross_clfclp = any(element in clfclp_list for element in input_name)
-    is_cross_usdclp_colateral_list = any(element in usdclp_colateral_list for element in input_name)
 
     df_report_process = generate_df(product_name, valuation_date, input_name)
 
@@ -193,71 +177,28 @@ def main():
 
     if is_product:
         message_reports = "\n o se ha lanzado el proceso cross anteriormente para esta curva"
-        if  is_cross_clp:
-            reports_usdclp = db_handler_sources.check_dependencies_cross(dependencies_usdclp)
-            if reports_usdclp == 5:
-                payload_cross["CURVE"] = "USDCLP"
-                launch_lambda(lambda_name=name_lambda_trigger_process, payload=payload_cross)
-                logger.info("Se lanza el glue para el proceso del calculo de la curva cross: USDCLP")
-            else:
-                logger.info(f"No se han reportado todas las dependencias para USDCLP: {reports_usdclp}"+message_reports)
-
-        if is_cross_pen:
-            reports_usdpen = db_handler_sources.check_dependencies_cross(dependencies_usdpen)
-            if reports_usdpen == 4:
-                payload_cross["CURVE"] = "USDPEN"
-                launch_lambda(lambda_name=name_lambda_trigger_process, payload=payload_cross)
-                logger.info("Se lanza el glue para el proceso del calculo de la curva cross: USDPEN")
-            else:
-                logger.info(f"No se han reportado todas las dependencias para USDPEN: {reports_usdpen}"+message_reports)
+        cross_to_check = [dependency for dependency in CROSS_DEPENDENCIES if any(element in dependency[2] for element in input_name)]
+        processes = sorted({process for _, _, dependencies, _ in cross_to_check for process in dependencies})
+        reported_processes = db_handler_sources.get_reported_processes(processes) if processes else {}
+        db_handler_sources.disconnect_db()
 
-        if is_cross_eurusd:
-            reports_eurusd = db_handler_sources.check_dependencies_cross(dependencies_eurusd)
-            if reports_eurusd == 5:
-                payload_cross["CURVE"] = "EURUSD"
-                launch_lambda(lambda_name=name_lambda_trigger_process, payload=payload_cross)
-                logger.info("Se lanza el glue para el proceso del calculo de la curva cross: EURUSD")
+        def launch_cross(cross: tuple):
+            lambda_param, curve = cross
+            launch_lambda(lambda_name=params_glue[lambda_param], payload={"VALUATION_DATE": valuation_date[0], "CURVE": curve})
+            logger.info(f"Se lanza el glue para el proceso del calculo de la curva cross: {curve}")
+            return curve
+
+        # Las curvas listas se encolan una sola vez por lambda y se lanzan al ritmo del token bucket
+        launcher = DependencyLauncher(launch=launch_cross, launch_rate=CROSS_LAUNCH_RATE)
+        for curve, lambda_param, dependencies, expected_reports in cross_to_check:
+            reports = sum(reported_processes.get(process, 0) for process in dependencies)
+            if reports == expected_reports:
+                launcher.submit((lambda_param, curve))
             else:
-                logger.info(f"No se han reportado todas las dependencias para EURUSD: {reports_eurusd}"+message_reports)
-                
-        if is_cross_usdjpy:
-            reports_usdjpy = db_handler_sources.check_dependencies_cross(dependencies_usdjpy)
-            if reports_usdjpy == 5:
-                payload_cross["CURVE"] = "USDJPY"
-                launch_lambda(lambda_name=name_lambda_trigger_process, payload=payload_cross)
-                logger.info("Se lanza el glue para el proceso del calculo de la curva cross: USDJPY")
-            else:
-                logger.info(f"No se han reportado todas las dependencias para USDJPY: {reports_usdjpy}"+message_reports)
-                
-        if is_cross_usdmxn:
-            reports_usdmxn = db_handler_sources.check_dependencies_cross(dependencies_usdmxn)
-            if reports_usdmxn == 5:
-                payload_cross["CURVE"] = "USDMXN"
-                launch_lambda(lambda_name=name_lambda_trigger_tiiesofr, payload=payload_cross)
-                logger.info("Se lanza el glue para el proceso del calculo de la curva cross: USDMXN")
-            else:
-                logger.info(f"No se han reportado todas las dependencias para USDMXN: {reports_usdmxn}"+message_reports)
-                
-        if is_cross_clfclp:
-            reports_clfclp = db_handler_sources.check_dependencies_cross(dependencies_clfclp)
-            if reports_clfclp == 3:
-                payload_cross["CURVE"] = "CLFCLP"
-                launch_lambda(lambda_name=name_lambda_trigger_ufcamara, payload=payload_cross)
-                logger.info("Se lanza el glue para el proceso del calculo de la curva cross: CLFCLP")
-            else:
-                logger.info(f"No se han reportado todas las dependencias para CLFCLP: {reports_clfclp}"+message_reports)
-                
-        if is_cross_usdclp_colateral_list:
-            reports_usdclp_colateral = db_handler_sources.check_dependencies_cross(dependencies_usdclp_colateral)
-            if reports_usdclp_colateral == 5:
-                payload_cross["CURVE"] = "USDCLP"
-                launch_lambda(lambda_name=name_lambda_trigger_clpcolateral, payload=payload_cross)
-                logger.info("Se lanza el glue para el proceso del calculo de la curva cross: USDCLP")
-            else:
-                logger.info(f"No se han reportado todas las dependencias para USDCLP: {reports_usdclp_colateral}"+message_reports)
-
-        db_handler_sources.disconnect_db()
+                logger.info(f"No se han reportado todas las dependencias para {curve}: {reports}"+message_reports)
+        launcher.run()
     else:
+        db_handler_sources.disconnect_db()
         logger.info("El producto reportado no es dependencia para Swap Inter Cross")
 
 if __name__ == "__main__":
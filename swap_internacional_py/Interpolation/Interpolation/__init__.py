@@ -1 +1 @@
-from .Interpolation import Interpol
+from .Interpolation import Interpol, FittedInterpol
@@ -5,10 +5,11 @@ Autor: Sebastian Velez <svelez@precia.co>
 """
 
 import datetime as dt
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-from Interpolation import Interpol
-from DateUtils import DateUtils,CalendarHandler
+from Interpolation import FittedInterpol
+from DateUtils import DateUtils,CalendarHandler,BusinessCalendar
 from scipy import optimize
 from dateutil import relativedelta as rd
 
@@ -20,11 +21,45 @@ class curve_function():
     """
     Clase que contiene las funciones relacionadas a la construcción de curvas interpoladas
     """
+    # -----Attributes-----
+    # Class attributes
+    _interpolators_cache_size = 64
+    #--------------------
     def __init__(self, curve_nodes_tenors, curve_nodes_df, curve_tenors, interpolation_method):
         self.curve_nodes_tenors = curve_nodes_tenors
         self.curve_nodes_df = curve_nodes_df
         self.curve_tenors = curve_tenors
         self.interpolation_method = interpolation_method
+
+    @staticmethod
+    @lru_cache(maxsize=_interpolators_cache_size)
+    def _fitted_interpolator(x_nodes_bytes, interpolation_method):
+        """
+        Interpolador ajustado a los días de los nodos, guardado en una cache acotada a los
+        ultimos _interpolators_cache_size juegos de nodos y metodos de interpolación
+        Params:
+            x_nodes_bytes (bytes): días de los nodos como bytes de un arreglo float64
+            interpolation_method (str): metodo de interpolación
+        Return:
+            interpolator (FittedInterpol): Interpolador con valores de los nodos en cero
+        """
+        x_nodes = np.frombuffer(x_nodes_bytes)
+        return FittedInterpol(x_nodes, np.zeros(len(x_nodes)), interpolation_method)
+
+    def interpolate(self, x_nodes, y_nodes):
+        """
+        Interpola los valores de los nodos sobre los días de la curva. El interpolador ajustado a los días de
+        los nodos se guarda por metodo de interpolación, de modo que en las iteraciones del bootstrap solo se
+        actualizan los valores de los nodos.
+        Params:
+            x_nodes (numpy.ndarray): días de los nodos para interpolar
+            y_nodes (numpy.ndarray): valores de los nodos para interpolar
+        Return:
+            y_points (numpy.ndarray): valores interpolados sobre curve_tenors
+        """
+        x_nodes = np.asarray(x_nodes, dtype=float)
+        interpolator = self._fitted_interpolator(x_nodes.tobytes(), self.interpolation_method).refit(y_nodes)
+        return interpolator(self.curve_tenors)
     
     def curve_from_nominal_rates(self):
         """
@@ -39,7 +74,7 @@ class curve_function():
         """
         
         curve_nodes_rates = (1/self.curve_nodes_df-1)*360/self.curve_nodes_tenors
-        rates_curve = Interpol(self.curve_nodes_tenors, curve_nodes_rates, self.curve_tenors).method(self.interpolation_method)
+        rates_curve = self.interpolate(self.curve_nodes_tenors, curve_nodes_rates)
         curve = 1/(1+rates_curve*self.curve_tenors/360)
         return(curve)
     
@@ -56,7 +91,7 @@ class curve_function():
         """
         x_nodes = np.append(np.array([0]),self.curve_nodes_tenors)
         y_nodes = np.append(np.array([1]),self.curve_nodes_df)
-        df_curve = Interpol(x_nodes,y_nodes, self.curve_tenors).method(self.interpolation_method)
+        df_curve = self.interpolate(x_nodes, y_nodes)
         curve = df_curve
         return(curve)
     def curve_from_log_discount_factors(self):
@@ -73,7 +108,7 @@ class curve_function():
         curve_nodes_logdf = np.log(self.curve_nodes_df)
         x_nodes = np.append(np.array([0]),self.curve_nodes_tenors)
         y_nodes = np.append(np.array([0]),curve_nodes_logdf)
-        log_df_curve = Interpol(x_nodes,y_nodes, self.curve_tenors).method(self.interpolation_method)
+        log_df_curve = self.interpolate(x_nodes, y_nodes)
         curve = np.exp(log_df_curve)
         return(curve)
     
@@ -99,6 +134,170 @@ class curve_function():
             return case()
 
 
+class bootstrap_engine():
+    """
+    Clase que evalua la curva interpolada sobre los dias de los flujos y su jacobiano analitico
+    respecto a los factores de descuento de los nodos variables. Como los dias de los nodos y de los
+    flujos no cambian durante el bootstrap, la interpolacion (lineal o cubica) es un mapa lineal
+    de los valores de los nodos que se precalcula una sola vez.
+    """
+    def __init__(self, nodes_days, fixed_nodes_values, flows_days, interpolation_method, interpolation_nodes):
+        """
+        Params:
+            nodes_days (numpy.ndarray): Días correspondientes a los nodos de la curva
+            fixed_nodes_values (numpy.ndarray): Factores de descuento de los nodos fijos (primeros nodos de la curva)
+            flows_days (numpy.ndarray): Días de los flujos sobre los que se evalua la curva
+            interpolation_method (str): Metodo de interpolación utilizado (linear_interpol, cubic_splines_interpol)
+            interpolation_nodes (str): Valores sobre los que se interpola (nominal_rates, discount_factors, log_discount_factors)
+        """
+        if interpolation_nodes not in ('nominal_rates', 'discount_factors', 'log_discount_factors'):
+            msg = ' interpolation_nodes invalido %s' % interpolation_nodes
+            raise ValueError(msg)
+        self.nodes_days = np.array(nodes_days, dtype=float)
+        self.fixed_nodes_values = np.atleast_1d(np.array(fixed_nodes_values, dtype=float))
+        self.flows_days = np.array(flows_days, dtype=float)
+        self.interpolation_nodes = interpolation_nodes
+        if interpolation_nodes == 'nominal_rates':
+            x_nodes = self.nodes_days
+        else:
+            x_nodes = np.append(np.array([0]), self.nodes_days)
+        # Pesos de interpolacion: columna j es la curva obtenida al interpolar el vector canonico e_j
+        self.weights = FittedInterpol(x_nodes, np.eye(len(x_nodes)), interpolation_method)(self.flows_days).T
+        if interpolation_nodes != 'nominal_rates':
+            self.origin_weights = self.weights[:, 0]
+            self.weights = self.weights[:, 1:]
+        self.n_fixed = len(self.fixed_nodes_values)
+
+    def curve(self, variable_nodes_values):
+        """
+        Calcula la curva de factores de descuento sobre los dias de los flujos y su jacobiano
+        Params:
+            variable_nodes_values (numpy.ndarray): Factores de descuento de los nodos variables
+        Return:
+            curve (numpy.ndarray): Factores de descuento interpolados en los dias de los flujos
+            jacobian (numpy.ndarray): Derivada de la curva respecto a cada nodo variable (flujos x nodos variables)
+        """
+        nodes_values = np.append(self.fixed_nodes_values, variable_nodes_values)
+        if self.interpolation_nodes == 'nominal_rates':
+            nodes_rates = (1/nodes_values-1)*360/self.nodes_days
+            curve_rates = self.weights @ nodes_rates
+            curve = 1/(1+curve_rates*self.flows_days/360)
+            d_rates = -360/(self.nodes_days*nodes_values**2)
+            jacobian = (-curve**2*self.flows_days/360)[:, None] * self.weights * d_rates[None, :]
+        elif self.interpolation_nodes == 'discount_factors':
+            curve = self.origin_weights + self.weights @ nodes_values
+            jacobian = self.weights
+        else:
+            curve = np.exp(self.weights @ np.log(nodes_values))
+            jacobian = curve[:, None] * self.weights / nodes_values[None, :]
+        return curve, jacobian[:, self.n_fixed:]
+
+
+class CashflowSchedule():
+    """
+    Clase que genera en una sola pasada las fechas de pago, tiempos entre cupones y marcas de ultimo pago
+    de todos los swaps de una curva, almacenados en arreglos planos. Cada fecha de mercado se ajusta una
+    sola vez aunque aparezca en el calendario de varios tenores y el cronograma queda en cache por fecha
+    de valoracion, convenciones y tenores para reprocesos dentro del mismo proceso. La cache conserva
+    solo los ultimos _cache_size cronogramas.
+    """
+    # -----Attributes-----
+    # Class attributes
+    _cache_size = 32
+    #--------------------
+    def __init__(self, trade_date, tenors, frequency, bullet_tenors, calendar, starting_day_convention,
+                 business_day_convention, daycount_convention, nested_frequency=False):
+        """
+        Params:
+            trade_date (datetime.date): Fecha de valoración
+            tenors (numpy.ndarray): Tenores de los swaps en el orden de construcción de la curva
+            frequency (str): Frecuencia de pago de los swaps no bullet
+            bullet_tenors (list): Tenores que pagan un unico cupon al vencimiento
+            calendar (list, BusinessCalendar): Calendario de dias habiles en formato datetime.date
+            starting_day_convention (str): Nombre de la convencion del dia de inicio
+            business_day_convention (str): Nombre de la convencion de dias habiles
+            daycount_convention (str): Nombre de la convencion de conteo de dias
+            nested_frequency (Boolean): Las fechas de cada tenor son las primeras del cronograma de la frecuencia
+                                        de pago (Opcional) False.
+        """
+        date_utils = DateUtils()
+        frequency_specs = date_utils.tenor_specs(frequency)
+        effective_date = date_utils.starting_date(trade_date, calendar, starting_day_convention)
+        adjusted_dates = {}
+        flows_dates = []
+        flows_tenor_index = []
+        seen_dates = set()
+        for tenor_index, tenor in enumerate(tenors):
+            tenor_frequency = tenor if tenor in bullet_tenors else frequency
+            tenor_frequency_specs = frequency_specs if nested_frequency else date_utils.tenor_specs(tenor_frequency)
+            tenor_count = self.tenor_count(date_utils.tenor_specs(tenor), date_utils.tenor_specs(tenor_frequency))
+            coupon_tenors = [str(x*tenor_frequency_specs["length"])+tenor_frequency_specs["period"] for x in range(1, tenor_count+1)]
+            tenor_dates = [effective_date]
+            for coupon_tenor in coupon_tenors:
+                if coupon_tenor not in adjusted_dates:
+                    adjusted_dates[coupon_tenor] = date_utils.business_date(
+                        date_utils.add_tenor(effective_date, coupon_tenor), calendar, business_day_convention)
+                tenor_dates.append(adjusted_dates[coupon_tenor])
+            if tenor_index > 0:
+                tenor_dates = [x for x in tenor_dates if x not in seen_dates]
+            if not tenor_dates:
+                msg = 'El tenor %s no tiene flujos nuevos respecto a los tenores anteriores' % tenor
+                raise ValueError(msg)
+            seen_dates.update(tenor_dates)
+            flows_dates.extend(tenor_dates)
+            flows_tenor_index.extend([tenor_index]*len(tenor_dates))
+
+        self.trade_date = trade_date
+        self.tenor_index = np.array(flows_tenor_index)
+        self.tenors = np.array(tenors)[self.tenor_index]
+        self.dates = np.array(flows_dates)
+        self.days = np.array([x.days for x in self.dates-trade_date])
+        accrual_start = np.append(np.array([trade_date]), self.dates[:-1])
+        self.coupon_time = date_utils.day_count_array(accrual_start, self.dates, daycount_convention, calendar)
+        self.last_payment = np.append(self.tenor_index[1:] != self.tenor_index[:-1], True)
+        for flows_array in (self.tenor_index, self.tenors, self.dates, self.days, self.coupon_time, self.last_payment):
+            flows_array.flags.writeable = False
+
+    @staticmethod
+    def tenor_count(tenor_specs, frequency_specs):
+        """
+        Calcula el numero de cupones de un tenor dada la frecuencia de pago
+        Params:
+            tenor_specs (dict): Periodo y longitud del tenor
+            frequency_specs (dict): Periodo y longitud de la frecuencia de pago
+        Return:
+            tenor_count (int): Numero de cupones
+        """
+        if (tenor_specs["period"] == frequency_specs["period"]):
+            return int(tenor_specs["length"]/frequency_specs["length"])
+        elif (tenor_specs["period"] == "Y" and frequency_specs["period"] == "M"):
+            return int(tenor_specs["length"]*12/frequency_specs["length"])
+        msg = 'La frecuencia %s%s no es compatible con el tenor %s%s' % (
+            frequency_specs["length"], frequency_specs["period"], tenor_specs["length"], tenor_specs["period"])
+        raise ValueError(msg)
+
+    @classmethod
+    def build(cls, trade_date, tenors, frequency, bullet_tenors, calendar, starting_day_convention,
+              business_day_convention, daycount_convention, nested_frequency=False):
+        """
+        Entrega el cronograma de flujos desde la cache o lo genera si no existe para los parametros dados
+        Params:
+            Los mismos del constructor de la clase
+        Return:
+            schedule (CashflowSchedule): Cronograma de flujos de los swaps de la curva
+        """
+        return cls._cached_build(trade_date, tuple(tenors), frequency, tuple(bullet_tenors),
+                                 BusinessCalendar.build(calendar), starting_day_convention, business_day_convention,
+                                 daycount_convention, nested_frequency)
+
+    @classmethod
+    @lru_cache(maxsize=_cache_size)
+    def _cached_build(cls, trade_date, tenors, frequency, bullet_tenors, calendar, starting_day_convention,
+                      business_day_convention, daycount_convention, nested_frequency):
+        return cls(trade_date, tenors, frequency, bullet_tenors, calendar, starting_day_convention,
+                   business_day_convention, daycount_convention, nested_frequency)
+
+
 class forward_functions():
     """
     Clase que contiene las funciones relacionadas a futuros y forwards
@@ -205,6 +404,7 @@ class swap_functions():
         self.curves_characteristics=curves_characteristics
         self.interest_rates_characteristics = interest_rates_characteristics
         self.calendar = calendar
+        self.business_calendar = BusinessCalendar(calendar)
         self.logger = logger
     
     # -----Attributes-----
@@ -213,7 +413,9 @@ class swap_functions():
     _bootstrap_error_message = 'Fallo el calculo del error bootstrap'
     _bootstrap_error_raise_message ="No se pudo calcular el error bootstrap para la curva con los insumos dados"
     _flows_log_message = 'Generacion de fechas y flujos de los swaps empleados'
-    
+    _newton_max_iterations = 50
+    _newton_tolerance = 1e-13
+
     #--------------------
     
     def ois_bootstrap(self, variable_nodes_values, nodes_days, fixed_nodes_values, swap_table, interpolation_method, interpolation_nodes):
@@ -247,7 +449,72 @@ class swap_functions():
         except(Exception,):
             self.logger.error(create_log_msg(self._bootstrap_error_message))
             raise PlataformError(self._bootstrap_error_raise_message)
-            
+
+    def ois_bootstrap_jac(self, variable_nodes_values, engine, legs_matrix):
+        """
+        Calcula el error bootstrap de cada swap ois y su jacobiano analitico. La pata flotante telescopica
+        del swap es 1 - P(ultimo pago) y la pata fija es la tasa par por la suma acumulada de tiempo del cupon
+        por factor de descuento, por lo que ambas son lineales en la curva de flujos
+        Params:
+            variable_nodes_values (numpy.ndarray): Factores de descuento de cada nodo
+            engine (bootstrap_engine): Curva interpolada precalculada sobre los dias de los flujos
+            legs_matrix (numpy.ndarray): Matriz (swaps x flujos) tal que error = legs_matrix @ curva - 1
+        Return:
+            bootstrap_error (numpy.ndarray): Error pata fija menos pata flotante de cada swap
+            jacobian (numpy.ndarray): Derivada del error de cada swap respecto a cada nodo variable
+        """
+        try:
+            curve, curve_jacobian = engine.curve(variable_nodes_values)
+            bootstrap_error = legs_matrix @ curve - 1
+            return bootstrap_error, legs_matrix @ curve_jacobian
+        except(Exception,):
+            self.logger.error(create_log_msg(self._bootstrap_error_message))
+            raise PlataformError(self._bootstrap_error_raise_message)
+
+    def ois_bootstrap_solve(self, variable_nodes_values, nodes_days, fixed_nodes_values, swap_table, interpolation_method, interpolation_nodes):
+        """
+        Resuelve los factores de descuento de los nodos ois sobre matrices de flujos precalculadas.
+        Hay un nodo por swap, por lo que el sistema es cuadrado y se resuelve por Newton con el jacobiano exacto;
+        si el metodo no converge se minimiza la suma de errores al cuadrado con su gradiente analitico
+        Params:
+            variable_nodes_values (numpy.ndarray): Valores iniciales de los factores de descuento de cada nodo
+            nodes_days (numpy.ndarray): Días correspondientes a los nodos de la curva
+            fixed_nodes_values (numpy.ndarray): Factor de descuento ON
+            swap_table (pd.DataFrame): Tabla que contiene la información relevante de cada swap (tenor, tasa par, dias del cupon, tiempo entre cupones)
+            interpolation_method (str): Metodo de interpolación utilizado (linear_interpol, cubic_splines_interpol)
+            interpolation_nodes (str): Valores sobre los que se interpola (nominal_rates, discount_factors, log_discount_factors)
+        Return:
+            swap_nodes_values (numpy.ndarray): Factores de descuento de los nodos variables
+        """
+        try:
+            engine = bootstrap_engine(nodes_days, fixed_nodes_values, swap_table["swap_days"].values, interpolation_method, interpolation_nodes)
+            last_payment = np.where(swap_table["last_payment"].values)[0]
+            coupon_time = swap_table["coupon_time"].values.astype(float)
+            flows_index = np.arange(len(coupon_time))
+            legs_matrix = np.where(flows_index[None, :] <= last_payment[:, None], coupon_time[None, :], 0)
+            legs_matrix = legs_matrix * swap_table["swap_rate"].values[last_payment][:, None]
+            legs_matrix[np.arange(len(last_payment)), last_payment] += 1
+
+            swap_nodes_values = np.array(variable_nodes_values, dtype=float)
+            for _ in range(self._newton_max_iterations):
+                bootstrap_error, jacobian = self.ois_bootstrap_jac(swap_nodes_values, engine, legs_matrix)
+                if not np.all(np.isfinite(bootstrap_error)):
+                    break
+                if np.max(np.abs(bootstrap_error)) < self._newton_tolerance:
+                    return swap_nodes_values
+                swap_nodes_values = swap_nodes_values - np.linalg.solve(jacobian, bootstrap_error)
+            self.logger.info(create_log_msg('El metodo de Newton no convergio, se minimiza el error cuadratico'))
+
+            def squared_error(nodes_values):
+                bootstrap_error, jacobian = self.ois_bootstrap_jac(nodes_values, engine, legs_matrix)
+                return np.dot(bootstrap_error, bootstrap_error), 2 * bootstrap_error @ jacobian
+            return optimize.minimize(squared_error, variable_nodes_values, jac=True).x
+        except PlataformError:
+            raise
+        except(Exception,):
+            self.logger.error(create_log_msg(self._bootstrap_error_message))
+            raise PlataformError(self._bootstrap_error_raise_message)
+
     def ois_curve(self, swap_curve, trade_date, swaps_info, discount_curve=None, curve_in_t2=False):
         """
         Construye la curva ois cero cupon a partir de información de swaps plain vanilla
@@ -282,7 +549,7 @@ class swap_functions():
             swap_characteristics = self.swaps_characteristics.loc[np.where(self.swaps_characteristics["swap_curve"]==swap_curve)].reset_index(drop=True)
             swap_business_day_convention = swap_characteristics["business_day_convention"][0]
             swap_starting_type_convention = swap_characteristics["start_type"][0]        
-            swap_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            swap_business_day_calendar=self.business_calendar
             swap_daycount_convention = swap_characteristics["daycount_convention"][0]
             bullet_tenors = swap_characteristics["bullet_tenors"][0].split(',')
             frequency_payment = swap_characteristics["buyer_leg_frequency_payment"][0]
@@ -292,7 +559,7 @@ class swap_functions():
             on_business_day_convention = interest_rate_characteristics["business_day_convention"][0]
             on_tenor = interest_rate_characteristics["tenor"][0]
             on_starting_type_convention = interest_rate_characteristics["start_type"][0]
-            on_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            on_business_day_calendar=self.business_calendar
             on_daycount_convention = interest_rate_characteristics["daycount_convention"][0]
     
             #ON handling
@@ -314,37 +581,20 @@ class swap_functions():
             
             self.logger.info(create_log_msg(self._flows_log_message))
             #Cashflow handling
-            swap_table = pd.DataFrame()
-            swap_last_dates=np.array([])
-            last_payment_date=None
-    
-            for swap_tenor in swap_tenors:
-                #Looping though swap tenors
-                swap_rate = swap_rates[np.where(swap_tenors==swap_tenor)][0]
-                frequency = swap_tenor if swap_tenor in bullet_tenors else frequency_payment
-                swap_dates = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)
-                if not swap_table.empty:
-                    swap_dates=swap_dates[np.where(np.logical_not(pd.Series(swap_dates).isin(swap_last_dates)))]
-                swap_last_dates=np.append(swap_last_dates,swap_dates)
-                swap_days = [x.days for x in (swap_dates-trade_date)]
-                
-                if swap_table.empty:
-                    default_date=trade_date
-                else:
-                    default_date=last_payment_date
-                coupon_time = [DateUtils().day_count(default_date,swap_dates[0],swap_daycount_convention)]+[DateUtils().day_count(swap_dates[i-1],swap_dates[i],swap_daycount_convention) for i in range(1,len(swap_dates))]
-                last_payment_date=swap_dates[-1]
-                last_payment=np.append(np.repeat(False, len(coupon_time)-1),True)
-                
-                swap_table = pd.concat([swap_table, pd.DataFrame({"swap_tenor":swap_tenor, "swap_rate":swap_rate, "swap_days":pd.Series(swap_days), "coupon_time":pd.Series(coupon_time),"last_payment":last_payment})])
-            swap_table.reset_index(drop=True,inplace=True)
+            schedule = CashflowSchedule.build(trade_date, swap_tenors, frequency_payment, bullet_tenors, swap_business_day_calendar,
+                                              swap_starting_type_convention, swap_business_day_convention, swap_daycount_convention)
+            swap_table = pd.DataFrame({"swap_tenor":schedule.tenors, "swap_rate":swap_rates[schedule.tenor_index], "swap_days":schedule.days,
+                                       "coupon_time":schedule.coupon_time, "last_payment":schedule.last_payment})
             if discount_curve is not None:
                 swap_table["discount_curve"]=discount_curve[swap_table["swap_days"]-1].reset_index(drop=True)
             self.logger.info(create_log_msg(f'Inicia el proceso de optimizacion de la curva {swap_curve}'))
             nodes_days = [on_day]+ swap_tenor_days
             fixed_nodes_values = on_value
             variable_nodes_values = 1/(1+swap_rates*swap_tenor_days/360)
-            swap_nodes_values = optimize.minimize(self.ois_bootstrap,variable_nodes_values,args=(nodes_days, fixed_nodes_values, swap_table, interpolation_method, interpolation_nodes)).x
+            if discount_curve is None:
+                swap_nodes_values = self.ois_bootstrap_solve(variable_nodes_values, nodes_days, fixed_nodes_values, swap_table, interpolation_method, interpolation_nodes)
+            else:
+                swap_nodes_values = optimize.minimize(self.ois_bootstrap,variable_nodes_values,args=(nodes_days, fixed_nodes_values, swap_table, interpolation_method, interpolation_nodes)).x
             self.logger.info(create_log_msg(f'Finalizo el proceso de optimizacion de la curva {swap_curve}'))
             nodes_values = np.append(np.array(on_value), swap_nodes_values)
             if curve_in_t2:
@@ -472,13 +722,12 @@ class swap_functions():
             swap_characteristics = self.swaps_characteristics.loc[np.where(self.swaps_characteristics["swap_curve"]==swap_curve)].reset_index(drop=True)
             swap_business_day_convention = swap_characteristics["business_day_convention"][0]
             swap_starting_type_convention = swap_characteristics["start_type"][0]           
-            swap_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            swap_business_day_calendar=self.business_calendar
             swap_daycount_convention = swap_characteristics["daycount_convention"][0]
             bullet_tenors = swap_characteristics["bullet_tenors"][0].split(',')
             on_the_run_tenors=swap_characteristics["on_the_run_tenors"][0].split(',')
             frequency_payment_buyer = swap_characteristics["buyer_leg_frequency_payment"][0]
             frequency_payment_seller = swap_characteristics["seller_leg_frequency_payment"][0]
-            eq_freq= frequency_payment_buyer==frequency_payment_seller
 
             #Swap handling
             swap_tenors = swaps_info.loc[np.isin(swaps_info["tenor"],on_the_run_tenors),"tenor"].values
@@ -492,46 +741,14 @@ class swap_functions():
              
             self.logger.info(create_log_msg(self._flows_log_message))
             #Cashflow handling
-            swap_table = pd.DataFrame()
-            swap_last_dates_buyer=np.array([])
-            swap_last_dates_seller=np.array([])
-            last_payment_date_buyer=None
-            last_payment_date_seller=None
-            
-            for swap_tenor in swap_tenors:
-                #Looping though swap tenors
-                swap_rate = swap_rates[np.where(swap_tenors==swap_tenor)][0]
-                frequency_buyer = swap_tenor if swap_tenor in bullet_tenors else frequency_payment_buyer
-                frequency_seller = swap_tenor if swap_tenor in bullet_tenors else frequency_payment_seller
-                if eq_freq:
-                    swap_dates_buyer= swap_dates_seller = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency_buyer, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)    
-                else:
-                    swap_dates_buyer = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency_buyer, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)
-                    swap_dates_seller = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency_seller, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)
-                if not swap_table.empty:
-                    swap_dates_buyer=swap_dates_buyer[np.where(np.logical_not(pd.Series(swap_dates_buyer).isin(swap_last_dates_buyer)))]
-                    swap_dates_seller=swap_dates_seller[np.where(np.logical_not(pd.Series(swap_dates_seller).isin(swap_last_dates_seller)))]
-                swap_last_dates_buyer=np.append(swap_last_dates_buyer,swap_dates_buyer)
-                swap_last_dates_seller=np.append(swap_last_dates_seller,swap_dates_seller)
-                
-            
-                swap_days_seller = [x.days for x in (swap_dates_seller-trade_date)]
-                
-                if swap_table.empty:
-                    default_date_buyer=trade_date
-                    default_date_seller=trade_date
-                else:
-                    default_date_buyer=last_payment_date_buyer
-                    default_date_seller=last_payment_date_seller
-                
-                coupon_time_buyer = [DateUtils().day_count(default_date_buyer,swap_dates_buyer[0],swap_daycount_convention)]+[DateUtils().day_count(swap_dates_buyer[i-1],swap_dates_buyer[i],swap_daycount_convention) for i in range(1,len(swap_dates_buyer))]
-                coupon_time_seller = [DateUtils().day_count(default_date_seller,swap_dates_seller[0],swap_daycount_convention)]+[DateUtils().day_count(swap_dates_seller[i-1],swap_dates_seller[i],swap_daycount_convention) for i in range(1,len(swap_dates_seller))]
-                last_payment_date_buyer=swap_dates_buyer[-1]
-                last_payment_date_seller=swap_dates_seller[-1]
-                last_payment=np.append(np.repeat(False, len(coupon_time_buyer)-1),True)
-                
-                swap_table = pd.concat([swap_table, pd.DataFrame({"swap_tenor":swap_tenor, "swap_rate":swap_rate, "swap_days":pd.Series(swap_days_seller), "coupon_time_buyer":pd.Series(coupon_time_buyer), "coupon_time_seller":pd.Series(coupon_time_seller),"last_payment":last_payment})])
-            swap_table.reset_index(drop=True,inplace=True)
+            schedule_buyer = CashflowSchedule.build(trade_date, swap_tenors, frequency_payment_buyer, bullet_tenors, swap_business_day_calendar,
+                                                    swap_starting_type_convention, swap_business_day_convention, swap_daycount_convention)
+            schedule_seller = CashflowSchedule.build(trade_date, swap_tenors, frequency_payment_seller, bullet_tenors, swap_business_day_calendar,
+                                                     swap_starting_type_convention, swap_business_day_convention, swap_daycount_convention)
+            if not np.array_equal(schedule_buyer.tenor_index, schedule_seller.tenor_index):
+                raise ValueError('Las patas del swap no tienen el mismo numero de flujos por tenor')
+            swap_table = pd.DataFrame({"swap_tenor":schedule_seller.tenors, "swap_rate":swap_rates[schedule_seller.tenor_index], "swap_days":schedule_seller.days,
+                                       "coupon_time_buyer":schedule_buyer.coupon_time, "coupon_time_seller":schedule_seller.coupon_time, "last_payment":schedule_buyer.last_payment})
             swap_table["foreing_discount_curve"] = 1/(1+discount_curve_for[swap_table["swap_days"].values-1]*swap_table["swap_days"].values/360)
             swap_table["foreing_projection_curve"] = 1/(1+projection_curve_for[swap_table["swap_days"].values-1]*swap_table["swap_days"].values/360)
             
@@ -636,13 +853,12 @@ class swap_functions():
             swap_characteristics = self.swaps_characteristics.loc[np.where(self.swaps_characteristics["swap_curve"]==swap_curve)].reset_index(drop=True)
             swap_business_day_convention = swap_characteristics["business_day_convention"][0]
             swap_starting_type_convention = swap_characteristics["start_type"][0]            
-            swap_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            swap_business_day_calendar=self.business_calendar
             swap_daycount_convention = swap_characteristics["daycount_convention"][0]
             bullet_tenors = swap_characteristics["bullet_tenors"][0].split(',')
             on_the_run_tenors=swap_characteristics["on_the_run_tenors"][0].split(',')
             frequency_payment_buyer = swap_characteristics["buyer_leg_frequency_payment"][0]
             frequency_payment_seller = swap_characteristics["seller_leg_frequency_payment"][0]
-            eq_freq= frequency_payment_buyer==frequency_payment_seller
             
             effective_date = DateUtils().starting_date(trade_date, swap_business_day_calendar,swap_starting_type_convention)
             
@@ -687,44 +903,15 @@ class swap_functions():
                 implied_rate_curve = ((1+discount_curve_for[fwd_days-1]*fwd_days/360)/(1+fwd_points.iloc[:swap_tenor_days[0]-1,1]/spot_pair_1*spot_pair_2)-1)*360/fwd_days
             self.logger.info(create_log_msg(self._flows_log_message))
             #Cashflow handling
-            swap_table = pd.DataFrame()
-            swap_last_dates_buyer=np.array([])
-            swap_last_dates_seller=np.array([])
-            last_payment_date_buyer=None
-            last_payment_date_seller=None
-            
-            for swap_tenor in swap_tenors:
-                #Looping though swap tenors
-                swap_basis = swaps_basis[np.where(swap_tenors==swap_tenor)][0]
-                frequency_buyer = swap_tenor if swap_tenor in bullet_tenors else frequency_payment_buyer
-                frequency_seller = swap_tenor if swap_tenor in bullet_tenors else frequency_payment_seller
-                if eq_freq:
-                    swap_dates_buyer= swap_dates_seller = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency_buyer, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)    
-                else:
-                    swap_dates_buyer = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency_buyer, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)
-                    swap_dates_seller = DateUtils().tenor_sequence_dates(trade_date, swap_tenor, frequency_seller, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)
-                if not swap_table.empty:
-                    swap_dates_buyer=swap_dates_buyer[np.where(np.logical_not(pd.Series(swap_dates_buyer).isin(swap_last_dates_buyer)))]
-                    swap_dates_seller=swap_dates_seller[np.where(np.logical_not(pd.Series(swap_dates_seller).isin(swap_last_dates_seller)))]
-                swap_last_dates_buyer=np.append(swap_last_dates_buyer,swap_dates_buyer)
-                swap_last_dates_seller=np.append(swap_last_dates_seller,swap_dates_seller)
-                
-                swap_days_buyer = [x.days for x in (swap_dates_buyer-trade_date)]
-                
-                
-                if swap_table.empty:
-                    default_date_buyer=trade_date
-                    default_date_seller=trade_date
-                else:
-                    default_date_buyer=last_payment_date_buyer
-                    default_date_seller=last_payment_date_seller
-                
-                coupon_time_buyer = [DateUtils().day_count(default_date_buyer,swap_dates_buyer[0],swap_daycount_convention)]+[DateUtils().day_count(swap_dates_buyer[i-1],swap_dates_buyer[i],swap_daycount_convention) for i in range(1,len(swap_dates_buyer))]
-                coupon_time_seller = [DateUtils().day_count(default_date_seller,swap_dates_seller[0],swap_daycount_convention)]+[DateUtils().day_count(swap_dates_seller[i-1],swap_dates_seller[i],swap_daycount_convention) for i in range(1,len(swap_dates_seller))]
-                last_payment_date_buyer=swap_dates_buyer[-1]
-                last_payment_date_seller=swap_dates_seller[-1]
-                last_payment=np.append(np.repeat(False, len(coupon_time_buyer)-1),True)
-                swap_table = pd.concat([swap_table, pd.DataFrame({"swap_tenor":swap_tenor, "swap_basis":swap_basis, "swap_days":pd.Series(swap_days_buyer), "coupon_time_buyer":pd.Series(coupon_time_buyer), "coupon_time_seller":pd.Series(coupon_time_seller),"last_payment":last_payment})])
+            schedule_buyer = CashflowSchedule.build(trade_date, swap_tenors, frequency_payment_buyer, bullet_tenors, swap_business_day_calendar,
+                                                    swap_starting_type_convention, swap_business_day_convention, swap_daycount_convention)
+            schedule_seller = CashflowSchedule.build(trade_date, swap_tenors, frequency_payment_seller, bullet_tenors, swap_business_day_calendar,
+                                                     swap_starting_type_convention, swap_business_day_convention, swap_daycount_convention)
+            if not np.array_equal(schedule_buyer.tenor_index, schedule_seller.tenor_index):
+                raise ValueError('Las patas del swap no tienen el mismo numero de flujos por tenor')
+            swap_table = pd.DataFrame({"swap_tenor":schedule_buyer.tenors, "swap_basis":swaps_basis[schedule_buyer.tenor_index], "swap_days":schedule_buyer.days,
+                                       "coupon_time_buyer":schedule_buyer.coupon_time, "coupon_time_seller":schedule_seller.coupon_time, "last_payment":schedule_buyer.last_payment})
+
      
             projection_curve_for_t2=projection_curve_for*on_value_seller_t2
             projection_curve_dom_t2=projection_curve_dom*on_value_buyer_t2
@@ -759,7 +946,7 @@ class swap_functions():
             swap_characteristics = self.swaps_characteristics.loc[np.where(self.swaps_characteristics["swap_curve"]==swap_curve)].reset_index(drop=True)
             swap_business_day_convention = swap_characteristics["business_day_convention"][0]
             swap_starting_type_convention = swap_characteristics["start_type"][0]            
-            swap_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            swap_business_day_calendar=self.business_calendar
             on_the_run_tenors=swap_characteristics["on_the_run_tenors"][0].split(',')
             used_swaps_info=swaps_info.loc[np.isin(swaps_info["tenor"],on_the_run_tenors)].reset_index(drop=True)
             swap_tenor_dates=[DateUtils().tenor_date(
@@ -794,12 +981,12 @@ class swap_functions():
         try:
             self.logger.info(create_log_msg('Inicio actualización tasa SOFR publicada'))
             sofr_updated=pd.DataFrame()
-            us_calendar=np.array([dt.datetime.strptime(x,self._date_format).date() for x in self.calendar])
+            us_calendar=self.business_calendar
             sofr_hist["Date"]=sofr_hist["Date"].apply(lambda x: dt.datetime.strptime(x,self._date_format).date())
             sofr_consults["valuation_date"]=sofr_consults["valuation_date"].apply(lambda x: dt.datetime.strptime(x,self._date_format).date())
             next_business_day=DateUtils().add_business_days(sofr_hist.iloc[-1,0], 1, us_calendar)
             self.logger.info(create_log_msg('Fechas de publicación tasa SOFR faltantes'))
-            publish_sofr_dates=us_calendar[np.where((us_calendar>next_business_day) & (us_calendar<=trade_date))]
+            publish_sofr_dates=us_calendar.dates[np.where((us_calendar.dates>next_business_day) & (us_calendar.dates<=trade_date))]
             last_sofr_date=sofr_hist.iloc[-1,0]
             for d in range(len(publish_sofr_dates)):
                 publish_sofr_date=publish_sofr_dates[d]
@@ -833,7 +1020,7 @@ class swap_functions():
         """
         try:
             self.logger.info(create_log_msg('Inicia el calculo del indice SOFR'))
-            us_calendar=np.array([dt.datetime.strptime(x,self._date_format).date() for x in self.calendar])
+            us_calendar=self.business_calendar
             sofr_hist["Mat_date"]=sofr_hist["Date"].apply(lambda x: DateUtils().add_business_days(x, 1, us_calendar))
             sofr_index=np.cumprod((1+sofr_hist["SOFR"]*(sofr_hist["Mat_date"]-sofr_hist["Date"]).dt.days/360))
             self.logger.info(create_log_msg('Finalizo el calculo del indice SOFR'))
@@ -931,7 +1118,7 @@ class swap_functions():
             swap_characteristics = self.swaps_characteristics.loc[np.where(self.swaps_characteristics["curve_name"]==curve_name)].reset_index(drop=True)
             swap_business_day_convention = swap_characteristics["business_day_convention"][0]
             swap_starting_type_convention = swap_characteristics["start_type"][0]
-            swap_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            swap_business_day_calendar=self.business_calendar
             swap_daycount_convention = swap_characteristics["daycount_convention"][0]
             bullet_tenors = swap_characteristics["bullet_tenors"][0].split(',')
             on_the_run_tenors=swap_characteristics["on_the_run_tenors"][0].split(',')
@@ -939,7 +1126,7 @@ class swap_functions():
     
             #ON Rate Characteristics
             interest_rate_characteristics = self.interest_rates_characteristics.loc[np.where(self.interest_rates_characteristics["interest_rate_name"]==swap_characteristics["buyer_leg_rate"][0])].reset_index(drop=True)
-            on_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            on_business_day_calendar=self.business_calendar
             on_daycount_convention = interest_rate_characteristics["daycount_convention"][0]
     
             #ON handling
@@ -1006,39 +1193,11 @@ class swap_functions():
             swap_tenor_days = [x.days for x in (np.array(swap_tenor_dates)-trade_date)]
                 
             #Cashflow handling
-            swap_table = pd.DataFrame()
-            swap_last_dates=np.array([])
-            last_payment_date=None
-            
             self.logger.info(create_log_msg(self._flows_log_message))
-            swaps_dates = DateUtils().tenor_sequence_dates(trade_date, swap_tenors[-1], frequency_payment, swap_business_day_calendar, swap_starting_type_convention, swap_business_day_convention)
-            for swap_tenor in swap_tenors:
-                #Looping though swap tenors
-                swap_rate = swap_rates[np.where(swap_tenors==swap_tenor)][0]
-                frequency = swap_tenor if swap_tenor in bullet_tenors else frequency_payment
-                tenor_specs = DateUtils().tenor_specs(swap_tenor)
-                frequency_specs = DateUtils().tenor_specs(frequency)
-                if (tenor_specs["period"]== frequency_specs["period"]):
-                    tenor_count =  int(tenor_specs["length"]/frequency_specs["length"])
-                elif (tenor_specs["period"]== "Y" and frequency_specs["period"] == "M"):
-                    tenor_count =  int(tenor_specs["length"]*12/frequency_specs["length"])
-                swap_dates = swaps_dates[:tenor_count+1]
-                if not swap_table.empty:
-                    swap_dates=swap_dates[np.where(np.logical_not(pd.Series(swap_dates).isin(swap_last_dates)))]
-                swap_last_dates=np.append(swap_last_dates,swap_dates)
-                swap_days = [x.days for x in (swap_dates-trade_date)]
-                
-                if swap_table.empty:
-                    default_date=trade_date
-                else:
-                    default_date=last_payment_date
-                
-                coupon_time = [DateUtils().day_count(default_date,swap_dates[0],swap_daycount_convention)]+[DateUtils().day_count(swap_dates[i-1],swap_dates[i],swap_daycount_convention) for i in range(1,len(swap_dates))]
-                last_payment_date=swap_dates[-1]
-                last_payment=np.append(np.repeat(False, len(coupon_time)-1),True) 
-                swap_table = pd.concat([swap_table, pd.DataFrame({"tenor":swap_tenor, "rate":swap_rate, "days":pd.Series(swap_days), "coupon_time":pd.Series(coupon_time),"last_payment":last_payment})])
-                
-            swap_table.reset_index(drop=True,inplace=True)
+            schedule = CashflowSchedule.build(trade_date, swap_tenors, frequency_payment, bullet_tenors, swap_business_day_calendar, swap_starting_type_convention,
+                                              swap_business_day_convention, swap_daycount_convention, nested_frequency=True)
+            swap_table = pd.DataFrame({"tenor":schedule.tenors, "rate":swap_rates[schedule.tenor_index], "days":schedule.days,
+                                       "coupon_time":schedule.coupon_time, "last_payment":schedule.last_payment})
             fut_swap_table=pd.concat([onem_future_table,future_table,swap_table]).reset_index(drop=True)
             market_info=pd.DataFrame({"days":[sofr_prom_days[-1]]+ fut_days + swap_tenor_days,
                                       "rates":np.concatenate(([onem_fut_rate],future_rates,swap_rates))}).sort_values("days").reset_index(drop=True)
@@ -1149,7 +1308,7 @@ class swap_functions():
             ois_business_day_convention = ois_characteristics["business_day_convention"][0]
             ois_starting_type_convention = ois_characteristics["start_type"][0]
             
-            ois_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            ois_business_day_calendar=self.business_calendar
             ois_daycount_convention = ois_characteristics["daycount_convention"][0]
             ois_bullet_tenors = ois_characteristics["bullet_tenors"][0].split(',')
             ois_frequency_payment = ois_characteristics["buyer_leg_frequency_payment"][0]
@@ -1159,7 +1318,7 @@ class swap_functions():
             basis_business_day_convention = basis_characteristics["business_day_convention"][0]
             basis_starting_type_convention = basis_characteristics["start_type"][0]
             
-            basis_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            basis_business_day_calendar=self.business_calendar
             basis_daycount_convention = basis_characteristics["daycount_convention"][0]
             basis_bullet_tenors = basis_characteristics["bullet_tenors"][0].split(',')
             basis_frequency_payment = basis_characteristics["buyer_leg_frequency_payment"][0]
@@ -1169,7 +1328,7 @@ class swap_functions():
             on_business_day_convention = interest_rate_characteristics["business_day_convention"][0]
             on_tenor = interest_rate_characteristics["tenor"][0]
             on_starting_type_convention = interest_rate_characteristics["start_type"][0] 
-            on_business_day_calendar=[dt.datetime.strptime(x,self._date_format).date() for x in self.calendar]
+            on_business_day_calendar=self.business_calendar
             on_daycount_convention = interest_rate_characteristics["daycount_convention"][0]
             self.logger.info(create_log_msg('Inicia la construccion de la curva cero cupon SOFR'))
             
@@ -1210,7 +1369,7 @@ class swap_functions():
                 else:
                     default_date=last_payment_date
                 
-                coupon_time = [DateUtils().day_count(default_date,swap_dates[0],ois_daycount_convention)]+[DateUtils().day_count(swap_dates[i-1],swap_dates[i],ois_daycount_convention) for i in range(1,len(swap_dates))]
+                coupon_time = DateUtils().day_count_array(np.append(default_date,swap_dates[:-1]),swap_dates,ois_daycount_convention)
                 last_payment_date=swap_dates[-1]
                 last_payment=np.append(np.repeat(False, len(coupon_time)-1),True)
                 
@@ -1251,7 +1410,7 @@ class swap_functions():
                 else:
                     default_date=last_payment_date
                 
-                coupon_time = [DateUtils().day_count(default_date,swap_dates[0],basis_daycount_convention)]+[DateUtils().day_count(swap_dates[i-1],swap_dates[i],basis_daycount_convention) for i in range(1,len(swap_dates))]
+                coupon_time = DateUtils().day_count_array(np.append(default_date,swap_dates[:-1]),swap_dates,basis_daycount_convention)
                 last_payment_date=swap_dates[-1]
                 last_payment=np.append(np.repeat(False, len(coupon_time)-1),True)
                 
@@ -14,6 +14,9 @@ En el presente script se realiza el calculo de la paridad de
 las monedas para crear la matriz de tasas de cambio. 
 Asi mismo se realiza el envio del reporte de variaciones y 
 actualización de bases de datos 
+
+Requiere en --extra-py-files precia_utils-0.2-py3-none-any.whl
+(se construye desde Supplies_py/precia_utils)
 =============================================================
 """
 
@@ -21,6 +24,7 @@ actualización de bases de datos
 import sqlalchemy as sa
 import logging
 import pandas as pd
+import numpy as np
 import json
 import io
 import os
@@ -31,6 +35,7 @@ from common_library_email_report.ReportEmail import ReportEmail
 from precia_utils.precia_logger import setup_logging, create_log_msg
 from precia_utils.precia_aws import get_params, get_secret
 from precia_utils.precia_exceptions import PlataformError
+from precia_utils.precia_db import get_engine, log_query_stats
 																						   
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -107,6 +112,7 @@ class actions_db():
         """
         try:
             self.db_url = db_url
+            self.sql_engine = None
         except (Exception,) as init_exc:
             error_msg = "Fallo la creacion del objeto DBManager"
             logger.error(create_log_msg(error_msg))
@@ -123,13 +129,10 @@ class actions_db():
             sa.engine.Connection: Conexion a BD
         """
         try:
-            logger.info("Creando el engine de conexion...")
-            sql_engine = sa.create_engine(
-                self.db_url, connect_args={"connect_timeout": 2}
-            )
-            logger.info("Engine de conexion creado con exito")
+            if self.sql_engine is None:
+                self.sql_engine = get_engine(self.db_url)
             logger.info("Creando conexion a BD...")
-            db_connection = sql_engine.connect()
+            db_connection = self.sql_engine.connect()
             logger.info("Conexion a BD creada con exito")
             return db_connection
         except (Exception,) as conn_exc:
@@ -283,6 +286,98 @@ class actions_db():
             raise PlataformError() from fpc_exc
         
         
+    def find_rates_data_dates(self, val_date, dates: list):
+        """
+        Se realiza la busqueda de la información de todas las fechas a procesar en una sola consulta.
+        Para la fecha de valoracion se toman las tasas del día (find_rates_data_today) y para las demás
+        fechas la ultima tasa de cada moneda desde la fecha de valoracion (find_rates_data)
+        """
+        try:
+            db_connection = self.create_connection()
+            select_query = sa.sql.text(
+                """SELECT id_precia, value_rates, valuation_date, effective_date, id_supplier FROM src_exchange_rates
+                WHERE valuation_date >= :first_date AND valuation_date <= :last_date AND status_info = 1""")
+            query_params = {"first_date": val_date, "last_date": max(dates)}
+            data_dates = pd.read_sql(select_query, db_connection, params=query_params)
+            db_connection.close()
+            rates_dates = pd.to_datetime(data_dates["valuation_date"]).dt.strftime(date_format)
+            rates_by_date = {}
+            for date in dates:
+                if date == val_date:
+                    supplier = data_dates["id_supplier"].str.lower()
+                    date_data = data_dates[(rates_dates == date) & supplier.notna() & (supplier != "parity")]
+                else:
+                    in_window = rates_dates <= date
+                    last_dates = rates_dates[in_window].groupby(data_dates.loc[in_window, "id_precia"]).transform("max")
+                    date_data = data_dates[in_window][rates_dates[in_window] == last_dates]
+                date_data = date_data.drop(columns="id_supplier").reset_index(drop=True)
+                rates_by_date[date] = date_data.sort_values(by=['effective_date'])
+                logger.debug(rates_by_date[date].to_string())
+            return rates_by_date
+        except (Exception,) as fpc_exc:
+            raise_msg = "Fallo la consulta de la información de las tasas para las fechas a procesar"
+            logger.error(create_log_msg(raise_msg))
+            update_report_process("Fallido", raise_msg, str(fpc_exc))
+            raise PlataformError() from fpc_exc
+
+
+    def get_rates_dates(self, dates: list):
+        """
+        Obtiene las tasas calculadas de todas las fechas a procesar en una sola consulta
+        (ver get_rates_today)
+        """
+        try:
+            db_connection = self.create_connection()
+            select_query = sa.sql.text(
+                """SELECT id_precia, value_rates, valuation_date 
+                FROM pub_exchange_rate_parity 
+                WHERE (id_precia LIKE 'USD%' OR id_precia LIKE '%USD')
+                AND status_info = :status_info
+                AND id_supplier = :id_supplier
+                AND valuation_date IN :valuation_dates""").bindparams(sa.bindparam("valuation_dates", expanding=True))
+            query_params = {
+                "status_info": 1,
+                "id_supplier": 'Parity',
+                "valuation_dates": list(dates)
+            }
+            rates_dates = pd.read_sql(select_query, db_connection, params=query_params)
+            db_connection.close()
+            valuation_dates = pd.to_datetime(rates_dates["valuation_date"]).dt.strftime(date_format)
+            return {date: rates_dates[valuation_dates == date].reset_index(drop=True) for date in dates}
+        except (Exception,) as fpc_exc:
+            raise_msg = "Fallo la consulta de las tasas calculadas para las fechas a procesar"
+            logger.error(create_log_msg(raise_msg))
+            update_report_process("Fallido", raise_msg, str(fpc_exc))
+            raise PlataformError() from fpc_exc
+
+
+    def replace_parity_rates(self, rates_by_date: dict, rates_to_db: list):
+        """
+        Deshabilita la informacion anterior de todas las fechas (ver disable_previous_info) e inserta
+        todas las tasas calculadas en una sola transaccion
+        """
+        error_msg = "No se pudo realizar el reemplazo de la informacion de paridad"
+        db_connection = None
+        try:
+            db_connection = self.create_connection()
+            with db_connection.begin():
+                for valuation_date, info_df in rates_by_date.items():
+                    update_query = sa.sql.text(
+                        """UPDATE pub_exchange_rate_parity SET status_info = 0 WHERE id_supplier = 'Parity'
+                        AND valuation_date = :valuation_date AND id_precia IN :id_precia_list"""
+                    ).bindparams(sa.bindparam("id_precia_list", expanding=True))
+                    db_connection.execute(update_query, {"valuation_date": valuation_date, "id_precia_list": info_df['id_precia'].values.tolist()})
+                pd.concat(rates_to_db).to_sql('pub_exchange_rate_parity', con=db_connection, if_exists="append", index=False)
+            logger.info("Insercion de las tasas de %s fechas en BD exitosa", len(rates_by_date))
+        except (Exception,) as fpc_exc:
+            logger.error(create_log_msg(error_msg))
+            update_report_process("Fallido", error_msg, str(fpc_exc))
+            raise PlataformError(error_msg) from fpc_exc
+        finally:
+            if db_connection is not None:
+                db_connection.close()
+
+
     def find_rates_data_uvr(self,valuation_date):
         """
         Se realiza la busqueda de la información de los ultimos 7 días
@@ -491,44 +586,70 @@ class exchange_rates():
             raise PlataformError() from fpc_exc               
 
     
+    def calculate_usd_rates(self, df_exchange_rates: pd.DataFrame, valuation_date):
+        """
+        Funcion encargada de construir el vector de tasas contra USD de una fecha a partir de la
+        informacion de los vendors y bancos centrales
+        """
+        df_usd_rates = pd.DataFrame()
+        eurusd_value = None
+        if 'EURUSD' in df_exchange_rates['id_precia'].values:
+            df_usd_ecb_rates,eurusd_value = self.calculate_eur_rates(df_exchange_rates,valuation_date)
+            df_usd_rates = pd.concat([df_usd_ecb_rates, df_usd_rates])
+        if ("EURMXN" in df_exchange_rates['id_precia'].values
+                )and("UDIMXN" in df_exchange_rates['id_precia'].values):
+                df_usdudi_rate = self.calculate_usdudi(df_exchange_rates,eurusd_value,valuation_date)
+                df_usd_rates = pd.concat([df_usd_rates, df_usdudi_rate])
+        if ("USDCLP" in df_exchange_rates["id_precia"].values) and (
+            "CLFCLP" in df_exchange_rates["id_precia"].values
+        ):
+            df_clf_rates = self.calculate_usdclf(
+                df_exchange_rates, valuation_date
+            )
+            df_usd_rates = pd.concat([df_usd_rates, df_clf_rates])
+
+        if ("USDCOP" in df_exchange_rates['id_precia'].values
+            )and("UVRCOP" in df_exchange_rates['id_precia'].values):
+            df_usduvr_rate = self.calculate_usduvr (df_exchange_rates,valuation_date)
+            df_usd_rates = pd.concat([df_usd_rates,df_usduvr_rate])
+
+        df_usd_central_bank = self.calculate_central_bank_rates(df_exchange_rates)
+        df_usd_rates = pd.concat([df_usd_rates,df_usd_central_bank])
+        return df_usd_rates
+
+
     def calculate_all_rates(self,data_exchange_rates:pd.DataFrame):
         """
         Funcion encargada de realizar la paridad de tasas de acuerdo a la informacion recolectada 
-        de los vendors y bancos centrales 
+        de los vendors y bancos centrales. Los cruces entre todas las monedas se calculan como una
+        division exterior del vector de tasas contra USD, sin los cruces de una moneda consigo misma
         """
         
         try:
-            results = []
-            id_precia = []
             data_usd_rates = data_exchange_rates[["id_precia", "value_rates"]]
-            for index1, row1 in data_exchange_rates.iterrows():
-                #logger.debug(index1)
-                for index2, row2 in data_exchange_rates.iterrows():
-                    #logger.debug(index2)
-                    results.append(row1["value_rates"] / row2["value_rates"])
-                    id_precia.append(row2["id_precia"] + str(row1["id_precia"]))
-            df_exchange_rates = pd.DataFrame()
-            df_exchange_rates["id_precia"] = id_precia
-            df_exchange_rates["id_precia"] = df_exchange_rates["id_precia"].replace(
-                {"USD": ""}, regex=True
+            usd_values = data_usd_rates["value_rates"].to_numpy(dtype=float)
+            currencies = data_usd_rates["id_precia"].str.replace("USD", "", regex=True).to_numpy(dtype=str)
+            n_rates = len(usd_values)
+            # Fila i, columna j: valor de la moneda i expresado en la moneda j (id_precia: moneda j + moneda i)
+            cross_values = usd_values[:, None] / usd_values[None, :]
+            cross_ids = np.char.add(currencies[None, :], currencies[:, None])
+            cross_index = np.arange(n_rates * n_rates).reshape(n_rates, n_rates)
+            different_currencies = currencies[:, None] != currencies[None, :]
+            df_exchange_rates = pd.DataFrame(
+                {"id_precia": cross_ids[different_currencies], "value_rates": cross_values[different_currencies]},
+                index=cross_index[different_currencies]
             )
-            df_exchange_rates["value_rates"] = results
-																			   
             df_exchange_rates = pd.concat([df_exchange_rates, data_usd_rates])
-            results = []
-            id_precia = []
-            for index, row1 in data_exchange_rates.iterrows():
-                #logger.debug(index)
-                for index2, row2 in data_exchange_rates.iterrows():
-                    #logger.debug(index2)
-                    id_precia.append(row1["id_precia"][3:] + row1["id_precia"][:3])
-                    results.append(round(1 / row1["value_rates"], 5))
-            df_usd_rates = pd.DataFrame()
-            df_usd_rates["id_precia"] = id_precia
-            df_usd_rates["value_rates"] = results
+            # Inversas de las tasas contra USD, ej. USDCOP -> COPUSD
+            df_usd_rates = pd.DataFrame(
+                {
+                    "id_precia": (data_usd_rates["id_precia"].str[3:] + data_usd_rates["id_precia"].str[:3]).to_numpy(),
+                    "value_rates": np.round(1 / usd_values, 5)
+                },
+                index=cross_index[:, 0]
+            )
             df_exchange_rates = pd.concat([df_usd_rates, df_exchange_rates])
             df_exchange_rates['id_supplier'] = 'Parity'
-            #logger.info(df_exchange_rates.dtypes)
             logger.info(df_exchange_rates)
             df_exchange_rates = df_exchange_rates.drop_duplicates()
             return df_exchange_rates
@@ -584,6 +705,27 @@ class exchange_rates():
         logger.info("lambda_response:\n%s", lambda_response["Payload"].read().decode())
 
 class generate_matrix_tc:
+    sftp_client = None
+    sftp_connect = None
+
+    def open_sftp_session(self, data_connection_sftp):
+        """
+        Abre una sesion SFTP que se reutiliza para todos los archivos de la ejecucion
+        """
+        self.sftp_client = precia_sftp.connect_to_sftp(data_connection_sftp, 10)
+        self.sftp_connect = self.sftp_client.open_sftp()
+
+    def close_sftp_session(self):
+        """
+        Cierra la sesion SFTP abierta con open_sftp_session
+        """
+        if self.sftp_connect is not None:
+            self.sftp_connect.close()
+            self.sftp_connect = None
+        if self.sftp_client is not None:
+            self.sftp_client.close()
+            self.sftp_client = None
+
     def select_parity_currencies(self, df_exchange_rates: pd.DataFrame):
         """
         De acuerdo a la informacion que encontro en paridad se va a extraer las monedas que alli se encuentran
@@ -1015,9 +1157,14 @@ class generate_matrix_tc:
             raise PlataformError() from fpc_exc
 
     def load_files_to_sftp(self, df_file, route_sftp, file_name, data_connection_sftp):
-        """Genera y carga los archivos en el SFTP de MATRIZ"""
-        client = precia_sftp.connect_to_sftp(data_connection_sftp, 10)
-        sftp_connect = client.open_sftp()
+        """Genera y carga los archivos en el SFTP de MATRIZ. Si hay una sesion abierta con
+        open_sftp_session se reutiliza"""
+        session_open = self.sftp_connect is not None
+        if session_open:
+            sftp_connect = self.sftp_connect
+        else:
+            client = precia_sftp.connect_to_sftp(data_connection_sftp, 10)
+            sftp_connect = client.open_sftp()
         logger.info("Comenzando a generar el archivo %s en el sftp", file_name)
         error_message = f"No se pudo generar el archivo en el SFTP: {file_name}"
         try:
@@ -1035,7 +1182,8 @@ class generate_matrix_tc:
             )
             update_report_process("Fallido", error_message, str(e))
         finally:
-            sftp_connect.close()
+            if not session_open:
+                sftp_connect.close()
 
 
 def launch_lambda(lambda_name: str, payload: dict):
@@ -1132,95 +1280,66 @@ def run():
     data_matrix_tc = generate_matrix_tc()
     is_holiday = data_matrix_tc.validate_effective_date(business_days_df)
     all_currencies = 'NO'
+    data_exchange_rates = exchange_rates()
+    src_otc_db_manager = actions_db(db_url_src)
+    pub_rates_db_manager = actions_db(db_url_pub)
+    # Las tasas fuente y las tasas ya publicadas de todas las fechas se consultan una sola vez
+    rates_by_date = src_otc_db_manager.find_rates_data_dates(val_date, datesstr)
+    published_rates_by_date = pub_rates_db_manager.get_rates_dates(datesstr)
+    all_usd_rates_by_date = {}
+    all_usd_rates_to_db_by_date = {}
     for valuation_date in datesstr:
-            data_exchange_rates = exchange_rates()
-            src_otc_db_manager = actions_db(db_url_src)
-            if valuation_date == val_date:
-                df_exchange_rates = src_otc_db_manager.find_rates_data_today(valuation_date)
-            else:
-                df_exchange_rates = src_otc_db_manager.find_rates_data(valuation_date,val_date)
-            df_usd_rates = pd.DataFrame()
-            if 'EURUSD' in df_exchange_rates['id_precia'].values:
-                df_usd_ecb_rates,eurusd_value = data_exchange_rates.calculate_eur_rates(df_exchange_rates,valuation_date)
-                df_usd_rates = pd.concat([df_usd_ecb_rates, df_usd_rates])
-            if ("EURMXN" in df_exchange_rates['id_precia'].values
-                    )and("UDIMXN" in df_exchange_rates['id_precia'].values):
-                    df_usdudi_rate = data_exchange_rates.calculate_usdudi(df_exchange_rates,eurusd_value,valuation_date)
-                    df_usd_rates = pd.concat([df_usd_rates, df_usdudi_rate])
-            if ("USDCLP" in df_exchange_rates["id_precia"].values) and (
-                "CLFCLP" in df_exchange_rates["id_precia"].values
-            ):
-                df_clf_rates = data_exchange_rates.calculate_usdclf(
-                    df_exchange_rates, valuation_date
-                )
-                logger.debug(df_usd_rates.to_string())
-                """df_usd_rates.drop(
-                    df_usd_rates[
-                        (df_usd_rates["id_precia"] == "USDCLF")
-                    ].index,
-                    inplace=True,
-                )"""
-                logger.debug(df_usd_rates.to_string())
-                
-                df_usd_rates = pd.concat([df_usd_rates, df_clf_rates])
-
-            if ("USDCOP" in df_exchange_rates['id_precia'].values
-                )and("UVRCOP" in df_exchange_rates['id_precia'].values):
-                df_usduvr_rate = data_exchange_rates.calculate_usduvr (df_exchange_rates,valuation_date)
-										   
-                df_usd_rates = pd.concat([df_usd_rates,df_usduvr_rate])
+        df_exchange_rates = rates_by_date[valuation_date]
+        df_usd_rates = data_exchange_rates.calculate_usd_rates(df_exchange_rates, valuation_date)
+        df_all_usd_rates = data_exchange_rates.calculate_all_rates(df_usd_rates)
+        df_all_usd_rates['valuation_date'] = valuation_date
+        if df_all_usd_rates.empty:
+            logger.info(f'No hay información para el día {valuation_date}')
+            update_report_process("Fallido", "No hay informacion", "Empty Data")
+            raise PlataformError (f'No hay información para el día {valuation_date}')
+        all_usd_rates_by_date[valuation_date] = df_all_usd_rates
+        all_usd_rates_to_db_by_date[valuation_date] = data_exchange_rates.remove_similar_pairs(df_all_usd_rates.copy())
+    # Todas las fechas se deshabilitan e insertan en una sola transaccion
+    pub_rates_db_manager.replace_parity_rates(all_usd_rates_by_date, list(all_usd_rates_to_db_by_date.values()))
+    for valuation_date in datesstr:
+        # ================================================================================================
+        # REPORTE DE TASAS PROCESADAS EN LA BASE DE DATOS PARA EL TRIGGER
+        df_exchange_rates = rates_by_date[valuation_date]
+        df_all_usd_rates = all_usd_rates_by_date[valuation_date]
+        start_usd = df_all_usd_rates[df_all_usd_rates['id_precia'].str.startswith('USD')]
+        end_usd = df_all_usd_rates[df_all_usd_rates['id_precia'].str.endswith('USD')]
+        clfclp_rate = df_exchange_rates[df_exchange_rates['id_precia'] == 'CLFCLP']
+        usdmxn_rate = df_all_usd_rates[df_all_usd_rates['id_precia'] == 'USDMXN']
+        pre_usd_rates = pd.concat([start_usd,end_usd, clfclp_rate, usdmxn_rate])
+        logger.debug("Tasas del proceso")
+        logger.debug(pre_usd_rates.to_string())
+        
+        df_rates_today = published_rates_by_date[valuation_date]
+        logger.debug(df_rates_today.to_string())
+        
+        post_usd_rates = pd.merge(pre_usd_rates, df_rates_today, on='id_precia', how='left')
+        logger.debug(f"Tasas de bd y calculadas: {post_usd_rates.to_string()}")
+        reports_rates = pd.DataFrame(post_usd_rates, columns=['id_precia'])
+        logger.debug(reports_rates)
+        if not reports_rates.empty:
+            logger.info(f"Tasas que se reportaran en la tabla: {reports_rates.to_string()}")
+            usd_rates_list = reports_rates['id_precia'].tolist()
+            payload = {"product": "Rates parity", "input_name":usd_rates_list, "valuation_date":datesstr}
+            data_exchange_rates.trigger_rates(lambda_process, payload)
+            logger.info("Se han reportado las tasas para el proceso")
+        else:
+            logger.info("Las tasas calculadas son la mismas que en bd, no se reportaran")
+        
+    #=====================================================================
+    # Los archivos de todas las fechas se cargan en una sola sesion SFTP
+    data_matrix_tc.open_sftp_session(data_connection_sftp)
+    try:
+        for valuation_date in datesstr:
+            df_exchange_rates = rates_by_date[valuation_date]
             df_uvrcop = df_exchange_rates[df_exchange_rates['id_precia']=='UVRCOP']
-            
-            df_usd_central_bank = data_exchange_rates.calculate_central_bank_rates(df_exchange_rates)
-            df_usd_rates = pd.concat([df_usd_rates,df_usd_central_bank])
-            df_all_usd_rates = data_exchange_rates.calculate_all_rates(df_usd_rates)
-            df_all_usd_rates['valuation_date'] = valuation_date
-            # ================================================================================================
-            # REPORTE DE TASAS PROCESADAS EN LA BASE DE DATOS PARA EL TRIGGER
-            pub_rates_db_manager_trigger = actions_db(db_url_pub)
-            logger.debug(df_exchange_rates.to_string())
-            start_usd = df_all_usd_rates[df_all_usd_rates['id_precia'].str.startswith('USD')]
-            end_usd = df_all_usd_rates[df_all_usd_rates['id_precia'].str.endswith('USD')]
-            clfclp_rate = df_exchange_rates[df_exchange_rates['id_precia'] == 'CLFCLP']
-            usdmxn_rate = df_all_usd_rates[df_all_usd_rates['id_precia'] == 'USDMXN']
-            logger.debug(df_exchange_rates.to_string())
-            logger.debug(clfclp_rate)
-            logger.debug(usdmxn_rate)
-            pre_usd_rates = pd.concat([start_usd,end_usd, clfclp_rate, usdmxn_rate])
-            logger.debug("Tasas del proceso")
-            logger.debug(pre_usd_rates.to_string())
-            
-            df_rates_today = pub_rates_db_manager_trigger.get_rates_today(valuation_date)
-            logger.debug(df_rates_today.to_string())
-            
-            post_usd_rates = pd.merge(pre_usd_rates, df_rates_today, on='id_precia', how='left')
-            logger.debug(f"Tasas de bd y calculadas: {post_usd_rates.to_string()}")
-            selected_data = post_usd_rates.loc[post_usd_rates['value_rates_x'] != post_usd_rates['value_rates_y'], 'id_precia']
-            logger.debug(selected_data)
-            reports_rates = pd.DataFrame(post_usd_rates, columns=['id_precia'])
-            logger.debug(reports_rates)
-            if not reports_rates.empty:
-                logger.info(f"Tasas que se reportaran en la tabla: {reports_rates.to_string()}")
-                usd_rates_list = reports_rates['id_precia'].tolist()
-                payload = {"product": "Rates parity", "input_name":usd_rates_list, "valuation_date":datesstr}
-                data_exchange_rates.trigger_rates(lambda_process, payload)
-                logger.info("Se han reportado las tasas para el proceso")
-            else:
-                logger.info("Las tasas calculadas son la mismas que en bd, no se reportaran")
-            
-            #=====================================================================
-            pub_rates_db_manager = actions_db(db_url_pub)
-            if df_all_usd_rates.empty:
-                logger.info(f'No hay información para el día {valuation_date}')
-                update_report_process("Fallido", "No hay informacion", "Empty Data")
-                raise PlataformError (f'No hay información para el día {valuation_date}')
-            pub_rates_db_manager.disable_previous_info(df_all_usd_rates,valuation_date)
-            df_all_usd_rates_to_db = data_exchange_rates.remove_similar_pairs(df_all_usd_rates)
-            pub_rates_db_manager.insert_data(df_all_usd_rates_to_db)
-            data_matrix_tc = generate_matrix_tc()
             effective_date = data_matrix_tc.validate_effective_date(business_days_df)
             business_days = business_days_df.iloc[:,1:].sum(axis=1)
-            df_exchange_rates = data_matrix_tc.create_matrix_run(business_days,business_days_df,effective_date,last_bussines_day_df,valuation_date,df_uvrcop,df_all_usd_rates_to_db)
+            df_exchange_rates = data_matrix_tc.create_matrix_run(business_days,business_days_df,effective_date,last_bussines_day_df,valuation_date,df_uvrcop,all_usd_rates_to_db_by_date[valuation_date])
             rates_tc = data_matrix_tc.select_parity_currencies(df_exchange_rates)
             df_currencies_tc = data_matrix_tc.compare_currencies(
                 rates_tc, df_exchange_rates
@@ -1229,6 +1348,8 @@ def run():
                 df_currencies_tc, valuation_date
             )
             logger.info('all_currencies (%s): %s',valuation_date,all_currencies)
+    finally:
+        data_matrix_tc.close_sftp_session()
     logger.info('all_currencies pos for ' + str(all_currencies))
 
     logger.info('all_currencies pos for ' + str(all_currencies))
@@ -1302,3 +1423,4 @@ Enviado por el servicio automático de notificaciones de Precia PPV S.A. en AWS
         
 if __name__ == "__main__":
     run()
+    log_query_stats()
@@ -1,8 +1,9 @@
 """
 Glue que se encarga de la metodología de tasas implícitas 
+Requiere en --extra-py-files precia_utils-0.2-py3-none-any.whl (se construye desde Supplies_py/precia_utils)
+Parametro opcional --S3_CURVE_CACHE_BUCKET: bucket del cache de curvas en S3 (sin el parametro no se usa cache)
 """
 # Nativas
-from base64 import b64decode
 from dateutil import relativedelta as rd
 import datetime as dt
 from decimal import Decimal
@@ -24,11 +25,20 @@ import pandas as pd
 import numpy as np
 import sqlalchemy as sa
 
+# Personalizadas
+from precia_utils.precia_aws import get_parameter_from_ssm, get_secret
+from precia_utils.precia_cache import CurveCache
+from precia_utils.precia_db import get_engine, log_query_stats
+
 ERROR_MSG_LOG_FORMAT = "{} (linea: {}, {}): {}."
 PRECIA_LOG_FORMAT = (
     "%(asctime)s [%(levelname)s] [%(filename)s](%(funcName)s): %(message)s"
 )
 PARAMETER_STORE = "ps-otc-lambda-reports"
+# Cache en S3 de las tasas implícitas, compartido entre ejecuciones. METHODOLOGY_VERSION hace parte de la
+# llave del cache y se debe actualizar con cada cambio de la metodología que modifique las tasas
+CURVE_CACHE_PREFIX = "otc_curve_cache/implicit_rate"
+METHODOLOGY_VERSION = "implicit-rate-1"
 
 #-------------------------------------------------------------------------------------------------------------------
 # CONFIGURACIÓN DEL SISTEMA DE LOGS
@@ -117,35 +127,20 @@ def get_params(parameter_list) -> dict:
         logger.error(create_log_msg(error_msg))
         raise Exception(error_msg) from sec_exc
         
-def get_secret(secret_name: str) -> dict:
+def curve_cache_from_params():
     """
-    Obtiene secretos almacenados en el servicio Secrets Manager de AWS.
-
-    Parameters:
-        secret_name (str): Nombre del secreto en el servicio AWS.
-        
-    Returns:
-        dict: Secreto con la informacion desplegada en Secrets Manager AWS.
+    Crea el cache de curvas en el bucket del parametro opcional S3_CURVE_CACHE_BUCKET del glue.
+    Si el job no tiene el parametro el cache queda deshabilitado y las curvas siempre se construyen
     """
-    try:
-        logger.info('Intentando obtener secreto: "%s" ...', secret_name)
-        cliente_secrets_manager = aws_client("secretsmanager")
-        secret_data = cliente_secrets_manager.get_secret_value(SecretId=secret_name)
-        if "SecretString" in secret_data:
-            secret_str = secret_data["SecretString"]
-        else:
-            secret_str = b64decode(secret_data["SecretBinary"])
-        logger.info("Se obtuvo el secreto.")
-        return json.loads(secret_str)
-    except (Exception,) as sec_exc:
-        error_msg = f'Fallo al obtener el secreto "{secret_name}"'
-        logger.error(create_log_msg(error_msg))
-        raise Exception(error_msg) from sec_exc
-    
+    bucket = None
+    if "--S3_CURVE_CACHE_BUCKET" in argv:
+        bucket = get_params(["S3_CURVE_CACHE_BUCKET"])["S3_CURVE_CACHE_BUCKET"]
+    return CurveCache(bucket, CURVE_CACHE_PREFIX, METHODOLOGY_VERSION)
 
 def get_parameter_store(parameter_name):
     """
-    Obtiene el valor del parameter store
+    Obtiene el valor del parameter store. El valor se conserva en el cache de precia_aws,
+    por lo que los reportes de estado sucesivos no vuelven a consultar SSM
     
     Parameters:
         parameter_name (str): Nombre del parámetro
@@ -153,13 +148,9 @@ def get_parameter_store(parameter_name):
     Returns:
         str: valor del parametro obtenido
     """
-    logger.info("Intentando leer el parametro: "+parameter_name)
-    ssm_client = aws_client('ssm')
-    response = ssm_client.get_parameter(
-        Name=parameter_name, WithDecryption=True)
-    logger.info("El parametro tiene el valor: " +
-                str(response['Parameter']['Value']))
-    return response['Parameter']['Value']
+    parameter_value = get_parameter_from_ssm(parameter_name)
+    logger.info("El parametro "+parameter_name+" tiene el valor: " + str(parameter_value))
+    return parameter_value
 
 #--------------------------------------------------------------------------------
 # EJECUTAR LAMBDA
@@ -346,7 +337,7 @@ class DbHandler:
     def connect_db(self):
         """Genera la conexión a base de datos"""
         try:
-            self.connection = sa.create_engine(self.url_db).connect()
+            self.connection = get_engine(self.url_db).connect()
             logger.info("Se conecto correctamente a la base de datos")
         except Exception as e:
             logger.error(create_log_msg("Fallo la conexión a la base de datos"))
@@ -627,6 +618,7 @@ class ETL():
         self.valuation_date = valuation_date_param["VALUATION_DATE"]
         rate_implict_param = get_params(["IMPLICIT_RATE"])
         self.implicit_rate = rate_implict_param["IMPLICIT_RATE"]
+        self.curve_cache = curve_cache_from_params()
 
     
     def extract_data(self):
@@ -672,8 +664,16 @@ class ETL():
         """Orquesta la construcción de las Tasas Implícitas, implementación de la metodología"""
         try:
             logger.info("Inicia la construcción de las tasas implicitas (Implementación de la metodología)...")
-            self.nodes_rates, self.daily_rates = implicit_rate(self.df_fwd_inter_daily,  self.exchange_rate, self.factor, 
-                                                               self.df_swapcc_inter["rate"].values, self.df_fwd_inter_nodes["days"].values, self.implicit_rate)
+            # Las tasas se reutilizan del cache cuando los insumos no cambiaron
+            cache_key = self.curve_cache.key(self.implicit_rate, self.exchange_rate, self.factor, self.df_swapcc_inter,
+                                             self.df_fwd_inter_daily, self.df_fwd_inter_nodes)
+            cached_rates = self.curve_cache.get(cache_key)
+            if cached_rates is not None:
+                self.nodes_rates, self.daily_rates = cached_rates["nodes_rates"], cached_rates["daily_rates"]
+            else:
+                self.nodes_rates, self.daily_rates = implicit_rate(self.df_fwd_inter_daily,  self.exchange_rate, self.factor, 
+                                                                   self.df_swapcc_inter["rate"].values, self.df_fwd_inter_nodes["days"].values, self.implicit_rate)
+                self.curve_cache.put(cache_key, {"nodes_rates": self.nodes_rates, "daily_rates": self.daily_rates})
             
             # Columnas adicionales para inserción en base de datos
             self.nodes_rates["valuation_date"] = self.valuation_date
@@ -848,4 +848,5 @@ def main():
 
 if __name__ == "__main__":
     logger = setup_logging(logging.INFO)
-    main() 
\ No newline at end of file
+    main()
+    log_query_stats()
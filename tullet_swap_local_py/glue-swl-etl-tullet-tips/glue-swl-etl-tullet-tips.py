@@ -2,12 +2,15 @@
 Módulo ETL ICAP
 Contiene el código de la lambda lbd-p-etl-src-icap-fwd-swp-local, funcionando en glue.
 Este componente procesa el archivo de Tullet que contiene las puntas
+Requiere en --extra-py-files precia_utils-0.2-py3-none-any.whl (se construye desde Supplies_py/precia_utils),
+que incluye precia_api y precia_orderbook
 """
 from base64 import b64decode
+from contextlib import contextmanager
+import csv
 from datetime import datetime
 from dateutil import tz, relativedelta as rd
 import datetime as dt
-import io
 import json
 import logging
 import os
@@ -23,6 +26,9 @@ import paramiko
 import requests
 import sqlalchemy as sa
 
+from precia_utils.precia_api import ApiIngestClient
+from precia_utils.precia_orderbook import drop_traded_actions, resolve_modify_actions
+
 pd.options.mode.chained_assignment = None
 failed_init = False
 error_message = ""
@@ -49,6 +55,24 @@ EXPECTED_FILE_COLUMNS = [
     "Rejected",
 ]
 MAX_FILE_SIZE = 5e7
+# Lectura del archivo por bloques de filas con tipos explicitos. DV01 conserva el
+# tipo inferido (entero o decimal) porque Amount hace parte de llaves de texto
+FILE_CHUNK_SIZE = 50000
+# Bytes por lectura del archivo en el SFTP
+SFTP_READ_SIZE = 32768
+FILE_SEPARATORS = [",", ";"]
+FILE_DTYPES = {
+    "Vendor": str,
+    "Issue Description": str,
+    "Trade Date": str,
+    "Order Type": str,
+    "Action Type": str,
+    "Market Entry Time": str,
+    "Market Leave Time": str,
+    "Price": "float64",
+    "Currency": str,
+    "Rejected": str,
+}
 ETL_FORMAT_DATE = "%Y-%m-%d"
 FILE_FORMAT_DATE = "%d/%m/%Y"
 SWP_COLUMN_DICT = {
@@ -337,7 +361,7 @@ def validate_file_structure(file_size: str) -> bool:
                 "El archivo %s es sospechosamente grande, no sera procesado.", FILE_NAME
             )
             raise_msg = f"El archivo {FILE_NAME} supera el tamanio maximo aceptado. "
-            raise_msg += "Maximo: {MAX_FILE_SIZE}B. Informado: {file_size}B"
+            raise_msg += f"Maximo: {MAX_FILE_SIZE:.0f}B. Informado: {file_size}B"
             raise PlataformError(raise_msg)
         if file_size == 0:
             logger.info("El archivo %s esta vacio.", FILE_NAME)
@@ -1095,47 +1119,8 @@ def delete_actions_from_trades(process_df: pd.DataFrame) -> pd.DataFrame:
         init_msg = "Eliminando las filas de accion INSERT para las "
         init_msg += "puntas que finalizaron con una accion TRADE..."
         logger.info(init_msg)
-        df_icap_filters_trade = pd.DataFrame(
-            process_df[process_df["Action_Type"] == "Trade"]
-        )
+        df_icap_filters_trade = drop_traded_actions(process_df)
         df_icap_filters_trade["order"] = df_icap_filters_trade["Action_Type"]
-        df_icap_filters_trade["Market_Entry_Time"].astype("string")
-
-        for i in range(df_icap_filters_trade.index.size):
-            # trade de la iteracion
-            trade_row = df_icap_filters_trade.iloc[
-                df_icap_filters_trade.index == df_icap_filters_trade.index[i]
-            ]
-            by_tenor_drop_equal = process_df[
-                (
-                    process_df["Issue_Description"]
-                    == trade_row.Issue_Description.values[0]
-                )
-                & (process_df["Price"] == trade_row["Price"].values[0])
-                & (process_df["Amount"] == trade_row["Amount"].values[0])
-                & (
-                    process_df["Market_Entry_Time"]
-                    == trade_row["Market_Entry_Time"].values[0]
-                )
-            ]
-            process_df.drop(
-                index=by_tenor_drop_equal.index.values.tolist(), inplace=True
-            )
-            by_tenor_drop_different = process_df[
-                (
-                    process_df["Issue_Description"]
-                    == trade_row.Issue_Description.values[0]
-                )
-                & (process_df["Price"] == trade_row["Price"].values[0])
-                & (process_df["Amount"] == trade_row["Amount"].values[0])
-                & (
-                    process_df["Market_Entry_Time"]
-                    == trade_row["Market_Leave_Time"].values[0]
-                )
-            ]
-            process_df.drop(
-                index=by_tenor_drop_different.index.values.tolist(), inplace=True
-            )
 
         df_icap_filters_trade = df_icap_filters_trade.sort_values(
             ["Market_Entry_Time", "Market_Leave_Time"]
@@ -1354,176 +1339,6 @@ def order_by_action_and_hour(process_df: pd.DataFrame) -> pd.DataFrame:
         raise PlataformError from ah_exc
 
 
-def replace_modify_actions(process_df: pd.DataFrame):
-    """
-    Reemplaza los MODIFY por INSERT + CANCEL. Si es subject MODIFY solo se
-    reemplaza por CANCEL. El nuevo INSERT toma como hora de insercion la hora
-    del MODIFY, y el nuevo CANCEL toma como hora de insercion la hora del INSERT
-    sobre el que se hace el MODIFY y como hora de retiro la hora del MODIFY
-
-    Args:
-        process_df (pd.DataFrame): Dataframe sobre el cual se realiza el
-        reemplazo de los MODIFY
-
-    Raises:
-        PlataformError: Cuando falla el reemplazo de los MODIFY
-
-    Returns:
-        pd.DataFrame: Dataframe con MODIFY sustituidos
-    """
-    try:
-        process_df_copy = process_df.copy()
-        modify_index_list = process_df_copy[
-            (process_df_copy["Action_Type"] == "Modify")
-        ].index.values.tolist()
-
-        # Dataframe para guardar nuevos insert con fila dummie
-        new_inserts_df = pd.DataFrame(
-            {
-                "Vendor": [0],
-                "Issue_Description": [0],
-                "Trade_Date": [0],
-                "Order_Type": [0],
-                "Action_Type": [0],
-                "Market_Entry_Time": [0],
-                "Market_Leave_Time": [0],
-                "Price": [0],
-                "Amount": [0],
-                "Currency": [0],
-                "Rejected": [0],
-                "Market": [0],
-                "date_issue": [0],
-                "derived_type": [0],
-                "Underlying": [0],
-                "Tenor": [0],
-                "order_Time": [0],
-                "order_time_temp": [0],
-                "order": [0],
-                "lettering_mistake": [0],
-                "length_error": [0],
-                "tenor_length_error": [0],
-            }
-        )
-
-        for modify_index in modify_index_list:
-
-            moldify_row = process_df_copy.loc[modify_index]
-            moldify_row_df = process_df_copy.loc[[modify_index]]
-
-            new_insert_row_df = moldify_row_df
-            new_insert_row_df.iloc[
-                [0], new_insert_row_df.columns.get_loc("Action_Type")
-            ] = "Insert"
-            modify_type = moldify_row["Order_Type"]
-
-            # Se agrega el nuevo INSERT si el modify si no es Subject
-            if "Subject" not in modify_type:
-                new_inserts_df = pd.concat([new_inserts_df, new_insert_row_df])
-
-            # dataframe desde la primera fila hasta el modify de la iteracion
-            actions_without_trades_partial_df = process_df_copy[0:modify_index]
-
-            # precio del modify de la iteracion
-            modify_price = moldify_row["Price"]
-
-            # curva y tenores del modify de la iteracion
-            modify_descripcion = moldify_row["Issue_Description"]
-
-            is_bid = "bid" in moldify_row["Order_Type"].lower()
-
-            # dataframe con inserts
-            inserts_df = actions_without_trades_partial_df[
-                (
-                    actions_without_trades_partial_df["Issue_Description"]
-                    == modify_descripcion
-                )
-                & (actions_without_trades_partial_df["Action_Type"] == "Insert")
-                & (actions_without_trades_partial_df["Price"] == modify_price)
-                & (
-                    actions_without_trades_partial_df["Order_Type"].str.contains(
-                        "bid", False
-                    )
-                    == is_bid
-                )
-            ]
-
-            # primer insert del dataframe anterior
-            one_insert_df = inserts_df.head(1)
-
-            if not one_insert_df.empty:
-
-                insert_init_hour = one_insert_df.loc[
-                    one_insert_df.index
-                    == one_insert_df["Market_Entry_Time"].index.max(),
-                    "Market_Entry_Time",
-                ].values[0]
-                modify_init_hour = moldify_row["Market_Entry_Time"]
-
-                # Reemplazando las horas del MODIFY
-                process_df_copy.loc[
-                    process_df_copy.index == modify_index,
-                    "Market_Entry_Time",
-                ] = insert_init_hour
-                process_df_copy.loc[
-                    process_df_copy.index == modify_index,
-                    "Market_Leave_Time",
-                ] = modify_init_hour
-
-                # se obtiene el order type, order time y order time temp del INSERT
-                insert_order_type = one_insert_df.loc[
-                    one_insert_df.index == one_insert_df["Order_Type"].index.max(),
-                    "Order_Type",
-                ].values[0]
-                insert_order_time = one_insert_df.loc[
-                    one_insert_df.index == one_insert_df["order_Time"].index.max(),
-                    "order_Time",
-                ].values[0]
-                insert_order_time_temp = one_insert_df.loc[
-                    one_insert_df.index == one_insert_df["order_time_temp"].index.max(),
-                    "order_time_temp",
-                ].values[0]
-
-                # Se sustituye el MODIFY por un CANCEL
-                process_df_copy.loc[
-                    process_df_copy.index == modify_index,
-                    "Action_Type",
-                ] = "Cancel"
-
-                # Se sustituye el order type, order time y order time temp del
-                # CANCEL por los del INSERT
-                process_df_copy.loc[
-                    process_df_copy.index == modify_index,
-                    "Order_Type",
-                ] = insert_order_type
-                process_df_copy.loc[
-                    process_df_copy.index == modify_index,
-                    "order_Time",
-                ] = insert_order_time
-                process_df_copy.loc[
-                    process_df_copy.index == modify_index,
-                    "order_time_temp",
-                ] = insert_order_time_temp
-
-                # elimina el INSERT del que extrajo la hora para el MODIFY
-                process_df_copy.drop(
-                    index=one_insert_df["Market_Entry_Time"].index.max(),
-                    inplace=True,
-                )
-
-        # Eliminando el primer registro dummie
-        new_inserts_df = new_inserts_df.drop(new_inserts_df.index[0])
-
-        logger.info("MODIFYs convertidos en INSERTs: %s", new_inserts_df.shape[0])
-
-        # Agregando los nuevos registros inserts
-        process_df_copy = pd.concat([process_df_copy, new_inserts_df])
-
-        return process_df_copy
-    except (Exception,) as rma_exc:
-        logger.error(create_log_msg("Fallo el reemplazo de MODIFY por INSERT+CANCEL"))
-        raise PlataformError from rma_exc
-
-
 def count_modify_actions(process_df: pd.DataFrame) -> int:
     """Cuenta el numero de acciones MODIFY en el dataframe dado
 
@@ -1662,46 +1477,19 @@ def filter_orders(procces_df: pd.DataFrame) -> pd.DataFrame:
                 inplace=True,
             )
 
-            # Iteracion para reemplazar modify por insert + cancel incluso
-            # cuando hay modify de modify
-            iterations = 0
-            while True:
-
-                number_of_modify_before = count_modify_actions(
-                    actions_without_trades_df
-                )
-                iterations += 1
-                logger.info(
-                    "MODIFYs antes de sustiticion de MODIFYs numero %s: %s",
-                    iterations,
-                    number_of_modify_before,
-                )
-
-                before_modify_msg = "Acciones (sin TRADEs) antes de sustiticion de MODIFYs numero %s: %s"
-                logger.info(
-                    before_modify_msg, iterations, actions_without_trades_df.shape[0]
-                )
-
-                actions_without_trades_df = order_by_action_and_hour(
-                    actions_without_trades_df
-                )
-                actions_without_trades_df.reset_index(drop=True, inplace=True)
-
-                actions_without_trades_df = replace_modify_actions(
-                    actions_without_trades_df
-                )
-
-                number_of_modify_after = count_modify_actions(actions_without_trades_df)
-                logger.info(
-                    "MODIFYs despues de sustiticion de MODIFYs numero %s: %s",
-                    iterations,
-                    number_of_modify_after,
-                )
-
-                # Si son iguales significa que no hubo nuevos modify validos
-                # para reemplazar (modify de modify)
-                if number_of_modify_before == number_of_modify_after:
-                    break
+            # Reemplaza los modify por insert + cancel incluso cuando hay
+            # modify de modify
+            logger.info(
+                "MODIFYs antes de la sustitucion de MODIFYs: %s",
+                count_modify_actions(actions_without_trades_df),
+            )
+            actions_without_trades_df = resolve_modify_actions(
+                actions_without_trades_df
+            )
+            logger.info(
+                "MODIFYs despues de la sustitucion de MODIFYs: %s",
+                count_modify_actions(actions_without_trades_df),
+            )
 
             actions_df = pd.concat(
                 [
@@ -2097,9 +1885,35 @@ def validate_column(df_icap_to_db):
         raise PlataformError from vc_exc
 
 
+def sniff_file_columns(data_file) -> tuple:
+    """
+    Lee las dos primeras lineas del archivo (titulo y encabezado) y determina
+    el separador: coma si el encabezado tiene todas las columnas esperadas,
+    punto y coma en otro caso
+
+    Args:
+        data_file: Archivo abierto en modo binario, posicionado al inicio
+
+    Returns:
+        tuple: (separador, columnas del encabezado)
+    """
+    data_file.readline()
+    header_line = data_file.readline().decode("utf-8").strip("\r\n")
+    for separator in FILE_SEPARATORS:
+        columns = next(csv.reader([header_line], delimiter=separator))
+        if len(columns) >= len(EXPECTED_FILE_COLUMNS):
+            break
+    logger.info("Separador detectado en el archivo: '%s'", separator)
+    return separator, columns
+
+
 def load_file_data(file_path: str, data_file) -> pd.DataFrame:
     """
-    Carga los datos del archivo insumo en un DataFrame Pandas
+    Carga los datos del archivo insumo en un DataFrame Pandas. El archivo se
+    lee por bloques de FILE_CHUNK_SIZE filas a medida que se descarga; en cada
+    bloque se validan la fecha y el broker, se descartan las puntas rechazadas
+    y se renombra DV01 como Amount, de modo que solo se acumulan las filas
+    utiles
     """
     params_glue = get_params(["VALUATION_DATE"])
     valuation_date = params_glue["VALUATION_DATE"]
@@ -2107,45 +1921,65 @@ def load_file_data(file_path: str, data_file) -> pd.DataFrame:
     try:
         logger.info("Extrayendo los datos del archivo como dataframe Pandas ...")
         file_extension = file_path.split(".")[-1].lower()
-        if file_extension == "csv":
-            data_df = pd.read_csv(io.BytesIO(b"".join(data_file)), skiprows=[0], sep=",")
-            if data_df.shape[1] < len(EXPECTED_FILE_COLUMNS):
-                data_df = pd.read_csv(io.BytesIO(b"".join(data_file)), skiprows=[0], sep=";")
-        else:
+        if file_extension != "csv":
             raise UserError(f"El archivo {file_path} no puede procesarse con este ETL.")
-        logger.info("Extraccion de los datos exitosa.")
-        logger.debug(
-            "Datos orginales del archivo. data_df(5):\n%s", data_df.head().to_string()
-        )
-        data_df.dropna(axis=0, how="all", inplace=True)
-        data_columns = list(data_df.columns)
+        separator, data_columns = sniff_file_columns(data_file)
         if set(data_columns) != set(EXPECTED_FILE_COLUMNS):
             raise_msg = "El archivo no tiene las columnas esperadas."
             raise_msg += (
                 f" Esperadas:{EXPECTED_FILE_COLUMNS}. Encontradas: {data_columns}"
             )
             raise UserError(raise_msg)
-        if data_df.empty:
+        trade_date = "Trade Date"
+        file_trade_date = None
+        data_broker = None
+        vendor_warned = False
+        total_rows = 0
+        chunks = []
+        for chunk_df in pd.read_csv(
+            data_file,
+            sep=separator,
+            header=None,
+            names=data_columns,
+            dtype=FILE_DTYPES,
+            chunksize=FILE_CHUNK_SIZE,
+        ):
+            chunk_df.dropna(axis=0, how="all", inplace=True)
+            if chunk_df.empty:
+                continue
+            if file_trade_date is None:
+                file_trade_date = chunk_df[trade_date].iloc[0]
+                data_broker = chunk_df["Vendor"].iloc[0]
+                logger.debug(
+                    "Datos orginales del archivo. data_df(5):\n%s",
+                    chunk_df.head().to_string(),
+                )
+            if not (chunk_df[trade_date] == file_trade_date).all():
+                raise_msg = (
+                    "La columna 'Trade Date' No tiene el mismo valor en todas las filas."
+                )
+                raise UserError(raise_msg)
+            if not vendor_warned and not (chunk_df["Vendor"] == data_broker).all():
+                warn_msg = "La columna 'Vendor' No tiene el mismo valor en todas las filas."
+                logger.warning(warn_msg)
+                vendor_warned = True
+            total_rows += chunk_df.shape[0]
+            chunk_df = chunk_df[(chunk_df["Rejected"] == "N")]
+            chunks.append(chunk_df.rename({"DV01": "Amount"}, axis=1))
+        logger.info("Extraccion de los datos exitosa.")
+        if total_rows == 0:
             logger.warning("El DataFrame de los datos del archivo esta vacio.")
             return pd.DataFrame()
-        trade_date = "Trade Date"
-        if not (data_df[trade_date] == data_df[trade_date].iloc[0]).all():
-            raise_msg = (
-                "La columna 'Trade Date' No tiene el mismo valor en todas las filas."
-            )
-            raise UserError(raise_msg)
-        if not (data_df["Vendor"] == data_df["Vendor"].iloc[0]).all():
-            warn_msg = "La columna 'Vendor' No tiene el mismo valor en todas las filas."
-            logger.warning(warn_msg)
-        data_broker = data_df["Vendor"].iloc[0]
+        logger.info(
+            "Filas del archivo: %s. Filas no rechazadas: %s",
+            total_rows,
+            sum(chunk_df.shape[0] for chunk_df in chunks),
+        )
         if data_broker != BROKER:
             log_msg = "El broker del archivo no coincide con el esperado. "
             log_msg += f"Esperado: {BROKER}. Encontrado: {data_broker}"
             logger.warning(log_msg)
-        file_valuation_date = data_df[trade_date].iloc[0]
-        file_valuation_date = dt.datetime.strptime(
-            file_valuation_date, FILE_FORMAT_DATE
-        )
+        file_valuation_date = dt.datetime.strptime(file_trade_date, FILE_FORMAT_DATE)
         data_valuation_date = file_valuation_date.strftime(ETL_FORMAT_DATE)
         if data_valuation_date != valuation_date:
             log_msg = (
@@ -2158,7 +1992,7 @@ def load_file_data(file_path: str, data_file) -> pd.DataFrame:
             logger.warning(log_msg)
             send_warning_email(log_msg)
             valuation_date = data_valuation_date
-        data_df = data_df.rename({"DV01":"Amount"}, axis=1)
+        data_df = pd.concat(chunks, ignore_index=True)
         logger.info("Carga de los datos del archivo exitosa.")
         logger.info("Load data: \n" + data_df.head().to_string())
         return data_df
@@ -2201,36 +2035,13 @@ def insert_data_to_db_swp(df_icap):
         if df_to_swp.empty:
             logger.info("No hay informacion para swaps")
         else:
-            df_to_swp.reset_index(inplace=True, drop=True)
-            data = []
-            for index, row in df_to_swp.iterrows():
-                registro = {
-                    "sistema": row["sistema"],
-                    "tipo-derivado": row["tipo-derivado"],
-                    "mercado": row["mercado"],
-                    "subyacente": row["subyacente"],
-                    "fecha": row["fecha"],
-                    "hora-inicial": row["hora-inicial"],
-                    "hora-final": row["hora-final"],
-                    "fecha-emision": row["fecha-emision"],
-                    "tenor": row["tenor"],
-                    "nominal": row["nominal"],
-                    "tipo-orden": row["tipo-orden"],
-                    "precio": row["precio"],
-                }
-                data.append(registro)
-
-            df_to_swp_db = {"data": data}
-            logger.info(f"Información a insertar {df_to_swp_db}")
-            url_api_insert_swp_local = f"{API_URL}/src/otc/swap/local"
-            mail_response = requests.post(url_api_insert_swp_local, json=df_to_swp_db, timeout=10)
-            api_mail_code = str(mail_response.status_code)
-            api_mail_text = mail_response.text
-            logger.info(
-                "Respuesta del servicio de notificaciones para la inserción: code: %s, body: %s",
-                api_mail_code,
-                api_mail_text,
-            )
+            logger.info("Registros a insertar: %s", df_to_swp.shape[0])
+            with ApiIngestClient(API_URL, timeout=10) as api_client:
+                api_client.post_dataframe(
+                    "/src/otc/swap/local",
+                    df_to_swp,
+                    columns=list(SWP_COLUMN_DICT.values()),
+                )
     except (Exception,):
         logger.error(create_log_msg(error_msg))
         raise
@@ -2245,6 +2056,7 @@ class SFTPHandler:
     
     def __init__(self, data_connection):
         self.data_connection = data_connection
+        self.sftp = None
         
 
     def connect_to_sftp(self, timeout: int = 40) -> paramiko.SSHClient:
@@ -2290,31 +2102,43 @@ class SFTPHandler:
             logger.info("No hay conexion al servidor SFTP")
             
             
-    def get_file(self, path_file: str):
+    @contextmanager
+    def open_file(self, path_file: str):
         """
-        Obtiene archivos desde un FTP en la ruta proporcionada
+        Abre un archivo del FTP en la ruta proporcionada para leerlo en
+        streaming. El tamanio se valida con stat antes de abrir el archivo, el
+        contenido se lee en bloques de SFTP_READ_SIZE bytes a medida que se
+        procesa, y la conexion se cierra al salir del contexto
+
+        Yields:
+            tuple: (archivo remoto abierto en modo binario, True si esta vacio)
         """
         try:
-            logger.info("Descargando archivos del FTP %s ...")
+            logger.info("Abriendo el archivo %s del FTP ...", path_file)
             self.connect_to_sftp()
-            self.sftp.stat(path_file)
-            with self.sftp.open(path_file, "rb") as remote_file:
-                file_data = remote_file.readlines()
-            logger.info("Se ha descargado el archivo correctamente del FTP")
             file_size = self.sftp.stat(path_file).st_size
-            return file_data, file_size
+            is_empty_file = validate_file_structure(file_size)
+            remote_file = self.sftp.open(path_file, "rb", bufsize=SFTP_READ_SIZE)
+        except PlataformError:
+            self.disconnect_sftp()
+            raise
         except FileNotFoundError as error:
+            self.disconnect_sftp()
             error_msg = f"El archivo {path_file} no existe en el FTP"
             logger.error(create_log_msg(error_msg))
             raise FileNotFoundError(error_msg) from error
         except (Exception,) as e:
+            self.disconnect_sftp()
             logger.error(
                 create_log_msg(
                     "Ocurrio un error en la descarga del archivo desde el FTP"
                 )
             )
             raise PlataformError("No se pudo descargar el archivo del FTP") from e
+        try:
+            yield remote_file, is_empty_file
         finally:
+            remote_file.close()
             self.disconnect_sftp()
 
 
@@ -2422,18 +2246,17 @@ def main():
             }
             route_tullet = key_secret_sftp["route_tullet"]+file_name_tp
             loader = SFTPHandler(data_connection_sftp)
-            data_file_tullet, file_size = loader.get_file(route_tullet)
-            is_empty_file = validate_file_structure(file_size)
-            if is_empty_file:
-                update_status("Exitoso")
-                body = "Finaliza la ejecucion exitosamente por que el archivo esta vacio"
-                send_warning_email(body)
-                response = {"statusCode": 200, "body": body}
-                logger.info(body)
-                return response
-            raw_file_data_df = load_file_data(route_tullet, data_file_tullet)
+            with loader.open_file(route_tullet) as (data_file_tullet, is_empty_file):
+                if is_empty_file:
+                    update_status("Exitoso")
+                    body = "Finaliza la ejecucion exitosamente por que el archivo esta vacio"
+                    send_warning_email(body)
+                    response = {"statusCode": 200, "body": body}
+                    logger.info(body)
+                    return response
+                # Las puntas rechazadas se descartan durante la lectura
+                raw_file_data_df = load_file_data(route_tullet, data_file_tullet)
             # Inicio de la lógica de negocio
-            raw_file_data_df = raw_file_data_df[(raw_file_data_df["Rejected"] == "N")]
             df_replace_str = replace_columns_names(raw_file_data_df)
             df_icap = set_close_hour_ny(df_replace_str)
             df_icap_new_columns = create_new_columns(df_icap)